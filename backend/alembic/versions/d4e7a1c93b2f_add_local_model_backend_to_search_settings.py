@@ -0,0 +1,45 @@
+"""add local model backend to search settings
+
+Revision ID: d4e7a1c93b2f
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from shared_configs.enums import LocalModelBackend
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e7a1c93b2f"
+down_revision = "c1d2e3f4a5b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "search_settings",
+        sa.Column(
+            "local_model_backend",
+            sa.Enum(LocalModelBackend, native_enum=False),
+            nullable=False,
+            server_default=LocalModelBackend.TORCH.name,
+        ),
+    )
+    op.add_column(
+        "search_settings",
+        sa.Column(
+            "rerank_local_model_backend",
+            sa.Enum(LocalModelBackend, native_enum=False),
+            nullable=False,
+            server_default=LocalModelBackend.TORCH.name,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("search_settings", "rerank_local_model_backend")
+    op.drop_column("search_settings", "local_model_backend")
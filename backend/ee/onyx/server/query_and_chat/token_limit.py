@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from onyx.db.api_key import is_api_key_email_address
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.llm import fetch_user_group_ids
 from onyx.db.models import ChatMessage
 from onyx.db.models import ChatSession
 from onyx.db.models import TokenRateLimit
@@ -25,6 +26,8 @@ from onyx.db.token_limit import fetch_all_user_token_rate_limits
 from onyx.server.query_and_chat.token_limit import _get_cutoff_time
 from onyx.server.query_and_chat.token_limit import _is_rate_limited
 from onyx.server.query_and_chat.token_limit import _user_is_rate_limited_by_global
+from onyx.server.query_and_chat.token_limit import fetch_usage
+from onyx.server.query_and_chat.token_limit import GLOBAL_USAGE_SCOPE
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 
@@ -47,11 +50,30 @@ def _check_token_rate_limits(user: User | None) -> None:
         )
 
 
+def _fetch_usage_scopes(user: User | None) -> list[str]:
+    # mirrors the limits that _check_token_rate_limits applies to the user
+    if user is None or is_api_key_email_address(user.email):
+        return [GLOBAL_USAGE_SCOPE]
+
+    with get_session_with_current_tenant() as db_session:
+        user_group_ids = fetch_user_group_ids(db_session, user)
+
+    return [
+        GLOBAL_USAGE_SCOPE,
+        _user_usage_scope(user.id),
+        *(_user_group_usage_scope(user_group_id) for user_group_id in user_group_ids),
+    ]
+
+
 """
 User rate limits
 """
 
 
+def _user_usage_scope(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
 def _user_is_rate_limited(user_id: UUID) -> None:
     with get_session_with_current_tenant() as db_session:
         user_rate_limits = fetch_all_user_token_rate_limits(
@@ -60,7 +82,11 @@ def _user_is_rate_limited(user_id: UUID) -> None:
 
         if user_rate_limits:
             user_cutoff_time = _get_cutoff_time(user_rate_limits)
-            user_usage = _fetch_user_usage(user_id, user_cutoff_time, db_session)
+            user_usage = fetch_usage(
+                _user_usage_scope(user_id),
+                user_cutoff_time,
+                lambda: _fetch_user_usage(user_id, user_cutoff_time, db_session),
+            )
 
             if _is_rate_limited(user_rate_limits, user_usage):
                 raise HTTPException(
@@ -93,26 +119,25 @@ User Group rate limits
 """
 
 
+def _user_group_usage_scope(user_group_id: int) -> str:
+    return f"user_group:{user_group_id}"
+
+
 def _user_is_rate_limited_by_group(user_id: UUID) -> None:
     with get_session_with_current_tenant() as db_session:
         group_rate_limits = _fetch_all_user_group_rate_limits(user_id, db_session)
 
         if group_rate_limits:
-            # Group cutoff time is the same for all groups.
-            # This could be optimized to only fetch the maximum cutoff time for
-            # a specific group, but seems unnecessary for now.
-            group_cutoff_time = _get_cutoff_time(
-                [e for sublist in group_rate_limits.values() for e in sublist]
-            )
-
-            user_group_ids = list(group_rate_limits.keys())
-            group_usage = _fetch_user_group_usage(
-                user_group_ids, group_cutoff_time, db_session
-            )
-
             has_at_least_one_untriggered_limit = False
             for user_group_id, rate_limits in group_rate_limits.items():
-                usage = group_usage.get(user_group_id, [])
+                group_cutoff_time = _get_cutoff_time(rate_limits)
+                usage = fetch_usage(
+                    _user_group_usage_scope(user_group_id),
+                    group_cutoff_time,
+                    lambda: _fetch_user_group_usage(
+                        [user_group_id], group_cutoff_time, db_session
+                    ).get(user_group_id, []),
+                )
 
                 if not _is_rate_limited(rate_limits, usage):
                     has_at_least_one_untriggered_limit = True
@@ -29,9 +29,15 @@ from shared_configs.configs import INFORMATION_CONTENT_MODEL_TAG
 from shared_configs.configs import INFORMATION_CONTENT_MODEL_VERSION
 from shared_configs.configs import INTENT_MODEL_TAG
 from shared_configs.configs import INTENT_MODEL_VERSION
+from shared_configs.configs import QUANTIZE_QUERY_CLASSIFIER_MODELS
+from shared_configs.configs import QUERY_CLASSIFIER_BATCH_SIZE
+from shared_configs.model_server_models import ConnectorClassificationBatchRequest
+from shared_configs.model_server_models import ConnectorClassificationBatchResponse
 from shared_configs.model_server_models import ConnectorClassificationRequest
 from shared_configs.model_server_models import ConnectorClassificationResponse
 from shared_configs.model_server_models import ContentClassificationPrediction
+from shared_configs.model_server_models import IntentBatchRequest
+from shared_configs.model_server_models import IntentBatchResponse
 from shared_configs.model_server_models import IntentRequest
 from shared_configs.model_server_models import IntentResponse
 
@@ -55,6 +61,18 @@ _INFORMATION_CONTENT_MODEL: Optional["SetFitModel"] = None
 _INFORMATION_CONTENT_MODEL_PROMPT_PREFIX: str = ""  # spec to model version!
 
 
+def _maybe_quantize(model: torch.nn.Module) -> torch.nn.Module:
+    """Swap the linear layers for int8 dynamically quantized ones if enabled. Only
+    applies on CPU, the quantized kernels aren't available for the GPU backends."""
+    if not QUANTIZE_QUERY_CLASSIFIER_MODELS or model.device.type != "cpu":
+        return model
+
+    logger.notice(f"Quantizing {model.__class__.__name__} to int8")
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
 def get_connector_classifier_tokenizer() -> "PreTrainedTokenizer":
     global _CONNECTOR_CLASSIFIER_TOKENIZER
     from transformers import AutoTokenizer, PreTrainedTokenizer
@@ -97,6 +115,9 @@ def get_local_connector_classifier(
                     f"Failed to load model even after attempted snapshot download: {e}"
                 )
                 raise
+        _CONNECTOR_CLASSIFIER_MODEL = cast(
+            ConnectorClassifier, _maybe_quantize(_CONNECTOR_CLASSIFIER_MODEL)
+        )
     return _CONNECTOR_CLASSIFIER_MODEL
 
 
@@ -142,6 +163,7 @@ def get_local_intent_model(
                     f"Failed to load model even after attempted snapshot download: {e}"
                 )
                 raise
+        _INTENT_MODEL = cast(HybridClassifier, _maybe_quantize(_INTENT_MODEL))
     return _INTENT_MODEL
 
 
@@ -234,6 +256,37 @@ def tokenize_connector_classification_query(
     return input_ids.unsqueeze(0), attention_mask.unsqueeze(0)
 
 
+def tokenize_connector_classification_queries(
+    connectors: list[str],
+    queries: list[str],
+    tokenizer: "PreTrainedTokenizer",
+    connector_token_end_id: int,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Batched version of tokenize_connector_classification_query, the prompts are right
+    padded to the longest one and the attention mask excludes the padding.
+    """
+    tokenized = [
+        tokenize_connector_classification_query(
+            connectors, query, tokenizer, connector_token_end_id
+        )
+        for query in queries
+    ]
+
+    input_ids = torch.nn.utils.rnn.pad_sequence(
+        [query_input_ids.squeeze(0) for query_input_ids, _ in tokenized],
+        batch_first=True,
+        padding_value=tokenizer.pad_token_id,
+    )
+    attention_mask = torch.nn.utils.rnn.pad_sequence(
+        [query_attention_mask.squeeze(0) for _, query_attention_mask in tokenized],
+        batch_first=True,
+        padding_value=0,
+    )
+
+    return input_ids, attention_mask
+
+
 def warm_up_connector_classifier_model() -> None:
     logger.info(
         f"Warming up connector_classifier model {CONNECTOR_CLASSIFIER_MODEL_TAG}"
@@ -276,7 +329,11 @@ def warm_up_information_content_model() -> None:
 
 
 @simple_log_function_time()
-def run_inference(tokens: "BatchEncoding") -> tuple[list[float], list[float]]:
+def run_inference_batch(
+    tokens: "BatchEncoding",
+) -> list[tuple[list[float], list[float]]]:
+    """Intent probabilities and per token keyword probabilities for each (padded)
+    sequence in the batch. Padding tokens are dropped from the token probabilities."""
     intent_model = get_local_intent_model()
     device = intent_model.device
 
@@ -289,13 +346,24 @@ def run_inference(tokens: "BatchEncoding") -> tuple[list[float], list[float]]:
     intent_logits = outputs["intent_logits"]
 
     # Move tensors to CPU before applying softmax and converting to numpy
-    intent_probabilities = F.softmax(intent_logits.cpu(), dim=-1).numpy()[0]
-    token_probabilities = F.softmax(token_logits.cpu(), dim=-1).numpy()[0]
-
+    intent_probabilities = F.softmax(intent_logits.cpu(), dim=-1).numpy()
     # Extract the probabilities for the positive class (index 1) for each token
-    token_positive_probs = token_probabilities[:, 1].tolist()
+    token_positive_probabilities = F.softmax(token_logits.cpu(), dim=-1).numpy()[
+        :, :, 1
+    ]
+    sequence_lengths = tokens["attention_mask"].sum(dim=-1).tolist()
 
-    return intent_probabilities.tolist(), token_positive_probs
+    return [
+        (
+            intent_probabilities[ind].tolist(),
+            token_positive_probabilities[ind, :sequence_length].tolist(),
+        )
+        for ind, sequence_length in enumerate(sequence_lengths)
+    ]
+
+
+def run_inference(tokens: "BatchEncoding") -> tuple[list[float], list[float]]:
+    return run_inference_batch(tokens)[0]
 
 
 @simple_log_function_time()
@@ -467,65 +535,134 @@ def clean_keywords(keywords: list[str]) -> list[str]:
     return cleaned_words
 
 
-def run_connector_classification(req: ConnectorClassificationRequest) -> list[str]:
+def run_connector_classification_batch(
+    queries: list[str], connector_names: list[str]
+) -> list[list[str]]:
+    if not queries or not connector_names:
+        return [[] for _ in queries]
+
     tokenizer = get_connector_classifier_tokenizer()
     model = get_local_connector_classifier()
 
-    connector_names = req.available_connectors
-
-    input_ids, attention_mask = tokenize_connector_classification_query(
-        connector_names,
-        req.query,
-        tokenizer,
-        model.connector_end_token_id,
-    )
-    input_ids = input_ids.to(model.device)
-    attention_mask = attention_mask.to(model.device)
+    passed_connectors_per_query: list[list[str]] = []
+    for start in range(0, len(queries), QUERY_CLASSIFIER_BATCH_SIZE):
+        batch_queries = queries[start : start + QUERY_CLASSIFIER_BATCH_SIZE]
 
-    global_confidence, classifier_confidence = model(input_ids, attention_mask)
-
-    if global_confidence.item() < 0.5:
-        return []
+        input_ids, attention_mask = tokenize_connector_classification_queries(
+            connector_names,
+            batch_queries,
+            tokenizer,
+            model.connector_end_token_id,
+        )
+        input_ids = input_ids.to(model.device)
+        attention_mask = attention_mask.to(model.device)
 
-    passed_connectors = []
+        global_confidence, classifier_confidence = model(input_ids, attention_mask)
 
-    for i, connector_name in enumerate(connector_names):
-        if classifier_confidence.view(-1)[i].item() > 0.5:
-            passed_connectors.append(connector_name)
+        # Every prompt has one connector end token per connector, in the same order
+        global_confidences = global_confidence.cpu().view(-1).tolist()
+        classifier_confidences = (
+            classifier_confidence.cpu().view(len(batch_queries), -1).tolist()
+        )
 
-    return passed_connectors
+        for query_global_confidence, query_classifier_confidences in zip(
+            global_confidences, classifier_confidences
+        ):
+            if query_global_confidence < 0.5:
+                passed_connectors_per_query.append([])
+                continue
+
+            passed_connectors_per_query.append(
+                [
+                    connector_name
+                    for connector_name, confidence in zip(
+                        connector_names, query_classifier_confidences
+                    )
+                    if confidence > 0.5
+                ]
+            )
 
+    return passed_connectors_per_query
 
-def run_analysis(intent_req: IntentRequest) -> tuple[bool, list[str]]:
-    tokenizer = get_intent_model_tokenizer()
-    model_input = tokenizer(
-        intent_req.query, return_tensors="pt", truncation=False, padding=False
-    )
 
-    if len(model_input.input_ids[0]) > 512:
-        # If the user text is too long, assume it is semantic and keep all words
-        return True, intent_req.query.split()
+def run_connector_classification(req: ConnectorClassificationRequest) -> list[str]:
+    return run_connector_classification_batch([req.query], req.available_connectors)[0]
 
-    intent_probs, token_probs = run_inference(model_input)
 
-    is_keyword_sequence = intent_probs[0] >= intent_req.keyword_percent_threshold
+def _extract_query_analysis(
+    query: str,
+    input_ids: list[int],
+    intent_probs: list[float],
+    token_probs: list[float],
+    keyword_percent_threshold: float,
+    tokenizer: "PreTrainedTokenizer",
+) -> tuple[bool, list[str]]:
+    is_keyword_sequence = intent_probs[0] >= keyword_percent_threshold
 
     keyword_preds = [
-        token_prob >= intent_req.keyword_percent_threshold for token_prob in token_probs
+        token_prob >= keyword_percent_threshold for token_prob in token_probs
     ]
 
     try:
-        keywords = map_keywords(model_input.input_ids[0], tokenizer, keyword_preds)
-    except Exception as e:
-        logger.warning(
-            f"Failed to extract keywords for query: {intent_req.query} due to {e}"
+        keywords = map_keywords(
+            torch.tensor(input_ids, dtype=torch.long), tokenizer, keyword_preds
         )
+    except Exception as e:
+        logger.warning(f"Failed to extract keywords for query: {query} due to {e}")
         # Fallback to keeping all words
-        keywords = intent_req.query.split()
+        keywords = query.split()
 
-    cleaned_keywords = clean_keywords(keywords)
+    return is_keyword_sequence, clean_keywords(keywords)
 
-    return is_keyword_sequence, cleaned_keywords
+
+def run_analysis_batch(
+    queries: list[str], keyword_percent_threshold: float
+) -> list[tuple[bool, list[str]]]:
+    """Analyzes the queries in padded batches of QUERY_CLASSIFIER_BATCH_SIZE, one forward
+    pass per batch instead of one per query."""
+    tokenizer = get_intent_model_tokenizer()
+
+    results: list[tuple[bool, list[str]] | None] = [None] * len(queries)
+    query_input_ids: list[list[int]] = tokenizer(
+        queries, truncation=False, padding=False
+    )["input_ids"]
+
+    inds_to_run: list[int] = []
+    for ind, input_ids in enumerate(query_input_ids):
+        if len(input_ids) > 512:
+            # If the user text is too long, assume it is semantic and keep all words
+            results[ind] = (True, queries[ind].split())
+        else:
+            inds_to_run.append(ind)
+
+    for start in range(0, len(inds_to_run), QUERY_CLASSIFIER_BATCH_SIZE):
+        batch_inds = inds_to_run[start : start + QUERY_CLASSIFIER_BATCH_SIZE]
+        # pads the token ids from above instead of tokenizing the queries again
+        model_input = tokenizer.pad(
+            {"input_ids": [query_input_ids[ind] for ind in batch_inds]},
+            padding=True,
+            return_tensors="pt",
+        )
+
+        for ind, (intent_probs, token_probs) in zip(
+            batch_inds, run_inference_batch(model_input)
+        ):
+            results[ind] = _extract_query_analysis(
+                query=queries[ind],
+                input_ids=query_input_ids[ind],
+                intent_probs=intent_probs,
+                token_probs=token_probs,
+                keyword_percent_threshold=keyword_percent_threshold,
+                tokenizer=tokenizer,
+            )
+
+    return cast(list[tuple[bool, list[str]]], results)
+
+
+def run_analysis(intent_req: IntentRequest) -> tuple[bool, list[str]]:
+    return run_analysis_batch([intent_req.query], intent_req.keyword_percent_threshold)[
+        0
+    ]
 
 
 @router.post("/connector-classification")
@@ -555,6 +692,39 @@ async def process_analysis_request(
     return IntentResponse(is_keyword=is_keyword, keywords=keywords)
 
 
+@router.post("/connector-classification-batch")
+async def process_connector_classification_batch_request(
+    classification_request: ConnectorClassificationBatchRequest,
+) -> ConnectorClassificationBatchResponse:
+    if INDEXING_ONLY:
+        raise RuntimeError(
+            "Indexing model server should not call connector classification endpoint"
+        )
+
+    connectors = run_connector_classification_batch(
+        classification_request.queries, classification_request.available_connectors
+    )
+    return ConnectorClassificationBatchResponse(connectors=connectors)
+
+
+@router.post("/query-analysis-batch")
+async def process_analysis_batch_request(
+    intent_request: IntentBatchRequest,
+) -> IntentBatchResponse:
+    if INDEXING_ONLY:
+        raise RuntimeError("Indexing model server should not call intent endpoint")
+
+    results = run_analysis_batch(
+        intent_request.queries, intent_request.keyword_percent_threshold
+    )
+    return IntentBatchResponse(
+        results=[
+            IntentResponse(is_keyword=is_keyword, keywords=keywords)
+            for is_keyword, keywords in results
+        ]
+    )
+
+
 @router.post("/content-classification")
 async def process_content_classification_request(
     content_classification_requests: list[str],
@@ -1,17 +1,18 @@
 import asyncio
 import time
 from typing import Any
-from typing import Optional
 from typing import TYPE_CHECKING
 
 from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
 
+from model_server.onnx_models import load_local_model
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import INDEXING_ONLY
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelBackend
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 from shared_configs.model_server_models import EmbedResponse
@@ -26,8 +27,9 @@ logger = setup_logger()
 router = APIRouter(prefix="/encoder")
 
 
-_GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
-_RERANK_MODEL: Optional["CrossEncoder"] = None
+# keyed by (model name, backend)
+_GLOBAL_MODELS_DICT: dict[tuple[str, LocalModelBackend], "SentenceTransformer"] = {}
+_RERANK_MODELS: dict[tuple[str, LocalModelBackend], "CrossEncoder"] = {}
 
 # If we are not only indexing, dont want retry very long
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
@@ -37,10 +39,12 @@ _RETRY_TRIES = 10 if INDEXING_ONLY else 2
 def get_embedding_model(
     model_name: str,
     max_context_length: int,
+    backend: LocalModelBackend = LocalModelBackend.TORCH,
 ) -> "SentenceTransformer":
     """
     Loads or returns a cached SentenceTransformer, sets max_seq_length, pins device,
     pre-warms rotary caches once, and wraps encode() with a lock to avoid cache races.
+    The pre-warm pass also warms up ONNX Runtime sessions for the ONNX backends.
     """
     from sentence_transformers import SentenceTransformer
 
@@ -67,37 +71,48 @@ def get_embedding_model(
 
     global _GLOBAL_MODELS_DICT
 
-    if model_name not in _GLOBAL_MODELS_DICT:
-        logger.notice(f"Loading {model_name}")
-        model = SentenceTransformer(
-            model_name_or_path=model_name,
+    model_key = (model_name, backend)
+    if model_key not in _GLOBAL_MODELS_DICT:
+        logger.notice(f"Loading {model_name} with the {backend.value} backend")
+        model = load_local_model(
+            SentenceTransformer,
+            model_name,
+            backend,
             trust_remote_code=True,
         )
         model.max_seq_length = max_context_length
         _prewarm_rope(model, max_context_length)
-        _GLOBAL_MODELS_DICT[model_name] = model
+        _GLOBAL_MODELS_DICT[model_key] = model
     else:
-        model = _GLOBAL_MODELS_DICT[model_name]
+        model = _GLOBAL_MODELS_DICT[model_key]
         if max_context_length != model.max_seq_length:
             model.max_seq_length = max_context_length
             prev = getattr(model, "_rope_prewarmed_to", 0)
             if max_context_length > int(prev or 0):
                 _prewarm_rope(model, max_context_length)
 
-    return _GLOBAL_MODELS_DICT[model_name]
+    return _GLOBAL_MODELS_DICT[model_key]
 
 
 def get_local_reranking_model(
     model_name: str,
+    backend: LocalModelBackend = LocalModelBackend.TORCH,
 ) -> "CrossEncoder":
-    global _RERANK_MODEL
+    global _RERANK_MODELS
     from sentence_transformers import CrossEncoder
 
-    if _RERANK_MODEL is None:
-        logger.notice(f"Loading {model_name}")
-        model = CrossEncoder(model_name)
-        _RERANK_MODEL = model
-    return _RERANK_MODEL
+    model_key = (model_name, backend)
+    if model_key not in _RERANK_MODELS:
+        logger.notice(f"Loading {model_name} with the {backend.value} backend")
+        model = load_local_model(CrossEncoder, model_name, backend)
+        try:
+            # first inference allocates buffers / builds kernels, keep it off the
+            # request path
+            model.predict([("warm up", "warm up")], show_progress_bar=False)
+        except Exception as e:
+            logger.warning(f"Reranking model warm-up failed: {e}")
+        _RERANK_MODELS[model_key] = model
+    return _RERANK_MODELS[model_key]
 
 
 ENCODING_RETRIES = 3
@@ -129,6 +144,7 @@ async def embed_text(
     normalize_embeddings: bool,
     prefix: str | None,
     gpu_type: str = "UNKNOWN",
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
 ) -> list[Embedding]:
     if not all(texts):
         logger.error("Empty strings provided for embedding")
@@ -155,7 +171,9 @@ async def embed_text(
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
         local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
+            model_name=model_name,
+            max_context_length=max_context_length,
+            backend=local_model_backend,
         )
         # Run CPU-bound embedding in a thread pool
         embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
@@ -179,6 +197,7 @@ async def embed_text(
             f"texts={len(texts)} "
             f"chars={total_chars} "
             f"model={model_name} "
+            f"backend={local_model_backend.value} "
             f"gpu={gpu_type} "
             f"elapsed={elapsed:.2f}"
         )
@@ -190,8 +209,13 @@ async def embed_text(
 
 
 @simple_log_function_time()
-async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
-    cross_encoder = get_local_reranking_model(model_name)
+async def local_rerank(
+    query: str,
+    docs: list[str],
+    model_name: str,
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
+) -> list[float]:
+    cross_encoder = get_local_reranking_model(model_name, local_model_backend)
     # Run CPU-bound reranking in a thread pool
     return await asyncio.get_event_loop().run_in_executor(
         None,
@@ -240,6 +264,7 @@ async def process_embed_request(
             normalize_embeddings=embed_request.normalize_embeddings,
             prefix=prefix,
             gpu_type=gpu_type,
+            local_model_backend=embed_request.local_model_backend,
         )
         return EmbedResponse(embeddings=embeddings)
     except RateLimitError as e:
@@ -282,6 +307,7 @@ async def process_rerank_request(rerank_request: RerankRequest) -> RerankRespons
             query=rerank_request.query,
             docs=rerank_request.documents,
             model_name=rerank_request.model_name,
+            local_model_backend=rerank_request.local_model_backend,
         )
         return RerankResponse(scores=sim_scores)
 
@@ -0,0 +1,126 @@
+"""
+Loading of local embedding / reranking models with ONNX Runtime instead of torch.
+
+The ONNX backends need `optimum[onnxruntime]` and sentence-transformers>=4.1, both
+part of the model server requirements. If a model can't be exported to ONNX, it is
+loaded with torch instead so that a misconfigured backend never takes down embedding or
+reranking.
+"""
+
+import os
+import shutil
+from typing import Any
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import ONNX_INTRA_OP_NUM_THREADS
+from shared_configs.configs import ONNX_MODEL_CACHE_DIR
+from shared_configs.enums import LocalModelBackend
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+
+logger = setup_logger()
+
+# AVX2 is available on practically every x86 inference node, unlike AVX512-VNNI
+_QUANTIZATION_CONFIG = "avx2"
+_QUANTIZED_FILE_NAME = os.path.join("onnx", f"model_qint8_{_QUANTIZATION_CONFIG}.onnx")
+
+_ModelT = TypeVar("_ModelT", "SentenceTransformer", "CrossEncoder")
+
+
+def _onnx_model_kwargs() -> dict[str, Any]:
+    import onnxruntime as ort  # type: ignore
+
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_INTRA_OP_NUM_THREADS > 0:
+        session_options.intra_op_num_threads = ONNX_INTRA_OP_NUM_THREADS
+
+    return {"provider": "CPUExecutionProvider", "session_options": session_options}
+
+
+def _quantized_model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def _export_quantized_model(
+    model_cls: type[_ModelT],
+    model_name: str,
+    quantized_dir: str,
+    model_kwargs: dict[str, Any],
+    **kwargs: Any,
+) -> None:
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    logger.notice(f"Quantizing {model_name} to int8, this only happens once")
+
+    # Written to a scratch directory first so that a crash or a concurrent model
+    # server never leaves a partially written model behind
+    scratch_dir = f"{quantized_dir}.tmp-{os.getpid()}"
+    try:
+        onnx_model = model_cls(
+            model_name, backend="onnx", model_kwargs=model_kwargs, **kwargs
+        )
+        onnx_model.save_pretrained(scratch_dir)
+        export_dynamic_quantized_onnx_model(
+            onnx_model,
+            quantization_config=_QUANTIZATION_CONFIG,
+            model_name_or_path=scratch_dir,
+        )
+        # a concurrent model server may have finished the export in the meantime,
+        # a directory without the quantized model is replaced
+        if not os.path.exists(os.path.join(quantized_dir, _QUANTIZED_FILE_NAME)):
+            shutil.rmtree(quantized_dir, ignore_errors=True)
+            os.replace(scratch_dir, quantized_dir)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def _load_onnx_model(
+    model_cls: type[_ModelT],
+    model_name: str,
+    backend: LocalModelBackend,
+    **kwargs: Any,
+) -> _ModelT:
+    model_kwargs = _onnx_model_kwargs()
+    if backend == LocalModelBackend.ONNX:
+        # models that don't ship an ONNX file are exported on load
+        return model_cls(
+            model_name, backend="onnx", model_kwargs=model_kwargs, **kwargs
+        )
+
+    quantized_dir = _quantized_model_dir(model_name)
+    if not os.path.exists(os.path.join(quantized_dir, _QUANTIZED_FILE_NAME)):
+        _export_quantized_model(
+            model_cls, model_name, quantized_dir, model_kwargs, **kwargs
+        )
+
+    return model_cls(
+        quantized_dir,
+        backend="onnx",
+        model_kwargs={**model_kwargs, "file_name": _QUANTIZED_FILE_NAME},
+        **kwargs,
+    )
+
+
+def load_local_model(
+    model_cls: type[_ModelT],
+    model_name: str,
+    backend: LocalModelBackend,
+    **kwargs: Any,
+) -> _ModelT:
+    """Loads a SentenceTransformer or CrossEncoder with the requested backend,
+    falling back to torch if the ONNX backend is unavailable for this model."""
+    if backend != LocalModelBackend.TORCH:
+        try:
+            return _load_onnx_model(model_cls, model_name, backend, **kwargs)
+        except Exception as e:
+            # e.g. architectures that optimum can't export to ONNX
+            logger.warning(
+                f"Could not load {model_name} with the {backend.value} backend, "
+                f"falling back to torch: {e}"
+            )
+
+    return model_cls(model_name, **kwargs)
@@ -0,0 +1,275 @@
+"""
+In-process cache of the users that API keys, personal access tokens and session tokens
+resolve to, see AUTH_PRINCIPAL_CACHE_ENABLED.
+
+Cached users are detached snapshots that are merged into the request's session without
+a query, so that every request still works with its own instance. Commits that change a
+user, or anything that is loaded along with the user, publish the user's id on a Redis
+channel and every API server evicts that user's entries when it receives it. Entries
+are only served while the process is subscribed to the channel.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from itertools import chain
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.schema import Column
+
+from onyx.configs.app_configs import AUTH_PRINCIPAL_CACHE_ENABLED
+from onyx.configs.app_configs import AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+from onyx.db.models import ApiKey
+from onyx.db.models import Credential
+from onyx.db.models import Memory
+from onyx.db.models import OAuthAccount
+from onyx.db.models import PersonalAccessToken
+from onyx.db.models import User
+from onyx.redis.redis_invalidation import publish_invalidation
+from onyx.redis.redis_invalidation import RedisInvalidationSubscriber
+from onyx.redis.redis_pool import get_async_redis_connection
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+PRINCIPAL_INVALIDATION_CHANNEL = "onyx_auth_principal_invalidation"
+
+# Rows that are loaded along with the user (or resolve to it) and the column pointing
+# to the user they belong to
+_USER_ID_COLUMNS: dict[type, str] = {
+    User: "id",
+    ApiKey: "user_id",
+    PersonalAccessToken: "user_id",
+    OAuthAccount: "user_id",
+    Memory: "user_id",
+    Credential: "user_id",
+}
+
+# Columns that bulk updates can change without invalidating the cached users, e.g.
+# the throttled PAT usage tracking
+_IGNORED_UPDATE_COLUMNS = {"last_used_at"}
+
+# Session.info key of the user ids changed in the current transaction
+_CHANGED_USER_IDS_KEY = "onyx_changed_principal_user_ids"
+# Session.info key set if the current transaction changed users that can't be told apart
+_CHANGED_ALL_USERS_KEY = "onyx_changed_all_principals"
+
+
+class CredentialType(str, Enum):
+    API_KEY = "api_key"
+    PAT = "pat"
+    SESSION_TOKEN = "session_token"
+
+
+def build_principal_cache_key(credential_type: CredentialType, credential: str) -> str:
+    credential_hash = hashlib.sha256(credential.encode()).hexdigest()
+    return f"{get_current_tenant_id()}:{credential_type.value}:{credential_hash}"
+
+
+@dataclass
+class _CacheEntry:
+    user: User
+    expires_at: float
+
+
+class _PrincipalCache:
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._keys_by_user_id: dict[UUID, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> User | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.user
+
+    def put(self, key: str, user: User) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _CacheEntry(user, time.monotonic() + self.ttl)
+            self._keys_by_user_id.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def evict_users(self, user_ids: list[UUID]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                for key in list(self._keys_by_user_id.get(user_id, ())):
+                    self._remove(key)
+
+    def evict_keys(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user_id.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user_id.get(entry.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user_id[entry.user.id]
+
+
+_cache = _PrincipalCache(
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS, AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+
+def _handle_invalidation(raw_message: bytes | str) -> None:
+    message = json.loads(raw_message)
+    if message.get("all"):
+        _cache.clear()
+        return
+    _cache.evict_users([UUID(user_id) for user_id in message.get("user_ids", [])])
+    _cache.evict_keys(message.get("keys", []))
+
+
+_subscriber = RedisInvalidationSubscriber(
+    PRINCIPAL_INVALIDATION_CHANNEL, _handle_invalidation, on_subscribe=_cache.clear
+)
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of the user and everything that was loaded along with it"""
+    with Session() as snapshot_session:
+        snapshot = snapshot_session.merge(user, load=False)
+    return snapshot
+
+
+async def get_cached_principal(key: str, async_db_session: AsyncSession) -> User | None:
+    if not AUTH_PRINCIPAL_CACHE_ENABLED:
+        return None
+
+    _subscriber.ensure_started()
+    if not _subscriber.subscribed.is_set():
+        return None
+
+    cached_user = _cache.get(key)
+    if cached_user is None:
+        return None
+    return await async_db_session.merge(cached_user, load=False)
+
+
+def cache_principal(key: str, user: User) -> None:
+    if AUTH_PRINCIPAL_CACHE_ENABLED and _subscriber.subscribed.is_set():
+        _cache.put(key, _snapshot(user))
+
+
+def _publish(message: dict[str, Any]) -> None:
+    _handle_invalidation(json.dumps(message))
+    publish_invalidation(PRINCIPAL_INVALIDATION_CHANNEL, json.dumps(message))
+
+
+async def invalidate_cached_principal(key: str) -> None:
+    """For credentials that are revoked without touching Postgres, e.g. on logout"""
+    if not AUTH_PRINCIPAL_CACHE_ENABLED:
+        return
+
+    message = json.dumps({"keys": [key]})
+    _handle_invalidation(message)
+    try:
+        redis = await get_async_redis_connection()
+        await redis.publish(PRINCIPAL_INVALIDATION_CHANNEL, message)
+    except Exception:
+        logger.exception("Failed to publish auth principal invalidation")
+
+
+def _changed_user_ids(session: Session) -> set[UUID]:
+    return session.info.setdefault(_CHANGED_USER_IDS_KEY, set())
+
+
+def _user_id_filtered_on(orm_execute_state: ORMExecuteState, column: str) -> Any:
+    """The user id of bulk updates / deletes of the form `WHERE <column> = <value>`"""
+    where_clause = getattr(orm_execute_state.statement, "whereclause", None)
+    if (
+        isinstance(where_clause, BinaryExpression)
+        and where_clause.operator is operators.eq
+        and isinstance(where_clause.left, Column)
+        and where_clause.left.key == column
+        and isinstance(where_clause.right, BindParameter)
+    ):
+        return where_clause.right.effective_value
+    return None
+
+
+def _updated_columns(orm_execute_state: ORMExecuteState) -> set[str]:
+    """The columns set by a bulk update, "*" if they aren't known"""
+    values = getattr(orm_execute_state.statement, "_values", None) or {}
+    return {getattr(column, "key", str(column)) for column in values} or {"*"}
+
+
+def _collect_changed_principals(session: Session, flush_context: Any) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        column = _USER_ID_COLUMNS.get(type(obj))
+        user_id = getattr(obj, column) if column else None
+        if user_id is not None:
+            _changed_user_ids(session).add(user_id)
+
+
+def _collect_bulk_changed_principals(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    column = _USER_ID_COLUMNS.get(mapper.class_) if mapper else None
+    if column is None:
+        return
+    updated_columns = _updated_columns(orm_execute_state)
+    if orm_execute_state.is_update and updated_columns <= _IGNORED_UPDATE_COLUMNS:
+        return
+
+    user_id = _user_id_filtered_on(orm_execute_state, column)
+    if user_id is not None:
+        _changed_user_ids(orm_execute_state.session).add(user_id)
+    else:
+        orm_execute_state.session.info[_CHANGED_ALL_USERS_KEY] = True
+
+
+def _publish_changed_principals(session: Session) -> None:
+    changed_all = session.info.pop(_CHANGED_ALL_USERS_KEY, False)
+    user_ids = session.info.pop(_CHANGED_USER_IDS_KEY, set())
+    if changed_all:
+        _publish({"all": True})
+    elif user_ids:
+        _publish({"user_ids": [str(user_id) for user_id in user_ids]})
+
+
+def _discard_changed_principals(session: Session) -> None:
+    session.info.pop(_CHANGED_ALL_USERS_KEY, None)
+    session.info.pop(_CHANGED_USER_IDS_KEY, None)
+
+
+if AUTH_PRINCIPAL_CACHE_ENABLED:
+    event.listen(Session, "after_flush", _collect_changed_principals)
+    event.listen(Session, "do_orm_execute", _collect_bulk_changed_principals)
+    event.listen(Session, "after_commit", _publish_changed_principals)
+    event.listen(Session, "after_rollback", _discard_changed_principals)
@@ -66,6 +66,11 @@ from onyx.auth.invited_users import get_invited_users
 from onyx.auth.invited_users import remove_user_from_invited_users
 from onyx.auth.jwt import verify_jwt_token
 from onyx.auth.pat import get_hashed_pat_from_request
+from onyx.auth.principal_cache import build_principal_cache_key
+from onyx.auth.principal_cache import cache_principal
+from onyx.auth.principal_cache import CredentialType
+from onyx.auth.principal_cache import get_cached_principal
+from onyx.auth.principal_cache import invalidate_cached_principal
 from onyx.auth.schemas import AuthBackend
 from onyx.auth.schemas import UserCreate
 from onyx.auth.schemas import UserRole
@@ -906,6 +911,14 @@ class TenantAwareRedisStrategy(RedisStrategy[User, uuid.UUID]):
     async def read_token(
         self, token: Optional[str], user_manager: BaseUserManager[User, uuid.UUID]
     ) -> Optional[User]:
+        if token is None:
+            return None
+
+        cache_key = build_principal_cache_key(CredentialType.SESSION_TOKEN, token)
+        user_db = cast(SQLAlchemyUserDatabase, user_manager.user_db)
+        if cached_user := await get_cached_principal(cache_key, user_db.session):
+            return cached_user
+
         redis = await get_async_redis_connection()
         token_data_str = await redis.get(f"{self.key_prefix}{token}")
         if not token_data_str:
@@ -915,14 +928,20 @@ class TenantAwareRedisStrategy(RedisStrategy[User, uuid.UUID]):
             token_data = json.loads(token_data_str)
             user_id = token_data["sub"]
             parsed_id = user_manager.parse_id(user_id)
-            return await user_manager.get(parsed_id)
+            user = await user_manager.get(parsed_id)
         except (exceptions.UserNotExists, exceptions.InvalidID, KeyError):
             return None
 
+        cache_principal(cache_key, user)
+        return user
+
     async def destroy_token(self, token: str, user: User) -> None:
         """Properly delete the token from async redis."""
         redis = await get_async_redis_connection()
         await redis.delete(f"{self.key_prefix}{token}")
+        await invalidate_cached_principal(
+            build_principal_cache_key(CredentialType.SESSION_TOKEN, token)
+        )
 
     async def refresh_token(self, token: Optional[str], user: User) -> str:
         """Refresh a token by extending its expiration time in Redis."""
@@ -1270,9 +1289,21 @@ async def optional_user(
 
     try:
         if hashed_pat := get_hashed_pat_from_request(request):
-            user = await fetch_user_for_pat(hashed_pat, async_db_session)
+            cache_key = build_principal_cache_key(CredentialType.PAT, hashed_pat)
+            user = await get_cached_principal(cache_key, async_db_session)
+            if user is None:
+                user = await fetch_user_for_pat(hashed_pat, async_db_session)
+                if user is not None:
+                    cache_principal(cache_key, user)
         elif hashed_api_key := get_hashed_api_key_from_request(request):
-            user = await fetch_user_for_api_key(hashed_api_key, async_db_session)
+            cache_key = build_principal_cache_key(
+                CredentialType.API_KEY, hashed_api_key
+            )
+            user = await get_cached_principal(cache_key, async_db_session)
+            if user is None:
+                user = await fetch_user_for_api_key(hashed_api_key, async_db_session)
+                if user is not None:
+                    cache_principal(cache_key, user)
     except ValueError:
         logger.warning("Issue with validating authentication token")
         return None
@@ -551,6 +551,7 @@ def monitor_connector_deletion_taskset(
         f"docs_deleted={fence_data.num_tasks}"
     )
 
+    redis_connector.change_index.reset()
     redis_connector.delete.reset()
 
 
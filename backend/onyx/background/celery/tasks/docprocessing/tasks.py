@@ -40,6 +40,7 @@ from onyx.background.indexing.checkpointing_utils import (
 )
 from onyx.background.indexing.index_attempt_utils import cleanup_index_attempts
 from onyx.background.indexing.index_attempt_utils import get_old_index_attempts
+from onyx.configs.app_configs import ENABLE_CONNECTOR_CHANGE_DETECTION
 from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
@@ -69,6 +70,7 @@ from onyx.db.engine.time_utils import get_db_current_time
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import IndexingMode
 from onyx.db.enums import IndexingStatus
+from onyx.db.enums import IndexModelStatus
 from onyx.db.enums import SwitchoverType
 from onyx.db.index_attempt import create_index_attempt_error
 from onyx.db.index_attempt import get_index_attempt
@@ -1459,6 +1461,21 @@ def _docprocessing_task(
                 documents,
             )
 
+        # Record what was indexed so that future runs can skip unchanged documents.
+        # Only the primary index is tracked, a secondary index always needs everything.
+        if (
+            ENABLE_CONNECTOR_CHANGE_DETECTION
+            and index_attempt.search_settings.status == IndexModelStatus.PRESENT
+        ):
+            failed_document_ids = {
+                failure.failed_document.document_id
+                for failure in index_pipeline_result.failures
+                if failure.failed_document
+            }
+            redis_connector.change_index.record(
+                [doc for doc in documents if doc.id not in failed_document_ids]
+            )
+
         coordination_status = None
         # Record failures in the database
         if index_pipeline_result.failures:
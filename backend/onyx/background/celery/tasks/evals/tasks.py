@@ -5,7 +5,6 @@ from celery import Task
 
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.constants import OnyxCeleryTask
-from onyx.evals.eval import run_eval
 from onyx.evals.models import EvalConfigurationOptions
 from onyx.utils.logger import setup_logger
 
@@ -25,6 +24,10 @@ def eval_run_task(
     configuration_dict: dict[str, Any],
 ) -> None:
     """Background task to run an evaluation with the given configuration"""
+    # imported here since it pulls in the whole chat flow, which the other tasks on the
+    # primary worker don't need
+    from onyx.evals.eval import run_eval
+
     try:
         configuration = EvalConfigurationOptions.model_validate(configuration_dict)
         run_eval(configuration, remote_dataset_name=configuration.dataset_name)
@@ -543,6 +543,9 @@ def connector_pruning_generator_task(
             # generate list of docs to remove (no longer in the source)
             doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
 
+            # if a pruned doc ever comes back at the source, it must be re-fetched
+            redis_connector.change_index.remove(doc_ids_to_remove)
+
             task_logger.info(
                 "Pruning set collected: "
                 f"cc_pair={cc_pair_id} "
@@ -16,6 +16,7 @@ from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.celery_utils import httpx_init_vespa_pool
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.configs.app_configs import MANAGED_VESPA
+from onyx.configs.app_configs import USER_FILE_PROCESSING_MAX_PARALLEL_BYTES
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
@@ -55,6 +56,13 @@ from onyx.natural_language_processing.search_nlp_models import (
     InformationContentClassificationModel,
 )
 from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_user_file_progress import RedisUserFileProgress
+from onyx.redis.redis_user_file_progress import UserFileProcessingStage
+from onyx.redis.redis_user_file_progress import UserFileProgress
+from onyx.utils.threadpool_concurrency import SizeBudget
+
+# shared by the user file processing tasks running in this worker
+_USER_FILE_PROCESSING_BUDGET = SizeBudget(USER_FILE_PROCESSING_MAX_PARALLEL_BYTES)
 
 
 def _as_uuid(value: str | UUID) -> UUID:
@@ -196,6 +204,17 @@ def process_single_user_file(self: Task, *, user_file_id: str, tenant_id: str) -
         )
         return None
 
+    progress = RedisUserFileProgress(user_file_id, redis_client)
+
+    def _on_page_processed(processed_pages: int, total_pages: int) -> None:
+        progress.set(
+            UserFileProgress(
+                stage=UserFileProcessingStage.EXTRACTING,
+                processed_units=processed_pages,
+                total_units=total_pages,
+            )
+        )
+
     documents: list[Document] = []
     try:
         with get_session_with_current_tenant() as db_session:
@@ -216,6 +235,8 @@ def process_single_user_file(self: Task, *, user_file_id: str, tenant_id: str) -
                 file_locations=[uf.file_id],
                 file_names=[uf.name] if uf.name else None,
                 zip_metadata={},
+                stream_pdf_pages=True,
+                progress_callback=_on_page_processed,
             )
             connector.load_credentials({})
 
@@ -244,70 +265,88 @@ def process_single_user_file(self: Task, *, user_file_id: str, tenant_id: str) -
                 )
 
             try:
-                for batch in connector.load_from_state():
-                    documents.extend(batch)
-
-                adapter = UserFileIndexingAdapter(
-                    tenant_id=tenant_id,
-                    db_session=db_session,
+                # bounds the memory of the files extracted and indexed at the same time
+                file_size = (
+                    get_default_file_store().get_file_size(uf.file_id, db_session) or 0
                 )
+                with _USER_FILE_PROCESSING_BUDGET.reserve(file_size):
+                    progress.set(
+                        UserFileProgress(stage=UserFileProcessingStage.EXTRACTING)
+                    )
+                    for batch in connector.load_from_state():
+                        documents.extend(batch)
+                    task_logger.info(
+                        f"process_single_user_file - Extracted id={user_file_id} "
+                        f"docs={len(documents)} elapsed={time.monotonic() - start:.2f}s"
+                    )
 
-                # Set up indexing pipeline components
-                embedding_model = DefaultIndexingEmbedder.from_db_search_settings(
-                    search_settings=current_search_settings,
-                )
+                    adapter = UserFileIndexingAdapter(
+                        tenant_id=tenant_id,
+                        db_session=db_session,
+                    )
 
-                information_content_classification_model = (
-                    InformationContentClassificationModel()
-                )
+                    # Set up indexing pipeline components
+                    embedding_model = DefaultIndexingEmbedder.from_db_search_settings(
+                        search_settings=current_search_settings,
+                    )
 
-                document_index = get_default_document_index(
-                    current_search_settings,
-                    None,
-                    httpx_client=HttpxPool.get("vespa"),
-                )
+                    information_content_classification_model = (
+                        InformationContentClassificationModel()
+                    )
 
-                # update the doument id to userfile id in the documents
-                for document in documents:
-                    document.id = str(user_file_id)
-                    document.source = DocumentSource.USER_FILE
-
-                # real work happens here!
-                index_pipeline_result = run_indexing_pipeline(
-                    embedder=embedding_model,
-                    information_content_classification_model=information_content_classification_model,
-                    document_index=document_index,
-                    ignore_time_skip=True,
-                    db_session=db_session,
-                    tenant_id=tenant_id,
-                    document_batch=documents,
-                    request_id=None,
-                    adapter=adapter,
-                )
+                    document_index = get_default_document_index(
+                        current_search_settings,
+                        None,
+                        httpx_client=HttpxPool.get("vespa"),
+                    )
 
-                task_logger.info(
-                    f"process_single_user_file - Indexing pipeline completed ={index_pipeline_result}"
-                )
+                    # update the doument id to userfile id in the documents
+                    for document in documents:
+                        document.id = str(user_file_id)
+                        document.source = DocumentSource.USER_FILE
 
-                if (
-                    index_pipeline_result.failures
-                    or index_pipeline_result.total_docs != len(documents)
-                    or index_pipeline_result.total_chunks == 0
-                ):
-                    task_logger.error(
-                        f"process_single_user_file - Indexing pipeline failed id={user_file_id}"
+                    progress.set(
+                        UserFileProgress(stage=UserFileProcessingStage.INDEXING)
+                    )
+
+                    # real work happens here!
+                    index_pipeline_result = run_indexing_pipeline(
+                        embedder=embedding_model,
+                        information_content_classification_model=information_content_classification_model,
+                        document_index=document_index,
+                        ignore_time_skip=True,
+                        db_session=db_session,
+                        tenant_id=tenant_id,
+                        document_batch=documents,
+                        request_id=None,
+                        adapter=adapter,
+                    )
+
+                    task_logger.info(
+                        f"process_single_user_file - Indexing pipeline completed ={index_pipeline_result}"
                     )
-                    # don't update the status if the user file is being deleted
-                    # Re-fetch to avoid mypy error
-                    current_user_file = db_session.get(UserFile, _as_uuid(user_file_id))
+
                     if (
-                        current_user_file
-                        and current_user_file.status != UserFileStatus.DELETING
+                        index_pipeline_result.failures
+                        or index_pipeline_result.total_docs != len(documents)
+                        or index_pipeline_result.total_chunks == 0
                     ):
-                        uf.status = UserFileStatus.FAILED
-                        db_session.add(uf)
-                        db_session.commit()
-                    return None
+                        task_logger.error(
+                            f"process_single_user_file - Indexing pipeline failed id={user_file_id}"
+                        )
+                        # don't update the status if the user file is being deleted
+                        # Re-fetch to avoid mypy error
+                        current_user_file = db_session.get(
+                            UserFile, _as_uuid(user_file_id)
+                        )
+                        if (
+                            current_user_file
+                            and current_user_file.status != UserFileStatus.DELETING
+                        ):
+                            uf.status = UserFileStatus.FAILED
+                            db_session.add(uf)
+                            db_session.commit()
+                        return None
 
             except Exception as e:
                 task_logger.exception(
@@ -345,6 +384,7 @@ def process_single_user_file(self: Task, *, user_file_id: str, tenant_id: str) -
         )
         return None
     finally:
+        progress.clear()
         if file_lock.owned():
             file_lock.release()
 
@@ -9,6 +9,9 @@ from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
+from onyx.configs.constants import DOCUMENT_SYNC_FENCE_KEY
+from onyx.configs.constants import DOCUMENT_SYNC_PREFIX
+from onyx.configs.constants import DOCUMENT_SYNC_TASKSET_KEY
 from onyx.configs.constants import OnyxCeleryPriority
 from onyx.configs.constants import OnyxCeleryQueues
 from onyx.configs.constants import OnyxCeleryTask
@@ -17,11 +20,6 @@ from onyx.db.document import construct_document_id_select_by_needs_sync
 from onyx.db.document import count_documents_by_needs_sync
 from onyx.utils.logger import setup_logger
 
-# Redis keys for document sync tracking
-DOCUMENT_SYNC_PREFIX = "documentsync"
-DOCUMENT_SYNC_FENCE_KEY = f"{DOCUMENT_SYNC_PREFIX}_fence"
-DOCUMENT_SYNC_TASKSET_KEY = f"{DOCUMENT_SYNC_PREFIX}_taskset"
-
 logger = setup_logger()
 
 
@@ -20,7 +20,6 @@ from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocument
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import LIGHT_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import OnyxCeleryTaskCompletionStatus
-from onyx.background.celery.tasks.vespa.document_sync import DOCUMENT_SYNC_FENCE_KEY
 from onyx.background.celery.tasks.vespa.document_sync import get_document_sync_payload
 from onyx.background.celery.tasks.vespa.document_sync import get_document_sync_remaining
 from onyx.background.celery.tasks.vespa.document_sync import reset_document_sync
@@ -30,6 +29,7 @@ from onyx.background.celery.tasks.vespa.document_sync import (
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.app_configs import VESPA_SYNC_MAX_TASKS
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
+from onyx.configs.constants import DOCUMENT_SYNC_FENCE_KEY
 from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
@@ -0,0 +1,229 @@
+"""
+Rebuilds the documents of a cc pair from the chunks in the current index so that the
+index of new search settings can be built without running the connector again, see
+ENABLE_REEMBED_FROM_CURRENT_INDEX.
+
+The rebuilt documents go through the regular docprocessing pipeline, so they are
+chunked and embedded for the new search settings. Metadata that only lives in Postgres
+(links, owners, permissions) is taken from the document rows. The new index covers the
+sources up to the end of the current index's last successful attempt, which becomes the
+attempt's poll range end so that the first indexing runs after the swap pick up what
+changed since.
+"""
+
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timezone
+
+from sqlalchemy.orm import Session
+
+from onyx.access.models import ExternalAccess
+from onyx.connectors.models import BasicExpertInfo
+from onyx.connectors.models import Document
+from onyx.connectors.models import ImageSection
+from onyx.connectors.models import TextSection
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
+from onyx.db.connector_credential_pair import get_last_successful_attempt_poll_range_end
+from onyx.db.document import get_document_batch_for_connector_credential_pair
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.enums import AccessType
+from onyx.db.enums import IndexModelStatus
+from onyx.db.models import Document as DbDocument
+from onyx.db.models import IndexAttempt
+from onyx.db.search_settings import get_current_search_settings
+from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.utils.logger import setup_logger
+from onyx.utils.text_processing import shared_precompare_cleanup
+
+logger = setup_logger()
+
+
+def get_current_index_poll_range_end(
+    index_attempt: IndexAttempt, db_session: Session
+) -> datetime | None:
+    """Returns the time up to which the current index covers the attempt's cc pair
+    if the attempt can be served from the current index, None if the connector has
+    to run"""
+    if (
+        index_attempt.search_settings is None
+        or index_attempt.search_settings.status != IndexModelStatus.FUTURE
+        # an explicit reindex from the source is honored
+        or index_attempt.from_beginning
+    ):
+        return None
+
+    poll_range_end = get_last_successful_attempt_poll_range_end(
+        cc_pair_id=index_attempt.connector_credential_pair_id,
+        earliest_index=0,
+        search_settings=get_current_search_settings(db_session),
+        db_session=db_session,
+    )
+    if not poll_range_end:
+        return None
+    return datetime.fromtimestamp(poll_range_end, tz=timezone.utc)
+
+
+def _get_experts(representations: list[str] | None) -> list[BasicExpertInfo] | None:
+    # the stored representation is the expert's display name or email
+    if not representations:
+        return None
+    return [
+        BasicExpertInfo(display_name=representation)
+        for representation in representations
+    ]
+
+
+def _split_at_link_offsets(
+    content: str, source_links: dict[int, str]
+) -> list[tuple[str, str]]:
+    """Splits the content of a chunk into the texts of the sections it was built from
+    with their links. The chunker records the offsets of the links in the text cleaned
+    up by shared_precompare_cleanup, so they are mapped back to the content first."""
+    # index in the content of every character that is kept by the clean up
+    kept_indices = [
+        index
+        for index, character in enumerate(content)
+        if shared_precompare_cleanup(character)
+    ]
+    starts = [
+        (kept_indices[offset] if offset < len(kept_indices) else len(content), link)
+        for offset, link in sorted(source_links.items())
+    ]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, ""))
+
+    segments: list[tuple[str, str]] = []
+    for index, (start, link) in enumerate(starts):
+        end = starts[index + 1][0] if index + 1 < len(starts) else len(content)
+        # the sections are joined with SECTION_SEPARATOR in the chunk
+        text = content[start:end].strip()
+        if text:
+            segments.append((text, link))
+    return segments
+
+
+def _build_document(
+    db_document: DbDocument, chunks: list[InferenceChunk], include_external_access: bool
+) -> Document:
+    """Rebuilds a document from its regular chunks ordered by chunk id. Chunks don't
+    overlap, every chunk is split into the sections it was built from at the offsets
+    of its links and sections that were split into several chunks are joined again."""
+    sections: list[TextSection | ImageSection] = []
+    for chunk in chunks:
+        source_links = chunk.source_links or {}
+        if chunk.image_file_id:
+            # image chunks are built from a single section, keeps the image summary
+            # so that the image isn't summarized again
+            sections.append(
+                ImageSection(
+                    image_file_id=chunk.image_file_id,
+                    link=next((link for link in source_links.values() if link), None),
+                    text=chunk.content,
+                )
+            )
+            continue
+
+        for index, (text, link) in enumerate(
+            _split_at_link_offsets(chunk.content, source_links)
+        ):
+            if (
+                index == 0
+                and chunk.section_continuation
+                and sections
+                and isinstance(sections[-1], TextSection)
+            ):
+                sections[-1].text += f" {text}"
+            else:
+                sections.append(TextSection(text=text, link=link or None))
+
+    first_chunk = chunks[0]
+    return Document(
+        id=db_document.id,
+        sections=sections,
+        source=first_chunk.source_type,
+        semantic_identifier=db_document.semantic_id or first_chunk.semantic_identifier,
+        metadata=first_chunk.metadata,
+        doc_updated_at=db_document.doc_updated_at or first_chunk.updated_at,
+        primary_owners=_get_experts(db_document.primary_owners),
+        secondary_owners=_get_experts(db_document.secondary_owners),
+        # the index stores the title used for indexing, None if it was empty
+        title=first_chunk.title if first_chunk.title is not None else "",
+        from_ingestion_api=db_document.from_ingestion_api,
+        external_access=(
+            ExternalAccess(
+                external_user_emails=set(db_document.external_user_emails or []),
+                external_user_group_ids=set(db_document.external_user_group_ids or []),
+                is_public=db_document.is_public,
+            )
+            if include_external_access
+            else None
+        ),
+        doc_metadata=db_document.doc_metadata,
+    )
+
+
+def iter_current_index_document_batches(
+    cc_pair_id: int, tenant_id: str, batch_size: int
+) -> Iterator[list[Document]]:
+    """Yields the cc pair's documents rebuilt from the current index in batches.
+    Documents without chunks in the current index are skipped."""
+    with get_session_with_current_tenant() as db_session:
+        cc_pair = get_connector_credential_pair_from_id(db_session, cc_pair_id)
+        if not cc_pair:
+            raise RuntimeError(f"CC pair {cc_pair_id} not found in DB.")
+        connector_id = cc_pair.connector_id
+        credential_id = cc_pair.credential_id
+        # permissions from the source are only stored for sync cc pairs
+        include_external_access = cc_pair.access_type == AccessType.SYNC
+        document_index = get_default_document_index(
+            get_current_search_settings(db_session), None
+        )
+
+    # all chunks of every document, hidden ones included
+    filters = IndexFilters(access_control_list=None, tenant_id=tenant_id)
+    last_document_id: str | None = None
+    while True:
+        with get_session_with_current_tenant() as db_session:
+            db_documents = get_document_batch_for_connector_credential_pair(
+                db_session=db_session,
+                connector_id=connector_id,
+                credential_id=credential_id,
+                limit=batch_size,
+                after_document_id=last_document_id,
+            )
+        if not db_documents:
+            return
+        last_document_id = db_documents[-1].id
+
+        # the chunk counts in Postgres may already be the ones of the new index, so
+        # the documents are requested without a chunk range
+        chunks = document_index.id_based_retrieval(
+            chunk_requests=[
+                VespaChunkRequest(document_id=db_document.id)
+                for db_document in db_documents
+            ],
+            filters=filters,
+            batch_retrieval=True,
+        )
+        chunks_by_document_id: dict[str, list[InferenceChunk]] = {}
+        for chunk in sorted(chunks, key=lambda chunk: chunk.chunk_id):
+            chunks_by_document_id.setdefault(chunk.document_id, []).append(chunk)
+
+        documents: list[Document] = []
+        for db_document in db_documents:
+            document_chunks = chunks_by_document_id.get(db_document.id)
+            if not document_chunks:
+                logger.debug(
+                    f"Skipping document {db_document.id}, it has no chunks in the "
+                    "current index"
+                )
+                continue
+            documents.append(
+                _build_document(db_document, document_chunks, include_external_access)
+            )
+
+        if documents:
+            yield documents
@@ -13,6 +13,14 @@ from onyx.background.indexing.checkpointing_utils import check_checkpoint_size
 from onyx.background.indexing.checkpointing_utils import get_latest_valid_checkpoint
 from onyx.background.indexing.checkpointing_utils import save_checkpoint
 from onyx.background.indexing.memory_tracer import MemoryTracer
+from onyx.background.indexing.reembed_from_index import (
+    get_current_index_poll_range_end,
+)
+from onyx.background.indexing.reembed_from_index import (
+    iter_current_index_document_batches,
+)
+from onyx.configs.app_configs import ENABLE_CONNECTOR_CHANGE_DETECTION
+from onyx.configs.app_configs import ENABLE_REEMBED_FROM_CURRENT_INDEX
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
@@ -20,6 +28,7 @@ from onyx.configs.app_configs import INTEGRATION_TESTS_MODE
 from onyx.configs.app_configs import LEAVE_CONNECTOR_ACTIVE_ON_INITIALIZATION_FAILURE
 from onyx.configs.app_configs import MAX_FILE_SIZE_BYTES
 from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.configs.app_configs import REEMBED_FROM_CURRENT_INDEX_BATCH_SIZE
 from onyx.configs.constants import OnyxCeleryPriority
 from onyx.configs.constants import OnyxCeleryQueues
 from onyx.configs.constants import OnyxCeleryTask
@@ -27,6 +36,7 @@ from onyx.connectors.connector_runner import ConnectorRunner
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.interfaces import ChangeDetectionConnector
 from onyx.connectors.interfaces import CheckpointedConnector
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import ConnectorStopSignal
@@ -53,6 +63,8 @@ from onyx.db.models import IndexAttempt
 from onyx.file_store.document_batch_storage import DocumentBatchStorage
 from onyx.file_store.document_batch_storage import get_document_batch_storage
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.redis.redis_connector import RedisConnector
+from onyx.redis.redis_connector_change_index import RedisConnectorChangeIndex
 from onyx.utils.logger import setup_logger
 from onyx.utils.variable_functionality import global_version
 from shared_configs.configs import MULTI_TENANT
@@ -280,6 +292,12 @@ def run_docfetching_entrypoint(
         )
         credential_id = attempt.connector_credential_pair.credential_id
 
+        current_index_poll_range_end = (
+            get_current_index_poll_range_end(attempt, db_session)
+            if ENABLE_REEMBED_FROM_CURRENT_INDEX
+            else None
+        )
+
     logger.info(
         f"Docfetching starting{tenant_str}: "
         f"connector='{connector_name}' "
@@ -287,14 +305,24 @@ def run_docfetching_entrypoint(
         f"credentials='{credential_id}'"
     )
 
-    connector_document_extraction(
-        app,
-        index_attempt_id,
-        attempt.connector_credential_pair_id,
-        attempt.search_settings_id,
-        tenant_id,
-        callback,
-    )
+    if current_index_poll_range_end is not None:
+        current_index_document_extraction(
+            app,
+            index_attempt_id,
+            attempt.connector_credential_pair_id,
+            tenant_id,
+            current_index_poll_range_end,
+            callback,
+        )
+    else:
+        connector_document_extraction(
+            app,
+            index_attempt_id,
+            attempt.connector_credential_pair_id,
+            attempt.search_settings_id,
+            tenant_id,
+            callback,
+        )
 
     logger.info(
         f"Docfetching finished{tenant_str}: "
@@ -461,6 +489,16 @@ def connector_document_extraction(
             include_permissions=should_fetch_permissions_during_indexing,
         )
 
+        # Only the primary index uses change detection. A secondary index that is
+        # being built needs every document, changed or not.
+        change_index: RedisConnectorChangeIndex | None = None
+        if ENABLE_CONNECTOR_CHANGE_DETECTION and is_primary:
+            change_index = RedisConnector(tenant_id, cc_pair_id).change_index
+            if from_beginning:
+                change_index.reset()
+            elif isinstance(connector_runner.connector, ChangeDetectionConnector):
+                connector_runner.connector.set_change_detection_index(change_index)
+
         # don't use a checkpoint if we're explicitly indexing from
         # the beginning in order to avoid weird interactions between
         # checkpointing / failure handling
@@ -577,6 +615,14 @@ def connector_document_extraction(
 
                 # Clean documents and create batch
                 doc_batch_cleaned = strip_null_characters(document_batch)
+
+                # drop documents whose content is identical to what was last indexed
+                if change_index is not None:
+                    doc_batch_cleaned = change_index.filter_unchanged_documents(
+                        doc_batch_cleaned
+                    )
+                    if not doc_batch_cleaned:
+                        continue
                 batch_description = []
 
                 for doc in doc_batch_cleaned:
@@ -760,6 +806,108 @@ def connector_document_extraction(
         memory_tracer.stop()
 
 
+def current_index_document_extraction(
+    app: Celery,
+    index_attempt_id: int,
+    cc_pair_id: int,
+    tenant_id: str,
+    poll_range_end: datetime,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> None:
+    """Queues the cc pair's documents rebuilt from the current index for the
+    indexing pipeline instead of running the connector. Used to build the index of
+    new search settings, see reembed_from_index."""
+    start_time = time.monotonic()
+    batch_storage = get_document_batch_storage(cc_pair_id, index_attempt_id)
+
+    with get_session_with_current_tenant() as db_session:
+        index_attempt = get_index_attempt(
+            db_session, index_attempt_id, eager_load_search_settings=True
+        )
+        if not index_attempt or index_attempt.search_settings is None:
+            raise RuntimeError(f"Index attempt {index_attempt_id} not found")
+        search_settings_status = index_attempt.search_settings.status
+
+        # the new index covers the sources as far as the current one does
+        index_attempt.poll_range_start = datetime.fromtimestamp(0, tz=timezone.utc)
+        index_attempt.poll_range_end = poll_range_end
+        db_session.commit()
+
+    logger.info(
+        f"Document extraction from the current index starting: "
+        f"attempt={index_attempt_id} "
+        f"cc_pair={cc_pair_id} "
+        f"poll_range_end={poll_range_end}"
+    )
+
+    # batches of a previous attempt are rebuilt from the index as well
+    batch_storage.cleanup_all_batches()
+    batch_num = 0
+    try:
+        for document_batch in iter_current_index_document_batches(
+            cc_pair_id, tenant_id, REEMBED_FROM_CURRENT_INDEX_BATCH_SIZE
+        ):
+            if callback and callback.should_stop():
+                raise ConnectorStopSignal("Connector stop signal detected")
+
+            with get_session_with_current_tenant() as db_session_tmp:
+                _check_connector_and_attempt_status(
+                    db_session_tmp,
+                    cc_pair_id,
+                    search_settings_status,
+                    index_attempt_id,
+                )
+
+            batch_storage.store_batch(batch_num, document_batch)
+            app.send_task(
+                OnyxCeleryTask.DOCPROCESSING_TASK,
+                kwargs={
+                    "index_attempt_id": index_attempt_id,
+                    "cc_pair_id": cc_pair_id,
+                    "tenant_id": tenant_id,
+                    "batch_num": batch_num,
+                },
+                queue=OnyxCeleryQueues.DOCPROCESSING,
+                priority=OnyxCeleryPriority.MEDIUM,
+            )
+            batch_num += 1
+
+        logger.info(
+            f"Document extraction from the current index completed: "
+            f"attempt={index_attempt_id} "
+            f"batches_queued={batch_num} "
+            f"elapsed={time.monotonic() - start_time:.2f}s"
+        )
+
+        with get_session_with_current_tenant() as db_session:
+            IndexingCoordination.set_total_batches(
+                db_session=db_session,
+                index_attempt_id=index_attempt_id,
+                total_batches=batch_num,
+            )
+
+    except Exception as e:
+        logger.exception(
+            f"Document extraction from the current index failed: "
+            f"attempt={index_attempt_id} "
+            f"error={str(e)}"
+        )
+        with get_session_with_current_tenant() as db_session_temp:
+            if isinstance(e, ConnectorStopSignal):
+                mark_attempt_canceled(index_attempt_id, db_session_temp, reason=str(e))
+            else:
+                # don't overwrite attempts that are already failed/canceled
+                attempt = get_index_attempt(db_session_temp, index_attempt_id)
+                if attempt and not attempt.status.is_terminal():
+                    mark_attempt_failed(
+                        index_attempt_id,
+                        db_session_temp,
+                        failure_reason=str(e),
+                        full_exception_trace=traceback.format_exc(),
+                    )
+        raise e
+
+
 def reissue_old_batches(
     batch_storage: DocumentBatchStorage,
     index_attempt_id: int,
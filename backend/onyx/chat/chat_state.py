@@ -5,6 +5,7 @@ from queue import Empty
 from typing import Any
 
 from onyx.chat.citation_processor import CitationMapping
+from onyx.chat.emitter import coalesce_packets
 from onyx.chat.emitter import Emitter
 from onyx.server.query_and_chat.placement import Placement
 from onyx.server.query_and_chat.streaming_models import OverallStop
@@ -14,6 +15,9 @@ from onyx.tools.models import ToolCallInfo
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import wait_on_background
 
+# Upper bound on the packets taken off the bus and coalesced in one go
+_MAX_PACKETS_PER_DRAIN = 100
+
 
 class ChatStateContainer:
     """Container for accumulating state during LLM loop execution.
@@ -104,6 +108,9 @@ def run_chat_loop_with_state_containers(
 
     The wrapped function should accept emitter as first arg and use it to emit
     Packet objects. This wrapper polls every 300ms to check if stop signal is set.
+    Text deltas that pile up while the consumer is busy are coalesced into fewer
+    packets, and the emitter is closed once this generator exits so that the
+    function never blocks on a bounded bus nobody reads anymore.
 
     Args:
         func: The function to wrap (should accept emitter and state_container as first and second args)
@@ -144,8 +151,9 @@ def run_chat_loop_with_state_containers(
     thread = run_in_background(run_with_exception_capture)
 
     pkt: Packet | None = None
+    stopped = False
     try:
-        while True:
+        while not stopped:
             # Poll queue with 300ms timeout for natural stop signal checking
             # the 300ms timeout is to avoid busy-waiting and to allow the stop signal to be checked regularly
             try:
@@ -156,15 +164,30 @@ def run_chat_loop_with_state_containers(
                     break
                 continue
 
-            if pkt is not None:
+            # Take everything else that is already buffered so bursts of token
+            # deltas go out as a few larger packets
+            pkts: list[Packet] = [pkt] if pkt is not None else []
+            while len(pkts) < _MAX_PACKETS_PER_DRAIN:
+                try:
+                    pkt = emitter.bus.get_nowait()
+                except Empty:
+                    break
+                if pkt is not None:
+                    pkts.append(pkt)
+
+            for pkt in coalesce_packets(pkts):
                 if pkt.obj == OverallStop(type="stop"):
                     yield pkt
+                    stopped = True
                     break
                 elif isinstance(pkt.obj, PacketException):
                     raise pkt.obj.exception
                 else:
                     yield pkt
     finally:
+        # Nothing reads the bus anymore, let the function run to completion without
+        # blocking on it
+        emitter.close()
         # Wait for thread to complete on normal exit to propagate exceptions and ensure cleanup.
         # Skip waiting if user disconnected to exit quickly.
         if is_connected():
@@ -1,7 +1,10 @@
 import json
 import re
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import cast
+from typing import NamedTuple
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -19,6 +22,8 @@ from onyx.chat.models import ChatLoadedFile
 from onyx.chat.models import ChatMessageSimple
 from onyx.chat.models import PersonaOverrideConfig
 from onyx.chat.models import ThreadMessage
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_BYTES
+from onyx.configs.chat_configs import CHAT_HISTORY_CACHE_MAX_BYTES
 from onyx.configs.constants import DEFAULT_PERSONA_ID
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import TMP_DRALPHA_PERSONA_NAME
@@ -60,6 +65,7 @@ from onyx.tools.tool_implementations.custom.custom_tool import (
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -520,26 +526,206 @@ def load_chat_file(
     )
 
 
-def load_all_chat_files(
-    chat_messages: list[ChatMessage],
-    db_session: Session,
-) -> list[ChatLoadedFile]:
-    # TODO There is likely a more efficient/standard way to load the files here.
-    file_descriptors_for_history: list[FileDescriptor] = []
+class _ChatFileCache:
+    """LRU cache of loaded chat files bounded by their total size, keyed by tenant and
+    file id. File ids are never reused for different contents, so entries don't need
+    to be invalidated."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._files: OrderedDict[tuple[str, str], ChatLoadedFile] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, file_id: str) -> ChatLoadedFile | None:
+        key = (tenant_id, file_id)
+        with self._lock:
+            loaded_file = self._files.get(key)
+            if loaded_file is not None:
+                self._files.move_to_end(key)
+            return loaded_file
+
+    def put(self, tenant_id: str, loaded_file: ChatLoadedFile) -> None:
+        size = len(loaded_file.content)
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+
+        key = (tenant_id, str(loaded_file.file_id))
+        with self._lock:
+            previous = self._files.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous.content)
+
+            self._files[key] = loaded_file
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._files.popitem(last=False)
+                self._total_bytes -= len(evicted.content)
+
+
+_chat_file_cache = _ChatFileCache(CHAT_FILE_CACHE_MAX_BYTES)
+
+
+def get_chat_file_descriptors(chat_messages: list[ChatMessage]) -> list[FileDescriptor]:
+    file_descriptors: list[FileDescriptor] = []
     for chat_message in chat_messages:
         if chat_message.files:
-            file_descriptors_for_history.extend(chat_message.files)
+            file_descriptors.extend(chat_message.files)
+    return file_descriptors
+
 
-    files = cast(
+def load_chat_files(
+    file_descriptors: list[FileDescriptor],
+    db_session: Session,
+) -> list[ChatLoadedFile]:
+    """Loads the files, files that were loaded for a previous turn are served from
+    memory."""
+    tenant_id = get_current_tenant_id()
+    files: list[ChatLoadedFile | None] = [
+        _chat_file_cache.get(tenant_id, file["id"]) for file in file_descriptors
+    ]
+    missing_indices = [ind for ind, file in enumerate(files) if file is None]
+    loaded_files = cast(
         list[ChatLoadedFile],
         run_functions_tuples_in_parallel(
             [
-                (load_chat_file, (file, db_session))
-                for file in file_descriptors_for_history
+                (load_chat_file, (file_descriptors[ind], db_session))
+                for ind in missing_indices
             ]
         ),
     )
-    return files
+
+    for ind, loaded_file in zip(missing_indices, loaded_files):
+        files[ind] = loaded_file
+        # user files still being processed don't have their token count yet
+        if not file_descriptors[ind].get("user_file_id") or loaded_file.token_count:
+            _chat_file_cache.put(tenant_id, loaded_file)
+
+    return cast(list[ChatLoadedFile], files)
+
+
+def _find_last_user_message_idx(chat_history: list[ChatMessage]) -> int | None:
+    for i in range(len(chat_history) - 1, -1, -1):
+        if chat_history[i].message_type == MessageType.USER:
+            return i
+    return None
+
+
+def _chat_message_fingerprint(chat_message: ChatMessage) -> tuple[int, int, int]:
+    # edited or regenerated messages get a new id, messages that are updated in place
+    # change their text and token count
+    return chat_message.id, chat_message.token_count, hash(chat_message.message)
+
+
+def _simple_message_size(simple_message: ChatMessageSimple) -> int:
+    return len(simple_message.message) + sum(
+        len(image_file.content) for image_file in simple_message.image_files or []
+    )
+
+
+class _CachedChatHistory(NamedTuple):
+    tool_id_to_name_map: dict[int, str]
+    # one fingerprint and list of converted messages per cached chat message
+    fingerprints: list[tuple[int, int, int]]
+    converted_messages: list[list[ChatMessageSimple]]
+    size: int
+
+
+class _ChatHistoryCache:
+    """LRU cache of converted chat histories bounded by their total size, keyed by
+    tenant and chat session. A cached history is reused up to the first message that
+    doesn't match the current chat history anymore and is dropped entirely when the
+    tools were renamed."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._histories: OrderedDict[tuple[str, UUID], _CachedChatHistory] = (
+            OrderedDict()
+        )
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        tenant_id: str,
+        chat_session_id: UUID,
+        chat_history: list[ChatMessage],
+        tool_id_to_name_map: dict[int, str],
+    ) -> list[list[ChatMessageSimple]]:
+        key = (tenant_id, chat_session_id)
+        with self._lock:
+            cached_history = self._histories.get(key)
+            if cached_history is None:
+                return []
+            if cached_history.tool_id_to_name_map != tool_id_to_name_map:
+                self._total_bytes -= cached_history.size
+                del self._histories[key]
+                return []
+            self._histories.move_to_end(key)
+
+        # The last user message also carries the project images and additional context
+        # of the turn, so it is always converted again
+        max_count = _find_last_user_message_idx(chat_history) or 0
+        count = 0
+        for fingerprint, chat_message in zip(
+            cached_history.fingerprints, chat_history[:max_count]
+        ):
+            if fingerprint != _chat_message_fingerprint(chat_message):
+                break
+            count += 1
+        return cached_history.converted_messages[:count]
+
+    def put(
+        self,
+        tenant_id: str,
+        chat_session_id: UUID,
+        chat_history: list[ChatMessage],
+        converted_messages: list[list[ChatMessageSimple]],
+        tool_id_to_name_map: dict[int, str],
+    ) -> None:
+        size = sum(
+            _simple_message_size(simple_message)
+            for simple_messages in converted_messages
+            for simple_message in simple_messages
+        )
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+
+        key = (tenant_id, chat_session_id)
+        with self._lock:
+            previous = self._histories.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+
+            self._histories[key] = _CachedChatHistory(
+                tool_id_to_name_map=tool_id_to_name_map,
+                fingerprints=[
+                    _chat_message_fingerprint(chat_message)
+                    for chat_message in chat_history
+                ],
+                converted_messages=converted_messages,
+                size=size,
+            )
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._histories.popitem(last=False)
+                self._total_bytes -= evicted.size
+
+
+_chat_history_cache = _ChatHistoryCache(CHAT_HISTORY_CACHE_MAX_BYTES)
+
+
+def get_cached_chat_history(
+    chat_session_id: UUID,
+    chat_history: list[ChatMessage],
+    tool_id_to_name_map: dict[int, str],
+) -> list[list[ChatMessageSimple]]:
+    """Returns the converted messages of the chat messages at the start of the chat
+    history that are unchanged since a previous turn of the chat session, one list per
+    chat message. Only the files of the remaining messages need to be loaded."""
+    return _chat_history_cache.get(
+        get_current_tenant_id(), chat_session_id, chat_history, tool_id_to_name_map
+    )
 
 
 def convert_chat_history(
@@ -549,25 +735,35 @@ def convert_chat_history(
     additional_context: str | None,
     token_counter: Callable[[str], int],
     tool_id_to_name_map: dict[int, str],
+    chat_session_id: UUID | None = None,
+    cached_chat_history: list[list[ChatMessageSimple]] | None = None,
 ) -> list[ChatMessageSimple]:
     """Convert ChatMessage history to ChatMessageSimple format.
 
     For user messages: includes attached files (images attached to message, text files as separate messages)
     For assistant messages: includes tool calls followed by the assistant response
+
+    If a chat_session_id is given, the converted messages are cached for the next turns
+    of the chat session. The messages from get_cached_chat_history are passed as
+    cached_chat_history and are not converted again.
     """
-    simple_messages: list[ChatMessageSimple] = []
+    converted_messages: list[list[ChatMessageSimple]] = list(cached_chat_history or [])
 
     # Create a mapping of file IDs to loaded files for quick lookup
     file_map = {str(f.file_id): f for f in files}
 
     # Find the index of the last USER message
-    last_user_message_idx = None
-    for i in range(len(chat_history) - 1, -1, -1):
-        if chat_history[i].message_type == MessageType.USER:
-            last_user_message_idx = i
-            break
+    last_user_message_idx = _find_last_user_message_idx(chat_history)
+
+    # messages with user files that are still being processed are converted again on
+    # the next turn, once their token count is known
+    cacheable_count = last_user_message_idx or 0
+
+    for idx in range(len(converted_messages), len(chat_history)):
+        chat_message = chat_history[idx]
+        simple_messages: list[ChatMessageSimple] = []
+        converted_messages.append(simple_messages)
 
-    for idx, chat_message in enumerate(chat_history):
         if chat_message.message_type == MessageType.USER:
             # Process files attached to this message
             text_files: list[ChatLoadedFile] = []
@@ -577,6 +773,10 @@ def convert_chat_history(
                 for file_descriptor in chat_message.files:
                     file_id = file_descriptor["id"]
                     loaded_file = file_map.get(file_id)
+                    if file_descriptor.get("user_file_id") and (
+                        loaded_file is None or not loaded_file.token_count
+                    ):
+                        cacheable_count = min(cacheable_count, idx)
                     if loaded_file:
                         if loaded_file.file_type == ChatFileType.IMAGE:
                             image_files.append(loaded_file)
@@ -697,7 +897,20 @@ def convert_chat_history(
                 f"Invalid message type when constructing simple history: {chat_message.message_type}"
             )
 
-    return simple_messages
+    if chat_session_id is not None:
+        _chat_history_cache.put(
+            get_current_tenant_id(),
+            chat_session_id,
+            chat_history[:cacheable_count],
+            converted_messages[:cacheable_count],
+            tool_id_to_name_map,
+        )
+
+    return [
+        simple_message
+        for simple_messages in converted_messages
+        for simple_message in simple_messages
+    ]
 
 
 def get_custom_agent_prompt(persona: Persona, chat_session: ChatSession) -> str | None:
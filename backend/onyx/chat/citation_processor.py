@@ -8,6 +8,9 @@ This module provides a citation processor that can:
 - Emit CitationInfo objects for detected citations (when replacing)
 - Track all seen citations regardless of replacement mode
 - Maintain a list of cited documents in order of first citation
+
+Tokens are parsed incrementally, every character of the stream is looked at once and
+the code block state is carried over from token to token.
 """
 
 import re
@@ -26,15 +29,19 @@ logger = setup_logger()
 CitationMapping: TypeAlias = dict[int, SearchDoc]
 
 
-# ============================================================================
-# Utility functions
-# ============================================================================
-
+# Citations look like [1], [1, 2], [[1]] and may also use the unicode bracket variants
+_OPEN_BRACKETS = "[【［"
+_CLOSE_BRACKETS = "]】］"
+# Characters that can change the parser state outside of a code block
+_SPECIAL_CHARS_PATTERN = re.compile(r"[\[【［`]")
 
-def in_code_block(llm_text: str) -> bool:
-    """Check if we're currently inside a code block by counting triple backticks."""
-    count = llm_text.count(TRIPLE_BACKTICK)
-    return count % 2 != 0
+# States of the citation parser while a potential citation is held back
+_OPENED = 1  # '['
+_DOUBLE_OPENED = 2  # '[['
+_IN_NUMBER = 3  # '[1', '[[1', '[1, 2'
+_AFTER_COMMA = 4  # '[1,'
+_AFTER_COMMA_SPACE = 5  # '[1, '
+_DOUBLE_CLOSING = 6  # '[[1]', either '[' followed by [1] or the start of [[1]]
 
 
 # ============================================================================
@@ -124,8 +131,8 @@ class DynamicCitationProcessor:
         self.seen_citations: CitationMapping = {}  # citation num -> SearchDoc
 
         # Token processing state
-        self.llm_out = ""  # entire output so far
-        self.curr_segment = ""  # tokens held for citation processing
+        self._llm_out_tokens: list[str] = []  # entire output so far
+        self.curr_segment = ""  # potential citation held back until it's complete
         self.hold = ""  # tokens held for stop token processing
         self.stop_stream = stop_stream
         self.replace_citation_tokens = replace_citation_tokens
@@ -140,17 +147,20 @@ class DynamicCitationProcessor:
         )  # recently cited (for deduplication)
         self.non_citation_count = 0
 
-        # Citation patterns
-        # Matches potential incomplete citations: '[', '[[', '[1', '[[1', '[1,', '[1, ', etc.
-        # Also matches unicode bracket variants: 【, ［
-        self.possible_citation_pattern = re.compile(r"([\[【［]+(?:\d+,? ?)*$)")
+        # Incremental parser state, each character of the stream is looked at once
+        self._citation_state = 0  # one of the states above while curr_segment is set
+        self._citation_has_multiple_numbers = False
+        self._backtick_run = 0  # consecutive backticks not yet emitted
+        self._in_code_block = False
+        # Whether a citation right here would not need a space in front of it
+        self._at_citation_boundary = True
+        # Output of the current token, CitationInfo objects split up the text
+        self._text_parts: list[str] = []
+        self._results: list[str | CitationInfo] = []
 
-        # Matches complete citations:
-        # group 1: '[[1]]', [[2]], etc. (also matches 【【1】】, ［［1］］, 【1】, ［1］)
-        # group 2: '[1]', '[1, 2]', '[1,2,16]', etc. (also matches unicode variants)
-        self.citation_pattern = re.compile(
-            r"([\[【［]{2}\d+[\]】］]{2})|([\[【［]\d+(?:, ?\d+)*[\]】］])"
-        )
+    @property
+    def llm_out(self) -> str:
+        return "".join(self._llm_out_tokens)
 
     def update_citation_mapping(
         self,
@@ -215,8 +225,16 @@ class DynamicCitationProcessor:
         """
         # None -> end of stream, flush remaining segment
         if token is None:
+            self._flush_backtick_run(next_char=None)
             if self.curr_segment:
-                yield self.curr_segment
+                if self._citation_state == _DOUBLE_CLOSING:
+                    # '[[1]' at the very end is a '[' followed by the citation [1]
+                    self._emit_text(self.curr_segment[0])
+                    self._complete_citation(self.curr_segment[1:], formatted=False)
+                else:
+                    self._emit_text(self.curr_segment)
+                self._reset_citation()
+            yield from self._take_results()
             return
 
         # Handle stop stream token
@@ -242,108 +260,194 @@ class DynamicCitationProcessor:
                 token = next_hold
                 self.hold = ""
 
-        self.curr_segment += token
-        self.llm_out += token
+        self._llm_out_tokens.append(token)
 
-        # Handle code blocks without language tags
-        # If we see ``` followed by \n, add "plaintext" language specifier
-        if "`" in self.curr_segment:
-            if self.curr_segment.endswith("`"):
-                pass
-            elif "```" in self.curr_segment:
-                parts = self.curr_segment.split("```")
-                if len(parts) > 1 and len(parts[1]) > 0:
-                    piece_that_comes_after = parts[1][0]
-                    if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
-                        self.curr_segment = self.curr_segment.replace(
-                            "```", "```plaintext"
-                        )
-
-        # Look for citations in current segment
-        citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
-        )
-
-        result = ""
-        if citation_matches and not in_code_block(self.llm_out):
-            match_idx = 0
-            for match in citation_matches:
-                match_span = match.span()
-
-                # Get text before/between citations
-                intermatch_str = self.curr_segment[match_idx : match_span[0]]
-                self.non_citation_count += len(intermatch_str)
-                match_idx = match_span[1]
-
-                # Check if there is already a space before this citation
-                if intermatch_str:
-                    has_leading_space = intermatch_str[-1].isspace()
+        idx = 0
+        token_len = len(token)
+        while idx < token_len:
+            char = token[idx]
+            if self._backtick_run:
+                if char == "`":
+                    self._backtick_run += 1
+                    idx += 1
                 else:
-                    # No text between citations (consecutive citations)
-                    # If match_idx > 0, we've already processed a citation, so don't add space
-                    if match_idx > 0:
-                        # Consecutive citations - don't add space between them
-                        has_leading_space = True
-                    else:
-                        # Citation at start of segment - check if previous output has space
-                        segment_start_idx = len(self.llm_out) - len(self.curr_segment)
-                        if segment_start_idx > 0:
-                            has_leading_space = self.llm_out[
-                                segment_start_idx - 1
-                            ].isspace()
-                        else:
-                            has_leading_space = False
-
-                # Reset recent citations if no citations found for a while
-                if self.non_citation_count > 5:
-                    self.recent_cited_documents.clear()
-
-                # Yield text before citation FIRST (preserve order)
-                if intermatch_str:
-                    yield intermatch_str
-
-                # Process the citation (returns formatted citation text and CitationInfo objects)
-                # Always tracks seen citations regardless of strip_citations flag
-                citation_text, citation_info_list = self._process_citation(
-                    match, has_leading_space, self.replace_citation_tokens
-                )
-
-                if self.replace_citation_tokens:
-                    # Yield CitationInfo objects BEFORE the citation text
-                    # This allows the frontend to receive citation metadata before the token
-                    # that contains [[n]](link), enabling immediate rendering
-                    for citation in citation_info_list:
-                        yield citation
-                    # Then yield the formatted citation text
-                    if citation_text:
-                        yield citation_text
+                    self._flush_backtick_run(next_char=char)
+            elif self.curr_segment:
+                if self._feed_citation_char(char):
+                    idx += 1
+            else:
+                # Plain text, jump straight to the next character that matters
+                if self._in_code_block:
+                    next_idx = token.find("`", idx)
                 else:
-                    # When not stripping, yield the original citation text unchanged
-                    yield match.group()
+                    match = _SPECIAL_CHARS_PATTERN.search(token, idx)
+                    next_idx = match.start() if match else -1
+                if next_idx == -1:
+                    next_idx = token_len
+                self._emit_text(token[idx:next_idx])
+                if next_idx == token_len:
+                    break
+
+                if token[next_idx] == "`":
+                    self._backtick_run = 1
+                else:
+                    self.curr_segment = token[next_idx]
+                    self._citation_state = _OPENED
+                idx = next_idx + 1
 
-                self.non_citation_count = 0
+        yield from self._take_results()
 
-            # Leftover text could be part of next citation
-            self.curr_segment = self.curr_segment[match_idx:]
-            self.non_citation_count = len(self.curr_segment)
+    def _emit_text(self, text: str) -> None:
+        if not text:
+            return
+        self._text_parts.append(text)
+        self.non_citation_count += len(text)
+        self._at_citation_boundary = text[-1].isspace()
+
+    def _take_results(self) -> list[str | CitationInfo]:
+        if self._text_parts:
+            self._results.append("".join(self._text_parts))
+            self._text_parts = []
+        results = self._results
+        self._results = []
+        return results
+
+    def _flush_backtick_run(self, next_char: str | None) -> None:
+        """Emits the backticks seen so far, every three of them open or close a code
+        block. Code blocks without a language tag get 'plaintext' added."""
+        if not self._backtick_run:
+            return
+        run = self._backtick_run
+        self._backtick_run = 0
+        if (run // len(TRIPLE_BACKTICK)) % 2:
+            self._in_code_block = not self._in_code_block
+
+        fence = "`" * run
+        if run >= len(TRIPLE_BACKTICK) and next_char == "\n" and self._in_code_block:
+            fence += "plaintext"
+        self._emit_text(fence)
+
+    def _reset_citation(self) -> None:
+        self.curr_segment = ""
+        self._citation_state = 0
+        self._citation_has_multiple_numbers = False
+
+    def _feed_citation_char(self, char: str) -> bool:
+        """Advances the citation parser by one character. Returns False if the
+        character is not part of the held back citation and must be processed again."""
+        state = self._citation_state
+        segment = self.curr_segment
+
+        if state == _OPENED:
+            if char in _OPEN_BRACKETS:
+                self._citation_state = _DOUBLE_OPENED
+            elif char.isdecimal():
+                self._citation_state = _IN_NUMBER
+            else:
+                return self._abort_citation()
+        elif state == _DOUBLE_OPENED:
+            if char in _OPEN_BRACKETS:
+                # Only the last two brackets can be part of a citation
+                self._emit_text(segment[0])
+                segment = segment[1:]
+            elif char.isdecimal():
+                self._citation_state = _IN_NUMBER
+            else:
+                return self._abort_citation()
+        elif state == _IN_NUMBER:
+            if char.isdecimal():
+                pass
+            elif char == ",":
+                self._citation_state = _AFTER_COMMA
+                self._citation_has_multiple_numbers = True
+            elif char in _CLOSE_BRACKETS:
+                if segment[1] not in _OPEN_BRACKETS:
+                    self._complete_citation(segment + char, formatted=False)
+                    return True
+                if self._citation_has_multiple_numbers:
+                    # '[[1, 2]' is '[' followed by the citation [1, 2]
+                    self._emit_text(segment[0])
+                    self._complete_citation(segment[1:] + char, formatted=False)
+                    return True
+                self._citation_state = _DOUBLE_CLOSING
+            else:
+                return self._abort_citation()
+        elif state == _AFTER_COMMA:
+            if char == " ":
+                self._citation_state = _AFTER_COMMA_SPACE
+            elif char.isdecimal():
+                self._citation_state = _IN_NUMBER
+            else:
+                return self._abort_citation()
+        elif state == _AFTER_COMMA_SPACE:
+            if char.isdecimal():
+                self._citation_state = _IN_NUMBER
+            else:
+                return self._abort_citation()
+        elif state == _DOUBLE_CLOSING:
+            if char in _CLOSE_BRACKETS:
+                self._complete_citation(segment + char, formatted=True)
+                return True
+            self._emit_text(segment[0])
+            self._complete_citation(segment[1:], formatted=False)
+            return False
+
+        self.curr_segment = segment + char
+        return True
+
+    def _abort_citation(self) -> bool:
+        """The held back text turned out not to be a citation, emit it as is."""
+        self._emit_text(self.curr_segment)
+        self._reset_citation()
+        return False
+
+    def _complete_citation(self, citation_str: str, formatted: bool) -> None:
+        self._reset_citation()
+
+        # Reset recent citations if no citations found for a while
+        if self.non_citation_count > 5:
+            self.recent_cited_documents.clear()
+
+        # Process the citation (returns formatted citation text and CitationInfo objects)
+        # Always tracks seen citations regardless of strip_citations flag
+        citation_text, citation_info_list = self._process_citation(
+            citation_str,
+            formatted,
+            self._at_citation_boundary,
+            self.replace_citation_tokens,
+        )
 
-        # Hold onto the current segment if potential citations found, otherwise stream it
-        if not possible_citation_found:
-            result += self.curr_segment
-            self.non_citation_count += len(self.curr_segment)
-            self.curr_segment = ""
+        if self.replace_citation_tokens:
+            # Yield CitationInfo objects BEFORE the citation text
+            # This allows the frontend to receive citation metadata before the token
+            # that contains [[n]](link), enabling immediate rendering
+            if citation_info_list:
+                if self._text_parts:
+                    self._results.append("".join(self._text_parts))
+                    self._text_parts = []
+                self._results.extend(citation_info_list)
+            # Then yield the formatted citation text
+            if citation_text:
+                self._text_parts.append(citation_text)
+        else:
+            # When not stripping, yield the original citation text unchanged
+            self._text_parts.append(citation_str)
 
-        if result:
-            yield result
+        self.non_citation_count = 0
+        # Consecutive citations are not separated by a space
+        self._at_citation_boundary = True
 
     def _process_citation(
-        self, match: re.Match, has_leading_space: bool, replace_tokens: bool = True
+        self,
+        citation_str: str,
+        formatted: bool,
+        has_leading_space: bool,
+        replace_tokens: bool = True,
     ) -> tuple[str, list[CitationInfo]]:
         """
         Process a single citation match and return formatted citation text and citation info objects.
 
-        This is an internal method called by process_token(). The match string can be
+        This is an internal method called by process_token(). The citation string can be
         in various formats: '[1]', '[1, 13, 6]', '[[4]]', '【1】', '［1］', etc.
 
         This method always:
@@ -360,7 +464,8 @@ class DynamicCitationProcessor:
         4. Returns empty string and empty list (caller yields original match text)
 
         Args:
-            match: Regex match object containing the citation pattern
+            citation_str: The complete citation text, e.g. '[1]' or '[[1]]'
+            formatted: Whether the citation is already in the form '[[1]]'
             has_leading_space: Whether the text immediately before this citation
                 ends with whitespace. Used to determine if a leading space should
                 be added to the formatted output.
@@ -375,15 +480,10 @@ class DynamicCitationProcessor:
             - citation_info_list: List of CitationInfo objects for newly cited
               documents, or empty list if replace_tokens=False
         """
-        citation_str: str = match.group()  # e.g., '[1]', '[1, 2, 3]', '[[1]]', '【1】'
-        formatted = (
-            match.lastindex == 1
-        )  # True means already in form '[[1]]' or '【【1】】'
-
         citation_info_list: list[CitationInfo] = []
         formatted_citation_parts: list[str] = []
 
-        # Extract citation numbers - regex ensures matched brackets, so we can simply slice
+        # Extract citation numbers - the parser ensures matched brackets, so we can simply slice
         citation_content = citation_str[2:-2] if formatted else citation_str[1:-1]
 
         for num_str in citation_content.split(","):
@@ -1,19 +1,102 @@
+import threading
+from queue import Full
 from queue import Queue
 
+from onyx.server.query_and_chat.placement import Placement
+from onyx.server.query_and_chat.streaming_models import AgentResponseDelta
+from onyx.server.query_and_chat.streaming_models import DeepResearchPlanDelta
+from onyx.server.query_and_chat.streaming_models import IntermediateReportDelta
 from onyx.server.query_and_chat.streaming_models import Packet
+from onyx.server.query_and_chat.streaming_models import ReasoningDelta
+
+# How often a blocked emit re-checks whether the consumer went away
+_EMIT_RETRY_INTERVAL = 0.3
+
+# Streamed text deltas and the field holding their text
+_COALESCIBLE_DELTA_FIELDS: dict[type, str] = {
+    AgentResponseDelta: "content",
+    ReasoningDelta: "reasoning",
+    DeepResearchPlanDelta: "content",
+    IntermediateReportDelta: "content",
+}
 
 
 class Emitter:
-    """Use this inside tools to emit arbitrary UI progress."""
+    """Use this inside tools to emit arbitrary UI progress.
+
+    If the bus is bounded, emit blocks while it is full so that a slow consumer slows
+    down the producer instead of packets piling up in memory. Once the consumer goes
+    away it must call close(), after which packets are dropped."""
 
     def __init__(self, bus: Queue):
         self.bus = bus
+        self._closed = threading.Event()
+        # (turn_index, tab_index, sub_turn_index) of the placements that were closed
+        self._closed_placements: set[tuple[int, int, int | None]] = set()
+        self._placements_lock = threading.Lock()
 
     def emit(self, packet: Packet) -> None:
-        self.bus.put(packet)  # Thread-safe
+        # the check and the put are atomic so that nothing is emitted for a placement
+        # after the last packet passed to close_placement
+        with self._placements_lock:
+            if _placement_key(packet.placement) in self._closed_placements:
+                return
+            self._put(packet)
+
+    def close_placement(
+        self, placement: Placement, last_packet: Packet | None = None
+    ) -> None:
+        """Emits last_packet and drops every packet emitted for the placement from
+        then on, e.g. for a tool that is no longer waited for but keeps running."""
+        with self._placements_lock:
+            if last_packet is not None:
+                self._put(last_packet)
+            self._closed_placements.add(_placement_key(placement))
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def _put(self, packet: Packet) -> None:
+        while not self._closed.is_set():
+            try:
+                self.bus.put(packet, timeout=_EMIT_RETRY_INTERVAL)  # Thread-safe
+                return
+            except Full:
+                continue
 
 
-def get_default_emitter() -> Emitter:
-    bus: Queue[Packet] = Queue()
+def _placement_key(placement: Placement) -> tuple[int, int, int | None]:
+    return (placement.turn_index, placement.tab_index, placement.sub_turn_index)
+
+
+def get_default_emitter(max_buffered_packets: int = 0) -> Emitter:
+    """max_buffered_packets bounds the bus, only set it if something consumes the
+    packets (0 for unbounded)."""
+    bus: Queue[Packet] = Queue(maxsize=max_buffered_packets)
     emitter = Emitter(bus)
     return emitter
+
+
+def coalesce_packets(packets: list[Packet]) -> list[Packet]:
+    """Merges consecutive text deltas of the same kind and placement into a single
+    packet so that fewer, larger frames are sent to the client."""
+    coalesced: list[Packet] = []
+    for packet in packets:
+        field = _COALESCIBLE_DELTA_FIELDS.get(type(packet.obj))
+        previous = coalesced[-1] if coalesced else None
+        if (
+            field is not None
+            and previous is not None
+            and type(previous.obj) is type(packet.obj)
+            and previous.placement == packet.placement
+        ):
+            merged_text = getattr(previous.obj, field) + getattr(packet.obj, field)
+            coalesced[-1] = Packet(
+                placement=previous.placement,
+                obj=previous.obj.model_copy(update={field: merged_text}),
+            )
+            continue
+
+        coalesced.append(packet)
+
+    return coalesced
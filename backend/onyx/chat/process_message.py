@@ -10,9 +10,11 @@ from onyx.chat.chat_state import ChatStateContainer
 from onyx.chat.chat_state import run_chat_loop_with_state_containers
 from onyx.chat.chat_utils import convert_chat_history
 from onyx.chat.chat_utils import create_chat_history_chain
+from onyx.chat.chat_utils import get_cached_chat_history
+from onyx.chat.chat_utils import get_chat_file_descriptors
 from onyx.chat.chat_utils import get_custom_agent_prompt
 from onyx.chat.chat_utils import is_last_assistant_message_clarification
-from onyx.chat.chat_utils import load_all_chat_files
+from onyx.chat.chat_utils import load_chat_files
 from onyx.chat.emitter import get_default_emitter
 from onyx.chat.llm_loop import run_llm_loop
 from onyx.chat.models import AnswerStream
@@ -26,6 +28,7 @@ from onyx.chat.prompt_utils import calculate_reserved_tokens
 from onyx.chat.save_chat import save_chat_turn
 from onyx.chat.stop_signal_checker import is_connected as check_stop_signal
 from onyx.chat.stop_signal_checker import reset_cancel_status
+from onyx.configs.chat_configs import CHAT_STREAM_MAX_BUFFERED_PACKETS
 from onyx.configs.chat_configs import CHAT_TARGET_CHUNK_PERCENTAGE
 from onyx.configs.chat_configs import MAX_CHUNKS_FED_TO_CHAT
 from onyx.configs.constants import DEFAULT_PERSONA_ID
@@ -38,10 +41,12 @@ from onyx.db.chat import get_chat_message
 from onyx.db.chat import get_chat_session_by_id
 from onyx.db.chat import get_or_create_root_message
 from onyx.db.chat import reserve_message_id
+from onyx.db.config_cache import get_or_load_config
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.memory import get_memories
 from onyx.db.models import ChatMessage
 from onyx.db.models import User
+from onyx.db.persona import get_cached_persona
 from onyx.db.projects import get_project_token_count
 from onyx.db.projects import get_user_files_from_project
 from onyx.db.tools import get_tools
@@ -62,6 +67,7 @@ from onyx.server.query_and_chat.streaming_models import AgentResponseDelta
 from onyx.server.query_and_chat.streaming_models import AgentResponseStart
 from onyx.server.query_and_chat.streaming_models import CitationInfo
 from onyx.server.query_and_chat.streaming_models import Packet
+from onyx.server.query_and_chat.token_limit import record_token_usage
 from onyx.server.utils import get_json_line
 from onyx.tools.constants import SEARCH_TOOL_ID
 from onyx.tools.interface import Tool
@@ -72,6 +78,8 @@ from onyx.tools.tool_constructor import SearchToolUsage
 from onyx.utils.logger import setup_logger
 from onyx.utils.long_term_log import LongTermLogger
 from onyx.utils.telemetry import mt_cloud_telemetry
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
 from onyx.utils.timing import log_generator_function_time
 from shared_configs.contextvars import get_current_tenant_id
@@ -254,6 +262,38 @@ def _get_project_search_availability(
     return search_usage_forcing_setting
 
 
+def _load_chat_files_with_new_session(
+    file_descriptors: list[FileDescriptor],
+) -> list[ChatLoadedFile]:
+    # runs concurrently with the rest of the setup so it can't use the request's session
+    with get_session_with_current_tenant() as db_session:
+        return load_chat_files(file_descriptors, db_session)
+
+
+def _get_memories_with_new_session(user: User | None) -> list[str]:
+    with get_session_with_current_tenant() as db_session:
+        return get_memories(user, db_session)
+
+
+def _load_tool_names() -> tuple[tuple[tuple[int, str], ...], int | None]:
+    with get_session_with_current_tenant() as db_session:
+        all_tools = get_tools(db_session)
+        search_tool_id = next(
+            (tool.id for tool in all_tools if tool.in_code_tool_id == SEARCH_TOOL_ID),
+            None,
+        )
+        return tuple((tool.id, tool.name) for tool in all_tools), search_tool_id
+
+
+def _get_tool_names_with_new_session() -> tuple[dict[int, str], int | None]:
+    """Returns the mapping of tool_id to tool_name used for history reconstruction and
+    the id of the search tool."""
+    tool_names, search_tool_id = get_or_load_config(
+        "tool_names", None, _load_tool_names
+    )
+    return dict(tool_names), search_tool_id
+
+
 def _initialize_chat_session(
     message_text: str,
     files: list[FileDescriptor],
@@ -348,7 +388,13 @@ def stream_chat_message_objects(
             user_id=user_id,
             db_session=db_session,
         )
-        persona = chat_session.persona
+        # only depends on the user, loaded while the chat session is set up
+        memories_task = run_in_background(_get_memories_with_new_session, user)
+        persona = (
+            get_cached_persona(chat_session.persona_id, db_session)
+            if chat_session.persona_id is not None
+            else chat_session.persona
+        )
 
         message_text = new_msg_req.message
         chat_session_id = new_msg_req.chat_session_id
@@ -425,7 +471,24 @@ def stream_chat_message_objects(
         # At this point we can save the user message as it's validated and final
         db_session.commit()
 
-        memories = get_memories(user, db_session)
+        tool_id_to_name_map, search_tool_id = _get_tool_names_with_new_session()
+
+        # The messages that were already converted on a previous turn of this chat
+        # session are reused, the files of the other messages don't depend on the rest
+        # of the setup, so they are loaded in the background while the project files and
+        # tools are prepared.
+        # TODO Once summarization is done, we don't need to load all the files from the beginning anymore.
+        cached_chat_history = get_cached_chat_history(
+            chat_session_id=chat_session_id,
+            chat_history=chat_history,
+            tool_id_to_name_map=tool_id_to_name_map,
+        )
+        files_task = run_in_background(
+            _load_chat_files_with_new_session,
+            get_chat_file_descriptors(chat_history[len(cached_chat_history) :]),
+        )
+
+        memories = wait_on_background(memories_task)
 
         custom_agent_prompt = get_custom_agent_prompt(persona, chat_session)
 
@@ -446,15 +509,6 @@ def stream_chat_message_objects(
             db_session=db_session,
         )
 
-        # Build a mapping of tool_id to tool_name for history reconstruction
-        all_tools = get_tools(db_session)
-        tool_id_to_name_map = {tool.id: tool.name for tool in all_tools}
-
-        search_tool_id = next(
-            (tool.id for tool in all_tools if tool.in_code_tool_id == SEARCH_TOOL_ID),
-            None,
-        )
-
         # This may also mutate the new_msg_req.forced_tool_ids
         # This logic is specifically for projects
         search_usage_forcing_setting = _get_project_search_availability(
@@ -465,7 +519,7 @@ def stream_chat_message_objects(
             search_tool_id=search_tool_id,
         )
 
-        emitter = get_default_emitter()
+        emitter = get_default_emitter(CHAT_STREAM_MAX_BUFFERED_PACKETS)
 
         # Construct tools based on the persona configurations
         tool_dict = construct_tools(
@@ -496,10 +550,6 @@ def stream_chat_message_objects(
         for tool_list in tool_dict.values():
             tools.extend(tool_list)
 
-        # TODO Once summarization is done, we don't need to load all the files from the beginning anymore.
-        # load all files needed for this chat chain in memory
-        files = load_all_chat_files(chat_history, db_session)
-
         # TODO Need to think of some way to support selected docs from the sidebar
 
         # Reserve a message id for the assistant response for frontend to track packets
@@ -519,11 +569,13 @@ def stream_chat_message_objects(
         # and is easy to parse for the agent loop
         simple_chat_history = convert_chat_history(
             chat_history=chat_history,
-            files=files,
+            files=wait_on_background(files_task),
             project_image_files=extracted_project_files.project_image_files,
             additional_context=additional_context,
             token_counter=token_counter,
             tool_id_to_name_map=tool_id_to_name_map,
+            chat_session_id=chat_session_id,
+            cached_chat_history=cached_chat_history,
         )
 
         redis_client = get_redis_client()
@@ -635,6 +687,10 @@ def stream_chat_message_objects(
             assistant_message=assistant_response,
             is_clarification=state_container.is_clarification,
         )
+        record_token_usage(
+            user,
+            (user_message.token_count or 0) + (assistant_response.token_count or 0),
+        )
 
     except ValueError as e:
         logger.exception("Failed to process chat message.")
@@ -101,6 +101,27 @@ SESSION_EXPIRE_TIME_SECONDS = int(
     or 86400 * 7
 )  # 7 days
 
+# Users resolved from API keys, personal access tokens and session tokens are cached
+# in memory so that requests don't have to load them from Postgres / Redis every time.
+# Changes to users and their credentials evict the entries of every API server through
+# Redis pub/sub, the TTL bounds how long a missed eviction or an expired session token
+# can be served from the cache.
+AUTH_PRINCIPAL_CACHE_ENABLED = (
+    os.environ.get("AUTH_PRINCIPAL_CACHE_ENABLED", "").lower() == "true"
+)
+AUTH_PRINCIPAL_CACHE_TTL_SECONDS = int(
+    os.environ.get("AUTH_PRINCIPAL_CACHE_TTL_SECONDS") or 30
+)
+AUTH_PRINCIPAL_CACHE_MAX_ENTRIES = int(
+    os.environ.get("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES") or 10000
+)
+
+# Cache personas, the tool catalog and LLM providers in process instead of loading them
+# for every chat message. Admin edits evict the tenant's entries on every server through
+# Redis pub/sub, the TTL bounds how long a missed eviction can be served.
+CONFIG_CACHE_ENABLED = os.environ.get("CONFIG_CACHE_ENABLED", "").lower() == "true"
+CONFIG_CACHE_TTL_SECONDS = int(os.environ.get("CONFIG_CACHE_TTL_SECONDS") or 300)
+
 # Default request timeout, mostly used by connectors
 REQUEST_TIMEOUT_SECONDS = int(os.environ.get("REQUEST_TIMEOUT_SECONDS") or 60)
 
@@ -210,6 +231,26 @@ VESPA_DEPLOYMENT_ZIP = (
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 
+# Filters on weightedset attributes (e.g. ACLs) with more values than this are sent as
+# a single weightedSet term instead of a long chain of OR'ed `contains` terms. This
+# keeps the YQL small and lets Vespa resolve the whole set with one dictionary lookup.
+VESPA_WEIGHTED_SET_FILTER_THRESHOLD = int(
+    os.environ.get("VESPA_WEIGHTED_SET_FILTER_THRESHOLD") or 10
+)
+# Query plan tuning for filtered nearest neighbor search, see
+# https://docs.vespa.ai/en/nearest-neighbor-search-guide.html#controlling-filter-behavior
+# Unset means the defaults from the Vespa ranking profile are used.
+VESPA_ANN_APPROXIMATE_THRESHOLD = (
+    float(os.environ["VESPA_ANN_APPROXIMATE_THRESHOLD"])
+    if os.environ.get("VESPA_ANN_APPROXIMATE_THRESHOLD")
+    else None
+)
+VESPA_ANN_POST_FILTER_THRESHOLD = (
+    float(os.environ["VESPA_ANN_POST_FILTER_THRESHOLD"])
+    if os.environ.get("VESPA_ANN_POST_FILTER_THRESHOLD")
+    else None
+)
+
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
@@ -257,6 +298,16 @@ try:
 except ValueError:
     POSTGRES_POOL_RECYCLE = POSTGRES_POOL_RECYCLE_DEFAULT
 
+# Multi tenant only. By default, sessions for a tenant are bound to a dedicated
+# connection that rewrites the schema of every statement (SQLAlchemy's
+# schema_translate_map). If enabled, the tenant is selected by setting the search_path
+# of the pooled connection instead, statements are sent as compiled and sessions only
+# hold a connection while a transaction is open. The search_path is only changed when a
+# pooled connection last served a different tenant.
+POSTGRES_TENANT_SEARCH_PATH_ROUTING = (
+    os.environ.get("POSTGRES_TENANT_SEARCH_PATH_ROUTING", "").lower() == "true"
+)
+
 # RDS IAM authentication - enables IAM-based authentication for PostgreSQL
 USE_IAM_AUTH = os.getenv("USE_IAM_AUTH", "False").lower() == "true"
 
@@ -402,8 +453,10 @@ CELERY_WORKER_MONITORING_CONCURRENCY = int(
     os.environ.get("CELERY_WORKER_MONITORING_CONCURRENCY") or 1
 )
 
+# the memory of the files processed at once is bounded by
+# USER_FILE_PROCESSING_MAX_PARALLEL_BYTES
 CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY = int(
-    os.environ.get("CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY") or 2
+    os.environ.get("CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY") or 4
 )
 
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
@@ -416,6 +469,19 @@ DB_YIELD_PER_DEFAULT = 64
 #####
 POLL_CONNECTOR_OFFSET = 30  # Minutes overlap between poll windows
 
+# Max number of partitions (drives, sites, spaces, ...) of a single connector that
+# docfetching will fetch in parallel. 1 disables partitioned fetching.
+DOCFETCHING_PARTITION_PARALLELISM = int(
+    os.environ.get("DOCFETCHING_PARTITION_PARALLELISM") or 1
+)
+
+# If set, connectors that support it consult a per cc-pair index of source versions /
+# content hashes and skip downloading + re-indexing documents that haven't changed
+# since they were last indexed. Only applies to the primary index.
+ENABLE_CONNECTOR_CHANGE_DETECTION = (
+    os.environ.get("ENABLE_CONNECTOR_CHANGE_DETECTION", "").lower() == "true"
+)
+
 # View the list here:
 # https://github.com/onyx-dot-app/onyx/blob/main/backend/onyx/connectors/factory.py
 # If this is empty, all connectors are enabled, this is an option for security heavy orgs where
@@ -648,6 +714,17 @@ CONTINUE_ON_CONNECTOR_FAILURE = os.environ.get(
 DISABLE_INDEX_UPDATE_ON_SWAP = (
     os.environ.get("DISABLE_INDEX_UPDATE_ON_SWAP", "").lower() == "true"
 )
+# Build the secondary index of a new embedding model from the documents in the current
+# index instead of running every connector from scratch. What changed in the sources
+# since then is fetched by the first regular indexing runs after the swap.
+ENABLE_REEMBED_FROM_CURRENT_INDEX = (
+    os.environ.get("ENABLE_REEMBED_FROM_CURRENT_INDEX", "").lower() == "true"
+)
+# Number of documents in a batch when re-embedding from the current index, larger than
+# INDEX_BATCH_SIZE since no connector has to be paged through
+REEMBED_FROM_CURRENT_INDEX_BATCH_SIZE = int(
+    os.environ.get("REEMBED_FROM_CURRENT_INDEX_BATCH_SIZE") or 64
+)
 # More accurate results at the expense of indexing speed and index size (stores additional 4 MINI_CHUNK vectors)
 ENABLE_MULTIPASS_INDEXING = (
     os.environ.get("ENABLE_MULTIPASS_INDEXING", "").lower() == "true"
@@ -696,6 +773,22 @@ INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
 # Setting this number too high may overload the indexing process
 USER_FILE_INDEXING_LIMIT = int(os.environ.get("USER_FILE_INDEXING_LIMIT") or 100)
 
+# Number of files of a single upload whose text is extracted and token counted in parallel
+USER_FILE_UPLOAD_MAX_PARALLELISM = int(
+    os.environ.get("USER_FILE_UPLOAD_MAX_PARALLELISM") or 8
+)
+# Total size of the uploaded files whose text is extracted at the same time in an api
+# server process. Files larger than this on their own are extracted one at a time.
+# <= 0 disables the limit.
+USER_FILE_UPLOAD_MAX_PARALLEL_BYTES = int(
+    os.environ.get("USER_FILE_UPLOAD_MAX_PARALLEL_BYTES") or 256 * 1024 * 1024
+)
+# Same as above for the user files processed at the same time by a user file
+# processing worker, see CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY
+USER_FILE_PROCESSING_MAX_PARALLEL_BYTES = int(
+    os.environ.get("USER_FILE_PROCESSING_MAX_PARALLEL_BYTES") or 256 * 1024 * 1024
+)
+
 # Maximum file size in a document to be indexed
 MAX_DOCUMENT_CHARS = int(os.environ.get("MAX_DOCUMENT_CHARS") or 5_000_000)
 MAX_FILE_SIZE_BYTES = int(
@@ -792,6 +885,16 @@ TOKEN_BUDGET_GLOBALLY_ENABLED = (
     os.environ.get("TOKEN_BUDGET_GLOBALLY_ENABLED", "").lower() == "true"
 )
 
+# Check token rate limits against per user / user group / tenant counters in Redis that
+# are updated when an answer is saved instead of summing up chat messages in Postgres
+TOKEN_USAGE_COUNTERS_ENABLED = (
+    os.environ.get("TOKEN_USAGE_COUNTERS_ENABLED", "").lower() == "true"
+)
+# How often the counters are rebuilt from the chat messages in Postgres
+TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS = int(
+    os.environ.get("TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS") or 15 * 60
+)
+
 # Defined custom query/answer conditions to validate the query and the LLM answer.
 # Format: list of strings
 CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
@@ -100,4 +100,44 @@ USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH = (
     == "true"
 )
 
+# Time budget in seconds for the tool calls of a single deep research agent step,
+# tool calls that are still running after this are reported to the agent as failed
+DEEP_RESEARCH_TOOL_CALL_TIMEOUT = int(
+    os.environ.get("DEEP_RESEARCH_TOOL_CALL_TIMEOUT") or 120
+)
+# Max number of deep research tool calls running at the same time in a process. Tool
+# calls that ran past their time budget keep running until they finish and count
+# towards this, further tool calls wait for a free slot within their own budget.
+DEEP_RESEARCH_MAX_CONCURRENT_TOOL_CALLS = int(
+    os.environ.get("DEEP_RESEARCH_MAX_CONCURRENT_TOOL_CALLS") or 32
+)
+# Start the internal search for each deep research task as soon as the task is
+# assigned, while the research agent is still deciding on its first tool calls.
+# Off by default, the search runs even if the agent never searches for its task.
+DEEP_RESEARCH_SPECULATIVE_SEARCH = (
+    os.environ.get("DEEP_RESEARCH_SPECULATIVE_SEARCH", "").lower() == "true"
+)
+
+# Max number of packets buffered between the chat loop and the response stream, if the
+# client reads slower than the LLM produces tokens the chat loop is paused instead
+CHAT_STREAM_MAX_BUFFERED_PACKETS = int(
+    os.environ.get("CHAT_STREAM_MAX_BUFFERED_PACKETS") or 256
+)
+# Max number of chat answers streamed at the same time by an api server process, each
+# one runs its chat loop in a thread. Further answers wait for one of them to finish.
+CHAT_STREAM_MAX_CONCURRENT = int(os.environ.get("CHAT_STREAM_MAX_CONCURRENT") or 64)
+
+# Files attached to chat messages are kept in memory across turns of a chat session so
+# that they are not read from the file store again for every new message.
+# Upper bound on the total size of the cached files per process, 0 disables the cache.
+CHAT_FILE_CACHE_MAX_BYTES = int(
+    os.environ.get("CHAT_FILE_CACHE_MAX_BYTES") or 64 * 1024 * 1024
+)
+# The chat history of a session converted for the LLM is also kept in memory across
+# turns so that only the messages added since the previous turn are converted (and have
+# their files loaded). Upper bound on the total size per process, 0 disables the cache.
+CHAT_HISTORY_CACHE_MAX_BYTES = int(
+    os.environ.get("CHAT_HISTORY_CACHE_MAX_BYTES") or 64 * 1024 * 1024
+)
+
 USE_DIV_CON_AGENT = os.environ.get("USE_DIV_CON_AGENT", "false").lower() == "true"
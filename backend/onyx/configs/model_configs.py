@@ -131,3 +131,16 @@ if _LITELLM_EXTRA_BODY_RAW:
 USE_INFORMATION_CONTENT_CLASSIFICATION = (
     os.environ.get("USE_INFORMATION_CONTENT_CLASSIFICATION", "false").lower() == "true"
 )
+
+# Opt-in cache for the responses of deterministic secondary LLM calls (query rephrasing,
+# chat session naming, ...), stored in Redis per tenant
+LLM_RESPONSE_CACHE_ENABLED = (
+    os.environ.get("LLM_RESPONSE_CACHE_ENABLED", "").lower() == "true"
+)
+LLM_RESPONSE_CACHE_TTL_SECONDS = int(
+    os.environ.get("LLM_RESPONSE_CACHE_TTL_SECONDS") or 24 * 60 * 60
+)
+# Max number of cached responses per tenant, the oldest ones are evicted first
+LLM_RESPONSE_CACHE_MAX_ENTRIES = int(
+    os.environ.get("LLM_RESPONSE_CACHE_MAX_ENTRIES") or 10_000
+)
@@ -24,3 +24,44 @@ if _CUSTOM_TOOL_PASS_THROUGH_HEADERS_RAW:
         logger.error(
             "Failed to parse CUSTOM_TOOL_PASS_THROUGH_HEADERS, must be a valid JSON object"
         )
+
+# Pages fetched by the open_url tool can be cached so that agents and deep research
+# loops re-opening the same pages don't refetch them. Cache-Control / Expires / ETag /
+# Last-Modified response headers are honored, the default TTL applies when the page
+# doesn't specify one.
+WEB_CONTENT_CACHE_ENABLED = (
+    os.environ.get("WEB_CONTENT_CACHE_ENABLED", "").lower() == "true"
+)
+WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS = int(
+    os.environ.get("WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS") or 60 * 60  # 1 hour
+)
+WEB_CONTENT_CACHE_MAX_TTL_SECONDS = int(
+    os.environ.get("WEB_CONTENT_CACHE_MAX_TTL_SECONDS") or 24 * 60 * 60  # 1 day
+)
+
+# Concurrency of the built-in web crawler, total and per host
+WEB_CRAWLER_MAX_WORKERS = int(os.environ.get("WEB_CRAWLER_MAX_WORKERS") or 8)
+WEB_CRAWLER_MAX_CONNECTIONS_PER_HOST = int(
+    os.environ.get("WEB_CRAWLER_MAX_CONNECTIONS_PER_HOST") or 2
+)
+
+# MCP client sessions are kept open and reused across tool calls of the same server and
+# credentials instead of doing a full connect + initialize handshake for every call.
+# Idle sessions are closed after the idle timeout, sessions that were idle for longer
+# than the health check interval are pinged before being reused.
+MCP_CLIENT_SESSION_POOL_ENABLED = (
+    os.environ.get("MCP_CLIENT_SESSION_POOL_ENABLED", "true").lower() == "true"
+)
+MCP_CLIENT_SESSION_IDLE_TIMEOUT_SECONDS = int(
+    os.environ.get("MCP_CLIENT_SESSION_IDLE_TIMEOUT_SECONDS") or 5 * 60  # 5 minutes
+)
+MCP_CLIENT_SESSION_HEALTH_CHECK_INTERVAL_SECONDS = int(
+    os.environ.get("MCP_CLIENT_SESSION_HEALTH_CHECK_INTERVAL_SECONDS") or 30
+)
+MCP_CLIENT_SESSION_POOL_MAX_SIZE = int(
+    os.environ.get("MCP_CLIENT_SESSION_POOL_MAX_SIZE") or 64
+)
+# Tool lists discovered through pooled sessions are cached for this long
+MCP_TOOL_LIST_CACHE_TTL_SECONDS = int(
+    os.environ.get("MCP_TOOL_LIST_CACHE_TTL_SECONDS") or 60
+)
@@ -1,4 +1,5 @@
 import copy
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -32,6 +33,7 @@ from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
+from onyx.connectors.interfaces import ChangeDetectionConnector
 from onyx.connectors.interfaces import CheckpointedConnector
 from onyx.connectors.interfaces import CheckpointOutput
 from onyx.connectors.interfaces import ConnectorCheckpoint
@@ -90,6 +92,11 @@ def _get_page_id(page: dict[str, Any], allow_missing: bool = False) -> str:
     return str(page["id"])
 
 
+def _get_page_version(page: dict[str, Any]) -> str | None:
+    version_number = page.get("version", {}).get("number")
+    return str(version_number) if version_number is not None else None
+
+
 class ConfluenceCheckpoint(ConnectorCheckpoint):
 
     next_page_url: str | None
@@ -100,6 +107,7 @@ class ConfluenceConnector(
     SlimConnector,
     SlimConnectorWithPermSync,
     CredentialsConnector,
+    ChangeDetectionConnector,
 ):
     def __init__(
         self,
@@ -363,6 +371,7 @@ class ConfluenceConnector(
                 metadata=metadata,
                 doc_updated_at=datetime_from_string(page["version"]["when"]),
                 primary_owners=primary_owners if primary_owners else None,
+                source_version=_get_page_version(page),
             )
         except Exception as e:
             logger.error(f"Error converting page {page.get('id', 'unknown')}: {e}")
@@ -587,33 +596,61 @@ class ConfluenceConnector(
         def store_next_page_url(next_page_url: str) -> None:
             checkpoint.next_page_url = next_page_url
 
+        def process_pages(
+            pages: list[dict[str, Any]],
+        ) -> Iterator[Document | ConnectorFailure]:
+            # unchanged pages are looked up once per page of results
+            page_ids = [
+                build_confluence_document_id(
+                    self.wiki_base, page["_links"]["webui"], self.is_cloud
+                )
+                for page in pages
+            ]
+            unchanged_page_ids = self.get_unchanged_at_source(
+                {
+                    page_id: _get_page_version(page)
+                    for page_id, page in zip(page_ids, pages)
+                }
+            )
+
+            for page_id, page in zip(page_ids, pages):
+                # Build doc from page, unless the page is unchanged since it was
+                # last indexed. Attachments are still checked below.
+                if page_id in unchanged_page_ids:
+                    doc_or_failure: Document | ConnectorFailure | None = None
+                else:
+                    doc_or_failure = self._convert_page_to_document(page)
+
+                if isinstance(doc_or_failure, ConnectorFailure):
+                    yield doc_or_failure
+                    continue
+
+                # yield completed document (or failure)
+                if doc_or_failure is not None:
+                    yield doc_or_failure
+
+                # Now get attachments for that page:
+                attachment_docs, attachment_failures = self._fetch_page_attachments(
+                    page, start, end
+                )
+                # yield attached docs and failures
+                yield from attachment_docs
+                yield from attachment_failures
+
+        pages: list[dict[str, Any]] = []
         for page in self.confluence_client.paginated_page_retrieval(
             cql_url=page_query_url,
             limit=self.batch_size,
             next_page_callback=store_next_page_url,
         ):
-            # Build doc from page
-            doc_or_failure = self._convert_page_to_document(page)
-
-            if isinstance(doc_or_failure, ConnectorFailure):
-                yield doc_or_failure
-                continue
-
-            # yield completed document (or failure)
-            yield doc_or_failure
-
-            # Now get attachments for that page:
-            attachment_docs, attachment_failures = self._fetch_page_attachments(
-                page, start, end
-            )
-            # yield attached docs and failures
-            yield from attachment_docs
-            yield from attachment_failures
+            pages.append(page)
 
             # Create checkpoint once a full page of results is returned
             if checkpoint.next_page_url and checkpoint.next_page_url != page_query_url:
+                yield from process_pages(pages)
                 return checkpoint
 
+        yield from process_pages(pages)
         checkpoint.has_more = False
         return checkpoint
 
@@ -1,20 +1,30 @@
+import contextvars
+import copy
 import sys
 import time
 from collections.abc import Generator
+from collections.abc import Iterator
 from datetime import datetime
+from typing import Any
 from typing import Generic
 from typing import TypeVar
 
+from onyx.configs.app_configs import DOCFETCHING_PARTITION_PARALLELISM
 from onyx.connectors.interfaces import BaseConnector
+from onyx.connectors.interfaces import ChangeDetectionConnector
 from onyx.connectors.interfaces import CheckpointedConnector
 from onyx.connectors.interfaces import CheckpointedConnectorWithPermSync
 from onyx.connectors.interfaces import CheckpointOutput
 from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import PartitionedCheckpointedConnector
 from onyx.connectors.interfaces import PollConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
 from onyx.connectors.models import ConnectorCheckpoint
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import Document
+from onyx.connectors.models import PartitionedConnectorCheckpoint
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import parallel_yield
 
 
 logger = setup_logger()
@@ -92,6 +102,192 @@ class CheckpointOutputWrapper(Generic[CT]):
         yield None, None, self.next_checkpoint
 
 
+PartitionStepOutput = tuple[
+    str, Document | ConnectorFailure | None, ConnectorCheckpoint | None
+]
+
+
+def _step_in_context(
+    gen: Iterator[PartitionStepOutput], ctx: contextvars.Context
+) -> Iterator[PartitionStepOutput]:
+    """Advances the generator inside `ctx` so that context vars (e.g. the tenant id)
+    are visible regardless of which worker thread calls next()."""
+    while True:
+        try:
+            item = ctx.run(next, gen)
+        except StopIteration:
+            return
+        yield item
+
+
+class ParallelPartitionConnector(
+    CheckpointedConnectorWithPermSync[PartitionedConnectorCheckpoint],
+    ChangeDetectionConnector,
+):
+    """
+    Wraps a PartitionedCheckpointedConnector so that each of its partitions is
+    fetched by its own partition connector, in parallel.
+
+    Each call to load_from_checkpoint advances every unfinished partition by exactly
+    one of its own checkpoints, so the combined checkpoint only ever covers documents
+    that have actually been yielded.
+    """
+
+    def __init__(
+        self,
+        connector: PartitionedCheckpointedConnector,
+        partitions: list[str],
+        max_workers: int,
+    ) -> None:
+        self.connector = connector
+        self.partitions = partitions
+        self.max_workers = max_workers
+
+        self._partition_connectors: dict[str, CheckpointedConnector] = {}
+
+    def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
+        # the wrapped connector is built with its credentials already loaded
+        return None
+
+    def validate_connector_settings(self) -> None:
+        self.connector.validate_connector_settings()
+
+    def _get_partition_connector(self, partition_id: str) -> CheckpointedConnector:
+        if partition_id not in self._partition_connectors:
+            partition_connector = self.connector.build_partition_connector(partition_id)
+            if isinstance(partition_connector, ChangeDetectionConnector):
+                partition_connector.set_change_detection_index(
+                    self._change_detection_index
+                )
+            self._partition_connectors[partition_id] = partition_connector
+
+        return self._partition_connectors[partition_id]
+
+    def _run_partition_step(
+        self,
+        partition_id: str,
+        partition_connector: CheckpointedConnector,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        serialized_checkpoint: str | None,
+        include_permissions: bool,
+    ) -> Iterator[PartitionStepOutput]:
+        partition_checkpoint = (
+            partition_connector.validate_checkpoint_json(serialized_checkpoint)
+            if serialized_checkpoint is not None
+            else partition_connector.build_dummy_checkpoint()
+        )
+
+        if include_permissions:
+            if not isinstance(partition_connector, CheckpointedConnectorWithPermSync):
+                raise ValueError("Connector does not support permission syncing")
+            load_from_checkpoint = (
+                partition_connector.load_from_checkpoint_with_perm_sync
+            )
+        else:
+            load_from_checkpoint = partition_connector.load_from_checkpoint
+
+        for document, failure, next_checkpoint in CheckpointOutputWrapper()(
+            load_from_checkpoint(start, end, partition_checkpoint)
+        ):
+            yield partition_id, document or failure, next_checkpoint
+
+    def _load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: PartitionedConnectorCheckpoint,
+        include_permissions: bool,
+    ) -> CheckpointOutput[PartitionedConnectorCheckpoint]:
+        checkpoint = copy.deepcopy(checkpoint)
+
+        active_partitions = [
+            partition_id
+            for partition_id in checkpoint.partition_checkpoints
+            if partition_id not in checkpoint.completed_partitions
+        ]
+
+        # partition connectors are built here (rather than in the worker threads)
+        # so that credential loading happens once and sequentially
+        step_generators = [
+            _step_in_context(
+                self._run_partition_step(
+                    partition_id,
+                    self._get_partition_connector(partition_id),
+                    start,
+                    end,
+                    checkpoint.partition_checkpoints[partition_id],
+                    include_permissions,
+                ),
+                contextvars.copy_context(),
+            )
+            for partition_id in active_partitions
+        ]
+
+        for partition_id, document_or_failure, next_checkpoint in parallel_yield(
+            step_generators, max_workers=self.max_workers
+        ):
+            if document_or_failure is not None:
+                yield document_or_failure
+
+            if next_checkpoint is None:
+                continue
+
+            checkpoint.partition_checkpoints[partition_id] = (
+                next_checkpoint.model_dump_json()
+            )
+            if not next_checkpoint.has_more:
+                checkpoint.completed_partitions.append(partition_id)
+
+        checkpoint.has_more = len(checkpoint.completed_partitions) < len(
+            checkpoint.partition_checkpoints
+        )
+        logger.info(
+            f"Partitioned connector step finished: "
+            f"completed_partitions={len(checkpoint.completed_partitions)} "
+            f"total_partitions={len(checkpoint.partition_checkpoints)}"
+        )
+        return checkpoint
+
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: PartitionedConnectorCheckpoint,
+    ) -> CheckpointOutput[PartitionedConnectorCheckpoint]:
+        return self._load_from_checkpoint(
+            start, end, checkpoint, include_permissions=False
+        )
+
+    def load_from_checkpoint_with_perm_sync(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: PartitionedConnectorCheckpoint,
+    ) -> CheckpointOutput[PartitionedConnectorCheckpoint]:
+        return self._load_from_checkpoint(
+            start, end, checkpoint, include_permissions=True
+        )
+
+    def build_dummy_checkpoint(self) -> PartitionedConnectorCheckpoint:
+        return PartitionedConnectorCheckpoint(
+            has_more=True,
+            partition_checkpoints={
+                partition_id: None for partition_id in self.partitions
+            },
+        )
+
+    def validate_checkpoint_json(
+        self, checkpoint_json: str
+    ) -> PartitionedConnectorCheckpoint:
+        checkpoint = PartitionedConnectorCheckpoint.model_validate_json(checkpoint_json)
+        if set(checkpoint.partition_checkpoints) != set(self.partitions):
+            raise ValueError(
+                "Checkpoint partitions do not match the connector's current partitions"
+            )
+        return checkpoint
+
+
 class ConnectorRunner(Generic[CT]):
     """
     Handles:
@@ -113,6 +309,23 @@ class ConnectorRunner(Generic[CT]):
                 "include_permissions cannot be True for non-checkpointed connectors"
             )
 
+        # fetch independent partitions of a single connector in parallel
+        if (
+            DOCFETCHING_PARTITION_PARALLELISM > 1
+            and isinstance(connector, PartitionedCheckpointedConnector)
+            and len(partitions := connector.get_partitions()) > 1
+        ):
+            logger.info(
+                f"Fetching connector partitions in parallel: "
+                f"partitions={len(partitions)} "
+                f"max_workers={DOCFETCHING_PARTITION_PARALLELISM}"
+            )
+            connector = ParallelPartitionConnector(
+                connector=connector,
+                partitions=partitions,
+                max_workers=DOCFETCHING_PARTITION_PARALLELISM,
+            )
+
         self.connector = connector
         self.time_range = time_range
         self.batch_size = batch_size
@@ -1,4 +1,5 @@
 import os
+from collections.abc import Callable
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
@@ -8,6 +9,7 @@ from typing import IO
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.configs.constants import FileOrigin
+from onyx.configs.llm_configs import get_image_extraction_and_analysis_enabled
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     process_onyx_metadata,
 )
@@ -17,9 +19,14 @@ from onyx.connectors.models import Document
 from onyx.connectors.models import ImageSection
 from onyx.connectors.models import TextSection
 from onyx.file_processing.extract_file_text import extract_text_and_images
+from onyx.file_processing.extract_file_text import ExtractionResult
 from onyx.file_processing.extract_file_text import get_file_ext
+from onyx.file_processing.extract_file_text import stream_pdf_file
+from onyx.file_processing.extract_file_text import StreamedPdf
 from onyx.file_processing.file_types import OnyxFileExtensions
+from onyx.file_processing.file_types import OnyxMimeTypes
 from onyx.file_processing.image_utils import store_image_and_create_section
+from onyx.file_processing.unstructured import get_unstructured_api_key
 from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
 
@@ -77,11 +84,17 @@ def _process_file(
     metadata: dict[str, Any] | None,
     pdf_pass: str | None,
     file_type: str | None,
+    stream_pdf_pages: bool = False,
+    progress_callback: Callable[[int, int], None] | None = None,
 ) -> list[Document]:
     """
     Process a file and return a list of Documents.
     For images, creates ImageSection objects without summarization.
     For documents with embedded images, extracts and stores the images.
+
+    With stream_pdf_pages, PDFs are read one page at a time: each page becomes its
+    own section, its images are stored as soon as the page is read and
+    progress_callback is called with (pages processed, total pages) after each page.
     """
     if metadata is None:
         metadata = {}
@@ -146,13 +159,62 @@ def _process_file(
     # 2) Otherwise: text-based approach. Possibly with embedded images.
     file.seek(0)
 
-    # Extract text and images from the file
-    extraction_result = extract_text_and_images(
-        file=file,
-        file_name=file_name,
-        pdf_pass=pdf_pass,
-        content_type=file_type,
-    )
+    # embedded images are numbered in the order they are found
+    embedded_image_count = 0
+    page_image_sections: list[ImageSection] = []
+
+    def _store_embedded_image(img_data: bytes, img_name: str) -> None:
+        nonlocal embedded_image_count
+        embedded_image_count += 1
+        idx = embedded_image_count
+        # Store each embedded image as a separate file in FileStore
+        # and create a section with the image reference
+        try:
+            image_section, stored_file_name = _create_image_section(
+                image_data=img_data,
+                parent_file_name=file_id,
+                display_name=f"{title} - image {idx}",
+                media_type="application/octet-stream",  # Default media type for embedded images
+                idx=idx,
+            )
+            page_image_sections.append(image_section)
+            logger.debug(
+                f"Created ImageSection for embedded image {idx} "
+                f"in {file_name}, stored as: {stored_file_name}"
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to process embedded image {idx} in {file_name}: {e}"
+            )
+
+    streamed_pdf: StreamedPdf | None = None
+    if (
+        stream_pdf_pages
+        and extension == ".pdf"
+        and file_type not in OnyxMimeTypes.TEXT_MIME_TYPES
+        and not get_unstructured_api_key()
+    ):
+        # only the metadata is read here, the pages are read while building sections
+        streamed_pdf = stream_pdf_file(
+            file,
+            pdf_pass=pdf_pass,
+            image_callback=(
+                _store_embedded_image
+                if get_image_extraction_and_analysis_enabled()
+                else None
+            ),
+        )
+        extraction_result = ExtractionResult(
+            text_content="", embedded_images=[], metadata=streamed_pdf.metadata
+        )
+    else:
+        # Extract text and images from the file
+        extraction_result = extract_text_and_images(
+            file=file,
+            file_name=file_name,
+            pdf_pass=pdf_pass,
+            content_type=file_type,
+        )
 
     # Each file may have file-specific ONYX_METADATA https://docs.onyx.app/admins/connectors/official/file
     # If so, we should add it to any metadata processed so far
@@ -185,28 +247,20 @@ def _process_file(
         )
 
     # Then any extracted images from docx, PDFs, etc.
-    for idx, (img_data, img_name) in enumerate(
-        extraction_result.embedded_images, start=1
-    ):
-        # Store each embedded image as a separate file in FileStore
-        # and create a section with the image reference
-        try:
-            image_section, stored_file_name = _create_image_section(
-                image_data=img_data,
-                parent_file_name=file_id,
-                display_name=f"{title} - image {idx}",
-                media_type="application/octet-stream",  # Default media type for embedded images
-                idx=idx,
-            )
-            sections.append(image_section)
-            logger.debug(
-                f"Created ImageSection for embedded image {idx} "
-                f"in {file_name}, stored as: {stored_file_name}"
-            )
-        except Exception as e:
-            logger.warning(
-                f"Failed to process embedded image {idx} in {file_name}: {e}"
-            )
+    for img_data, img_name in extraction_result.embedded_images:
+        _store_embedded_image(img_data, img_name)
+    sections.extend(page_image_sections)
+    page_image_sections.clear()
+
+    # When streaming, one Section per page followed by the images of that page
+    if streamed_pdf is not None:
+        for page_num, page_text in enumerate(streamed_pdf.page_texts, start=1):
+            if page_text.strip():
+                sections.append(TextSection(link=link, text=page_text.strip()))
+            sections.extend(page_image_sections)
+            page_image_sections.clear()
+            if progress_callback is not None:
+                progress_callback(page_num, streamed_pdf.page_count)
 
     return [
         Document(
@@ -241,11 +295,15 @@ class LocalFileConnector(LoadConnector):
         file_names: list[str] | None = None,
         zip_metadata: dict[str, Any] | None = None,
         batch_size: int = INDEX_BATCH_SIZE,
+        stream_pdf_pages: bool = False,
+        progress_callback: Callable[[int, int], None] | None = None,
     ) -> None:
         self.file_locations = [str(loc) for loc in file_locations]
         self.batch_size = batch_size
         self.pdf_pass: str | None = None
         self.zip_metadata = zip_metadata or {}
+        self.stream_pdf_pages = stream_pdf_pages
+        self.progress_callback = progress_callback
 
     def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
         self.pdf_pass = credentials.get("pdf_password")
@@ -273,15 +331,20 @@ class LocalFileConnector(LoadConnector):
                 continue
 
             metadata = self._get_file_metadata(file_record.display_name)
-            file_io = file_store.read_file(file_id=file_id, mode="b")
-            new_docs = _process_file(
-                file_id=file_id,
-                file_name=file_record.display_name,
-                file=file_io,
-                metadata=metadata,
-                pdf_pass=self.pdf_pass,
-                file_type=file_record.file_type,
-            )
+            # spooled to disk so that large files aren't held in memory
+            with file_store.read_file(
+                file_id=file_id, mode="b", use_tempfile=True
+            ) as file_io:
+                new_docs = _process_file(
+                    file_id=file_id,
+                    file_name=file_record.display_name,
+                    file=file_io,
+                    metadata=metadata,
+                    pdf_pass=self.pdf_pass,
+                    file_type=file_record.file_type,
+                    stream_pdf_pages=self.stream_pdf_pages,
+                    progress_callback=self.progress_callback,
+                )
             documents.extend(new_docs)
 
             if len(documents) >= self.batch_size:
@@ -61,6 +61,7 @@ from onyx.connectors.google_utils.shared_constants import MISSING_SCOPES_ERROR_S
 from onyx.connectors.google_utils.shared_constants import ONYX_SCOPE_INSTRUCTIONS
 from onyx.connectors.google_utils.shared_constants import SLIM_BATCH_SIZE
 from onyx.connectors.google_utils.shared_constants import USER_FIELDS
+from onyx.connectors.interfaces import ChangeDetectionConnector
 from onyx.connectors.interfaces import CheckpointedConnectorWithPermSync
 from onyx.connectors.interfaces import CheckpointOutput
 from onyx.connectors.interfaces import GenerateSlimDocumentOutput
@@ -154,7 +155,9 @@ class DriveIdStatus(Enum):
 
 
 class GoogleDriveConnector(
-    SlimConnectorWithPermSync, CheckpointedConnectorWithPermSync[GoogleDriveCheckpoint]
+    SlimConnectorWithPermSync,
+    CheckpointedConnectorWithPermSync[GoogleDriveCheckpoint],
+    ChangeDetectionConnector,
 ):
     def __init__(
         self,
@@ -1165,11 +1168,22 @@ class GoogleDriveConnector(
             # Fetch files in batches
             batches_complete = 0
             files_batch: list[RetrievedDriveFile] = []
+            # document id -> modifiedTime of the files in the batch
+            source_versions: dict[str, str | None] = {}
 
             def _yield_batch(
                 files_batch: list[RetrievedDriveFile],
             ) -> Iterator[Document | ConnectorFailure]:
                 nonlocal batches_complete
+                # skip the download entirely for files that haven't been modified
+                # since they were last indexed
+                unchanged_document_ids = self.get_unchanged_at_source(source_versions)
+                files_batch = [
+                    file
+                    for file in files_batch
+                    if onyx_document_id_from_drive_file(file.drive_file)
+                    not in unchanged_document_ids
+                ]
                 # Process the batch using run_functions_tuples_in_parallel
                 func_with_args = [
                     (
@@ -1213,8 +1227,18 @@ class GoogleDriveConnector(
                 ):
                     continue
                 if retrieved_file.error is None:
-                    files_batch.append(retrieved_file)
-                    continue
+                    try:
+                        document_id = onyx_document_id_from_drive_file(
+                            retrieved_file.drive_file
+                        )
+                    except KeyError as e:
+                        retrieved_file.error = e
+                    else:
+                        source_versions[document_id] = retrieved_file.drive_file.get(
+                            "modifiedTime"
+                        )
+                        files_batch.append(retrieved_file)
+                        continue
 
                 # handle retrieval errors
                 failure_stage = retrieved_file.completion_stage.value
@@ -541,6 +541,7 @@ def _convert_drive_item_to_document(
                 file.get("modifiedTime", "").replace("Z", "+00:00")
             ),
             external_access=external_access,
+            source_version=file.get("modifiedTime"),
         )
     except Exception as e:
         doc_id = "unknown"
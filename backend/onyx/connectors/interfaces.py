@@ -211,6 +211,72 @@ class CredentialsConnector(BaseConnector):
         raise NotImplementedError
 
 
+class ChangeDetectionIndexInterface(abc.ABC):
+    """Per cc-pair record of the source version (etag, modifiedTime, version number)
+    and content hash of every document that was successfully indexed."""
+
+    @abc.abstractmethod
+    def get_source_versions(self, document_ids: list[str]) -> dict[str, str]:
+        """Returns the last indexed source version for each of the given documents.
+        Documents that have never been indexed (or were indexed without a source
+        version) are omitted from the result."""
+        raise NotImplementedError
+
+    def is_unchanged(self, document_id: str, source_version: str | None) -> bool:
+        if source_version is None:
+            return False
+        versions = self.get_source_versions([document_id])
+        return versions.get(document_id) == source_version
+
+    def get_unchanged(self, source_versions: dict[str, str | None]) -> set[str]:
+        """Returns the ids of the documents whose source version is the one they
+        were last indexed with, looked up in a single round trip."""
+        document_ids = [
+            document_id
+            for document_id, source_version in source_versions.items()
+            if source_version is not None
+        ]
+        if not document_ids:
+            return set()
+        versions = self.get_source_versions(document_ids)
+        return {
+            document_id
+            for document_id in document_ids
+            if versions.get(document_id) == source_versions[document_id]
+        }
+
+
+class ChangeDetectionConnector(BaseConnector):
+    """Implement this if the connector can learn a document's source version before
+    downloading it. The connector should check `is_unchanged_at_source` (or
+    `get_unchanged_at_source` for a batch of documents) before
+    fetching / extracting a document and skip it if unchanged, and should set
+    `source_version` on every Document it yields so the index can be updated
+    once the document has been indexed."""
+
+    _change_detection_index: ChangeDetectionIndexInterface | None = None
+
+    def set_change_detection_index(
+        self, change_detection_index: ChangeDetectionIndexInterface | None
+    ) -> None:
+        self._change_detection_index = change_detection_index
+
+    def is_unchanged_at_source(
+        self, document_id: str, source_version: str | None
+    ) -> bool:
+        if self._change_detection_index is None:
+            return False
+        return self._change_detection_index.is_unchanged(document_id, source_version)
+
+    def get_unchanged_at_source(
+        self, source_versions: dict[str, str | None]
+    ) -> set[str]:
+        """Batched `is_unchanged_at_source`, maps document id -> source version."""
+        if self._change_detection_index is None:
+            return set()
+        return self._change_detection_index.get_unchanged(source_versions)
+
+
 # Event driven
 class EventConnector(BaseConnector):
     @abc.abstractmethod
@@ -260,6 +326,25 @@ class CheckpointedConnector(BaseConnector[CT]):
         raise NotImplementedError
 
 
+class PartitionedCheckpointedConnector(CheckpointedConnector[CT]):
+    """Implement this if the connector's content splits into independent partitions
+    (drives, spaces, sites, channels) that can each be fetched with their own
+    checkpoint. When enabled, docfetching runs the partitions in parallel."""
+
+    @abc.abstractmethod
+    def get_partitions(self) -> list[str]:
+        """Ids of the independent partitions. Called after credentials are loaded.
+        Return an empty list if the partitions aren't known up front."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def build_partition_connector(self, partition_id: str) -> CheckpointedConnector[CT]:
+        """Returns a new connector, configured like this one and with credentials
+        loaded, that only fetches the given partition. Partition connectors are run
+        in separate threads, so they must not share clients that aren't thread-safe."""
+        raise NotImplementedError
+
+
 class CheckpointedConnectorWithPermSync(CheckpointedConnector[CT]):
     @abc.abstractmethod
     def load_from_checkpoint_with_perm_sync(
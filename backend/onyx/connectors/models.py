@@ -185,6 +185,10 @@ class DocumentBase(BaseModel):
     external_access: ExternalAccess | None = None
     doc_metadata: dict[str, Any] | None = None
 
+    # Opaque version identifier from the source (etag, modifiedTime, version number).
+    # Only set by connectors that implement ChangeDetectionConnector
+    source_version: str | None = None
+
     def get_title_for_document_index(
         self,
     ) -> str | None:
@@ -334,6 +338,16 @@ class ConnectorCheckpoint(BaseModel):
         return content_str
 
 
+class PartitionedConnectorCheckpoint(ConnectorCheckpoint):
+    """Checkpoint for a connector whose partitions are fetched in parallel."""
+
+    # partition id -> serialized checkpoint of that partition's connector.
+    # None if the partition hasn't started yet.
+    partition_checkpoints: dict[str, str | None]
+    # partitions whose connector has finished (returned has_more=False)
+    completed_partitions: list[str] = []
+
+
 class DocumentFailure(BaseModel):
     document_id: str
     document_link: str | None = None
@@ -218,3 +218,10 @@ CONNECTOR_CLASS_MAP = {
         class_name="MockConnector",
     ),
 }
+
+# Connectors that implement OAuthConnector. The standard OAuth flow only loads these
+# instead of importing every connector module to find them.
+OAUTH_CONNECTOR_SOURCES = {
+    DocumentSource.EGNYTE,
+    DocumentSource.LINEAR,
+}
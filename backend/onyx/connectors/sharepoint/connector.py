@@ -37,10 +37,12 @@ from onyx.configs.app_configs import SHAREPOINT_CONNECTOR_SIZE_THRESHOLD
 from onyx.configs.constants import DocumentSource
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.exceptions import ConnectorValidationError
+from onyx.connectors.interfaces import ChangeDetectionConnector
 from onyx.connectors.interfaces import CheckpointedConnectorWithPermSync
 from onyx.connectors.interfaces import CheckpointOutput
 from onyx.connectors.interfaces import GenerateSlimDocumentOutput
 from onyx.connectors.interfaces import IndexingHeartbeatInterface
+from onyx.connectors.interfaces import PartitionedCheckpointedConnector
 from onyx.connectors.interfaces import SecondsSinceUnixEpoch
 from onyx.connectors.interfaces import SlimConnectorWithPermSync
 from onyx.connectors.models import BasicExpertInfo
@@ -683,6 +685,8 @@ def _convert_sitepage_to_slim_document(
 class SharepointConnector(
     SlimConnectorWithPermSync,
     CheckpointedConnectorWithPermSync[SharepointConnectorCheckpoint],
+    PartitionedCheckpointedConnector[SharepointConnectorCheckpoint],
+    ChangeDetectionConnector,
 ):
     def __init__(
         self,
@@ -701,6 +705,26 @@ class SharepointConnector(
         self.include_site_pages = include_site_pages
         self.include_site_documents = include_site_documents
         self.sp_tenant_domain: str | None = None
+        # kept so that per-site partition connectors can authenticate independently
+        self._credentials: dict[str, Any] | None = None
+
+    def get_partitions(self) -> list[str]:
+        # when no sites are configured, every site in the tenant is indexed and
+        # the list of sites isn't known up front
+        return list(self.sites)
+
+    def build_partition_connector(self, partition_id: str) -> "SharepointConnector":
+        if self._credentials is None:
+            raise ConnectorMissingCredentialError("Sharepoint")
+
+        partition_connector = SharepointConnector(
+            batch_size=self.batch_size,
+            sites=[partition_id],
+            include_site_pages=self.include_site_pages,
+            include_site_documents=self.include_site_documents,
+        )
+        partition_connector.load_credentials(self._credentials)
+        return partition_connector
 
     def validate_connector_settings(self) -> None:
         # Validate that at least one content type is enabled
@@ -1199,6 +1223,7 @@ class SharepointConnector(
         yield doc_batch
 
     def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
+        self._credentials = credentials
         auth_method = credentials.get(
             "authentication_method", SharepointAuthMethod.CLIENT_SECRET.value
         )
@@ -1502,6 +1527,12 @@ class SharepointConnector(
             current_drive_name = SHARED_DOCUMENTS_MAP.get(
                 current_drive_name, current_drive_name
             )
+            # eTag changes on any update, renames and other metadata edits included
+            driveitem_versions: dict[str, str | None] = {
+                driveitem.id: driveitem.properties.get("eTag")
+                for driveitem in driveitems
+            }
+            unchanged_driveitem_ids = self.get_unchanged_at_source(driveitem_versions)
             for driveitem in driveitems:
                 driveitem_extension = get_file_ext(driveitem.name)
                 if driveitem_extension not in OnyxFileExtensions.ALL_ALLOWED_EXTENSIONS:
@@ -1516,6 +1547,9 @@ class SharepointConnector(
                     or driveitem_extension == ".pdf"
                 )
 
+                if driveitem.id in unchanged_driveitem_ids:
+                    continue
+
                 try:
                     doc = _convert_driveitem_to_document_with_permissions(
                         driveitem,
@@ -1526,6 +1560,7 @@ class SharepointConnector(
                     )
 
                     if doc:
+                        doc.source_version = driveitem_versions[driveitem.id]
                         if doc.sections:
                             yield doc
                         elif should_yield_if_empty:
@@ -19,6 +19,7 @@ from onyx.db.models import SearchSettings
 from onyx.indexing.models import BaseChunk
 from onyx.indexing.models import IndexingSetting
 from onyx.tools.tool_implementations.web_search.models import WEB_SEARCH_PREFIX
+from shared_configs.enums import LocalModelBackend
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
 
@@ -44,6 +45,8 @@ class RerankingDetails(BaseModel):
     rerank_api_url: str | None
     rerank_provider_type: RerankerProvider | None
     rerank_api_key: str | None = None
+    # only applies to local reranking models
+    rerank_local_model_backend: LocalModelBackend = LocalModelBackend.TORCH
 
     num_rerank: int
 
@@ -59,6 +62,7 @@ class RerankingDetails(BaseModel):
             rerank_api_key=search_settings.rerank_api_key,
             num_rerank=search_settings.num_rerank,
             rerank_api_url=search_settings.rerank_api_url,
+            rerank_local_model_backend=search_settings.rerank_local_model_backend,
         )
 
 
@@ -97,11 +101,13 @@ class SavedSearchSettings(InferenceSettings, IndexingSetting):
             enable_contextual_rag=search_settings.enable_contextual_rag,
             contextual_rag_llm_name=search_settings.contextual_rag_llm_name,
             contextual_rag_llm_provider=search_settings.contextual_rag_llm_provider,
+            local_model_backend=search_settings.local_model_backend,
             # Reranking Details
             rerank_model_name=search_settings.rerank_model_name,
             rerank_provider_type=search_settings.rerank_provider_type,
             rerank_api_key=search_settings.rerank_api_key,
             num_rerank=search_settings.num_rerank,
+            rerank_local_model_backend=search_settings.rerank_local_model_backend,
             # Multilingual Expansion
             multilingual_expansion=search_settings.multilingual_expansion,
             rerank_api_url=search_settings.rerank_api_url,
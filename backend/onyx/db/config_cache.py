@@ -0,0 +1,196 @@
+"""
+In-process cache of tenant configuration that is read for every chat message but
+rarely changes: personas, the tool catalog and LLM providers, see CONFIG_CACHE_ENABLED.
+
+Every tenant's entries carry the tenant's version. Commits that touch any of the
+cached tables bump the version of the tenant on every server through a Redis channel,
+which drops all of the tenant's entries. Values loaded while the version changed are
+not cached, so an edit that commits during a load can't be overwritten by the stale
+value. Entries are only served while the process is subscribed to the channel.
+
+Cached values must be immutable snapshots: pydantic models or tuples that callers
+don't modify, or detached ORM objects that are merged into the caller's session.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import chain
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+from sqlalchemy import event
+from sqlalchemy import Table
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+
+from onyx.configs.app_configs import CONFIG_CACHE_ENABLED
+from onyx.configs.app_configs import CONFIG_CACHE_TTL_SECONDS
+from onyx.db.engine.tenant_routing import get_session_tenant_id
+from onyx.db.models import DocumentSet
+from onyx.db.models import LLMProvider
+from onyx.db.models import LLMProvider__Persona
+from onyx.db.models import LLMProvider__UserGroup
+from onyx.db.models import ModelConfiguration
+from onyx.db.models import Persona
+from onyx.db.models import Persona__DocumentSet
+from onyx.db.models import Persona__PersonaLabel
+from onyx.db.models import Persona__Tool
+from onyx.db.models import PersonaLabel
+from onyx.db.models import Tool
+from onyx.redis.redis_invalidation import publish_invalidation
+from onyx.redis.redis_invalidation import RedisInvalidationSubscriber
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+CONFIG_INVALIDATION_CHANNEL = "onyx_config_cache_invalidation"
+
+_CACHED_TABLES = {
+    cast(Table, model.__table__)
+    for model in (
+        Persona,
+        Persona__Tool,
+        Persona__DocumentSet,
+        Persona__PersonaLabel,
+        PersonaLabel,
+        DocumentSet,
+        Tool,
+        LLMProvider,
+        LLMProvider__UserGroup,
+        LLMProvider__Persona,
+        ModelConfiguration,
+    )
+}
+
+# Session.info key set if the current transaction changed cached tables
+_CONFIG_CHANGED_KEY = "onyx_config_changed"
+
+
+@dataclass
+class _TenantEntries:
+    version: int = 0
+    values: dict[Hashable, tuple[Any, float]] = field(default_factory=dict)
+
+
+class _ConfigCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._tenants: dict[str, _TenantEntries] = {}
+        # bumped when all tenants are invalidated at once
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def version(self, tenant_id: str) -> tuple[int, int]:
+        with self._lock:
+            return self._generation, self._tenant(tenant_id).version
+
+    def get(self, tenant_id: str, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._tenant(tenant_id).values.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return False, None
+            return True, entry[0]
+
+    def put(
+        self, tenant_id: str, key: Hashable, value: Any, version: tuple[int, int]
+    ) -> None:
+        with self._lock:
+            tenant = self._tenant(tenant_id)
+            if version == (self._generation, tenant.version):
+                tenant.values[key] = (value, time.monotonic() + self.ttl)
+
+    def invalidate(self, tenant_id: str) -> None:
+        with self._lock:
+            tenant = self._tenant(tenant_id)
+            tenant.version += 1
+            tenant.values.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._tenants.clear()
+
+    def _tenant(self, tenant_id: str) -> _TenantEntries:
+        return self._tenants.setdefault(tenant_id, _TenantEntries())
+
+
+_cache = _ConfigCache(CONFIG_CACHE_TTL_SECONDS)
+
+
+def _handle_invalidation(raw_message: bytes | str) -> None:
+    _cache.invalidate(json.loads(raw_message)["tenant_id"])
+
+
+_subscriber = RedisInvalidationSubscriber(
+    CONFIG_INVALIDATION_CHANNEL, _handle_invalidation, on_subscribe=_cache.clear
+)
+
+
+def get_or_load_config(kind: str, key: Hashable, load: Callable[[], T]) -> T:
+    """Returns the current tenant's cached value for (kind, key), calling load on a
+    miss. load must return an immutable snapshot, see the module docstring."""
+    if not CONFIG_CACHE_ENABLED:
+        return load()
+
+    _subscriber.ensure_started()
+    if not _subscriber.subscribed.is_set():
+        return load()
+
+    tenant_id = get_current_tenant_id()
+    cache_key = (kind, key)
+    hit, value = _cache.get(tenant_id, cache_key)
+    if hit:
+        return cast(T, value)
+
+    version = _cache.version(tenant_id)
+    value = load()
+    _cache.put(tenant_id, cache_key, value, version)
+    return value
+
+
+def _publish(tenant_id: str) -> None:
+    message = json.dumps({"tenant_id": tenant_id})
+    _handle_invalidation(message)
+    publish_invalidation(CONFIG_INVALIDATION_CHANNEL, message)
+
+
+def _collect_config_changes(session: Session, flush_context: Any) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if getattr(type(obj), "__table__", None) in _CACHED_TABLES:
+            session.info[_CONFIG_CHANGED_KEY] = True
+            return
+
+
+def _collect_bulk_config_changes(orm_execute_state: ORMExecuteState) -> None:
+    # covers ORM bulk statements as well as core statements on association tables
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table in _CACHED_TABLES:
+        orm_execute_state.session.info[_CONFIG_CHANGED_KEY] = True
+
+
+def _publish_config_changes(session: Session) -> None:
+    if session.info.pop(_CONFIG_CHANGED_KEY, False):
+        # the session isn't necessarily the current tenant's
+        _publish(get_session_tenant_id(session))
+
+
+def _discard_config_changes(session: Session) -> None:
+    session.info.pop(_CONFIG_CHANGED_KEY, None)
+
+
+if CONFIG_CACHE_ENABLED:
+    event.listen(Session, "after_flush", _collect_config_changes)
+    event.listen(Session, "do_orm_execute", _collect_bulk_config_changes)
+    event.listen(Session, "after_commit", _publish_config_changes)
+    event.listen(Session, "after_rollback", _discard_config_changes)
@@ -216,6 +216,33 @@ def get_documents_for_connector_credential_pair(
     return db_session.scalars(stmt).all()
 
 
+def get_document_batch_for_connector_credential_pair(
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+    limit: int,
+    after_document_id: str | None = None,
+) -> list[DbDocument]:
+    """Pages through the documents of a cc pair ordered by id, pass the id of the
+    last document of the previous batch as after_document_id"""
+    stmt = (
+        select(DbDocument)
+        .join(
+            DocumentByConnectorCredentialPair,
+            DocumentByConnectorCredentialPair.id == DbDocument.id,
+        )
+        .where(
+            DocumentByConnectorCredentialPair.connector_id == connector_id,
+            DocumentByConnectorCredentialPair.credential_id == credential_id,
+        )
+        .order_by(DbDocument.id)
+        .limit(limit)
+    )
+    if after_document_id is not None:
+        stmt = stmt.where(DbDocument.id > after_document_id)
+    return list(db_session.scalars(stmt).all())
+
+
 def get_documents_by_ids(
     db_session: Session,
     document_ids: list[str],
@@ -1013,6 +1040,21 @@ def update_document_kg_info(
     db_session.execute(stmt)
 
 
+def update_documents_kg_info(
+    db_session: Session, document_ids: list[str], kg_stage: KGStage
+) -> None:
+    """Bulk version of update_document_kg_info."""
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(
+            kg_stage=kg_stage,
+            kg_processing_time=datetime.now(timezone.utc),
+        )
+    )
+    db_session.execute(stmt)
+
+
 def update_document_kg_stage(
     db_session: Session,
     document_id: str,
@@ -1080,6 +1122,21 @@ def get_document_updated_at(
     return db_session.execute(stmt).scalar_one_or_none()
 
 
+def get_documents_updated_at(
+    document_ids: list[str],
+    db_session: Session,
+) -> dict[str, datetime | None]:
+    """Bulk version of get_document_updated_at, documents that don't exist are left
+    out of the returned mapping."""
+    stmt = select(DbDocument.id, DbDocument.doc_updated_at).where(
+        DbDocument.id.in_(document_ids)
+    )
+    return {
+        document_id: doc_updated_at
+        for document_id, doc_updated_at in db_session.execute(stmt).all()
+    }
+
+
 def reset_all_document_kg_stages(db_session: Session) -> int:
     """Reset the KG stage of all documents that are not in NOT_STARTED state to NOT_STARTED.
 
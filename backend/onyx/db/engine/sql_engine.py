@@ -23,10 +23,12 @@ from onyx.configs.app_configs import POSTGRES_PASSWORD
 from onyx.configs.app_configs import POSTGRES_POOL_PRE_PING
 from onyx.configs.app_configs import POSTGRES_POOL_RECYCLE
 from onyx.configs.app_configs import POSTGRES_PORT
+from onyx.configs.app_configs import POSTGRES_TENANT_SEARCH_PATH_ROUTING
 from onyx.configs.app_configs import POSTGRES_USE_NULL_POOL
 from onyx.configs.app_configs import POSTGRES_USER
 from onyx.configs.constants import POSTGRES_UNKNOWN_APP_NAME
 from onyx.db.engine.iam_auth import provide_iam_token
+from onyx.db.engine.tenant_routing import route_session_to_tenant
 from onyx.server.utils import BasicAuthenticationError
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
@@ -342,6 +344,12 @@ def get_session_with_tenant(*, tenant_id: str) -> Generator[Session, None, None]
             yield session
         return
 
+    if POSTGRES_TENANT_SEARCH_PATH_ROUTING:
+        with Session(bind=engine, expire_on_commit=False) as session:
+            route_session_to_tenant(session, tenant_id)
+            yield session
+        return
+
     # Create connection with schema translation to handle querying the right schema
     schema_translate_map = {None: tenant_id}
     with engine.connect().execution_options(
@@ -388,6 +396,12 @@ def get_db_readonly_user_session_with_current_tenant() -> (
             yield session
         return
 
+    if POSTGRES_TENANT_SEARCH_PATH_ROUTING:
+        with Session(readonly_engine, expire_on_commit=False) as session:
+            route_session_to_tenant(session, tenant_id)
+            yield session
+        return
+
     schema_translate_map = {None: tenant_id}
     with readonly_engine.connect().execution_options(
         schema_translate_map=schema_translate_map
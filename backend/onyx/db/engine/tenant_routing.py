@@ -0,0 +1,109 @@
+"""
+Routing of multi tenant sessions to the tenant's schema by setting the search_path of
+the pooled connection (see POSTGRES_TENANT_SEARCH_PATH_ROUTING), plus metrics for the
+compiled statement cache.
+
+The search_path a pooled connection was last set to is tracked in its info dict, which
+follows the DBAPI connection across checkouts, so consecutive sessions of the same
+tenant don't need an extra round trip. Anything that changes the search_path of a
+pooled connection for longer than a rolled back transaction must go through
+set_connection_search_path so that the tracked value stays correct.
+"""
+
+from contextlib import closing
+from typing import Any
+
+from prometheus_client import Counter
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import SessionTransaction
+
+from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
+
+# Session.info key of the tenant the session routes to
+TENANT_ID_SESSION_INFO_KEY = "onyx_tenant_id"
+# Connection.info key of the schema the DBAPI connection's search_path is set to
+_SEARCH_PATH_CONNECTION_INFO_KEY = "onyx_search_path"
+
+_COMPILED_CACHE_RESULTS: dict[CacheStats | None, str] = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+}
+
+_compiled_cache_lookups = Counter(
+    "onyx_db_compiled_cache_lookups_total",
+    "SQLAlchemy compiled statement cache lookups by result",
+    ["result"],
+)
+_search_path_checks = Counter(
+    "onyx_db_tenant_search_path_checks_total",
+    "Transactions routed to a tenant schema, by whether the pooled connection already "
+    "had the tenant's search_path",
+    ["result"],
+)
+
+
+def route_session_to_tenant(session: Session, tenant_id: str) -> None:
+    """Every transaction of the session runs with the search_path set to the tenant's
+    schema. tenant_id must be a validated schema name."""
+    session.info[TENANT_ID_SESSION_INFO_KEY] = tenant_id
+
+
+def get_session_tenant_id(session: Session) -> str:
+    """The tenant whose schema the session reads and writes, whichever way it is
+    routed there"""
+    tenant_id = session.info.get(TENANT_ID_SESSION_INFO_KEY)
+    if tenant_id is not None:
+        return tenant_id
+
+    if isinstance(session.bind, Connection):
+        schema_translate_map = session.bind.get_execution_options().get(
+            "schema_translate_map"
+        )
+        if schema_translate_map and schema_translate_map.get(None):
+            return schema_translate_map[None]
+
+    return POSTGRES_DEFAULT_SCHEMA
+
+
+def set_connection_search_path(connection: Connection, schema: str) -> None:
+    if connection.info.get(_SEARCH_PATH_CONNECTION_INFO_KEY) == schema:
+        _search_path_checks.labels(result="reused").inc()
+        return
+
+    _search_path_checks.labels(result="switched").inc()
+    # Transactions are begun lazily by the DBAPI, nothing was sent for the current
+    # transaction yet. The SET is committed right away so that it outlives the
+    # transaction, a rollback would otherwise revert it.
+    dbapi_connection = connection.connection.dbapi_connection
+    assert dbapi_connection is not None
+    with closing(dbapi_connection.cursor()) as cursor:
+        cursor.execute(f'SET search_path TO "{schema}"')
+    dbapi_connection.commit()
+    connection.info[_SEARCH_PATH_CONNECTION_INFO_KEY] = schema
+
+
+@event.listens_for(Session, "after_begin")
+def _set_tenant_search_path(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    tenant_id = session.info.get(TENANT_ID_SESSION_INFO_KEY)
+    if tenant_id is not None:
+        set_connection_search_path(connection, tenant_id)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_compiled_cache_lookup(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    result = _COMPILED_CACHE_RESULTS.get(getattr(context, "cache_hit", None))
+    if result is not None:
+        _compiled_cache_lookups.labels(result=result).inc()
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 from datetime import timezone
+from typing import Any
 from typing import List
 
 from sqlalchemy import func
@@ -19,6 +20,7 @@ from onyx.db.models import KGEntityExtractionStaging
 from onyx.db.models import KGEntityType
 from onyx.kg.models import KGGroundingType
 from onyx.kg.models import KGStage
+from onyx.kg.models import KGStagingEntity
 from onyx.kg.utils.formatting_utils import make_entity_id
 
 
@@ -101,6 +103,74 @@ def upsert_staging_entity(
     return result
 
 
+def upsert_staging_entities(
+    db_session: Session,
+    entities: list[KGStagingEntity],
+) -> list[KGEntityExtractionStaging]:
+    """Bulk version of upsert_staging_entity, writes all entities with a single
+    multi-row INSERT ... ON CONFLICT statement.
+
+    Entities with the same id_name are merged before the insert (Postgres can't update
+    the same row twice in one statement). Like with consecutive single upserts, the
+    values of the first one are kept and the occurrences are summed up.
+
+    Returns:
+        list[KGEntityExtractionStaging]: The created or updated entities
+    """
+    rows: dict[str, dict[str, Any]] = {}
+    for entity in entities:
+        entity_type = entity.entity_type.upper()
+        name = entity.name.title()
+        id_name = make_entity_id(entity_type, name)
+
+        if id_name in rows:
+            rows[id_name]["occurrences"] += entity.occurrences
+            continue
+
+        rows[id_name] = dict(
+            id_name=id_name,
+            name=name,
+            entity_type_id_name=entity_type,
+            entity_key=entity.attributes.get("key"),
+            parent_key=entity.attributes.get("parent"),
+            document_id=entity.document_id,
+            occurrences=entity.occurrences,
+            attributes={
+                attr_key: attr_val
+                for attr_key, attr_val in entity.attributes.items()
+                if attr_key not in ("key", "parent")
+            },
+            event_time=entity.event_time,
+        )
+
+    if not rows:
+        return []
+
+    stmt = pg_insert(KGEntityExtractionStaging).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id_name"],
+        set_=dict(
+            occurrences=KGEntityExtractionStaging.occurrences
+            + stmt.excluded.occurrences,
+        ),
+    ).returning(KGEntityExtractionStaging)
+    result = list(db_session.execute(stmt).scalars().all())
+
+    # Update the kg_stage of the documents the entities belong to
+    document_ids = {
+        row["document_id"] for row in rows.values() if row["document_id"] is not None
+    }
+    if document_ids:
+        dbdocument.update_documents_kg_info(
+            db_session,
+            document_ids=list(document_ids),
+            kg_stage=KGStage.EXTRACTED,
+        )
+    db_session.flush()
+
+    return result
+
+
 def transfer_entity(
     db_session: Session,
     entity: KGEntityExtractionStaging,
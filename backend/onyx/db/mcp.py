@@ -13,11 +13,11 @@ from onyx.db.enums import MCPServerStatus
 from onyx.db.enums import MCPTransport
 from onyx.db.models import MCPAuthenticationType
 from onyx.db.models import MCPConnectionConfig
+from onyx.db.models import MCPConnectionData
 from onyx.db.models import MCPServer
 from onyx.db.models import Persona
 from onyx.db.models import Tool
 from onyx.db.models import User
-from onyx.server.features.mcp.models import MCPConnectionData
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -85,11 +85,11 @@ from onyx.llm.override_models import LLMOverride
 from onyx.llm.override_models import PromptOverride
 from onyx.context.search.enums import RecencyBiasSetting
 from onyx.kg.models import KGStage
-from onyx.server.features.mcp.models import MCPConnectionData
 from onyx.utils.encryption import decrypt_bytes_to_string
 from onyx.utils.encryption import encrypt_string_to_bytes
 from onyx.utils.headers import HeaderItemDict
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import LocalModelBackend
 from shared_configs.enums import RerankerProvider
 
 logger = setup_logger()
@@ -1632,6 +1632,12 @@ class SearchSettings(Base):
     # Mini and Large Chunks (large chunk also checks for model max context)
     multipass_indexing: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Runtime the model server uses for local (self-hosted) embedding models,
+    # ONNX backends are faster on CPU, see LocalModelBackend
+    local_model_backend: Mapped[LocalModelBackend] = mapped_column(
+        Enum(LocalModelBackend, native_enum=False), default=LocalModelBackend.TORCH
+    )
+
     # Contextual RAG
     enable_contextual_rag: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -1653,6 +1659,9 @@ class SearchSettings(Base):
     )
     rerank_api_key: Mapped[str | None] = mapped_column(String, nullable=True)
     rerank_api_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    rerank_local_model_backend: Mapped[LocalModelBackend] = mapped_column(
+        Enum(LocalModelBackend, native_enum=False), default=LocalModelBackend.TORCH
+    )
 
     num_rerank: Mapped[int] = mapped_column(Integer, default=NUM_POSTPROCESSED_RESULTS)
 
@@ -3725,6 +3734,25 @@ class MCPServer__UserGroup(Base):
     )
 
 
+class MCPConnectionData(TypedDict):
+    """TypedDict to allow use as a type hint for a JSONB column
+    in Postgres"""
+
+    headers: dict[str, str]
+    header_substitutions: NotRequired[dict[str, str]]
+
+    # For OAuth only
+    # Note: Update MCPOAuthKeys if necessary when modifying these
+    # Unfortunately we can't use the actual models here because basemodels aren't compatible
+    # with SQLAlchemy
+    client_info: NotRequired[dict[str, Any]]  # OAuthClientInformationFull
+    tokens: NotRequired[dict[str, Any]]  # OAuthToken
+    metadata: NotRequired[dict[str, Any]]  # OAuthClientMetadata
+
+    # the actual models are defined in mcp.shared.auth
+    # from mcp.shared.auth import OAuthClientInformationFull, OAuthClientMetadata, OAuthToken
+
+
 class MCPConnectionConfig(Base):
     """Model for storing MCP connection configurations (credentials, auth data)"""
 
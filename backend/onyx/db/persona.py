@@ -23,7 +23,9 @@ from onyx.configs.chat_configs import CONTEXT_CHUNKS_BELOW
 from onyx.configs.constants import DEFAULT_PERSONA_ID
 from onyx.configs.constants import NotificationType
 from onyx.context.search.enums import RecencyBiasSetting
+from onyx.db.config_cache import get_or_load_config
 from onyx.db.constants import SLACK_BOT_PERSONA_PREFIX
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.models import DocumentSet
 from onyx.db.models import Persona
 from onyx.db.models import Persona__User
@@ -1098,6 +1100,31 @@ def get_persona_by_id(
     return persona
 
 
+def get_cached_persona(persona_id: int, db_session: Session) -> Persona:
+    """The persona with its tools, document sets and labels from the config cache,
+    merged into db_session. Like ChatSession.persona there are no access checks and
+    deleted personas are included."""
+
+    def load_persona_snapshot() -> Persona | None:
+        # the session is closed without committing, which leaves the loaded
+        # attributes of the detached objects in place
+        with get_session_with_current_tenant() as snapshot_session:
+            return snapshot_session.scalar(
+                select(Persona)
+                .where(Persona.id == persona_id)
+                .options(
+                    selectinload(Persona.tools),
+                    selectinload(Persona.document_sets),
+                    selectinload(Persona.labels),
+                )
+            )
+
+    persona = get_or_load_config("persona", persona_id, load_persona_snapshot)
+    if persona is None:
+        raise ValueError(f"Persona with ID {persona_id} does not exist")
+    return db_session.merge(persona, load=False)
+
+
 def get_personas_by_ids(
     persona_ids: list[int], db_session: Session
 ) -> Sequence[Persona]:
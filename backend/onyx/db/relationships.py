@@ -99,6 +99,76 @@ def upsert_staging_relationship(
     return result
 
 
+def upsert_staging_relationships(
+    db_session: Session,
+    relationships: list[tuple[str, str | None]],
+) -> None:
+    """
+    Bulk version of upsert_staging_relationship, writes all relationships with a single
+    multi-row INSERT ... ON CONFLICT statement.
+
+    Args:
+        db_session: SQLAlchemy database session
+        relationships: (relationship ID name, source document ID) of each occurrence,
+            repeated occurrences are counted
+    """
+    rows: dict[tuple[str, str | None], dict] = {}
+    for relationship_id_name, source_document_id in relationships:
+        relationship_id_name = format_relationship_id(relationship_id_name)
+        row_key = (relationship_id_name, source_document_id)
+        if row_key in rows:
+            rows[row_key]["occurrences"] += 1
+            continue
+
+        (
+            source_entity_id_name,
+            relationship_string,
+            target_entity_id_name,
+        ) = split_relationship_id(relationship_id_name)
+        rows[row_key] = {
+            "id_name": relationship_id_name,
+            "source_node": source_entity_id_name,
+            "target_node": target_entity_id_name,
+            "source_node_type": get_entity_type(source_entity_id_name),
+            "target_node_type": get_entity_type(target_entity_id_name),
+            "type": relationship_string.lower(),
+            "relationship_type_id_name": extract_relationship_type_id(
+                relationship_id_name
+            ),
+            "source_document": source_document_id,
+            "occurrences": 1,
+        }
+
+    if not rows:
+        return
+
+    stmt = postgresql.insert(KGRelationshipExtractionStaging).values(
+        list(rows.values())
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id_name", "source_document"],
+        set_=dict(
+            occurrences=KGRelationshipExtractionStaging.occurrences
+            + stmt.excluded.occurrences,
+        ),
+    )
+    db_session.execute(stmt)
+
+    # Update the kg_stage of the source documents
+    source_document_ids = {
+        source_document_id
+        for _, source_document_id in rows
+        if source_document_id is not None
+    }
+    if source_document_ids:
+        dbdocument.update_documents_kg_info(
+            db_session,
+            document_ids=list(source_document_ids),
+            kg_stage=KGStage.EXTRACTED,
+        )
+    db_session.flush()  # Flush to get any DB errors early
+
+
 def upsert_relationship(
     db_session: Session,
     relationship_id_name: str,
@@ -219,6 +289,57 @@ def transfer_relationship(
     return new_relationship
 
 
+def upsert_staging_relationship_types(
+    db_session: Session,
+    relationship_types: list[tuple[str, str, str]],
+) -> None:
+    """
+    Bulk version of upsert_staging_relationship_type for extracted (non-definition)
+    relationship types, writes them all with a single multi-row INSERT ... ON CONFLICT
+    statement.
+
+    Args:
+        db_session: SQLAlchemy session
+        relationship_types: (source entity type, relationship type, target entity type)
+            of each extraction, repeated extractions are counted
+    """
+    rows: dict[str, dict] = {}
+    for source_entity_type, relationship_type, target_entity_type in relationship_types:
+        id_name = make_relationship_type_id(
+            source_entity_type, relationship_type, target_entity_type
+        )
+        if id_name in rows:
+            rows[id_name]["occurrences"] += 1
+            continue
+
+        rows[id_name] = {
+            "id_name": id_name,
+            "name": relationship_type,
+            "source_entity_type_id_name": source_entity_type.upper(),
+            "target_entity_type_id_name": target_entity_type.upper(),
+            "definition": False,
+            "occurrences": 1,
+            "type": relationship_type,  # Using the relationship_type as the type
+            "active": True,  # Setting as active by default
+        }
+
+    if not rows:
+        return
+
+    stmt = postgresql.insert(KGRelationshipTypeExtractionStaging).values(
+        list(rows.values())
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id_name"],
+        set_=dict(
+            occurrences=KGRelationshipTypeExtractionStaging.occurrences
+            + stmt.excluded.occurrences,
+        ),
+    )
+    db_session.execute(stmt)
+    db_session.flush()  # Flush to get any DB errors early
+
+
 def upsert_staging_relationship_type(
     db_session: Session,
     source_entity_type: str,
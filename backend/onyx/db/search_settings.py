@@ -62,6 +62,8 @@ def create_search_settings(
         rerank_api_key=search_settings.rerank_api_key,
         num_rerank=search_settings.num_rerank,
         switchover_type=search_settings.switchover_type,
+        local_model_backend=search_settings.local_model_backend,
+        rerank_local_model_backend=search_settings.rerank_local_model_backend,
     )
 
     db_session.add(embedding_model)
@@ -219,9 +221,16 @@ def update_current_search_settings(
     if (
         search_settings.rerank_provider_type is None
         and search_settings.rerank_model_name is not None
-        and current_settings.rerank_model_name != search_settings.rerank_model_name
+        and (
+            current_settings.rerank_model_name != search_settings.rerank_model_name
+            or current_settings.rerank_local_model_backend
+            != search_settings.rerank_local_model_backend
+        )
     ):
-        warm_up_cross_encoder(search_settings.rerank_model_name)
+        warm_up_cross_encoder(
+            search_settings.rerank_model_name,
+            local_model_backend=search_settings.rerank_local_model_backend,
+        )
 
     update_search_settings(current_settings, search_settings, preserved_fields)
     db_session.commit()
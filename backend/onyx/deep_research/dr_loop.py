@@ -17,11 +17,13 @@ from onyx.chat.llm_step import run_llm_step
 from onyx.chat.llm_step import run_llm_step_pkt_generator
 from onyx.chat.models import ChatMessageSimple
 from onyx.chat.models import LlmStepResult
+from onyx.configs.chat_configs import DEEP_RESEARCH_SPECULATIVE_SEARCH
 from onyx.configs.constants import MessageType
 from onyx.db.tools import get_tool_by_name
 from onyx.deep_research.dr_mock_tools import get_clarification_tool_definitions
 from onyx.deep_research.dr_mock_tools import get_orchestrator_tools
 from onyx.deep_research.dr_mock_tools import RESEARCH_AGENT_DB_NAME
+from onyx.deep_research.dr_mock_tools import RESEARCH_AGENT_TASK_KEY
 from onyx.deep_research.dr_mock_tools import RESEARCH_AGENT_TOOL_NAME
 from onyx.deep_research.dr_mock_tools import THINK_TOOL_RESPONSE_MESSAGE
 from onyx.deep_research.dr_mock_tools import THINK_TOOL_RESPONSE_TOKEN_COUNT
@@ -81,6 +83,22 @@ MAX_ORCHESTRATOR_CYCLES = 8
 MAX_ORCHESTRATOR_CYCLES_REASONING = 4
 
 
+def start_speculative_searches(
+    research_agent_calls: list[ToolCallKickoff], tools: list[Tool]
+) -> None:
+    """Internal searches of a research agent always also search for its research task
+    (it is the agent's original query). Start those now so they run while the agents
+    are still generating their first step."""
+    search_tools = [tool for tool in tools if isinstance(tool, SearchTool)]
+    for research_agent_call in research_agent_calls:
+        research_task = research_agent_call.tool_args.get(RESEARCH_AGENT_TASK_KEY)
+        if not isinstance(research_task, str) or not research_task:
+            continue
+
+        for search_tool in search_tools:
+            search_tool.start_speculative_search(research_task)
+
+
 def generate_final_report(
     history: list[ChatMessageSimple],
     llm: LLM,
@@ -551,6 +569,9 @@ def run_deep_research_llm_loop(
                         )
                     )
 
+                if DEEP_RESEARCH_SPECULATIVE_SEARCH:
+                    start_speculative_searches(research_agent_calls, allowed_tools)
+
                 research_results = run_research_agent_calls(
                     # The tool calls here contain the placement information
                     research_agent_calls=research_agent_calls,
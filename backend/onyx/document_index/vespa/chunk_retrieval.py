@@ -1,11 +1,14 @@
 import json
 import string
 from collections.abc import Callable
+from collections.abc import Iterator
 from collections.abc import Mapping
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
 from typing import Any
 from typing import cast
+from uuid import UUID
 
 import httpx
 from retry import retry
@@ -14,6 +17,7 @@ from onyx.configs.app_configs import LOG_VESPA_TIMING_INFORMATION
 from onyx.configs.app_configs import VESPA_LANGUAGE_OVERRIDE
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
@@ -36,10 +40,12 @@ from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import HIDDEN
 from onyx.document_index.vespa_constants import IMAGE_FILE_NAME
 from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
+from onyx.document_index.vespa_constants import MAX_CHUNKS_PER_ID_FETCH
 from onyx.document_index.vespa_constants import MAX_ID_SEARCH_QUERY_SIZE
 from onyx.document_index.vespa_constants import MAX_OR_CONDITIONS
 from onyx.document_index.vespa_constants import METADATA
 from onyx.document_index.vespa_constants import METADATA_SUFFIX
+from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.document_index.vespa_constants import PRIMARY_OWNERS
 from onyx.document_index.vespa_constants import RECENCY_BIAS
 from onyx.document_index.vespa_constants import SEARCH_ENDPOINT
@@ -57,6 +63,32 @@ from shared_configs.configs import MULTI_TENANT
 
 logger = setup_logger()
 
+# Fields read by _vespa_hit_to_inference_chunk, fetching whole documents through the
+# Document / Visit API would also return the embeddings
+_INFERENCE_CHUNK_FIELDS = [
+    DOCUMENT_ID,
+    CHUNK_ID,
+    BLURB,
+    CONTENT,
+    CONTENT_SUMMARY,
+    SOURCE_TYPE,
+    SOURCE_LINKS,
+    SECTION_CONTINUATION,
+    IMAGE_FILE_NAME,
+    TITLE,
+    SEMANTIC_IDENTIFIER,
+    BOOST,
+    HIDDEN,
+    PRIMARY_OWNERS,
+    SECONDARY_OWNERS,
+    LARGE_CHUNK_REFERENCE_IDS,
+    METADATA,
+    METADATA_SUFFIX,
+    DOC_SUMMARY,
+    CHUNK_CONTEXT,
+    DOC_UPDATED_AT,
+]
+
 
 def _process_dynamic_summary(
     dynamic_summary: str, max_summary_length: int = 400
@@ -157,17 +189,21 @@ def _vespa_hit_to_inference_chunk(
     )
 
 
-def get_chunks_via_visit_api(
-    chunk_request: VespaChunkRequest,
-    index_name: str,
-    filters: IndexFilters,
-    field_names: list[str] | None = None,
-    get_large_chunks: bool = False,
-) -> list[dict]:
-    # Constructing the URL for the Visit API
-    # NOTE: visit API uses the same URL as the document API, but with different params
-    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+@contextmanager
+def _vespa_http_client(http_client: httpx.Client | None) -> Iterator[httpx.Client]:
+    """Uses the caller's client if given, otherwise one client for the whole
+    retrieval"""
+    if http_client is not None:
+        yield http_client
+        return
+
+    with get_vespa_http_client() as new_http_client:
+        yield new_http_client
+
 
+def _build_field_set(
+    index_name: str, field_names: list[str] | None, filters: IndexFilters
+) -> str | None:
     # build the list of fields to retrieve
     field_set_list = (
         [f"{field_name}" for field_name in field_names] if field_names else []
@@ -186,9 +222,166 @@ def get_chunks_via_visit_api(
             field_set_list.append(tenant_id_fieldset_entry)
 
     if field_set_list:
-        field_set = f"{index_name}:" + ",".join(field_set_list)
-    else:
-        field_set = None
+        return f"{index_name}:" + ",".join(field_set_list)
+    return None
+
+
+def _is_chunk_accessible(
+    document: dict, filters: IndexFilters, user_acl: set[str] | None
+) -> bool:
+    """Post filter for the Document / Visit API, which can't check the ACL in the
+    selection. user_acl is the set of the filters' ACL entries."""
+    if user_acl:
+        # weighted sets are returned as a map of entry -> weight
+        document_acl = document["fields"].get(ACCESS_CONTROL_LIST)
+        if not document_acl or user_acl.isdisjoint(document_acl):
+            return False
+
+    if MULTI_TENANT:
+        if not filters.tenant_id:
+            raise ValueError("Tenant ID is required for multi-tenant")
+        document_tenant_id = document["fields"].get(TENANT_ID)
+        if document_tenant_id != filters.tenant_id:
+            logger.error(
+                f"Skipping document {document['id']} because "
+                f"it does not belong to tenant {filters.tenant_id}. "
+                "This should never happen."
+            )
+            return False
+
+    return True
+
+
+def _can_fetch_by_id(chunk_request: VespaChunkRequest, get_large_chunks: bool) -> bool:
+    # chunk ids can only be derived for regular chunks in a known range
+    return (
+        not get_large_chunks
+        and chunk_request.range is not None
+        and chunk_request.range <= MAX_CHUNKS_PER_ID_FETCH
+    )
+
+
+@retry(tries=3, delay=1, backoff=2)
+def _get_chunk_by_id(
+    chunk_id: UUID,
+    index_name: str,
+    field_set: str | None,
+    http_client: httpx.Client,
+) -> dict | None:
+    response = http_client.get(
+        f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{chunk_id}",
+        params={"fieldSet": field_set} if field_set else None,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def _get_chunk_by_id_or_error(
+    chunk_id: UUID,
+    index_name: str,
+    field_set: str | None,
+    http_client: httpx.Client,
+) -> dict | httpx.HTTPError | None:
+    try:
+        return _get_chunk_by_id(chunk_id, index_name, field_set, http_client)
+    except httpx.HTTPError as e:
+        return e
+
+
+def get_chunks_via_document_api(
+    chunk_requests: list[VespaChunkRequest],
+    index_name: str,
+    filters: IndexFilters,
+    http_client: httpx.Client,
+    field_names: list[str] | None = None,
+) -> tuple[list[dict], list[VespaChunkRequest]]:
+    """
+    Fetches the regular chunks of capped requests with a Document API GET per chunk
+    id, which are derived from the document id and chunk index. Unlike the Visit API
+    this doesn't scan the index for a document selection.
+
+    Returns the accessible chunks and the requests that have to be retrieved by
+    document id instead: the ones of which no chunk exists under the derived ids, e.g.
+    documents indexed with the old chunk id scheme, and the ones with a GET that
+    still failed after retrying.
+    """
+    if MULTI_TENANT and not filters.tenant_id:
+        raise ValueError("Tenant ID is required for multi-tenant")
+
+    chunk_ids: list[tuple[int, UUID]] = [
+        (
+            request_ind,
+            get_uuid_from_chunk_info(
+                document_id=chunk_request.document_id,
+                chunk_id=chunk_ind,
+                tenant_id=filters.tenant_id or "",
+            ),
+        )
+        for request_ind, chunk_request in enumerate(chunk_requests)
+        for chunk_ind in range(
+            chunk_request.min_chunk_ind or 0,
+            cast(int, chunk_request.max_chunk_ind) + 1,
+        )
+    ]
+    if not chunk_ids:
+        return [], []
+
+    field_set = _build_field_set(index_name, field_names, filters)
+    documents = run_functions_tuples_in_parallel(
+        [
+            (
+                _get_chunk_by_id_or_error,
+                (chunk_id, index_name, field_set, http_client),
+            )
+            for _, chunk_id in chunk_ids
+        ],
+        max_workers=NUM_THREADS,
+    )
+
+    failed_request_inds = {
+        request_ind
+        for (request_ind, _), document in zip(chunk_ids, documents)
+        if isinstance(document, httpx.HTTPError)
+    }
+    if failed_request_inds:
+        logger.warning(
+            f"Failed to fetch chunks of {len(failed_request_inds)} requests from Vespa "
+            "by id, retrieving them by document id instead"
+        )
+
+    user_acl = set(filters.access_control_list) if filters.access_control_list else None
+    found_request_inds: set[int] = set()
+    document_chunks: list[dict] = []
+    for (request_ind, _), document in zip(chunk_ids, documents):
+        if document is None or request_ind in failed_request_inds:
+            continue
+        found_request_inds.add(request_ind)
+        if _is_chunk_accessible(document, filters, user_acl):
+            document_chunks.append(document)
+
+    not_found_requests = [
+        chunk_request
+        for request_ind, chunk_request in enumerate(chunk_requests)
+        if request_ind not in found_request_inds
+    ]
+    return document_chunks, not_found_requests
+
+
+def get_chunks_via_visit_api(
+    chunk_request: VespaChunkRequest,
+    index_name: str,
+    filters: IndexFilters,
+    field_names: list[str] | None = None,
+    get_large_chunks: bool = False,
+    http_client: httpx.Client | None = None,
+) -> list[dict]:
+    # Constructing the URL for the Visit API
+    # NOTE: visit API uses the same URL as the document API, but with different params
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+
+    field_set = _build_field_set(index_name, field_names, filters)
 
     # build filters
     selection = f"{index_name}.document_id=='{chunk_request.document_id}'"
@@ -216,56 +409,38 @@ def get_chunks_via_visit_api(
         "fieldSet": field_set,
     }
 
+    user_acl = set(filters.access_control_list) if filters.access_control_list else None
     document_chunks: list[dict] = []
-    while True:
-        try:
-            filtered_params = {k: v for k, v in params.items() if v is not None}
-            with get_vespa_http_client() as http_client:
-                response = http_client.get(url, params=filtered_params)
+    with _vespa_http_client(http_client) as client:
+        while True:
+            try:
+                filtered_params = {k: v for k, v in params.items() if v is not None}
+                response = client.get(url, params=filtered_params)
                 response.raise_for_status()
-        except httpx.HTTPError as e:
-            error_base = "Failed to query Vespa"
-            logger.error(
-                f"{error_base}:\n"
-                f"Request URL: {e.request.url}\n"
-                f"Request Headers: {e.request.headers}\n"
-                f"Request Payload: {params}\n"
-                f"Exception: {str(e)}"
-            )
-            raise httpx.HTTPError(error_base) from e
-
-        # Check if the response contains any documents
-        response_data = response.json()
-
-        if "documents" in response_data:
-            for document in response_data["documents"]:
-                if filters.access_control_list:
-                    document_acl = document["fields"].get(ACCESS_CONTROL_LIST)
-                    if not document_acl or not any(
-                        user_acl_entry in document_acl
-                        for user_acl_entry in filters.access_control_list
-                    ):
-                        continue
-
-                if MULTI_TENANT:
-                    if not filters.tenant_id:
-                        raise ValueError("Tenant ID is required for multi-tenant")
-                    document_tenant_id = document["fields"].get(TENANT_ID)
-                    if document_tenant_id != filters.tenant_id:
-                        logger.error(
-                            f"Skipping document {document['document_id']} because "
-                            f"it does not belong to tenant {filters.tenant_id}. "
-                            "This should never happen."
-                        )
-                        continue
-
-                document_chunks.append(document)
-
-        # Check for continuation token to handle pagination
-        if "continuation" in response_data and response_data["continuation"]:
-            params["continuation"] = response_data["continuation"]
-        else:
-            break  # Exit loop if no continuation token
+            except httpx.HTTPError as e:
+                error_base = "Failed to query Vespa"
+                logger.error(
+                    f"{error_base}:\n"
+                    f"Request URL: {e.request.url}\n"
+                    f"Request Headers: {e.request.headers}\n"
+                    f"Request Payload: {params}\n"
+                    f"Exception: {str(e)}"
+                )
+                raise httpx.HTTPError(error_base) from e
+
+            # Check if the response contains any documents
+            response_data = response.json()
+
+            if "documents" in response_data:
+                for document in response_data["documents"]:
+                    if _is_chunk_accessible(document, filters, user_acl):
+                        document_chunks.append(document)
+
+            # Check for continuation token to handle pagination
+            if "continuation" in response_data and response_data["continuation"]:
+                params["continuation"] = response_data["continuation"]
+            else:
+                break  # Exit loop if no continuation token
 
     return document_chunks
 
@@ -293,29 +468,54 @@ def parallel_visit_api_retrieval(
     chunk_requests: list[VespaChunkRequest],
     filters: IndexFilters,
     get_large_chunks: bool = False,
+    http_client: httpx.Client | None = None,
 ) -> list[InferenceChunkUncleaned]:
-    functions_with_args: list[tuple[Callable, tuple]] = [
-        (
-            get_chunks_via_visit_api,
-            (chunk_request, index_name, filters, get_large_chunks),
+    with _vespa_http_client(http_client) as client:
+        # The Visit API is only needed if the chunk ids can't be derived
+        vespa_chunks, visit_requests = get_chunks_via_document_api(
+            [
+                chunk_request
+                for chunk_request in chunk_requests
+                if _can_fetch_by_id(chunk_request, get_large_chunks)
+            ],
+            index_name,
+            filters,
+            client,
+            field_names=_INFERENCE_CHUNK_FIELDS,
         )
-        for chunk_request in chunk_requests
-    ]
+        visit_requests += [
+            chunk_request
+            for chunk_request in chunk_requests
+            if not _can_fetch_by_id(chunk_request, get_large_chunks)
+        ]
 
-    parallel_results = run_functions_tuples_in_parallel(
-        functions_with_args, allow_failures=True
-    )
+        functions_with_args: list[tuple[Callable, tuple]] = [
+            (
+                get_chunks_via_visit_api,
+                (
+                    chunk_request,
+                    index_name,
+                    filters,
+                    _INFERENCE_CHUNK_FIELDS,
+                    get_large_chunks,
+                    client,
+                ),
+            )
+            for chunk_request in visit_requests
+        ]
+
+        parallel_results = run_functions_tuples_in_parallel(
+            functions_with_args, allow_failures=True
+        )
 
     # Any failures to retrieve would give a None, drop the Nones and empty lists
     vespa_chunk_sets = [res for res in parallel_results if res]
 
-    flattened_vespa_chunks = []
     for chunk_set in vespa_chunk_sets:
-        flattened_vespa_chunks.extend(chunk_set)
+        vespa_chunks.extend(chunk_set)
 
     inference_chunks = [
-        _vespa_hit_to_inference_chunk(chunk, null_score=True)
-        for chunk in flattened_vespa_chunks
+        _vespa_hit_to_inference_chunk(chunk, null_score=True) for chunk in vespa_chunks
     ]
 
     return inference_chunks
@@ -442,23 +642,63 @@ def batch_search_api_retrieval(
     chunk_requests: list[VespaChunkRequest],
     filters: IndexFilters,
     get_large_chunks: bool = False,
+    http_client: httpx.Client | None = None,
 ) -> list[InferenceChunkUncleaned]:
     retrieved_chunks: list[InferenceChunkUncleaned] = []
     capped_requests: list[VespaChunkRequest] = []
     uncapped_requests: list[VespaChunkRequest] = []
     chunk_count = 0
-    for req_ind, request in enumerate(chunk_requests, start=1):
-        # All requests without a chunk range are uncapped
-        # Uncapped requests are retrieved using the Visit API
-        range = request.range
-        if range is None:
-            uncapped_requests.append(request)
-            continue
 
-        if (
-            chunk_count + range > MAX_ID_SEARCH_QUERY_SIZE
-            or req_ind % MAX_OR_CONDITIONS == 0
-        ):
+    with _vespa_http_client(http_client) as client:
+        # Chunks in small, known ranges are fetched directly by their ids, the
+        # requests for which that doesn't work fall back to the search below
+        id_fetched_chunks, search_requests = get_chunks_via_document_api(
+            [
+                chunk_request
+                for chunk_request in chunk_requests
+                if _can_fetch_by_id(chunk_request, get_large_chunks)
+            ],
+            index_name,
+            filters,
+            client,
+            field_names=_INFERENCE_CHUNK_FIELDS,
+        )
+        retrieved_chunks.extend(
+            _vespa_hit_to_inference_chunk(chunk, null_score=True)
+            for chunk in id_fetched_chunks
+        )
+        search_requests += [
+            chunk_request
+            for chunk_request in chunk_requests
+            if not _can_fetch_by_id(chunk_request, get_large_chunks)
+        ]
+
+        for req_ind, request in enumerate(search_requests, start=1):
+            # All requests without a chunk range are uncapped
+            # Uncapped requests are retrieved using the Visit API
+            range = request.range
+            if range is None:
+                uncapped_requests.append(request)
+                continue
+
+            if (
+                chunk_count + range > MAX_ID_SEARCH_QUERY_SIZE
+                or req_ind % MAX_OR_CONDITIONS == 0
+            ):
+                retrieved_chunks.extend(
+                    _get_chunks_via_batch_search(
+                        index_name=index_name,
+                        chunk_requests=capped_requests,
+                        filters=filters,
+                        get_large_chunks=get_large_chunks,
+                    )
+                )
+                capped_requests = []
+                chunk_count = 0
+            capped_requests.append(request)
+            chunk_count += range
+
+        if capped_requests:
             retrieved_chunks.extend(
                 _get_chunks_via_batch_search(
                     index_name=index_name,
@@ -467,27 +707,17 @@ def batch_search_api_retrieval(
                     get_large_chunks=get_large_chunks,
                 )
             )
-            capped_requests = []
-            chunk_count = 0
-        capped_requests.append(request)
-        chunk_count += range
-
-    if capped_requests:
-        retrieved_chunks.extend(
-            _get_chunks_via_batch_search(
-                index_name=index_name,
-                chunk_requests=capped_requests,
-                filters=filters,
-                get_large_chunks=get_large_chunks,
-            )
-        )
 
-    if uncapped_requests:
-        logger.debug(f"Retrieving {len(uncapped_requests)} uncapped requests")
-        retrieved_chunks.extend(
-            parallel_visit_api_retrieval(
-                index_name, uncapped_requests, filters, get_large_chunks
+        if uncapped_requests:
+            logger.debug(f"Retrieving {len(uncapped_requests)} uncapped requests")
+            retrieved_chunks.extend(
+                parallel_visit_api_retrieval(
+                    index_name,
+                    uncapped_requests,
+                    filters,
+                    get_large_chunks,
+                    http_client=client,
+                )
             )
-        )
 
     return retrieved_chunks
@@ -2,6 +2,9 @@ from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 
+from onyx.configs.app_configs import VESPA_ANN_APPROXIMATE_THRESHOLD
+from onyx.configs.app_configs import VESPA_ANN_POST_FILTER_THRESHOLD
+from onyx.configs.app_configs import VESPA_WEIGHTED_SET_FILTER_THRESHOLD
 from onyx.configs.constants import INDEX_SEPARATOR
 from onyx.context.search.models import IndexFilters
 from onyx.document_index.interfaces import VespaChunkRequest
@@ -29,6 +32,32 @@ def build_tenant_id_filter(tenant_id: str, include_trailing_and: bool = False) -
     return filter_str
 
 
+def _quote_yql_string(val: str) -> str:
+    escaped = val.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def build_weighted_set_filter(key: str, vals: list[str]) -> str:
+    """A single weightedSet term matching any of `vals`. Vespa evaluates this as one
+    dictionary lookup over the (fast-search) attribute, so the cost stays flat as the
+    number of values grows, unlike an OR of `contains` terms."""
+    weighted_elems = ", ".join(f"{_quote_yql_string(val)}: 1" for val in vals)
+    return f"weightedSet({key}, {{{weighted_elems}}})"
+
+
+def build_vespa_query_plan_params() -> dict[str, str | int | float]:
+    """Query params that tune how Vespa combines filters with nearest neighbor search.
+    Only set if explicitly configured."""
+    params: dict[str, str | int | float] = {}
+    if VESPA_ANN_APPROXIMATE_THRESHOLD is not None:
+        params["ranking.matching.approximateThreshold"] = (
+            VESPA_ANN_APPROXIMATE_THRESHOLD
+        )
+    if VESPA_ANN_POST_FILTER_THRESHOLD is not None:
+        params["ranking.matching.postFilterThreshold"] = VESPA_ANN_POST_FILTER_THRESHOLD
+    return params
+
+
 def build_vespa_filters(
     filters: IndexFilters,
     *,
@@ -45,6 +74,17 @@ def build_vespa_filters(
         or_clause = " or ".join(eq_elems)
         return f"({or_clause}) and "
 
+    def _build_weighted_set_or_filters(key: str, vals: list[str] | None) -> str:
+        """For filters on weightedset attributes that may have a very large number
+        of values (e.g. ACLs of users in thousands of external groups)."""
+        if not key or not vals:
+            return ""
+        # dedupe while preserving order
+        unique_vals = list(dict.fromkeys(val for val in vals if val))
+        if len(unique_vals) <= VESPA_WEIGHTED_SET_FILTER_THRESHOLD:
+            return _build_or_filters(key, unique_vals)
+        return f"({build_weighted_set_filter(key, unique_vals)}) and "
+
     def _build_int_or_filters(key: str, vals: list[int] | None) -> str:
         """
         For an integer field filter.
@@ -161,7 +201,7 @@ def build_vespa_filters(
 
     # ACL filters
     if filters.access_control_list is not None:
-        filter_str += _build_or_filters(
+        filter_str += _build_weighted_set_or_filters(
             ACCESS_CONTROL_LIST, filters.access_control_list
         )
 
@@ -181,7 +221,7 @@ def build_vespa_filters(
     filter_str += _build_or_filters(METADATA_LIST, tag_attributes)
 
     # Document sets
-    filter_str += _build_or_filters(DOCUMENT_SETS, filters.document_set)
+    filter_str += _build_weighted_set_or_filters(DOCUMENT_SETS, filters.document_set)
 
     # Convert UUIDs to strings for user_file_ids
     user_file_ids_str = (
@@ -47,6 +47,9 @@ from onyx.document_index.vespa.shared_utils.utils import (
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
 )
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    build_vespa_query_plan_params,
+)
 from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
@@ -381,6 +384,7 @@ class VespaDocumentIndex(DocumentIndex):
         self._index_name = index_name
         self._tenant_id = tenant_state.tenant_id
         self._large_chunks_enabled = large_chunks_enabled
+        self._httpx_client = httpx_client
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This
         # is beneficial for indexing / updates / deletes since we have to make a
         # large volume of requests.
@@ -616,6 +620,9 @@ class VespaDocumentIndex(DocumentIndex):
             for chunk_request in chunk_requests
         ]
 
+        # Without a global client the retrieval uses one client for all of its
+        # requests. The temporary client context isn't shared since retrievals may
+        # run concurrently.
         if batch_retrieval:
             return _cleanup_chunks(
                 batch_search_api_retrieval(
@@ -625,6 +632,7 @@ class VespaDocumentIndex(DocumentIndex):
                     # No one was passing in this parameter in the legacy
                     # interface, it always defaulted to False.
                     get_large_chunks=False,
+                    http_client=self._httpx_client,
                 )
             )
         return _cleanup_chunks(
@@ -635,6 +643,7 @@ class VespaDocumentIndex(DocumentIndex):
                 # No one was passing in this parameter in the legacy interface,
                 # it always defaulted to False.
                 get_large_chunks=False,
+                http_client=self._httpx_client,
             )
         )
 
@@ -695,6 +704,7 @@ class VespaDocumentIndex(DocumentIndex):
             "offset": offset,
             "ranking.profile": ranking_profile,
             "timeout": VESPA_TIMEOUT,
+            **build_vespa_query_plan_params(),
         }
 
         return _cleanup_chunks(query_vespa(params))
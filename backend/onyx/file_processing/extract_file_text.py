@@ -34,6 +34,8 @@ from onyx.utils.logger import setup_logger
 
 if TYPE_CHECKING:
     from markitdown import MarkItDown
+    from pypdf import PageObject
+    from pypdf import PdfReader
 logger = setup_logger()
 
 TEXT_SECTION_SEPARATOR = "\n\n"
@@ -185,6 +187,60 @@ def pdf_to_text(file: IO[Any], pdf_pass: str | None = None) -> str:
     return text
 
 
+def _open_pdf(file: IO[Any], pdf_pass: str | None) -> "PdfReader | None":
+    """Returns the reader of the PDF, decrypted if needed. None if the PDF is
+    encrypted and can't be decrypted with pdf_pass."""
+    from pypdf import PdfReader
+
+    pdf_reader = PdfReader(file)
+
+    if pdf_reader.is_encrypted and pdf_pass is not None:
+        decrypt_success = False
+        try:
+            decrypt_success = pdf_reader.decrypt(pdf_pass) != 0
+        except Exception:
+            logger.error("Unable to decrypt pdf")
+
+        if not decrypt_success:
+            return None
+    elif pdf_reader.is_encrypted:
+        logger.warning("No Password for an encrypted PDF, returning empty text.")
+        return None
+
+    return pdf_reader
+
+
+def _read_pdf_metadata(pdf_reader: "PdfReader") -> dict[str, Any]:
+    """Basic PDF metadata"""
+    metadata: dict[str, Any] = {}
+    if pdf_reader.metadata is not None:
+        for key, value in pdf_reader.metadata.items():
+            clean_key = key.lstrip("/")
+            if isinstance(value, str) and value.strip():
+                metadata[clean_key] = value
+            elif isinstance(value, list) and all(
+                isinstance(item, str) for item in value
+            ):
+                metadata[clean_key] = ", ".join(value)
+    return metadata
+
+
+def _iter_pdf_page_images(
+    page: "PageObject", page_num: int
+) -> Iterator[tuple[bytes, str]]:
+    for image_file_object in page.images:
+        image = Image.open(io.BytesIO(image_file_object.data))
+        img_byte_arr = io.BytesIO()
+        image.save(img_byte_arr, format=image.format)
+        img_bytes = img_byte_arr.getvalue()
+
+        image_format = image.format.lower() if image.format else "png"
+        image_name = (
+            f"page_{page_num + 1}_image_{image_file_object.name}.{image_format}"
+        )
+        yield img_bytes, image_name
+
+
 def read_pdf_file(
     file: IO[Any],
     pdf_pass: str | None = None,
@@ -194,37 +250,16 @@ def read_pdf_file(
     """
     Returns the text, basic PDF metadata, and optionally extracted images.
     """
-    from pypdf import PdfReader
     from pypdf.errors import PdfStreamError
 
     metadata: dict[str, Any] = {}
     extracted_images: list[tuple[bytes, str]] = []
     try:
-        pdf_reader = PdfReader(file)
-
-        if pdf_reader.is_encrypted and pdf_pass is not None:
-            decrypt_success = False
-            try:
-                decrypt_success = pdf_reader.decrypt(pdf_pass) != 0
-            except Exception:
-                logger.error("Unable to decrypt pdf")
-
-            if not decrypt_success:
-                return "", metadata, []
-        elif pdf_reader.is_encrypted:
-            logger.warning("No Password for an encrypted PDF, returning empty text.")
+        pdf_reader = _open_pdf(file, pdf_pass)
+        if pdf_reader is None:
             return "", metadata, []
 
-        # Basic PDF metadata
-        if pdf_reader.metadata is not None:
-            for key, value in pdf_reader.metadata.items():
-                clean_key = key.lstrip("/")
-                if isinstance(value, str) and value.strip():
-                    metadata[clean_key] = value
-                elif isinstance(value, list) and all(
-                    isinstance(item, str) for item in value
-                ):
-                    metadata[clean_key] = ", ".join(value)
+        metadata = _read_pdf_metadata(pdf_reader)
 
         text = TEXT_SECTION_SEPARATOR.join(
             page.extract_text() for page in pdf_reader.pages
@@ -232,14 +267,7 @@ def read_pdf_file(
 
         if extract_images:
             for page_num, page in enumerate(pdf_reader.pages):
-                for image_file_object in page.images:
-                    image = Image.open(io.BytesIO(image_file_object.data))
-                    img_byte_arr = io.BytesIO()
-                    image.save(img_byte_arr, format=image.format)
-                    img_bytes = img_byte_arr.getvalue()
-
-                    image_format = image.format.lower() if image.format else "png"
-                    image_name = f"page_{page_num + 1}_image_{image_file_object.name}.{image_format}"
+                for img_bytes, image_name in _iter_pdf_page_images(page, page_num):
                     if image_callback is not None:
                         # Stream image out immediately
                         image_callback(img_bytes, image_name)
@@ -256,6 +284,56 @@ def read_pdf_file(
     return "", metadata, []
 
 
+class StreamedPdf(NamedTuple):
+    metadata: dict[str, Any]
+    page_count: int
+    # the text of each page, read when the page is reached
+    page_texts: Iterator[str]
+
+
+def _iter_pdf_page_texts(
+    pdf_reader: "PdfReader",
+    image_callback: Callable[[bytes, str], None] | None,
+) -> Iterator[str]:
+    try:
+        for page_num, page in enumerate(pdf_reader.pages):
+            if image_callback is not None:
+                for img_bytes, image_name in _iter_pdf_page_images(page, page_num):
+                    image_callback(img_bytes, image_name)
+            yield page.extract_text()
+    except Exception:
+        logger.exception("Failed to read PDF page")
+
+
+def stream_pdf_file(
+    file: IO[Any],
+    pdf_pass: str | None = None,
+    image_callback: Callable[[bytes, str], None] | None = None,
+) -> StreamedPdf:
+    """
+    Like read_pdf_file, but the pages are read one at a time while iterating over
+    page_texts, so that the text and images of a large PDF are never all held in
+    memory. The embedded images of a page are passed to image_callback before the
+    page's text is yielded. PDFs that can't be read have no pages.
+    """
+    from pypdf.errors import PdfStreamError
+
+    try:
+        pdf_reader = _open_pdf(file, pdf_pass)
+        if pdf_reader is not None:
+            return StreamedPdf(
+                metadata=_read_pdf_metadata(pdf_reader),
+                page_count=len(pdf_reader.pages),
+                page_texts=_iter_pdf_page_texts(pdf_reader, image_callback),
+            )
+    except PdfStreamError:
+        logger.exception("Invalid PDF file")
+    except Exception:
+        logger.exception("Failed to read PDF")
+
+    return StreamedPdf(metadata={}, page_count=0, page_texts=iter([]))
+
+
 def extract_docx_images(docx_bytes: IO[Any]) -> Iterator[tuple[bytes, str]]:
     """
     Given the bytes of a docx file, extract all the images.
@@ -24,6 +24,7 @@ from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.indexing.models import IndexChunk
 from onyx.indexing.models import UpdatableChunkData
 from onyx.llm.factory import get_default_llm
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.utils.logger import setup_logger
 
@@ -163,7 +164,9 @@ class UserFileIndexingAdapter:
                 )
                 user_file_id_to_raw_text[str(user_file_id)] = combined_content
                 token_count = (
-                    len(llm_tokenizer.encode(combined_content)) if llm_tokenizer else 0
+                    count_tokens(combined_content, llm_tokenizer)
+                    if llm_tokenizer
+                    else 0
                 )
                 user_file_id_to_token_count[str(user_file_id)] = token_count
             else:
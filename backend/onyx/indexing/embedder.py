@@ -18,6 +18,7 @@ from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelBackend
 from shared_configs.model_server_models import Embedding
 
 
@@ -41,6 +42,7 @@ class IndexingEmbedder(ABC):
         deployment_name: str | None,
         reduced_dimension: int | None,
         callback: IndexingHeartbeatInterface | None,
+        local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
     ):
         self.model_name = model_name
         self.normalize = normalize
@@ -63,6 +65,7 @@ class IndexingEmbedder(ABC):
             api_version=api_version,
             deployment_name=deployment_name,
             reduced_dimension=reduced_dimension,
+            local_model_backend=local_model_backend,
             # The below are globally set, this flow always uses the indexing one
             server_host=INDEXING_MODEL_SERVER_HOST,
             server_port=INDEXING_MODEL_SERVER_PORT,
@@ -94,6 +97,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
     ):
         super().__init__(
             model_name,
@@ -107,6 +111,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name,
             reduced_dimension,
             callback,
+            local_model_backend,
         )
 
     @log_function_time()
@@ -238,6 +243,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name=search_settings.deployment_name,
             reduced_dimension=search_settings.reduced_dimension,
             callback=callback,
+            local_model_backend=search_settings.local_model_backend,
         )
 
 
@@ -460,7 +460,7 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
                 **document.model_dump(),
                 processed_sections=[
                     Section(
-                        text=section.text if isinstance(section, TextSection) else "",
+                        text=section.text or "",
                         link=section.link,
                         image_file_id=(
                             section.image_file_id
@@ -481,7 +481,17 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
 
         for section in document.sections:
             # For ImageSection, process and create base Section with both text and image_file_id
-            if isinstance(section, ImageSection):
+            if isinstance(section, ImageSection) and section.text:
+                # Already summarized, e.g. when rebuilt from the current index
+                processed_sections.append(
+                    Section(
+                        link=section.link,
+                        image_file_id=section.image_file_id,
+                        text=section.text,
+                    )
+                )
+
+            elif isinstance(section, ImageSection):
                 # Default section with image path preserved - ensure text is always a string
                 processed_section = Section(
                     link=section.link,
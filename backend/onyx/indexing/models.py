@@ -13,6 +13,7 @@ from onyx.db.enums import EmbeddingPrecision
 from onyx.db.enums import SwitchoverType
 from onyx.utils.logger import setup_logger
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import LocalModelBackend
 from shared_configs.model_server_models import Embedding
 
 if TYPE_CHECKING:
@@ -178,6 +179,7 @@ class IndexingSetting(EmbeddingModelDetail):
     enable_contextual_rag: bool
     contextual_rag_llm_name: str | None = None
     contextual_rag_llm_provider: str | None = None
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH
 
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
@@ -203,6 +205,7 @@ class IndexingSetting(EmbeddingModelDetail):
             reduced_dimension=search_settings.reduced_dimension,
             switchover_type=search_settings.switchover_type,
             enable_contextual_rag=search_settings.enable_contextual_rag,
+            local_model_backend=search_settings.local_model_backend,
         )
 
 
@@ -6,13 +6,14 @@ from redis.lock import Lock as RedisLock
 from onyx.background.celery.tasks.kg_processing.utils import extend_lock
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.db.connector import get_kg_enabled_connectors
-from onyx.db.document import get_document_updated_at
+from onyx.db.document import get_documents_updated_at
 from onyx.db.document import get_skipped_kg_documents
 from onyx.db.document import get_unprocessed_kg_document_batch_for_connector
-from onyx.db.document import update_document_kg_info
 from onyx.db.document import update_document_kg_stage
+from onyx.db.document import update_documents_kg_info
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.entities import delete_from_kg_entities__no_commit
+from onyx.db.entities import upsert_staging_entities
 from onyx.db.entities import upsert_staging_entity
 from onyx.db.entity_type import get_entity_types
 from onyx.db.kg_config import get_kg_config_settings
@@ -22,12 +23,15 @@ from onyx.db.models import KGStage
 from onyx.db.relationships import delete_from_kg_relationships__no_commit
 from onyx.db.relationships import upsert_staging_relationship
 from onyx.db.relationships import upsert_staging_relationship_type
+from onyx.db.relationships import upsert_staging_relationship_types
+from onyx.db.relationships import upsert_staging_relationships
 from onyx.kg.models import KGClassificationInstructions
 from onyx.kg.models import KGDocumentDeepExtractionResults
 from onyx.kg.models import KGEnhancedDocumentMetadata
 from onyx.kg.models import KGEntityTypeInstructions
 from onyx.kg.models import KGExtractionInstructions
 from onyx.kg.models import KGImpliedExtractionResults
+from onyx.kg.models import KGStagingEntity
 from onyx.kg.utils.extraction_utils import EntityTypeMetadataTracker
 from onyx.kg.utils.extraction_utils import (
     get_batch_documents_metadata,
@@ -36,7 +40,6 @@ from onyx.kg.utils.extraction_utils import kg_deep_extraction
 from onyx.kg.utils.extraction_utils import (
     kg_implied_extraction,
 )
-from onyx.kg.utils.formatting_utils import extract_relationship_type_id
 from onyx.kg.utils.formatting_utils import get_entity_type
 from onyx.kg.utils.formatting_utils import split_entity_id
 from onyx.kg.utils.formatting_utils import split_relationship_id
@@ -200,6 +203,110 @@ def _get_batch_documents_enhanced_metadata(
     return kg_document_meta_data_dict
 
 
+def _write_staging_extractions_one_by_one(
+    entities: list[KGStagingEntity],
+    relationship_types: list[tuple[str, str, str]],
+    relationships: list[tuple[str, str | None]],
+    metadata_tracker: EntityTypeMetadataTracker,
+) -> None:
+    for entity in entities:
+        try:
+            with get_session_with_current_tenant() as db_session:
+                upserted_entity = upsert_staging_entity(
+                    db_session=db_session,
+                    name=entity.name,
+                    entity_type=entity.entity_type,
+                    document_id=entity.document_id,
+                    occurrences=entity.occurrences,
+                    attributes=entity.attributes,
+                    event_time=entity.event_time,
+                )
+                metadata_tracker.track_metadata(
+                    upserted_entity.entity_type_id_name, upserted_entity.attributes
+                )
+                db_session.commit()
+        except Exception as e:
+            logger.error(
+                f"Error adding entity {entity.entity_type}::{entity.name}. "
+                f"Error message: {e}"
+            )
+
+    for source_entity_type, relationship_type, target_entity_type in relationship_types:
+        try:
+            with get_session_with_current_tenant() as db_session:
+                upsert_staging_relationship_type(
+                    db_session=db_session,
+                    source_entity_type=source_entity_type,
+                    relationship_type=relationship_type,
+                    target_entity_type=target_entity_type,
+                    definition=False,
+                    extraction_count=1,
+                )
+                db_session.commit()
+        except Exception as e:
+            logger.error(
+                f"Error adding relationship type {source_entity_type}__"
+                f"{relationship_type}__{target_entity_type} to the database: {e}"
+            )
+
+    for relationship, document_id in relationships:
+        try:
+            with get_session_with_current_tenant() as db_session:
+                upsert_staging_relationship(
+                    db_session=db_session,
+                    relationship_id_name=relationship,
+                    source_document_id=document_id,
+                    occurrences=1,
+                )
+                db_session.commit()
+        except Exception as e:
+            logger.error(
+                f"Error adding relationship {relationship} to the database: {e}"
+            )
+
+
+def _write_staging_extractions(
+    entities: list[KGStagingEntity],
+    relationship_types: list[tuple[str, str, str]],
+    relationships: list[tuple[str, str | None]],
+    metadata_tracker: EntityTypeMetadataTracker,
+) -> None:
+    """
+    Writes the extracted entities and relationships of a document batch to the staging
+    tables in a single transaction, with one statement per table.
+    If the batch fails as a whole (e.g. because of a single bad row), it is written
+    again row by row so that the valid rows still make it in.
+    """
+    document_ids = list(
+        {entity.document_id for entity in entities if entity.document_id}
+    )
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            document_updated_at = get_documents_updated_at(document_ids, db_session)
+            for entity in entities:
+                if entity.document_id:
+                    entity.event_time = document_updated_at.get(entity.document_id)
+
+            upserted_entities = upsert_staging_entities(db_session, entities)
+            upsert_staging_relationship_types(db_session, relationship_types)
+            upsert_staging_relationships(db_session, relationships)
+            db_session.commit()
+    except Exception as e:
+        logger.warning(
+            f"Bulk write of the KG extractions failed, writing them one by one: {e}"
+        )
+        _write_staging_extractions_one_by_one(
+            entities, relationship_types, relationships, metadata_tracker
+        )
+        return
+
+    for upserted_entity in upserted_entities:
+        metadata_tracker.track_metadata(
+            upserted_entity.entity_type_id_name, upserted_entity.attributes
+        )
+
+
 def kg_extraction(
     tenant_id: str,
     index_name: str,
@@ -445,6 +552,7 @@ def kg_extraction(
                 )
 
             # Populate the KG database with the extracted entities, relationships, and terms
+            staging_entities: list[KGStagingEntity] = []
             for potential_document_id, entity in batch_entities:
                 # verify the entity is valid
                 parts = split_entity_id(entity)
@@ -461,58 +569,40 @@ def kg_extraction(
                 if entity_type not in active_entity_types:
                     continue
 
-                try:
-                    with get_session_with_current_tenant() as db_session:
-                        entity_attributes: dict[str, Any] = {}
-
-                        if potential_document_id:
-                            entity_attributes = (
-                                batch_metadata[potential_document_id].document_metadata
-                                or {}
-                            )
-
-                        # only keep selected attributes (and translate the attribute names)
-                        metadata_attributes = entity_metadata_conversion_instructions[
-                            entity_type
-                        ]
-                        keep_attributes = {
-                            metadata_attributes[attr_name].name: attr_val
-                            for attr_name, attr_val in entity_attributes.items()
-                            if (
-                                attr_name in metadata_attributes
-                                and metadata_attributes[attr_name].keep
-                            )
-                        }
-
-                        # add the classification result to the attributes
-                        if entity in entity_classification:
-                            keep_attributes["classification"] = entity_classification[
-                                entity
-                            ]
-
-                        event_time = None
-                        if potential_document_id:
-                            event_time = get_document_updated_at(
-                                potential_document_id, db_session
-                            )
-
-                        upserted_entity = upsert_staging_entity(
-                            db_session=db_session,
-                            name=entity_name,
-                            entity_type=entity_type,
-                            document_id=potential_document_id,
-                            occurrences=1,
-                            attributes=keep_attributes,
-                            event_time=event_time,
-                        )
-                        metadata_tracker.track_metadata(
-                            entity_type, upserted_entity.attributes
-                        )
+                entity_attributes: dict[str, Any] = {}
+                if potential_document_id:
+                    entity_attributes = (
+                        batch_metadata[potential_document_id].document_metadata or {}
+                    )
 
-                        db_session.commit()
-                except Exception as e:
-                    logger.error(f"Error adding entity {entity}. Error message: {e}")
+                # only keep selected attributes (and translate the attribute names)
+                metadata_attributes = entity_metadata_conversion_instructions[
+                    entity_type
+                ]
+                keep_attributes = {
+                    metadata_attributes[attr_name].name: attr_val
+                    for attr_name, attr_val in entity_attributes.items()
+                    if (
+                        attr_name in metadata_attributes
+                        and metadata_attributes[attr_name].keep
+                    )
+                }
+
+                # add the classification result to the attributes
+                if entity in entity_classification:
+                    keep_attributes["classification"] = entity_classification[entity]
+
+                staging_entities.append(
+                    KGStagingEntity(
+                        name=entity_name,
+                        entity_type=entity_type,
+                        document_id=potential_document_id,
+                        attributes=keep_attributes,
+                    )
+                )
 
+            staging_relationship_types: list[tuple[str, str, str]] = []
+            staging_relationships: list[tuple[str, str | None]] = []
             for document_id, relationship in batch_relationships:
                 relationship_split = split_relationship_id(relationship)
 
@@ -533,48 +623,31 @@ def kg_extraction(
                 ):
                     continue
 
-                relationship_type_id_name = extract_relationship_type_id(relationship)
-
-                with get_session_with_current_tenant() as db_session:
-                    try:
-                        upsert_staging_relationship_type(
-                            db_session=db_session,
-                            source_entity_type=source_entity_type.upper(),
-                            relationship_type=relationship_type,
-                            target_entity_type=target_entity_type.upper(),
-                            definition=False,
-                            extraction_count=1,
-                        )
-                        db_session.commit()
-                    except Exception as e:
-                        logger.error(
-                            f"Error adding relationship type {relationship_type_id_name} to the database: {e}"
-                        )
+                staging_relationship_types.append(
+                    (
+                        source_entity_type.upper(),
+                        relationship_type,
+                        target_entity_type.upper(),
+                    )
+                )
+                staging_relationships.append((relationship, document_id))
 
-                    with get_session_with_current_tenant() as db_session:
-                        try:
-                            upsert_staging_relationship(
-                                db_session=db_session,
-                                relationship_id_name=relationship,
-                                source_document_id=document_id,
-                                occurrences=1,
-                            )
-                            db_session.commit()
-                        except Exception as e:
-                            logger.error(
-                                f"Error adding relationship {relationship} to the database: {e}"
-                            )
+            _write_staging_extractions(
+                staging_entities,
+                staging_relationship_types,
+                staging_relationships,
+                metadata_tracker,
+            )
 
             # Populate the Documents table with the kg information for the documents
 
-            for processed_document in documents_to_process:
-                with get_session_with_current_tenant() as db_session:
-                    update_document_kg_info(
-                        db_session,
-                        processed_document,
-                        KGStage.EXTRACTED,
-                    )
-                    db_session.commit()
+            with get_session_with_current_tenant() as db_session:
+                update_documents_kg_info(
+                    db_session,
+                    documents_to_process,
+                    KGStage.EXTRACTED,
+                )
+                db_session.commit()
 
         # Update the the Skipped Docs back to Not Started
         with get_session_with_current_tenant() as db_session:
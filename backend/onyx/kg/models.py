@@ -186,5 +186,14 @@ class KGDocumentDeepExtractionResults(BaseModel):
     deep_extracted_relationships: set[str]
 
 
+class KGStagingEntity(BaseModel):
+    name: str
+    entity_type: str
+    document_id: str | None = None
+    occurrences: int = 1
+    attributes: dict[str, Any] = {}
+    event_time: datetime | None = None
+
+
 class KGException(Exception):
     pass
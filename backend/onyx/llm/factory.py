@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from onyx.chat.models import PersonaOverrideConfig
 from onyx.configs.model_configs import GEN_AI_TEMPERATURE
+from onyx.db.config_cache import get_or_load_config
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.llm import can_user_access_llm_provider
 from onyx.db.llm import fetch_default_provider
@@ -280,9 +281,32 @@ def llm_from_provider(
     )
 
 
-def get_llm_for_contextual_rag(model_name: str, model_provider: str) -> LLM:
+def _load_default_provider() -> LLMProviderView | None:
     with get_session_with_current_tenant() as db_session:
-        llm_provider = fetch_llm_provider_view(db_session, model_provider)
+        return fetch_default_provider(db_session)
+
+
+def _fetch_default_provider_cached() -> LLMProviderView | None:
+    llm_provider = get_or_load_config(
+        "default_llm_provider", None, _load_default_provider
+    )
+    # copied so that the cached snapshot can't be modified
+    return llm_provider.model_copy(deep=True) if llm_provider else None
+
+
+def _fetch_llm_provider_view_cached(provider_name: str) -> LLMProviderView | None:
+    def load_llm_provider_view() -> LLMProviderView | None:
+        with get_session_with_current_tenant() as db_session:
+            return fetch_llm_provider_view(db_session, provider_name)
+
+    llm_provider = get_or_load_config(
+        "llm_provider_view", provider_name, load_llm_provider_view
+    )
+    return llm_provider.model_copy(deep=True) if llm_provider else None
+
+
+def get_llm_for_contextual_rag(model_name: str, model_provider: str) -> LLM:
+    llm_provider = _fetch_llm_provider_view_cached(model_provider)
     if not llm_provider:
         raise ValueError("No LLM provider with name {} found".format(model_provider))
     return llm_from_provider(
@@ -297,9 +321,7 @@ def get_default_llm(
     additional_headers: dict[str, str] | None = None,
     long_term_logger: LongTermLogger | None = None,
 ) -> LLM:
-    with get_session_with_current_tenant() as db_session:
-        llm_provider = fetch_default_provider(db_session)
-
+    llm_provider = _fetch_default_provider_cached()
     if not llm_provider:
         raise ValueError("No default LLM provider found")
 
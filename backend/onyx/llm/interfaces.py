@@ -50,6 +50,9 @@ class LLM(abc.ABC):
         max_tokens: int | None = None,
         reasoning_effort: ReasoningEffort | None = None,
         user_identity: LLMUserIdentity | None = None,
+        # Only for deterministic calls, whether the cache is used at all is controlled
+        # by LLM_RESPONSE_CACHE_ENABLED
+        use_response_cache: bool = False,
     ) -> "ModelResponse":
         raise NotImplementedError
 
@@ -13,6 +13,7 @@ from onyx.configs.app_configs import SEND_USER_METADATA_TO_LLM_PROVIDER
 from onyx.configs.chat_configs import QA_TIMEOUT
 from onyx.configs.model_configs import GEN_AI_TEMPERATURE
 from onyx.configs.model_configs import LITELLM_EXTRA_BODY
+from onyx.configs.model_configs import LLM_RESPONSE_CACHE_ENABLED
 from onyx.llm.interfaces import LanguageModelInput
 from onyx.llm.interfaces import LLM
 from onyx.llm.interfaces import LLMConfig
@@ -27,6 +28,9 @@ from onyx.llm.model_response import ModelResponse
 from onyx.llm.model_response import ModelResponseStream
 from onyx.llm.models import CLAUDE_REASONING_BUDGET_TOKENS
 from onyx.llm.models import OPENAI_REASONING_EFFORT
+from onyx.llm.response_cache import build_response_cache_key
+from onyx.llm.response_cache import cache_response
+from onyx.llm.response_cache import get_cached_response
 from onyx.llm.utils import is_true_openai_model
 from onyx.llm.utils import model_is_reasoning_model
 from onyx.server.utils import mask_string
@@ -402,11 +406,29 @@ class LitellmLLM(LLM):
         max_tokens: int | None = None,
         reasoning_effort: ReasoningEffort | None = None,
         user_identity: LLMUserIdentity | None = None,
+        use_response_cache: bool = False,
     ) -> ModelResponse:
         from litellm import ModelResponse as LiteLLMModelResponse
 
         from onyx.llm.model_response import from_litellm_model_response
 
+        cache_key: str | None = None
+        if use_response_cache and LLM_RESPONSE_CACHE_ENABLED:
+            cache_key = build_response_cache_key(
+                config=self.config,
+                prompt=_prompt_to_dicts(prompt),
+                params={
+                    "tools": tools,
+                    "tool_choice": tool_choice,
+                    "structured_response_format": structured_response_format,
+                    "max_tokens": max_tokens,
+                    "reasoning_effort": reasoning_effort,
+                },
+            )
+            cached_response = get_cached_response(cache_key)
+            if cached_response is not None:
+                return cached_response
+
         response = cast(
             LiteLLMModelResponse,
             self._completion(
@@ -423,7 +445,10 @@ class LitellmLLM(LLM):
             ),
         )
 
-        return from_litellm_model_response(response)
+        model_response = from_litellm_model_response(response)
+        if cache_key is not None:
+            cache_response(cache_key, model_response)
+        return model_response
 
     def stream(
         self,
@@ -0,0 +1,119 @@
+"""
+Tenant scoped Redis cache for the responses of deterministic LLM calls.
+
+Secondary flows like query rephrasing or chat session naming see the same inputs over
+and over (Slack bots answering the same questions, regenerated messages). Callers opt
+in per call, the cache is only used if LLM_RESPONSE_CACHE_ENABLED is set. A broken
+cache never fails the LLM call, it only costs the provider round-trip.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any
+from typing import cast
+
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import LLM_RESPONSE_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import LLM_RESPONSE_CACHE_TTL_SECONDS
+from onyx.llm.interfaces import LLMConfig
+from onyx.llm.model_response import ModelResponse
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_CACHE_KEY_PREFIX = "llm_response_cache"
+# Sorted set of the cached keys, scored by insertion time, used for size based eviction
+_CACHE_INDEX_KEY = f"{_CACHE_KEY_PREFIX}_index"
+
+LLM_RESPONSE_CACHE_LOOKUPS = Counter(
+    "onyx_llm_response_cache_lookups_total",
+    "Lookups in the LLM response cache",
+    ["result"],  # hit, miss or error
+)
+
+
+def _normalize(value: Any) -> Any:
+    """Collapses whitespace so that prompts which only differ in formatting share a
+    cache entry."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def build_response_cache_key(
+    config: LLMConfig, prompt: list[dict[str, Any]], params: dict[str, Any]
+) -> str:
+    """The key covers everything that influences the response: the model, the
+    normalized prompt and the call parameters. Credentials are left out."""
+    payload = {
+        "model_provider": config.model_provider,
+        "model_name": config.model_name,
+        "api_base": config.api_base,
+        "api_version": config.api_version,
+        "deployment_name": config.deployment_name,
+        "temperature": config.temperature,
+        "prompt": _normalize(prompt),
+        "params": params,
+    }
+    digest = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{_CACHE_KEY_PREFIX}:{digest}"
+
+
+def get_cached_response(cache_key: str) -> ModelResponse | None:
+    try:
+        cached = cast(bytes | None, get_redis_client().get(cache_key))
+    except Exception:
+        logger.exception("Failed to read from the LLM response cache")
+        LLM_RESPONSE_CACHE_LOOKUPS.labels(result="error").inc()
+        return None
+
+    if cached is None:
+        LLM_RESPONSE_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    try:
+        response = ModelResponse.model_validate_json(cached)
+    except Exception:
+        # e.g. written by a version with a different response model
+        logger.warning(f"Ignoring invalid LLM response cache entry {cache_key}")
+        LLM_RESPONSE_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    LLM_RESPONSE_CACHE_LOOKUPS.labels(result="hit").inc()
+    return response
+
+
+def cache_response(cache_key: str, response: ModelResponse) -> None:
+    try:
+        redis_client = get_redis_client()
+        now = time.time()
+        redis_client.set(
+            cache_key, response.model_dump_json(), ex=LLM_RESPONSE_CACHE_TTL_SECONDS
+        )
+        redis_client.zadd(_CACHE_INDEX_KEY, {cache_key: now})
+
+        # Entries past their TTL are already gone, then evict the oldest ones
+        redis_client.zremrangebyscore(
+            _CACHE_INDEX_KEY, 0, now - LLM_RESPONSE_CACHE_TTL_SECONDS
+        )
+        excess = (
+            cast(int, redis_client.zcard(_CACHE_INDEX_KEY))
+            - LLM_RESPONSE_CACHE_MAX_ENTRIES
+        )
+        if excess > 0:
+            for evicted_key, _ in cast(
+                list[tuple[bytes, float]],
+                redis_client.zpopmin(_CACHE_INDEX_KEY, excess),
+            ):
+                redis_client.delete(evicted_key)
+    except Exception:
+        logger.exception("Failed to write to the LLM response cache")
@@ -12,13 +12,8 @@ from types import TracebackType
 from typing import Any
 from typing import cast
 
-import aioboto3  # type: ignore
 import httpx
 import requests
-import voyageai  # type: ignore[import-untyped]
-from cohere import AsyncClient as CohereAsyncClient
-from cohere.core.api_error import ApiError
-from google.oauth2 import service_account
 from httpx import HTTPError
 from requests import JSONDecodeError
 from requests import RequestException
@@ -58,7 +53,10 @@ from shared_configs.configs import SKIP_WARM_UP
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelBackend
 from shared_configs.enums import RerankerProvider
+from shared_configs.model_server_models import ConnectorClassificationBatchRequest
+from shared_configs.model_server_models import ConnectorClassificationBatchResponse
 from shared_configs.model_server_models import ConnectorClassificationRequest
 from shared_configs.model_server_models import ConnectorClassificationResponse
 from shared_configs.model_server_models import ContentClassificationPrediction
@@ -66,6 +64,8 @@ from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 from shared_configs.model_server_models import EmbedResponse
 from shared_configs.model_server_models import InformationContentClassificationResponses
+from shared_configs.model_server_models import IntentBatchRequest
+from shared_configs.model_server_models import IntentBatchResponse
 from shared_configs.model_server_models import IntentRequest
 from shared_configs.model_server_models import IntentResponse
 from shared_configs.model_server_models import RerankRequest
@@ -78,6 +78,10 @@ logger = setup_logger()
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
 _RETRY_TRIES = 10 if INDEXING_ONLY else 2
 
+# Shared by the query time custom model clients (query analysis, connector
+# classification) so they reuse connections to the model server
+_CUSTOM_MODELS_SESSION = requests.Session()
+
 # OpenAI only allows 2048 embeddings to be computed at once
 _OPENAI_MAX_INPUT_LEN = 2048
 # Cohere allows up to 96 embeddings in a single embedding calling
@@ -302,6 +306,8 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_COHERE_MODEL
 
+        from cohere import AsyncClient as CohereAsyncClient
+
         client = CohereAsyncClient(api_key=self.api_key)
 
         final_embeddings: list[Embedding] = []
@@ -323,6 +329,8 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VOYAGE_MODEL
 
+        import voyageai  # type: ignore[import-untyped]
+
         client = voyageai.AsyncClient(
             api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
         )
@@ -360,6 +368,7 @@ class CloudEmbedding:
     ) -> list[Embedding]:
         from google import genai
         from google.genai import types as genai_types
+        from google.oauth2 import service_account
 
         if not model:
             model = DEFAULT_VERTEX_MODEL
@@ -580,6 +589,9 @@ class CloudEmbedding:
 async def cohere_rerank_api(
     query: str, docs: list[str], model_name: str, api_key: str
 ) -> list[float]:
+    from cohere import AsyncClient as CohereAsyncClient
+    from cohere.core.api_error import ApiError
+
     cohere_client = CohereAsyncClient(api_key=api_key)
     try:
         response = await cohere_client.rerank(
@@ -608,6 +620,8 @@ async def cohere_rerank_aws(
     aws_access_key_id: str,
     aws_secret_access_key: str,
 ) -> list[float]:
+    import aioboto3  # type: ignore
+
     session = aioboto3.Session(
         aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key
     )
@@ -678,6 +692,7 @@ class EmbeddingModel:
         api_version: str | None = None,
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
+        local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
     ) -> None:
         self.api_key = api_key
         self.provider_type = provider_type
@@ -690,6 +705,7 @@ class EmbeddingModel:
         self.api_version = api_version
         self.deployment_name = deployment_name
         self.reduced_dimension = reduced_dimension
+        self.local_model_backend = local_model_backend
         self.tokenizer = get_tokenizer(
             model_name=model_name, provider_type=provider_type
         )
@@ -881,6 +897,7 @@ class EmbeddingModel:
                 manual_passage_prefix=self.passage_prefix,
                 api_url=self.api_url,
                 reduced_dimension=self.reduced_dimension,
+                local_model_backend=self.local_model_backend,
             )
 
             start_time = time.monotonic()
@@ -1027,6 +1044,7 @@ class EmbeddingModel:
             api_version=search_settings.api_version,
             deployment_name=search_settings.deployment_name,
             reduced_dimension=search_settings.reduced_dimension,
+            local_model_backend=search_settings.local_model_backend,
         )
 
 
@@ -1039,11 +1057,13 @@ class RerankingModel:
         api_url: str | None,
         model_server_host: str = MODEL_SERVER_HOST,
         model_server_port: int = MODEL_SERVER_PORT,
+        local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
     ) -> None:
         self.model_name = model_name
         self.provider_type = provider_type
         self.api_key = api_key
         self.api_url = api_url
+        self.local_model_backend = local_model_backend
 
         # Only build model server endpoint for local models
         if self.provider_type is None:
@@ -1118,6 +1138,7 @@ class RerankingModel:
                 provider_type=self.provider_type,
                 api_key=self.api_key,
                 api_url=self.api_url,
+                local_model_backend=self.local_model_backend,
             )
 
             response = requests.post(
@@ -1140,6 +1161,9 @@ class QueryAnalysisModel:
     ) -> None:
         model_server_url = build_model_server_url(model_server_host, model_server_port)
         self.intent_server_endpoint = model_server_url + "/custom/query-analysis"
+        self.intent_batch_server_endpoint = (
+            model_server_url + "/custom/query-analysis-batch"
+        )
         self.keyword_percent_threshold = keyword_percent_threshold
         self.semantic_percent_threshold = semantic_percent_threshold
 
@@ -1153,7 +1177,7 @@ class QueryAnalysisModel:
             semantic_percent_threshold=self.semantic_percent_threshold,
         )
 
-        response = requests.post(
+        response = _CUSTOM_MODELS_SESSION.post(
             self.intent_server_endpoint, json=intent_request.model_dump()
         )
         response.raise_for_status()
@@ -1162,6 +1186,31 @@ class QueryAnalysisModel:
 
         return response_model.is_keyword, response_model.keywords
 
+    def predict_batch(
+        self,
+        queries: list[str],
+    ) -> list[tuple[bool, list[str]]]:
+        """Analyze many queries with a single model server request."""
+        if not queries:
+            return []
+
+        intent_request = IntentBatchRequest(
+            queries=queries,
+            keyword_percent_threshold=self.keyword_percent_threshold,
+            semantic_percent_threshold=self.semantic_percent_threshold,
+        )
+
+        response = _CUSTOM_MODELS_SESSION.post(
+            self.intent_batch_server_endpoint, json=intent_request.model_dump()
+        )
+        response.raise_for_status()
+
+        response_model = IntentBatchResponse(**response.json())
+
+        return [
+            (result.is_keyword, result.keywords) for result in response_model.results
+        ]
+
 
 class InformationContentClassificationModel:
     def __init__(
@@ -1209,6 +1258,9 @@ class ConnectorClassificationModel:
         self.connector_classification_endpoint = (
             model_server_url + "/custom/connector-classification"
         )
+        self.connector_classification_batch_endpoint = (
+            model_server_url + "/custom/connector-classification-batch"
+        )
 
     def predict(
         self,
@@ -1227,7 +1279,7 @@ class ConnectorClassificationModel:
             available_connectors=available_connectors,
             query=query,
         )
-        response = requests.post(
+        response = _CUSTOM_MODELS_SESSION.post(
             self.connector_classification_endpoint,
             json=connector_classification_request.dict(),
         )
@@ -1237,6 +1289,37 @@ class ConnectorClassificationModel:
 
         return response_model.connectors
 
+    def predict_batch(
+        self,
+        queries: list[str],
+        available_connectors: list[str],
+    ) -> list[list[str]]:
+        """Classify many queries against the same connectors with a single model
+        server request."""
+        if not queries:
+            return []
+
+        # Check if model server is disabled
+        if os.environ.get("DISABLE_MODEL_SERVER", "").lower() == "true":
+            logger.info(
+                "DISABLE_MODEL_SERVER is set, returning all available connectors"
+            )
+            return [list(available_connectors) for _ in queries]
+
+        connector_classification_request = ConnectorClassificationBatchRequest(
+            available_connectors=available_connectors,
+            queries=queries,
+        )
+        response = _CUSTOM_MODELS_SESSION.post(
+            self.connector_classification_batch_endpoint,
+            json=connector_classification_request.model_dump(),
+        )
+        response.raise_for_status()
+
+        response_model = ConnectorClassificationBatchResponse(**response.json())
+
+        return response_model.connectors
+
 
 def warm_up_retry(
     func: Callable[..., Any],
@@ -1300,6 +1383,7 @@ def warm_up_bi_encoder(
 
 def warm_up_cross_encoder(
     rerank_model_name: str,
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH,
     non_blocking: bool = False,
 ) -> None:
     if SKIP_WARM_UP:
@@ -1312,6 +1396,7 @@ def warm_up_cross_encoder(
         provider_type=None,
         api_url=None,
         api_key=None,
+        local_model_backend=local_model_backend,
     )
 
     def _warm_up() -> None:
@@ -13,6 +13,8 @@ from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
 from shared_configs.enums import EmbeddingProvider
 
 TRIM_SEP_PAT = "\n... {n} tokens removed...\n"
+# Long texts are token counted in segments of about this many characters
+_TOKEN_COUNT_SEGMENT_CHARS = 100_000
 
 logger = setup_logger()
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -175,6 +177,32 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+def count_tokens(
+    content: str, tokenizer: BaseTokenizer, stop_after: int | None = None
+) -> int:
+    """Counts the tokens of content one segment at a time so that the token ids of a
+    long text are never all held in memory. Segments are split at whitespace, so the
+    count can only differ from encoding the whole text at once at the boundaries.
+    If stop_after is set, counting stops once more tokens than that were found."""
+    token_count = 0
+    start = 0
+    while start < len(content):
+        end = start + _TOKEN_COUNT_SEGMENT_CHARS
+        if end < len(content):
+            split_at = max(
+                content.rfind(" ", start, end), content.rfind("\n", start, end)
+            )
+            if split_at > start:
+                end = split_at
+
+        token_count += len(tokenizer.encode(content[start:end]))
+        if stop_after is not None and token_count > stop_after:
+            break
+        start = end
+
+    return token_count
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -69,3 +69,19 @@ TENANT_HEARTBEAT_EXPIRATION = (
 TENANT_ACQUISITION_INTERVAL = 60  # How often pods attempt to acquire unprocessed tenants and checks for new tokens
 
 MAX_TENANTS_PER_POD = int(os.getenv("MAX_TENANTS_PER_POD", 50))
+
+# Slack events are acknowledged right away and processed by a pool of worker threads
+SLACK_BOT_EVENT_WORKERS = int(os.getenv("SLACK_BOT_EVENT_WORKERS") or 16)
+# How many events of the same tenant can be processed at the same time, so that one
+# busy workspace can't take up all workers
+SLACK_BOT_MAX_CONCURRENT_EVENTS_PER_TENANT = int(
+    os.getenv("SLACK_BOT_MAX_CONCURRENT_EVENTS_PER_TENANT") or 4
+)
+# Events of a tenant that arrive while this many are already waiting are dropped
+SLACK_BOT_MAX_QUEUED_EVENTS_PER_TENANT = int(
+    os.getenv("SLACK_BOT_MAX_QUEUED_EVENTS_PER_TENANT") or 100
+)
+# How long the ids of received events are remembered to ignore Slack's retries of them
+SLACK_BOT_EVENT_DEDUPE_TTL_SECONDS = int(
+    os.getenv("SLACK_BOT_EVENT_DEDUPE_TTL_SECONDS") or 3600
+)
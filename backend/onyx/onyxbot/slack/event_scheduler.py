@@ -0,0 +1,192 @@
+"""
+Deferred processing of Slack events.
+
+Socket mode events are acknowledged as soon as they arrive and then handed to the
+SlackEventScheduler, which runs them on its own worker threads. Every tenant has a
+bounded queue and a limit on how many of its events run at the same time, and the
+workers take turns between the (tenant, bot) pairs that have work waiting, so that a
+burst from one workspace can't hold up the other workspaces on the pod.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from onyx.configs.constants import OnyxRedisLocks
+from onyx.onyxbot.slack.config import SLACK_BOT_EVENT_DEDUPE_TTL_SECONDS
+from onyx.onyxbot.slack.config import SLACK_BOT_EVENT_WORKERS
+from onyx.onyxbot.slack.config import SLACK_BOT_MAX_CONCURRENT_EVENTS_PER_TENANT
+from onyx.onyxbot.slack.config import SLACK_BOT_MAX_QUEUED_EVENTS_PER_TENANT
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_slack_events = Counter(
+    "onyx_slack_bot_events_total",
+    "Slack events received by this pod, by whether they were queued, dropped because "
+    "the tenant's queue was full or ignored as a retry of an earlier event",
+    ["result"],
+)
+_queued_slack_events = Gauge(
+    "onyx_slack_bot_queued_events",
+    "Slack events waiting for a worker",
+)
+
+# (tenant_id, slack_bot_id)
+_QueueKey = tuple[str, int]
+
+
+@dataclass
+class _QueuedEvent:
+    function: Callable[[], None]
+    context: contextvars.Context
+
+
+class SlackEventScheduler:
+    def __init__(
+        self,
+        num_workers: int = SLACK_BOT_EVENT_WORKERS,
+        max_concurrent_per_tenant: int = SLACK_BOT_MAX_CONCURRENT_EVENTS_PER_TENANT,
+        max_queued_per_tenant: int = SLACK_BOT_MAX_QUEUED_EVENTS_PER_TENANT,
+    ) -> None:
+        self.max_concurrent_per_tenant = max_concurrent_per_tenant
+        self.max_queued_per_tenant = max_queued_per_tenant
+
+        self._condition = threading.Condition()
+        self._queues: dict[_QueueKey, deque[_QueuedEvent]] = {}
+        # keys of the non-empty queues in the order they get their next turn
+        self._turns: deque[_QueueKey] = deque()
+        self._queued_per_tenant: dict[str, int] = {}
+        self._running_per_tenant: dict[str, int] = {}
+        self._closed = False
+
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"slack-event-worker-{i}", daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self, tenant_id: str, slack_bot_id: int, function: Callable[[], None]
+    ) -> bool:
+        """Queues function to run on a worker with a copy of the caller's context.
+        Returns False if the tenant's queue is full or the scheduler was shut down."""
+        with self._condition:
+            queued = self._queued_per_tenant.get(tenant_id, 0)
+            if self._closed or queued >= self.max_queued_per_tenant:
+                _slack_events.labels(result="dropped").inc()
+                return False
+
+            key = (tenant_id, slack_bot_id)
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._turns.append(key)
+            self._queues[key].append(_QueuedEvent(function, contextvars.copy_context()))
+            self._queued_per_tenant[tenant_id] = queued + 1
+            _slack_events.labels(result="queued").inc()
+            _queued_slack_events.inc()
+            self._condition.notify()
+            return True
+
+    def shutdown(self, timeout: float) -> None:
+        """Stops accepting events and waits up to timeout seconds for the queued ones
+        to be processed"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _next_event(self) -> tuple[str, _QueuedEvent] | None:
+        """The first event, in turn order, of a tenant that is below its concurrency
+        limit. Must hold the condition."""
+        for _ in range(len(self._turns)):
+            key = self._turns.popleft()
+            tenant_id = key[0]
+            if (
+                self._running_per_tenant.get(tenant_id, 0)
+                >= self.max_concurrent_per_tenant
+            ):
+                self._turns.append(key)
+                continue
+
+            queue = self._queues[key]
+            event = queue.popleft()
+            if queue:
+                self._turns.append(key)
+            else:
+                del self._queues[key]
+
+            self._queued_per_tenant[tenant_id] -= 1
+            if not self._queued_per_tenant[tenant_id]:
+                del self._queued_per_tenant[tenant_id]
+            self._running_per_tenant[tenant_id] = (
+                self._running_per_tenant.get(tenant_id, 0) + 1
+            )
+            _queued_slack_events.dec()
+            return tenant_id, event
+
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while (next_event := self._next_event()) is None:
+                    if self._closed and not self._queues:
+                        return
+                    self._condition.wait()
+
+            tenant_id, event = next_event
+            try:
+                event.context.run(event.function)
+            except Exception:
+                logger.exception("Failed to process slack event")
+            finally:
+                with self._condition:
+                    self._running_per_tenant[tenant_id] -= 1
+                    if not self._running_per_tenant[tenant_id]:
+                        del self._running_per_tenant[tenant_id]
+                    # a tenant that was at its limit may have events waiting
+                    self._condition.notify_all()
+
+
+def is_duplicate_slack_event(req: SocketModeRequest, slack_bot_id: int) -> bool:
+    """Slack redelivers events that weren't acknowledged in time under the same event
+    id. Only the first delivery is processed, across all pods. Must be called with the
+    tenant set."""
+    event_id = req.payload.get("event_id") if req.type == "events_api" else None
+    if not event_id:
+        return False
+
+    try:
+        is_first_delivery = get_redis_client().set(
+            f"{OnyxRedisLocks.SLACK_BOT_EVENT_PREFIX}:{slack_bot_id}:{event_id}",
+            1,
+            nx=True,
+            ex=SLACK_BOT_EVENT_DEDUPE_TTL_SECONDS,
+        )
+    except Exception:
+        logger.exception("Failed to check for a duplicate slack event")
+        return False
+
+    if is_first_delivery:
+        return False
+
+    logger.info(
+        f"Ignoring redelivered slack event: {event_id=} {req.retry_attempt=} "
+        f"{req.retry_reason=}"
+    )
+    _slack_events.labels(result="duplicate").inc()
+    return True
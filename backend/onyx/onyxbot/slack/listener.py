@@ -64,6 +64,8 @@ from onyx.onyxbot.slack.constants import KEEP_TO_YOURSELF_ACTION_ID
 from onyx.onyxbot.slack.constants import LIKE_BLOCK_ACTION_ID
 from onyx.onyxbot.slack.constants import SHOW_EVERYONE_ACTION_ID
 from onyx.onyxbot.slack.constants import VIEW_DOC_FEEDBACK_ID
+from onyx.onyxbot.slack.event_scheduler import is_duplicate_slack_event
+from onyx.onyxbot.slack.event_scheduler import SlackEventScheduler
 from onyx.onyxbot.slack.handlers.handle_buttons import handle_doc_feedback_button
 from onyx.onyxbot.slack.handlers.handle_buttons import handle_followup_button
 from onyx.onyxbot.slack.handlers.handle_buttons import (
@@ -153,6 +155,8 @@ class SlackbotHandler:
 
         self._lock = threading.Lock()
 
+        self.event_scheduler = SlackEventScheduler()
+
         logger.info(f"Pod ID: {self.pod_id}")
 
         # Set up signal handlers for graceful shutdown
@@ -264,7 +268,7 @@ class SlackbotHandler:
                 self.socket_clients[tenant_bot_pair].close()
 
             socket_client = self.start_socket_client(
-                bot.id, tenant_id, slack_bot_tokens
+                bot.id, tenant_id, slack_bot_tokens, self.event_scheduler
             )
             if socket_client:
                 # Ensure tenant is tracked as active
@@ -465,7 +469,10 @@ class SlackbotHandler:
 
     @staticmethod
     def start_socket_client(
-        slack_bot_id: int, tenant_id: str, slack_bot_tokens: SlackBotTokens
+        slack_bot_id: int,
+        tenant_id: str,
+        slack_bot_tokens: SlackBotTokens,
+        event_scheduler: SlackEventScheduler,
     ) -> TenantSocketModeClient | None:
         """Returns the socket client if this succeeds"""
         socket_client: TenantSocketModeClient = _get_socket_client(
@@ -508,7 +515,7 @@ class SlackbotHandler:
             )
 
         # Append the event handler
-        process_slack_event = create_process_slack_event()
+        process_slack_event = create_process_slack_event(event_scheduler)
         socket_client.socket_mode_request_listeners.append(process_slack_event)  # type: ignore
 
         # Establish a WebSocket connection to the Socket Mode servers
@@ -554,6 +561,10 @@ class SlackbotHandler:
         logger.info(f"Stopping {len(self.socket_clients)} socket clients")
         SlackbotHandler.stop_socket_clients(self.pod_id, self.socket_clients)
 
+        # Finish the events that were already acknowledged while we still hold the locks
+        logger.info("Waiting for queued Slack events to be processed")
+        self.event_scheduler.shutdown(timeout=30.0)
+
         # Release locks for all tenants we currently hold
         logger.info(f"Releasing locks for {len(self.tenant_ids)} tenants")
         for tenant_id in list(self.tenant_ids):
@@ -1080,9 +1091,19 @@ def view_routing(req: SocketModeRequest, client: TenantSocketModeClient) -> None
             return process_feedback(req, client)
 
 
-def create_process_slack_event() -> (
-    Callable[[TenantSocketModeClient, SocketModeRequest], None]
-):
+def route_slack_event(req: SocketModeRequest, client: TenantSocketModeClient) -> None:
+    if req.type == "interactive":
+        if req.payload.get("type") == "block_actions":
+            return action_routing(req, client)
+        elif req.payload.get("type") == "view_submission":
+            return view_routing(req, client)
+    elif req.type == "events_api" or req.type == "slash_commands":
+        return process_message(req, client)
+
+
+def create_process_slack_event(
+    event_scheduler: SlackEventScheduler,
+) -> Callable[[TenantSocketModeClient, SocketModeRequest], None]:
     def process_slack_event(
         client: TenantSocketModeClient, req: SocketModeRequest
     ) -> None:
@@ -1090,16 +1111,19 @@ def create_process_slack_event() -> (
         # it will assume the Bot is DEAD!!! :(
         acknowledge_message(req, client)
 
-        try:
-            if req.type == "interactive":
-                if req.payload.get("type") == "block_actions":
-                    return action_routing(req, client)
-                elif req.payload.get("type") == "view_submission":
-                    return view_routing(req, client)
-            elif req.type == "events_api" or req.type == "slash_commands":
-                return process_message(req, client)
-        except Exception:
-            logger.exception("Failed to process slack event")
+        if is_duplicate_slack_event(req, client.slack_bot_id):
+            return
+
+        # The actual processing happens on the scheduler's workers so that the socket
+        # mode client's threads are free to acknowledge the next events
+        tenant_id = get_current_tenant_id()
+        if not event_scheduler.submit(
+            tenant_id, client.slack_bot_id, lambda: route_slack_event(req, client)
+        ):
+            logger.warning(
+                f"Too many queued Slack events, dropping event: {tenant_id=} "
+                f"{client.slack_bot_id=} {req.type=} {req.envelope_id=}"
+            )
 
     return process_slack_event
 
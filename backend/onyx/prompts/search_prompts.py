@@ -128,6 +128,37 @@ Section IDs:
 """.strip()
 
 
+# Shared by the single and batched document context selection prompts
+DOCUMENT_CONTEXT_SELECTION_CATEGORIES = """
+# Classification Categories:
+**1 - NOT_RELEVANT**
+- Main section and surrounding sections do not help answer the query.
+- Appears on topic but refers to a different context or subject.
+
+**2 - MAIN_SECTION_ONLY**
+- Main section contains useful information for the query.
+- Adjacent sections do not provide additional directly relevant information.
+
+**3 - INCLUDE_ADJACENT_SECTIONS**
+- The main section AND adjacent sections are all useful for answering the user query.
+- The surrounding sections provide relevant information that does not exist in the main section.
+- Even if only 1 of the adjacent sections is useful or there is a small piece in either that is useful.
+- Additional unseen sections are unlikely to contain valuable related information.
+
+**4 - INCLUDE_FULL_DOCUMENT**
+- Additional unseen sections are likely to contain valuable related information to the query.
+
+## Additional Decision Notes
+- If only a small piece of the document is useful - use classification 2 or 3, do not use 1.
+- If the document is very on topic and provides additional context that might be useful in \
+combination with other documents - use classification 2, 3 or 4, do not use 1.
+- A section may appear on topic but could refer to a different context or subject don't assume relevance. \
+In this case, use this classification.
+- It is important to avoid conflating different contexts and subjects - if the document is related to the query but not about \
+the correct subject, use classification 1.
+""".strip()
+
+
 # Some models are trained heavily to reason in the actual output so we allow some flexibility in the prompt.
 # Downstream of the model, we will attempt to parse the output to extract the number.
 # This inference will not have a system prompt as it's a single message task more like the traditional ones.
@@ -135,63 +166,86 @@ Section IDs:
 # Opted to not include metadata here as the doc was already selected by the previous step that has it.
 # Also hopefully it leans not throwing out documents as there are not many bad ones that make it to this stage.
 # If anything, it's mostly because of something misleading, otherwise this step should be treated as 95% expansion/filtering.
-DOCUMENT_CONTEXT_SELECTION_PROMPT = """
+DOCUMENT_CONTEXT_SELECTION_PROMPT = f"""
 Analyze the relevance of document sections to a search query and classify according to the categories \
 described at the end of the prompt.
 
 # Document Title / Metadata
 ```
-{document_title}
+{{document_title}}
 ```
 
 # Section Above:
 ```
-{section_above}
+{{section_above}}
 ```
 
 # Main Section:
 ```
-{main_section}
+{{main_section}}
 ```
 
 # Section Below:
 ```
-{section_below}
+{{section_below}}
 ```
 
 # User Query:
 ```
-{user_query}
+{{user_query}}
 ```
 
-# Classification Categories:
-**1 - NOT_RELEVANT**
-- Main section and surrounding sections do not help answer the query.
-- Appears on topic but refers to a different context or subject.
+{DOCUMENT_CONTEXT_SELECTION_CATEGORIES}
 
-**2 - MAIN_SECTION_ONLY**
-- Main section contains useful information for the query.
-- Adjacent sections do not provide additional directly relevant information.
+CRITICAL: ONLY output the NUMBER of the situation most applicable to the query and sections provided (1, 2, 3, or 4).
 
-**3 - INCLUDE_ADJACENT_SECTIONS**
-- The main section AND adjacent sections are all useful for answering the user query.
-- The surrounding sections provide relevant information that does not exist in the main section.
-- Even if only 1 of the adjacent sections is useful or there is a small piece in either that is useful.
-- Additional unseen sections are unlikely to contain valuable related information.
+Situation Number:
+""".strip()
 
-**4 - INCLUDE_FULL_DOCUMENT**
-- Additional unseen sections are likely to contain valuable related information to the query.
 
-## Additional Decision Notes
-- If only a small piece of the document is useful - use classification 2 or 3, do not use 1.
-- If the document is very on topic and provides additional context that might be useful in \
-combination with other documents - use classification 2, 3 or 4, do not use 1.
-- A section may appear on topic but could refer to a different context or subject don't assume relevance. \
-In this case, use this classification.
-- It is important to avoid conflating different contexts and subjects - if the document is related to the query but not about \
-the correct subject, use classification 1.
+# Same classification as DOCUMENT_CONTEXT_SELECTION_PROMPT but for many sections in a single call.
+# Each section is formatted with BATCH_DOCUMENT_CONTEXT_SECTION_TEMPLATE.
+# Downstream of the model, we parse "section_id: situation_number" pairs out of the output.
+BATCH_DOCUMENT_CONTEXT_SECTION_TEMPLATE = """
+## Section {section_id}
+### Document Title / Metadata
+```
+{document_title}
+```
 
-CRITICAL: ONLY output the NUMBER of the situation most applicable to the query and sections provided (1, 2, 3, or 4).
+### Section Above:
+```
+{section_above}
+```
 
-Situation Number:
+### Main Section:
+```
+{main_section}
+```
+
+### Section Below:
+```
+{section_below}
+```
+""".strip()
+
+BATCH_DOCUMENT_CONTEXT_SELECTION_PROMPT = f"""
+Analyze the relevance of each of the document sections below to a search query and classify each one \
+independently according to the categories described at the end of the prompt.
+
+# Document Sections
+{{formatted_sections}}
+
+# User Query:
+```
+{{user_query}}
+```
+
+{DOCUMENT_CONTEXT_SELECTION_CATEGORIES}
+
+CRITICAL: ONLY output one line per section in the format "section_id: situation_number", for example:
+0: 2
+1: 4
+
+Classifications:
 """.strip()
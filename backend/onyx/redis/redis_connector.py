@@ -1,5 +1,6 @@
 import redis
 
+from onyx.redis.redis_connector_change_index import RedisConnectorChangeIndex
 from onyx.redis.redis_connector_delete import RedisConnectorDelete
 from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
 from onyx.redis.redis_connector_ext_group_sync import RedisConnectorExternalGroupSync
@@ -29,6 +30,7 @@ class RedisConnector:
         self.external_group_sync = RedisConnectorExternalGroupSync(
             tenant_id, cc_pair_id, self.redis
         )
+        self.change_index = RedisConnectorChangeIndex(tenant_id, cc_pair_id, self.redis)
 
     @staticmethod
     def get_id_from_fence_key(key: str) -> str | None:
@@ -0,0 +1,152 @@
+import hashlib
+import json
+from typing import cast
+
+import redis
+from pydantic import BaseModel
+
+from onyx.connectors.interfaces import ChangeDetectionIndexInterface
+from onyx.connectors.models import Document
+
+
+class ChangeIndexEntry(BaseModel):
+    document_id: str
+    source_version: str | None = None
+    content_hash: str | None = None
+
+
+def compute_document_content_hash(document: Document) -> str:
+    """Stable hash over everything in a Document that ends up in the index.
+    Fields that change without the content changing (doc_updated_at, chunk_count,
+    etc.) are deliberately left out."""
+    hasher = hashlib.sha256()
+    hasher.update(
+        document.model_dump_json(
+            include={
+                "sections",
+                "semantic_identifier",
+                "title",
+                "metadata",
+                "primary_owners",
+                "secondary_owners",
+                "doc_metadata",
+            }
+        ).encode("utf-8")
+    )
+
+    # sets don't serialize in a stable order, so handle permissions separately
+    if document.external_access is not None:
+        hasher.update(
+            json.dumps(
+                [
+                    sorted(document.external_access.external_user_emails),
+                    sorted(document.external_access.external_user_group_ids),
+                    document.external_access.is_public,
+                ]
+            ).encode("utf-8")
+        )
+
+    return hasher.hexdigest()
+
+
+class RedisConnectorChangeIndex(ChangeDetectionIndexInterface):
+    """Manages the per cc-pair change detection index, used by connectors to skip
+    downloading documents that haven't changed since they were last indexed.
+    Should only be accessed through RedisConnector.
+
+    Stored as a single redis hash of document id -> json encoded ChangeIndexEntry."""
+
+    PREFIX = "connectorchangeindex"
+
+    # keeps a single HMGET from blocking redis for too long
+    HMGET_BATCH_SIZE = 1000
+
+    # refreshed on every write, so only cc-pairs that stop indexing entirely expire
+    TTL = 30 * 24 * 60 * 60  # 30 days
+
+    def __init__(self, tenant_id: str, id: int, redis: redis.Redis) -> None:
+        self.tenant_id: str = tenant_id
+        self.id: int = id
+        self.redis = redis
+
+        # hmget, expire and pipelines don't automatically add the tenant_id prefix,
+        # so the key carries it for every operation to hit the same hash
+        self.index_key: str = f"{tenant_id}:{self.PREFIX}_{id}"
+
+    def get_entries(self, document_ids: list[str]) -> dict[str, ChangeIndexEntry]:
+        if not document_ids:
+            return {}
+
+        raw_values: list[bytes | None] = []
+        for i in range(0, len(document_ids), self.HMGET_BATCH_SIZE):
+            raw_values.extend(
+                cast(
+                    list[bytes | None],
+                    self.redis.hmget(
+                        self.index_key, document_ids[i : i + self.HMGET_BATCH_SIZE]
+                    ),
+                )
+            )
+
+        entries: dict[str, ChangeIndexEntry] = {}
+        for raw_value in raw_values:
+            if raw_value is None:
+                continue
+
+            entry = ChangeIndexEntry.model_validate_json(raw_value)
+            entries[entry.document_id] = entry
+
+        return entries
+
+    def get_source_versions(self, document_ids: list[str]) -> dict[str, str]:
+        return {
+            document_id: entry.source_version
+            for document_id, entry in self.get_entries(document_ids).items()
+            if entry.source_version is not None
+        }
+
+    def filter_unchanged_documents(self, documents: list[Document]) -> list[Document]:
+        """Returns only the documents whose content hash differs from the one
+        recorded the last time they were indexed."""
+        entries = self.get_entries([doc.id for doc in documents])
+
+        changed_documents: list[Document] = []
+        for doc in documents:
+            entry = entries.get(doc.id)
+            if (
+                entry is not None
+                and entry.content_hash is not None
+                and entry.content_hash == compute_document_content_hash(doc)
+            ):
+                continue
+            changed_documents.append(doc)
+
+        return changed_documents
+
+    def record(self, documents: list[Document]) -> None:
+        """Call only after the documents have been successfully indexed."""
+        if not documents:
+            return
+
+        mapping = {
+            doc.id: ChangeIndexEntry(
+                document_id=doc.id,
+                source_version=doc.source_version,
+                content_hash=compute_document_content_hash(doc),
+            ).model_dump_json()
+            for doc in documents
+        }
+
+        pipe = self.redis.pipeline()
+        pipe.hset(self.index_key, mapping=mapping)
+        pipe.expire(self.index_key, self.TTL)
+        pipe.execute()
+
+    def remove(self, document_ids: list[str]) -> None:
+        if not document_ids:
+            return
+
+        self.redis.hdel(self.index_key, *document_ids)
+
+    def reset(self) -> None:
+        self.redis.delete(self.index_key)
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from onyx.redis.redis_pool import get_raw_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_SUBSCRIBER_POLL_SECONDS = 1.0
+_SUBSCRIBER_RETRY_SECONDS = 5.0
+
+_publish_executor: ThreadPoolExecutor | None = None
+_publish_executor_pid: int | None = None
+_publish_executor_lock = threading.Lock()
+
+
+def _get_publish_executor() -> ThreadPoolExecutor:
+    global _publish_executor, _publish_executor_pid
+    with _publish_executor_lock:
+        # after a fork the worker thread only exists in the parent
+        if _publish_executor is None or _publish_executor_pid != os.getpid():
+            _publish_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="redis-invalidation-publisher"
+            )
+            _publish_executor_pid = os.getpid()
+        return _publish_executor
+
+
+def _publish_to_redis(channel: str, message: str) -> None:
+    try:
+        get_raw_redis_client().publish(channel, message)
+    except Exception:
+        logger.exception(f"Failed to publish invalidation to {channel}")
+
+
+def publish_invalidation(channel: str, message: str) -> None:
+    """Publishes an invalidation message without waiting for Redis, so that it can be
+    called from commit hooks (including the ones of async sessions). A single worker
+    keeps the messages in order."""
+    _get_publish_executor().submit(_publish_to_redis, channel, message)
+
+
+class RedisInvalidationSubscriber:
+    """Listens for the invalidation messages of an in-process cache on a Redis channel
+    in a background thread. on_subscribe is called every time the subscription is
+    (re)established since messages may have been missed, caches should be cleared
+    there. Caches must only serve entries while subscribed is set."""
+
+    def __init__(
+        self,
+        channel: str,
+        handle_message: Callable[[bytes | str], None],
+        on_subscribe: Callable[[], None],
+    ) -> None:
+        self.channel = channel
+        self.subscribed = threading.Event()
+        self._handle_message = handle_message
+        self._on_subscribe = on_subscribe
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # after a fork the thread only exists in the parent
+            if self._pid == os.getpid():
+                return
+            self.subscribed.clear()
+            threading.Thread(
+                target=self._run, name=f"{self.channel}-subscriber", daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            pubsub = get_raw_redis_client().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                self._on_subscribe()
+                self.subscribed.set()
+                while True:
+                    message = pubsub.get_message(timeout=_SUBSCRIBER_POLL_SECONDS)
+                    if message is not None and message["type"] == "message":
+                        self._handle_message(message["data"])
+            except Exception:
+                logger.exception(f"Invalidation subscriber for {self.channel} failed")
+            finally:
+                self.subscribed.clear()
+                pubsub.close()
+
+            time.sleep(_SUBSCRIBER_RETRY_SECONDS)
@@ -129,6 +129,10 @@ class TenantRedis(redis.Redis):
             "hdel",
             "ttl",
             "pttl",
+            "zadd",
+            "zcard",
+            "zpopmin",
+            "zremrangebyscore",
         ]  # Regular methods that need simple prefixing
 
         if item == "scan_iter" or item == "sscan_iter":
@@ -0,0 +1,43 @@
+from enum import Enum
+
+import redis
+from pydantic import BaseModel
+
+from onyx.configs.constants import CELERY_USER_FILE_PROCESSING_LOCK_TIMEOUT
+
+
+class UserFileProcessingStage(str, Enum):
+    EXTRACTING = "extracting"
+    INDEXING = "indexing"
+
+
+class UserFileProgress(BaseModel):
+    stage: UserFileProcessingStage
+    processed_units: int = 0
+    # e.g. the number of pages of a PDF, None if not known up front
+    total_units: int | None = None
+
+
+class RedisUserFileProgress:
+    """Progress of a user file while it is being processed, so that the UI can show
+    more than PROCESSING for large files."""
+
+    PREFIX = "userfileprogress"
+    # matches the processing lock, so progress never outlives an abandoned task
+    TTL = CELERY_USER_FILE_PROCESSING_LOCK_TIMEOUT
+
+    def __init__(self, user_file_id: str, redis: redis.Redis) -> None:
+        self.redis = redis
+        self.key = f"{self.PREFIX}_{user_file_id}"
+
+    def set(self, progress: UserFileProgress) -> None:
+        self.redis.set(self.key, progress.model_dump_json(), ex=self.TTL)
+
+    def get(self) -> UserFileProgress | None:
+        raw = self.redis.get(self.key)
+        if raw is None:
+            return None
+        return UserFileProgress.model_validate_json(raw)  # type: ignore[arg-type]
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
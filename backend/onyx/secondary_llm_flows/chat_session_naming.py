@@ -29,7 +29,7 @@ def get_renamed_conversation_name(
         language_hint_or_empty=language_hint, chat_history=history_str
     )
 
-    new_name_raw = llm_response_to_string(llm.invoke(prompt))
+    new_name_raw = llm_response_to_string(llm.invoke(prompt, use_response_cache=True))
 
     new_name = new_name_raw.strip().strip('"')
 
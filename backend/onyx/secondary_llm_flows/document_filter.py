@@ -1,21 +1,58 @@
 import json
 import re
+from collections.abc import Callable
+
+from pydantic import BaseModel
 
 from onyx.context.search.models import ContextExpansionType
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLM
 from onyx.llm.models import ReasoningEffort
+from onyx.prompts.search_prompts import BATCH_DOCUMENT_CONTEXT_SECTION_TEMPLATE
+from onyx.prompts.search_prompts import BATCH_DOCUMENT_CONTEXT_SELECTION_PROMPT
 from onyx.prompts.search_prompts import DOCUMENT_CONTEXT_SELECTION_PROMPT
 from onyx.prompts.search_prompts import DOCUMENT_SELECTION_PROMPT
+from onyx.tools.tool_implementations.search.constants import (
+    MAX_CHARS_PER_RELEVANCE_PROMPT,
+)
 from onyx.tools.tool_implementations.search.constants import (
     MAX_CHUNKS_FOR_RELEVANCE,
 )
+from onyx.tools.tool_implementations.search.constants import (
+    MAX_SECTIONS_PER_RELEVANCE_PROMPT,
+)
+from onyx.tools.tool_implementations.search.constants import (
+    RERANKER_ADJACENT_SECTIONS_THRESHOLD,
+)
+from onyx.tools.tool_implementations.search.constants import (
+    RERANKER_NOT_RELEVANT_THRESHOLD,
+)
+from onyx.tools.tool_implementations.search.constants import (
+    SECTION_RELEVANCE_TIMEOUT,
+)
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
 
+# Map situation number in the context selection prompts to ContextExpansionType
+_SITUATION_TO_EXPANSION_TYPE = {
+    1: ContextExpansionType.NOT_RELEVANT,
+    2: ContextExpansionType.MAIN_SECTION_ONLY,
+    3: ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+    4: ContextExpansionType.FULL_DOCUMENT,
+}
+
+
+class SectionRelevanceInput(BaseModel):
+    document_title: str
+    section_text: str
+    section_above_text: str | None = None
+    section_below_text: str | None = None
+
+
 def select_chunks_for_relevance(
     section: InferenceSection,
     max_chunks: int = MAX_CHUNKS_FOR_RELEVANCE,
@@ -134,14 +171,7 @@ def classify_section_relevance(
             numbers = re.findall(r"\b[1-4]\b", llm_response)
             if numbers:
                 situation = int(numbers[-1])
-                # Map situation number to ContextExpansionType
-                situation_to_type = {
-                    1: ContextExpansionType.NOT_RELEVANT,
-                    2: ContextExpansionType.MAIN_SECTION_ONLY,
-                    3: ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
-                    4: ContextExpansionType.FULL_DOCUMENT,
-                }
-                classification = situation_to_type.get(
+                classification = _SITUATION_TO_EXPANSION_TYPE.get(
                     situation, default_classification
                 )
             else:
@@ -154,17 +184,230 @@ def classify_section_relevance(
         logger.error(f"Error calling LLM for context selection: {e}")
         classification = default_classification
 
+    return _restrict_classification_without_context(
+        classification=classification,
+        section_above_text=section_above_text,
+        section_below_text=section_below_text,
+    )
+
+
+def _restrict_classification_without_context(
+    classification: ContextExpansionType,
+    section_above_text: str | None,
+    section_below_text: str | None,
+) -> ContextExpansionType:
     # To save some effort down the line, if there is nothing surrounding, don't allow a classification of adjacent or whole doc
     if (
         not section_above_text
         and not section_below_text
         and classification != ContextExpansionType.NOT_RELEVANT
     ):
-        classification = ContextExpansionType.MAIN_SECTION_ONLY
+        return ContextExpansionType.MAIN_SECTION_ONLY
 
     return classification
 
 
+def _format_section_for_batch_prompt(
+    section_id: int, section: SectionRelevanceInput
+) -> str:
+    return BATCH_DOCUMENT_CONTEXT_SECTION_TEMPLATE.format(
+        section_id=section_id,
+        document_title=section.document_title,
+        section_above=section.section_above_text or "N/A",
+        main_section=section.section_text,
+        section_below=section.section_below_text or "N/A",
+    )
+
+
+def _split_into_relevance_batches(
+    formatted_sections: list[str],
+    max_sections_per_prompt: int,
+    max_chars_per_prompt: int,
+) -> list[list[int]]:
+    """Group section indices into batches bounded by both section count and prompt size.
+    A single section larger than the char budget still gets a batch of its own."""
+    batches: list[list[int]] = []
+    current_batch: list[int] = []
+    current_chars = 0
+    for ind, formatted_section in enumerate(formatted_sections):
+        if current_batch and (
+            len(current_batch) >= max_sections_per_prompt
+            or current_chars + len(formatted_section) > max_chars_per_prompt
+        ):
+            batches.append(current_batch)
+            current_batch = []
+            current_chars = 0
+
+        current_batch.append(ind)
+        current_chars += len(formatted_section)
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
+
+
+def _classify_relevance_batch(
+    section_ids: list[int],
+    formatted_sections: list[str],
+    user_query: str,
+    llm: LLM,
+    timeout: int,
+) -> dict[int, ContextExpansionType]:
+    prompt_text = BATCH_DOCUMENT_CONTEXT_SELECTION_PROMPT.format(
+        formatted_sections="\n\n".join(
+            formatted_sections[section_id] for section_id in section_ids
+        ),
+        user_query=user_query,
+    )
+
+    response = llm.invoke(
+        prompt=prompt_text,
+        reasoning_effort=ReasoningEffort.OFF,
+        timeout_override=timeout,
+    )
+    llm_response = response.choice.message.content
+    if not llm_response:
+        logger.warning("LLM returned empty response for batched context selection")
+        return {}
+
+    # Later lines win in case the model revises an answer while reasoning out loud
+    classifications: dict[int, ContextExpansionType] = {}
+    for section_id_str, situation_str in re.findall(
+        r"(\d+)\s*[:=\-]\s*([1-4])\b", llm_response
+    ):
+        section_id = int(section_id_str)
+        if section_id in section_ids:
+            classifications[section_id] = _SITUATION_TO_EXPANSION_TYPE[
+                int(situation_str)
+            ]
+
+    if len(classifications) < len(section_ids):
+        logger.warning(
+            f"Could only parse {len(classifications)} of {len(section_ids)} "
+            f"classifications from LLM response: {llm_response}"
+        )
+
+    return classifications
+
+
+def _classification_from_reranker_score(score: float) -> ContextExpansionType:
+    if score < RERANKER_NOT_RELEVANT_THRESHOLD:
+        return ContextExpansionType.NOT_RELEVANT
+    if score >= RERANKER_ADJACENT_SECTIONS_THRESHOLD:
+        return ContextExpansionType.INCLUDE_ADJACENT_SECTIONS
+    return ContextExpansionType.MAIN_SECTION_ONLY
+
+
+def _classify_relevance_with_reranker(
+    section_ids: list[int],
+    sections: list[SectionRelevanceInput],
+    user_query: str,
+    reranker: Callable[[str, list[str]], list[float]],
+) -> dict[int, ContextExpansionType]:
+    try:
+        scores = reranker(
+            user_query,
+            [sections[section_id].section_text for section_id in section_ids],
+        )
+    except Exception as e:
+        logger.warning(f"Reranker fallback for context selection failed: {e}")
+        return {}
+
+    return {
+        section_id: _classification_from_reranker_score(score)
+        for section_id, score in zip(section_ids, scores)
+    }
+
+
+def classify_sections_relevance(
+    sections: list[SectionRelevanceInput],
+    user_query: str,
+    llm: LLM,
+    max_sections_per_prompt: int = MAX_SECTIONS_PER_RELEVANCE_PROMPT,
+    max_chars_per_prompt: int = MAX_CHARS_PER_RELEVANCE_PROMPT,
+    timeout: int = SECTION_RELEVANCE_TIMEOUT,
+    reranker: Callable[[str, list[str]], list[float]] | None = None,
+) -> list[ContextExpansionType]:
+    """Batched version of classify_section_relevance. Classifies all sections with as
+    few LLM calls as possible, each bounded by max_sections_per_prompt and
+    max_chars_per_prompt. The batches are run in parallel.
+
+    Sections whose batch fails, times out or whose classification can't be parsed are
+    classified from their reranker score instead. Sections without a reranker score
+    get MAIN_SECTION_ONLY, the same default as the single section version.
+
+    Args:
+        sections: The sections to classify, with the text of their adjacent chunks
+        user_query: The user's search query
+        llm: LLM instance to use for classification
+        max_sections_per_prompt: Maximum number of sections classified per LLM call
+        max_chars_per_prompt: Approximate maximum size of the sections in one LLM call
+        timeout: Timeout in seconds for each LLM call
+        reranker: Scores the relevance of passages to a query, e.g.
+            RerankingModel.predict. Only called for the sections the LLM didn't classify
+
+    Returns:
+        ContextExpansionType for each section, in the same order as `sections`
+    """
+    if not sections:
+        return []
+
+    formatted_sections = [
+        _format_section_for_batch_prompt(section_id, section)
+        for section_id, section in enumerate(sections)
+    ]
+    batches = _split_into_relevance_batches(
+        formatted_sections=formatted_sections,
+        max_sections_per_prompt=max_sections_per_prompt,
+        max_chars_per_prompt=max_chars_per_prompt,
+    )
+
+    batch_results: list[dict[int, ContextExpansionType] | None] = (
+        run_functions_tuples_in_parallel(
+            [
+                (
+                    _classify_relevance_batch,
+                    (batch, formatted_sections, user_query, llm, timeout),
+                )
+                for batch in batches
+            ],
+            allow_failures=True,
+        )
+    )
+
+    classifications: dict[int, ContextExpansionType] = {}
+    for batch_result in batch_results:
+        if batch_result is not None:
+            classifications.update(batch_result)
+
+    unclassified_section_ids = [
+        section_id
+        for section_id in range(len(sections))
+        if section_id not in classifications
+    ]
+    if unclassified_section_ids and reranker is not None:
+        classifications.update(
+            _classify_relevance_with_reranker(
+                section_ids=unclassified_section_ids,
+                sections=sections,
+                user_query=user_query,
+                reranker=reranker,
+            )
+        )
+
+    return [
+        _restrict_classification_without_context(
+            classification=classifications.get(
+                section_id, ContextExpansionType.MAIN_SECTION_ONLY
+            ),
+            section_above_text=section.section_above_text,
+            section_below_text=section.section_below_text,
+        )
+        for section_id, section in enumerate(sections)
+    ]
+
+
 def select_sections_for_expansion(
     sections: list[InferenceSection],
     user_query: str,
@@ -135,7 +135,11 @@ def semantic_query_rephrase(
     messages.append(final_user_msg)
 
     # Call LLM and return result
-    response = llm.invoke(prompt=messages, reasoning_effort=ReasoningEffort.OFF)
+    response = llm.invoke(
+        prompt=messages,
+        reasoning_effort=ReasoningEffort.OFF,
+        use_response_cache=True,
+    )
 
     final_query = response.choice.message.content
 
@@ -212,7 +216,11 @@ def keyword_query_expansion(
     messages.append(final_user_msg)
 
     # Call LLM and return result
-    response = llm.invoke(prompt=messages, reasoning_effort=ReasoningEffort.OFF)
+    response = llm.invoke(
+        prompt=messages,
+        reasoning_effort=ReasoningEffort.OFF,
+        use_response_cache=True,
+    )
     content = response.choice.message.content
 
     # Parse the response - each line is a separate keyword query
@@ -228,7 +236,9 @@ def llm_multilingual_query_expansion(query: str, language: str) -> str:
 
     prompt = LANGUAGE_REPHRASE_PROMPT.format(query=query, target_language=language)
     model_output = llm_response_to_string(
-        llm.invoke(prompt, reasoning_effort=ReasoningEffort.OFF)
+        llm.invoke(
+            prompt, reasoning_effort=ReasoningEffort.OFF, use_response_cache=True
+        )
     )
     logger.debug(model_output)
 
@@ -9,6 +9,7 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.preprocessing.access_filters import (
     build_access_filters_for_user,
 )
+from onyx.db.document import fetch_chunk_count_for_document
 from onyx.db.engine.sql_engine import get_session
 from onyx.db.models import User
 from onyx.db.search_settings import get_current_search_settings
@@ -35,8 +36,17 @@ def get_document_info(
     document_index = get_default_document_index(search_settings, None)
 
     user_acl_filters = build_access_filters_for_user(user, db_session)
+    # with a known chunk count the chunks are fetched by id instead of visiting the
+    # whole index for the document
+    chunk_count = fetch_chunk_count_for_document(document_id, db_session)
     inference_chunks = document_index.id_based_retrieval(
-        chunk_requests=[VespaChunkRequest(document_id=document_id)],
+        chunk_requests=[
+            VespaChunkRequest(
+                document_id=document_id,
+                min_chunk_ind=0 if chunk_count else None,
+                max_chunk_ind=chunk_count - 1 if chunk_count else None,
+            )
+        ],
         filters=IndexFilters(access_control_list=user_acl_filters),
     )
 
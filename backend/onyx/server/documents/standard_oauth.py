@@ -15,14 +15,15 @@ from sqlalchemy.orm import Session
 from onyx.auth.users import current_user
 from onyx.configs.app_configs import WEB_DOMAIN
 from onyx.configs.constants import DocumentSource
+from onyx.connectors.factory import identify_connector_class
 from onyx.connectors.interfaces import OAuthConnector
+from onyx.connectors.registry import OAUTH_CONNECTOR_SOURCES
 from onyx.db.credentials import create_credential
 from onyx.db.engine.sql_engine import get_session
 from onyx.db.models import User
 from onyx.redis.redis_pool import get_redis_client
 from onyx.server.documents.models import CredentialBase
 from onyx.utils.logger import setup_logger
-from onyx.utils.subclasses import find_all_subclasses_in_package
 from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
@@ -34,27 +35,13 @@ _OAUTH_STATE_EXPIRATION_SECONDS = 10 * 60  # 10 minutes
 _DESIRED_RETURN_URL_KEY = "desired_return_url"
 _ADDITIONAL_KWARGS_KEY = "additional_kwargs"
 
-# Cache for OAuth connectors, populated at module load time
-_OAUTH_CONNECTORS: dict[DocumentSource, type[OAuthConnector]] = {}
-
 
 def _discover_oauth_connectors() -> dict[DocumentSource, type[OAuthConnector]]:
-    """Walk through the connectors package to find all OAuthConnector implementations"""
-    global _OAUTH_CONNECTORS
-    if _OAUTH_CONNECTORS:  # Return cached connectors if already discovered
-        return _OAUTH_CONNECTORS
-
-    # Import submodules using package-based discovery to avoid sys.path mutations
-    oauth_connectors = find_all_subclasses_in_package(
-        cast(type[OAuthConnector], OAuthConnector), "onyx.connectors"
-    )
-
-    _OAUTH_CONNECTORS = {cls.oauth_id(): cls for cls in oauth_connectors}
-    return _OAUTH_CONNECTORS
-
-
-# Discover OAuth connectors at module load time
-_discover_oauth_connectors()
+    """Loads the connectors that implement OAuthConnector"""
+    return {
+        source: cast(type[OAuthConnector], identify_connector_class(source))
+        for source in OAUTH_CONNECTOR_SOURCES
+    }
 
 
 def _get_additional_kwargs(
@@ -1,10 +1,7 @@
 import datetime
 from enum import Enum
-from typing import Any
 from typing import List
-from typing import NotRequired
 from typing import Optional
-from typing import TypedDict
 
 from mcp.types import Tool as MCPLibTool
 from pydantic import BaseModel
@@ -17,7 +14,7 @@ from onyx.db.enums import MCPServerStatus
 from onyx.db.enums import MCPTransport
 
 
-# This should be updated along with MCPConnectionData
+# This should be updated along with onyx.db.models.MCPConnectionData
 class MCPOAuthKeys(str, Enum):
     """MCP OAuth keys types"""
 
@@ -26,25 +23,6 @@ class MCPOAuthKeys(str, Enum):
     METADATA = "metadata"
 
 
-class MCPConnectionData(TypedDict):
-    """TypedDict to allow use as a type hint for a JSONB column
-    in Postgres"""
-
-    headers: dict[str, str]
-    header_substitutions: NotRequired[dict[str, str]]
-
-    # For OAuth only
-    # Note: Update MCPOAuthKeys if necessary when modifying these
-    # Unfortunately we can't use the actual models here because basemodels aren't compatible
-    # with SQLAlchemy
-    client_info: NotRequired[dict[str, Any]]  # OAuthClientInformationFull
-    tokens: NotRequired[dict[str, Any]]  # OAuthToken
-    metadata: NotRequired[dict[str, Any]]  # OAuthClientMetadata
-
-    # the actual models are defined in mcp.shared.auth
-    # from mcp.shared.auth import OAuthClientInformationFull, OAuthClientMetadata, OAuthToken
-
-
 class MCPAuthTemplate(BaseModel):
     """Template for per-user authentication configuration"""
 
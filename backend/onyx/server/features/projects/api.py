@@ -26,6 +26,8 @@ from onyx.db.models import UserProject
 from onyx.db.persona import get_personas_by_ids
 from onyx.db.projects import get_project_token_count
 from onyx.db.projects import upload_files_to_user_files_with_indexing
+from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_user_file_progress import RedisUserFileProgress
 from onyx.server.features.projects.models import CategorizedFilesSnapshot
 from onyx.server.features.projects.models import ChatSessionRequest
 from onyx.server.features.projects.models import TokenCountResponse
@@ -40,6 +42,15 @@ logger = setup_logger()
 router = APIRouter(prefix="/user/projects")
 
 
+def _user_file_status_snapshot(user_file: UserFile) -> UserFileSnapshot:
+    snapshot = UserFileSnapshot.from_model(user_file)
+    if user_file.status == UserFileStatus.PROCESSING:
+        snapshot.progress = RedisUserFileProgress(
+            str(user_file.id), get_redis_client()
+        ).get()
+    return snapshot
+
+
 class UserFileDeleteResult(BaseModel):
     has_associations: bool
     project_names: list[str] = []
@@ -457,7 +468,7 @@ def get_user_file(
     )
     if user_file is None:
         raise HTTPException(status_code=404, detail="File not found")
-    return UserFileSnapshot.from_model(user_file)
+    return _user_file_status_snapshot(user_file)
 
 
 class UserFileIdsRequest(BaseModel):
@@ -486,7 +497,7 @@ def get_user_file_statuses(
         .all()
     )
 
-    return [UserFileSnapshot.from_model(user_file) for user_file in user_files]
+    return [_user_file_status_snapshot(user_file) for user_file in user_files]
 
 
 @router.post("/{project_id}/move_chat_session")
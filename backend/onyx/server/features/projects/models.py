@@ -8,6 +8,7 @@ from onyx.db.models import UserFile
 from onyx.db.models import UserProject
 from onyx.db.projects import CategorizedFilesResult
 from onyx.file_store.models import ChatFileType
+from onyx.redis.redis_user_file_progress import UserFileProgress
 from onyx.server.query_and_chat.chat_utils import mime_type_to_chat_file_type
 from onyx.server.query_and_chat.models import ChatSessionDetails
 
@@ -26,6 +27,8 @@ class UserFileSnapshot(BaseModel):
     chat_file_type: ChatFileType
     token_count: int | None
     chunk_count: int | None
+    # only set while the file is being processed
+    progress: UserFileProgress | None = None
 
     @classmethod
     def from_model(
@@ -1,3 +1,5 @@
+import os
+from enum import Enum
 from math import ceil
 
 from fastapi import UploadFile
@@ -8,12 +10,18 @@ from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
 
+from onyx.configs.app_configs import USER_FILE_UPLOAD_MAX_PARALLEL_BYTES
+from onyx.configs.app_configs import USER_FILE_UPLOAD_MAX_PARALLELISM
 from onyx.file_processing.extract_file_text import extract_file_text
 from onyx.file_processing.extract_file_text import get_file_ext
 from onyx.file_processing.file_types import OnyxFileExtensions
 from onyx.llm.factory import get_default_llm
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import SizeBudget
 from shared_configs.configs import MULTI_TENANT
 from shared_configs.configs import SKIP_USERFILE_THRESHOLD
 from shared_configs.configs import SKIP_USERFILE_THRESHOLD_TENANT_LIST
@@ -36,6 +44,16 @@ def get_safe_filename(upload: UploadFile) -> str:
 # Guard against extremely large images
 Image.MAX_IMAGE_PIXELS = 12000 * 12000
 
+# shared by all uploads in this process, so that concurrent uploads of large files
+# don't extract all of them at once
+_UPLOAD_EXTRACTION_BUDGET = SizeBudget(USER_FILE_UPLOAD_MAX_PARALLEL_BYTES)
+
+
+class _FileCategory(str, Enum):
+    ACCEPTABLE = "acceptable"
+    NON_ACCEPTED = "non_accepted"
+    UNSUPPORTED = "unsupported"
+
 
 class CategorizedFiles(BaseModel):
     acceptable: list[UploadFile] = Field(default_factory=list)
@@ -111,6 +129,79 @@ def estimate_image_tokens_for_upload(
             pass
 
 
+def _get_upload_size(upload: UploadFile) -> int:
+    if upload.size is not None:
+        return upload.size
+    position = upload.file.tell()
+    size = upload.file.seek(0, os.SEEK_END)
+    upload.file.seek(position)
+    return size
+
+
+def _categorize_uploaded_file(
+    upload: UploadFile, tokenizer: BaseTokenizer, skip_threshold: bool
+) -> tuple[_FileCategory, int | None]:
+    """The category of the file and, if it is acceptable, its token count"""
+    filename = get_safe_filename(upload)
+    try:
+        extension = get_file_ext(filename)
+
+        # If image, estimate tokens via dedicated method first
+        if extension in OnyxFileExtensions.IMAGE_EXTENSIONS:
+            try:
+                token_count = estimate_image_tokens_for_upload(upload)
+            except (UnidentifiedImageError, OSError) as e:
+                logger.warning(f"Failed to process image file '{filename}': {str(e)}")
+                return _FileCategory.UNSUPPORTED, None
+
+            if not skip_threshold and token_count > FILE_TOKEN_COUNT_THRESHOLD:
+                return _FileCategory.NON_ACCEPTED, None
+            return _FileCategory.ACCEPTABLE, token_count
+
+        # Otherwise, handle as text/document: extract text and count tokens
+        elif extension in OnyxFileExtensions.ALL_ALLOWED_EXTENSIONS:
+            with _UPLOAD_EXTRACTION_BUDGET.reserve(_get_upload_size(upload)):
+                text_content = extract_file_text(
+                    file=upload.file,
+                    file_name=filename,
+                    break_on_unprocessable=False,
+                    extension=extension,
+                )
+
+            # Reset file pointer for subsequent upload handling
+            try:
+                upload.file.seek(0)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to reset file pointer for '{filename}': {str(e)}"
+                )
+
+            if not text_content:
+                logger.warning(f"No text content extracted from '{filename}'")
+                return _FileCategory.UNSUPPORTED, None
+
+            # no need to count past the threshold if the file is rejected anyway
+            token_count = count_tokens(
+                text_content,
+                tokenizer,
+                stop_after=None if skip_threshold else FILE_TOKEN_COUNT_THRESHOLD,
+            )
+            if not skip_threshold and token_count > FILE_TOKEN_COUNT_THRESHOLD:
+                return _FileCategory.NON_ACCEPTED, None
+            return _FileCategory.ACCEPTABLE, token_count
+
+        # If not recognized as supported types above, mark unsupported
+        logger.warning(
+            f"Unsupported file extension '{extension}' for file '{filename}'"
+        )
+        return _FileCategory.UNSUPPORTED, None
+    except Exception as e:
+        logger.warning(
+            f"Failed to process uploaded file '{filename}' (error_type={type(e).__name__}, error={str(e)})"
+        )
+        return _FileCategory.UNSUPPORTED, None
+
+
 def categorize_uploaded_files(files: list[UploadFile]) -> CategorizedFiles:
     """
     Categorize uploaded files based on text extractability and tokenized length.
@@ -120,6 +211,9 @@ def categorize_uploaded_files(files: list[UploadFile]) -> CategorizedFiles:
     - If token length > 100,000, marked as non_accepted (unless threshold skip is enabled).
     - If extension unsupported or text cannot be extracted, marked as unsupported.
     - Otherwise marked as acceptable.
+
+    Files are processed in parallel, see USER_FILE_UPLOAD_MAX_PARALLELISM and
+    USER_FILE_UPLOAD_MAX_PARALLEL_BYTES.
     """
 
     results = CategorizedFiles()
@@ -148,67 +242,24 @@ def categorize_uploaded_files(files: list[UploadFile]) -> CategorizedFiles:
         except RuntimeError as e:
             logger.warning(f"Failed to get current tenant ID: {str(e)}")
 
-    for upload in files:
-        try:
-            filename = get_safe_filename(upload)
-            extension = get_file_ext(filename)
-
-            # If image, estimate tokens via dedicated method first
-            if extension in OnyxFileExtensions.IMAGE_EXTENSIONS:
-                try:
-                    token_count = estimate_image_tokens_for_upload(upload)
-                except (UnidentifiedImageError, OSError) as e:
-                    logger.warning(
-                        f"Failed to process image file '{filename}': {str(e)}"
-                    )
-                    results.unsupported.append(filename)
-                    continue
-
-                if not skip_threshold and token_count > FILE_TOKEN_COUNT_THRESHOLD:
-                    results.non_accepted.append(filename)
-                else:
-                    results.acceptable.append(upload)
-                    results.acceptable_file_to_token_count[filename] = token_count
-                continue
-
-            # Otherwise, handle as text/document: extract text and count tokens
-            elif extension in OnyxFileExtensions.ALL_ALLOWED_EXTENSIONS:
-                text_content = extract_file_text(
-                    file=upload.file,
-                    file_name=filename,
-                    break_on_unprocessable=False,
-                    extension=extension,
-                )
-                if not text_content:
-                    logger.warning(f"No text content extracted from '{filename}'")
-                    results.unsupported.append(filename)
-                    continue
-
-                token_count = len(tokenizer.encode(text_content))
-                if not skip_threshold and token_count > FILE_TOKEN_COUNT_THRESHOLD:
-                    results.non_accepted.append(filename)
-                else:
-                    results.acceptable.append(upload)
-                    results.acceptable_file_to_token_count[filename] = token_count
-
-                # Reset file pointer for subsequent upload handling
-                try:
-                    upload.file.seek(0)
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to reset file pointer for '{filename}': {str(e)}"
-                    )
-                continue
-
-            # If not recognized as supported types above, mark unsupported
-            logger.warning(
-                f"Unsupported file extension '{extension}' for file '{filename}'"
-            )
+    categories: list[tuple[_FileCategory, int | None]] = (
+        run_functions_tuples_in_parallel(
+            [
+                (_categorize_uploaded_file, (upload, tokenizer, skip_threshold))
+                for upload in files
+            ],
+            max_workers=USER_FILE_UPLOAD_MAX_PARALLELISM,
+        )
+    )
+
+    for upload, (category, token_count) in zip(files, categories):
+        filename = get_safe_filename(upload)
+        if category == _FileCategory.ACCEPTABLE and token_count is not None:
+            results.acceptable.append(upload)
+            results.acceptable_file_to_token_count[filename] = token_count
+        elif category == _FileCategory.NON_ACCEPTED:
+            results.non_accepted.append(filename)
+        else:
             results.unsupported.append(filename)
-        except Exception as e:
-            logger.warning(
-                f"Failed to process uploaded file '{get_safe_filename(upload)}' (error_type={type(e).__name__}, error={str(e)})"
-            )
-            results.unsupported.append(get_safe_filename(upload))
 
     return results
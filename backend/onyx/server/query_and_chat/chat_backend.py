@@ -1,7 +1,9 @@
 import datetime
 import json
 import os
-from collections.abc import Generator
+import threading
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from uuid import UUID
 
@@ -24,6 +26,8 @@ from onyx.chat.process_message import stream_chat_message
 from onyx.chat.prompt_utils import get_default_base_system_prompt
 from onyx.chat.stop_signal_checker import set_fence
 from onyx.configs.app_configs import WEB_DOMAIN
+from onyx.configs.chat_configs import CHAT_STREAM_MAX_BUFFERED_PACKETS
+from onyx.configs.chat_configs import CHAT_STREAM_MAX_CONCURRENT
 from onyx.configs.chat_configs import HARD_DELETE_CHATS
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import MilestoneRecordType
@@ -89,12 +93,31 @@ from onyx.server.query_and_chat.token_limit import check_token_rate_limits
 from onyx.utils.headers import get_custom_tool_additional_request_headers
 from onyx.utils.logger import setup_logger
 from onyx.utils.telemetry import mt_cloud_telemetry
+from onyx.utils.threadpool_concurrency import iterate_in_background_thread
 from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
 router = APIRouter(prefix="/chat")
 
+_chat_stream_executor: ThreadPoolExecutor | None = None
+_chat_stream_executor_pid: int | None = None
+_chat_stream_executor_lock = threading.Lock()
+
+
+def _get_chat_stream_executor() -> ThreadPoolExecutor:
+    """Runs the chat loops of all streamed answers of this process"""
+    global _chat_stream_executor, _chat_stream_executor_pid
+    with _chat_stream_executor_lock:
+        # after a fork the worker threads only exist in the parent
+        if _chat_stream_executor is None or _chat_stream_executor_pid != os.getpid():
+            _chat_stream_executor = ThreadPoolExecutor(
+                max_workers=CHAT_STREAM_MAX_CONCURRENT,
+                thread_name_prefix="chat-stream",
+            )
+            _chat_stream_executor_pid = os.getpid()
+        return _chat_stream_executor
+
 
 def _get_available_tokens_for_persona(
     persona: Persona,
@@ -456,17 +479,24 @@ def handle_new_chat_message(
         event=MilestoneRecordType.RAN_QUERY,
     )
 
-    def stream_generator() -> Generator[str, None, None]:
+    async def stream_generator() -> AsyncGenerator[str, None]:
         try:
-            for packet in stream_chat_message(
-                new_msg_req=chat_message_req,
-                user=user,
-                litellm_additional_headers=extract_headers(
-                    request.headers, LITELLM_PASS_THROUGH_HEADERS
-                ),
-                custom_tool_additional_headers=get_custom_tool_additional_request_headers(
-                    request.headers
+            # The chat loop is blocking, it runs in a thread of the shared chat stream
+            # executor and is paused while the client is slower than the LLM instead
+            # of buffering the whole answer
+            async for packet in iterate_in_background_thread(
+                stream_chat_message(
+                    new_msg_req=chat_message_req,
+                    user=user,
+                    litellm_additional_headers=extract_headers(
+                        request.headers, LITELLM_PASS_THROUGH_HEADERS
+                    ),
+                    custom_tool_additional_headers=get_custom_tool_additional_request_headers(
+                        request.headers
+                    ),
                 ),
+                max_buffered=CHAT_STREAM_MAX_BUFFERED_PACKETS,
+                executor=_get_chat_stream_executor(),
             ):
                 yield packet
 
@@ -1,8 +1,11 @@
+import time
+from collections.abc import Callable
 from collections.abc import Sequence
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 from functools import lru_cache
+from typing import cast
 
 from dateutil import tz
 from fastapi import Depends
@@ -12,14 +15,18 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from onyx.auth.users import current_chat_accessible_user
+from onyx.configs.app_configs import TOKEN_USAGE_COUNTERS_ENABLED
+from onyx.configs.app_configs import TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.models import ChatMessage
 from onyx.db.models import ChatSession
 from onyx.db.models import TokenRateLimit
 from onyx.db.models import User
 from onyx.db.token_limit import fetch_all_global_token_rate_limits
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 from onyx.utils.variable_functionality import fetch_versioned_implementation
+from shared_configs.contextvars import get_current_tenant_id
 
 
 logger = setup_logger()
@@ -27,6 +34,15 @@ logger = setup_logger()
 
 TOKEN_BUDGET_UNIT = 1_000
 
+GLOBAL_USAGE_SCOPE = "global"
+
+_TOKEN_USAGE_KEY_PREFIX = "token_usage"
+# hash fields of the usage counters that aren't minute buckets
+_RECONCILED_AT_FIELD = "reconciled_at"
+_RECONCILED_FROM_FIELD = "reconciled_from"
+# counters that are neither read nor written for this long are rebuilt on the next check
+_TOKEN_USAGE_TTL_SECONDS = 24 * 60 * 60
+
 
 def check_token_rate_limits(
     user: User | None = Depends(current_chat_accessible_user),
@@ -46,6 +62,24 @@ def _check_token_rate_limits(_: User | None) -> None:
     _user_is_rate_limited_by_global()
 
 
+def record_token_usage(user: User | None, token_count: int) -> None:
+    """Adds the tokens of a completed chat turn to the usage counters, see
+    TOKEN_USAGE_COUNTERS_ENABLED"""
+    if not TOKEN_USAGE_COUNTERS_ENABLED or token_count <= 0:
+        return
+    if not any_rate_limit_exists():
+        return
+
+    versioned_usage_scopes = fetch_versioned_implementation(
+        "onyx.server.query_and_chat.token_limit", _fetch_usage_scopes.__name__
+    )
+    _increment_usage(versioned_usage_scopes(user), token_count)
+
+
+def _fetch_usage_scopes(_: User | None) -> list[str]:
+    return [GLOBAL_USAGE_SCOPE]
+
+
 """
 Global rate limits
 """
@@ -59,7 +93,11 @@ def _user_is_rate_limited_by_global() -> None:
 
         if global_rate_limits:
             global_cutoff_time = _get_cutoff_time(global_rate_limits)
-            global_usage = _fetch_global_usage(global_cutoff_time, db_session)
+            global_usage = fetch_usage(
+                GLOBAL_USAGE_SCOPE,
+                global_cutoff_time,
+                lambda: _fetch_global_usage(global_cutoff_time, db_session),
+            )
 
             if _is_rate_limited(global_rate_limits, global_usage):
                 raise HTTPException(
@@ -89,6 +127,108 @@ def _fetch_global_usage(
     return [(row[0], row[1]) for row in result]
 
 
+"""
+Usage counters
+
+Usage is kept per scope (the tenant, a user or a user group) in a Redis hash of
+minute buckets that is incremented when an answer is saved. The counters are rebuilt
+from the chat messages in Postgres when they are first read, every
+TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS and when a limit's window grows, which also
+corrects tokens that were saved without being counted.
+"""
+
+
+def _usage_key(scope: str) -> str:
+    # pipelines, hincrby and hgetall don't automatically add the tenant_id prefix
+    return f"{get_current_tenant_id()}:{_TOKEN_USAGE_KEY_PREFIX}:{scope}"
+
+
+def _minute(moment: datetime) -> int:
+    return int(moment.timestamp()) // 60
+
+
+def _increment_usage(scopes: Sequence[str], token_count: int) -> None:
+    minute = _minute(datetime.now(tz=timezone.utc))
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for scope in scopes:
+            pipeline.hincrby(_usage_key(scope), str(minute), token_count)
+            pipeline.expire(_usage_key(scope), _TOKEN_USAGE_TTL_SECONDS)
+        pipeline.execute()
+    except Exception:
+        # the tokens are picked up by the next reconciliation
+        logger.exception("Failed to record token usage")
+
+
+def _reconcile_usage(
+    key: str, cutoff_minute: int, usage: Sequence[tuple[datetime, int]]
+) -> None:
+    buckets: dict[str, int | float] = {
+        _RECONCILED_AT_FIELD: time.time(),
+        _RECONCILED_FROM_FIELD: cutoff_minute,
+    }
+    for time_sent, token_count in usage:
+        bucket = str(_minute(time_sent))
+        buckets[bucket] = buckets.get(bucket, 0) + (token_count or 0)
+
+    # tokens recorded between the Postgres query and this replacement are lost until
+    # the next reconciliation
+    pipeline = get_redis_client().pipeline(transaction=True)
+    pipeline.delete(key)
+    pipeline.hset(key, mapping=buckets)
+    pipeline.expire(key, _TOKEN_USAGE_TTL_SECONDS)
+    pipeline.execute()
+
+
+def fetch_usage(
+    scope: str,
+    cutoff_time: datetime,
+    fetch_usage_from_db: Callable[[], Sequence[tuple[datetime, int]]],
+) -> Sequence[tuple[datetime, int]]:
+    """
+    Fetch the usage of a scope within the cutoff time, grouped by minute. Served from
+    the usage counters if enabled, fetch_usage_from_db is only called to rebuild them.
+    """
+    if not TOKEN_USAGE_COUNTERS_ENABLED:
+        return fetch_usage_from_db()
+
+    key = _usage_key(scope)
+    cutoff_minute = _minute(cutoff_time)
+    try:
+        fields = {
+            field.decode() if isinstance(field, bytes) else field: float(value)
+            for field, value in cast(
+                dict[bytes | str, bytes | str], get_redis_client().hgetall(key)
+            ).items()
+        }
+        reconciled_at = fields.pop(_RECONCILED_AT_FIELD, 0.0)
+        reconciled_from = fields.pop(_RECONCILED_FROM_FIELD, float("inf"))
+        if (
+            time.time() - reconciled_at >= TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS
+            or cutoff_minute < reconciled_from
+        ):
+            usage = fetch_usage_from_db()
+            _reconcile_usage(key, cutoff_minute, usage)
+            return usage
+
+        expired_buckets = [bucket for bucket in fields if int(bucket) < cutoff_minute]
+        if expired_buckets:
+            pipeline = get_redis_client().pipeline(transaction=True)
+            pipeline.hdel(key, *expired_buckets)
+            # a longer window than this needs a reconciliation again
+            pipeline.hset(key, _RECONCILED_FROM_FIELD, str(cutoff_minute))
+            pipeline.execute()
+    except Exception:
+        logger.exception(f"Failed to read token usage counters for {scope}")
+        return fetch_usage_from_db()
+
+    return [
+        (datetime.fromtimestamp(int(bucket) * 60, tz=timezone.utc), int(token_count))
+        for bucket, token_count in fields.items()
+        if int(bucket) >= cutoff_minute
+    ]
+
+
 """
 Common functions
 """
@@ -123,6 +123,7 @@ def setup_onyx(
         # In integration tests, do not block API startup on warm-up
         warm_up_cross_encoder(
             search_settings.rerank_model_name,
+            local_model_backend=search_settings.rerank_local_model_backend,
             non_blocking=INTEGRATION_TESTS_MODE,
         )
 
@@ -13,6 +13,7 @@ from onyx.chat.llm_step import run_llm_step
 from onyx.chat.llm_step import run_llm_step_pkt_generator
 from onyx.chat.models import ChatMessageSimple
 from onyx.chat.models import LlmStepResult
+from onyx.configs.chat_configs import DEEP_RESEARCH_TOOL_CALL_TIMEOUT
 from onyx.configs.constants import MessageType
 from onyx.context.search.models import SearchDocsResponse
 from onyx.deep_research.dr_mock_tools import (
@@ -420,6 +421,7 @@ def run_research_agent_call(
                         next_citation_num=citation_processor.get_next_citation_number(),
                         # May be better to not do this step, hard to say, needs to be tested
                         skip_search_query_expansion=False,
+                        timeout=DEEP_RESEARCH_TOOL_CALL_TIMEOUT,
                     )
 
                     if tool_calls and not tool_responses:
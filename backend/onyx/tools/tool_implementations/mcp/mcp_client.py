@@ -5,9 +5,15 @@ This module provides a proper MCP client that follows the JSON-RPC 2.0 specifica
 and handles connection initialization, session management, and protocol communication.
 """
 
+import threading
+import time
+from collections.abc import AsyncIterator
 from collections.abc import Awaitable
 from collections.abc import Callable
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from enum import Enum
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import TypeVar
@@ -23,7 +29,12 @@ from mcp.types import TextResourceContents
 from mcp.types import Tool as MCPLibTool
 from pydantic import BaseModel
 
+from onyx.configs.tool_configs import MCP_CLIENT_SESSION_POOL_ENABLED
+from onyx.configs.tool_configs import MCP_TOOL_LIST_CACHE_TTL_SECONDS
 from onyx.db.enums import MCPTransport
+from onyx.tools.tool_implementations.mcp.mcp_session_pool import build_mcp_session_key
+from onyx.tools.tool_implementations.mcp.mcp_session_pool import get_mcp_session_pool
+from onyx.tools.tool_implementations.mcp.mcp_session_pool import SessionOpener
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_async_sync_no_cancel
 
@@ -33,6 +44,10 @@ T = TypeVar("T", covariant=True)
 
 MCPClientFunction = Callable[[ClientSession], Awaitable[T]]
 
+# session key -> (expiry, tools)
+_tool_list_cache: dict[str, tuple[float, list[MCPLibTool]]] = {}
+_tool_list_cache_lock = threading.Lock()
+
 
 class MCPMessageType(str, Enum):
     """MCP message types"""
@@ -84,49 +99,12 @@ class MCPMessage(BaseModel):
         return msg
 
 
-# TODO: in the future we should do things like manage sessions and handle errors better
-# using an abstraction like this. For now things are purely functional and we initialize
-# a new session for each tool call.
-# class MCPClient:
-#     """
-#     MCP Client implementation that properly handles the protocol lifecycle
-#     and different transport mechanisms.
-#     """
-
-#     def __init__(
-#         self,
-#         server_url: str,
-#         transport: MCPTransport = MCPTransport.STREAMABLE_HTTP,
-#         auth_token: str | None = None,
-#     ):
-#         self.server_url = server_url
-#         self.transport = transport
-#         self.auth_token = auth_token
-
-#         # Session management
-#         self.session: Optional[aiohttp.ClientSession] = None
-#         self.initialized = False
-#         self.capabilities: Dict[str, Any] = {}
-#         self.protocol_version = "2025-03-26"  # Current MCP protocol version
-#         self.session_id: str | None = None
-#         # Legacy HTTP+SSE transport support (backwards compatibility)
-#         self.legacy_post_endpoint: str | None = None
-
-#         # Message ID counter
-#         self._message_id_counter = 0
-
-#         # For stdio transport
-#         self.process: Optional[subprocess.Popen] = None
-
-
-def _create_mcp_client_function_runner(
-    function: Callable[[ClientSession], Awaitable[T]],
+def _mcp_session_opener(
     server_url: str,
     connection_headers: dict[str, str] | None = None,
     transport: MCPTransport = MCPTransport.STREAMABLE_HTTP,
     auth: OAuthClientProvider | None = None,  # TODO: maybe used this for all auth types
-    **kwargs: Any,
-) -> Callable[[], Awaitable[T]]:
+) -> SessionOpener:
     auth_headers = connection_headers or {}
     # WARNING: httpx.Auth with requires_response_body=True (as in the MCP OAuth
     # provider) forces httpx to fully read the response body. That is incompatible
@@ -140,7 +118,8 @@ def _create_mcp_client_function_runner(
         else sse_client
     )
 
-    async def run_client_function() -> T:
+    @asynccontextmanager
+    async def open_session() -> AsyncIterator[ClientSession]:
         async with client_func(
             server_url, headers=auth_headers, auth=auth_for_request
         ) as client_tuple:
@@ -153,12 +132,28 @@ def _create_mcp_client_function_runner(
                 raise ValueError(
                     f"Unexpected number of client tuple elements: {len(client_tuple)}"
                 )
-            from datetime import timedelta
 
             async with ClientSession(
                 read, write, read_timeout_seconds=timedelta(seconds=300)
             ) as session:
-                return await function(session, **kwargs)
+                yield session
+
+    return open_session
+
+
+def _create_mcp_client_function_runner(
+    function: Callable[[ClientSession], Awaitable[T]],
+    server_url: str,
+    connection_headers: dict[str, str] | None = None,
+    transport: MCPTransport = MCPTransport.STREAMABLE_HTTP,
+    auth: OAuthClientProvider | None = None,
+    **kwargs: Any,
+) -> Callable[[], Awaitable[T]]:
+    open_session = _mcp_session_opener(server_url, connection_headers, transport, auth)
+
+    async def run_client_function() -> T:
+        async with open_session() as session:
+            return await function(session, **kwargs)
 
     return run_client_function
 
@@ -182,12 +177,34 @@ def _call_mcp_client_function_sync(
     connection_headers: dict[str, str] | None = None,
     transport: MCPTransport = MCPTransport.STREAMABLE_HTTP,
     auth: OAuthClientProvider | None = None,
+    retry_on_disconnect: bool = False,
     **kwargs: Any,
 ) -> T:
-    run_client_function = _create_mcp_client_function_runner(
-        function, server_url, connection_headers, transport, auth, **kwargs
-    )
+    """Runs function with an initialized session. Sessions authenticated with headers
+    come from the session pool, OAuth providers are created per request and can start
+    an interactive flow, so those get a session of their own that is closed after the
+    call."""
     try:
+        if MCP_CLIENT_SESSION_POOL_ENABLED and auth is None:
+            return get_mcp_session_pool().run(
+                build_mcp_session_key(server_url, transport.value, connection_headers),
+                _mcp_session_opener(server_url, connection_headers, transport),
+                partial(function, **kwargs),
+                retry_on_disconnect=retry_on_disconnect,
+            )
+
+        async def initialize_and_run(session: ClientSession, **kwargs: Any) -> T:
+            await session.initialize()
+            return await function(session, **kwargs)
+
+        run_client_function = _create_mcp_client_function_runner(
+            initialize_and_run,
+            server_url,
+            connection_headers,
+            transport,
+            auth,
+            **kwargs,
+        )
         return run_async_sync_no_cancel(run_client_function())
     except Exception as e:
         logger.error(f"Failed to call MCP client function: {e}")
@@ -236,7 +253,6 @@ def process_mcp_result(call_tool_result: CallToolResult) -> str:
 
 def _call_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> MCPClientFunction[str]:
     async def call_tool(session: ClientSession) -> str:
-        await session.initialize()
         result = await session.call_tool(tool_name, arguments)
         return process_mcp_result(result)
 
@@ -277,17 +293,9 @@ async def initialize_mcp_client(
 
 
 async def _discover_mcp_tools(session: ClientSession) -> list[MCPLibTool]:
-    # 1) initialize
-    import time
-
     t1 = time.time()
-    init_result = await session.initialize()  # sends JSON-RPC "initialize"
-    logger.info(f"Initialized with server: {init_result.serverInfo}")
-    logger.info(f"Initialized with server time: {time.time() - t1}")
-    # 2) tools/list
-    t2 = time.time()
     tools_response = await session.list_tools()  # sends JSON-RPC "tools/list"
-    logger.info(f"Listed tools with server time: {time.time() - t2}")
+    logger.info(f"Listed tools with server time: {time.time() - t1}")
     return tools_response.tools
 
 
@@ -299,15 +307,40 @@ def discover_mcp_tools(
 ) -> list[MCPLibTool]:
     """
     Synchronous wrapper for discovering MCP tools.
+    Tool lists of servers using pooled sessions are cached for
+    MCP_TOOL_LIST_CACHE_TTL_SECONDS.
     """
-    return _call_mcp_client_function_sync(
+    use_cache = MCP_CLIENT_SESSION_POOL_ENABLED and auth is None
+    cache_key = build_mcp_session_key(server_url, transport.value, connection_headers)
+    if use_cache:
+        with _tool_list_cache_lock:
+            cached = _tool_list_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+
+    tools = _call_mcp_client_function_sync(
         _discover_mcp_tools,
         server_url,
         connection_headers,
         transport,
         auth,
+        retry_on_disconnect=True,
     )
 
+    if use_cache:
+        now = time.monotonic()
+        with _tool_list_cache_lock:
+            for key in [
+                k for k, (expiry, _) in _tool_list_cache.items() if expiry <= now
+            ]:
+                del _tool_list_cache[key]
+            _tool_list_cache[cache_key] = (
+                now + MCP_TOOL_LIST_CACHE_TTL_SECONDS,
+                list(tools),
+            )
+
+    return tools
+
 
 async def _discover_mcp_resources(session: ClientSession) -> ListResourcesResult:
     return await session.list_resources()
@@ -329,4 +362,5 @@ def discover_mcp_resources_sync(
         connection_headers,
         MCPTransport(transport),
         auth,
+        retry_on_disconnect=True,
     )
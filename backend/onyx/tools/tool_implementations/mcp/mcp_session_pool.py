@@ -0,0 +1,312 @@
+"""
+Pool of long-lived MCP client sessions.
+
+Every pooled session is opened and initialized once and then reused by all calls for
+the same server and credentials. The transport and ClientSession context managers
+have to be entered and exited by the same task, so each session is owned by a task
+that keeps them open until the session is closed, and all sessions live on a single
+event loop running in a background thread. Sync callers hand their coroutines over
+to that loop.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Coroutine
+from contextlib import AbstractAsyncContextManager
+from typing import Any
+from typing import TypeVar
+
+import anyio
+import httpx
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from onyx.configs.tool_configs import MCP_CLIENT_SESSION_HEALTH_CHECK_INTERVAL_SECONDS
+from onyx.configs.tool_configs import MCP_CLIENT_SESSION_IDLE_TIMEOUT_SECONDS
+from onyx.configs.tool_configs import MCP_CLIENT_SESSION_POOL_MAX_SIZE
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+SessionOpener = Callable[[], AbstractAsyncContextManager[ClientSession]]
+
+# Error code the streamable HTTP transport reports when the server dropped the session
+_SESSION_TERMINATED = 32600
+_PING_TIMEOUT_SECONDS = 10
+_CLOSE_TIMEOUT_SECONDS = 5
+
+
+def build_mcp_session_key(
+    server_url: str, transport: str, connection_headers: dict[str, str] | None
+) -> str:
+    """Sessions are only shared between calls of the same tenant that use the same
+    server and credentials. The headers are hashed so that no secrets are kept
+    around in the key."""
+    payload = json.dumps(
+        [get_current_tenant_id(), server_url, transport, connection_headers or {}],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_disconnect(e: BaseException) -> bool:
+    if isinstance(e, McpError):
+        return e.error.code in (CONNECTION_CLOSED, _SESSION_TERMINATED)
+    return isinstance(
+        e,
+        (
+            anyio.ClosedResourceError,
+            anyio.BrokenResourceError,
+            anyio.EndOfStream,
+            httpx.TransportError,
+        ),
+    )
+
+
+class _PooledSession:
+    def __init__(self, key: str, open_session: SessionOpener) -> None:
+        self.key = key
+        self.session: ClientSession | None = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+        self._open_session = open_session
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not self._closing.is_set()
+        )
+
+    async def open(self) -> None:
+        # a fresh context so that the long-lived owner task doesn't hold on to the
+        # context of whichever call happened to open the session
+        self._task = asyncio.get_running_loop().create_task(
+            self._own_session(), context=contextvars.Context()
+        )
+        await self._ready.wait()
+        if self.session is None:
+            raise self._error or RuntimeError("MCP session closed during initialize")
+
+    async def _own_session(self) -> None:
+        try:
+            async with self._open_session() as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except BaseException as e:
+            # includes the cancellation of this task when the transport fails
+            self._error = e
+            if self.session is not None:
+                logger.info(f"Pooled MCP session closed: {e!r}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self) -> bool:
+        if not self.is_alive or self.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), _PING_TIMEOUT_SECONDS)
+            return True
+        except Exception as e:
+            logger.info(f"Pooled MCP session failed its health check: {e!r}")
+            return False
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), _CLOSE_TIMEOUT_SECONDS)
+        except Exception:
+            self._task.cancel()
+
+
+class MCPSessionPool:
+    """Keeps one initialized MCP session per key. Sessions that have been idle for
+    longer than the idle timeout are closed, sessions that have been idle for longer
+    than the health check interval are pinged before being handed out again and are
+    reopened if the ping fails."""
+
+    def __init__(
+        self,
+        idle_timeout: float = MCP_CLIENT_SESSION_IDLE_TIMEOUT_SECONDS,
+        health_check_interval: float = MCP_CLIENT_SESSION_HEALTH_CHECK_INTERVAL_SECONDS,
+        max_size: int = MCP_CLIENT_SESSION_POOL_MAX_SIZE,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.max_size = max_size
+
+        # only touched from the pool's event loop
+        self._sessions: dict[str, _PooledSession] = {}
+        self._key_locks: dict[str, asyncio.Lock] = {}
+
+        self._loop_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_pid: int | None = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            # after a fork the loop thread only exists in the parent
+            if self._loop is None or self._loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="mcp-session-pool", daemon=True
+                ).start()
+                self._sessions = {}
+                self._key_locks = {}
+                self._loop = loop
+                self._loop_pid = os.getpid()
+                asyncio.run_coroutine_threadsafe(self._evict_idle_sessions(), loop)
+
+            return self._loop
+
+    def _run_on_loop(self, coro: Coroutine[Any, Any, T]) -> T:
+        context = contextvars.copy_context()
+
+        async def run_in_caller_context() -> T:
+            return await asyncio.get_running_loop().create_task(coro, context=context)
+
+        future: concurrent.futures.Future[T] = asyncio.run_coroutine_threadsafe(
+            run_in_caller_context(), self._get_loop()
+        )
+        return future.result()
+
+    def run(
+        self,
+        key: str,
+        open_session: SessionOpener,
+        function: Callable[[ClientSession], Awaitable[T]],
+        retry_on_disconnect: bool = False,
+    ) -> T:
+        """Runs function with the pooled session for key, opening the session with
+        open_session if there is none. If the connection turns out to be gone the
+        session is dropped, and the call is retried once on a new session if it is
+        safe to repeat it."""
+        return self._run_on_loop(
+            self._run(key, open_session, function, retry_on_disconnect)
+        )
+
+    def close_all(self) -> None:
+        if self._loop is None or self._loop_pid != os.getpid():
+            return
+        self._run_on_loop(self._close_all())
+
+    async def _run(
+        self,
+        key: str,
+        open_session: SessionOpener,
+        function: Callable[[ClientSession], Awaitable[T]],
+        retry_on_disconnect: bool,
+    ) -> T:
+        pooled = await self._acquire(key, open_session)
+        try:
+            assert pooled.session is not None
+            return await function(pooled.session)
+        except Exception as e:
+            if not _is_disconnect(e) and pooled.is_alive:
+                raise
+            logger.info(f"Pooled MCP session was disconnected: {e!r}")
+            await self._discard(pooled)
+            if not retry_on_disconnect:
+                raise
+        finally:
+            self._release(pooled)
+
+        pooled = await self._acquire(key, open_session)
+        try:
+            assert pooled.session is not None
+            return await function(pooled.session)
+        finally:
+            self._release(pooled)
+
+    async def _acquire(self, key: str, open_session: SessionOpener) -> _PooledSession:
+        async with self._key_locks.setdefault(key, asyncio.Lock()):
+            pooled = self._sessions.get(key)
+            if (
+                pooled is not None
+                and time.monotonic() - pooled.last_used > self.health_check_interval
+                and pooled.in_flight == 0
+                and not await pooled.ping()
+            ):
+                await self._discard(pooled)
+                pooled = None
+
+            if pooled is None or not pooled.is_alive:
+                if pooled is not None:
+                    await self._discard(pooled)
+                await self._make_room()
+                pooled = _PooledSession(key, open_session)
+                await pooled.open()
+                self._sessions[key] = pooled
+
+            pooled.in_flight += 1
+            pooled.last_used = time.monotonic()
+            return pooled
+
+    def _release(self, pooled: _PooledSession) -> None:
+        pooled.in_flight -= 1
+        pooled.last_used = time.monotonic()
+
+    async def _discard(self, pooled: _PooledSession) -> None:
+        if self._sessions.get(pooled.key) is pooled:
+            del self._sessions[pooled.key]
+        await pooled.close()
+
+    async def _make_room(self) -> None:
+        """Closes the least recently used idle session if the pool is full. Sessions
+        that are in use are never closed, so the pool can go over its size while all
+        sessions are busy."""
+        if len(self._sessions) < self.max_size:
+            return
+        idle_sessions = [s for s in self._sessions.values() if s.in_flight == 0]
+        if idle_sessions:
+            await self._discard(min(idle_sessions, key=lambda s: s.last_used))
+
+    async def _evict_idle_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            now = time.monotonic()
+            for pooled in list(self._sessions.values()):
+                if pooled.in_flight == 0 and (
+                    now - pooled.last_used > self.idle_timeout or not pooled.is_alive
+                ):
+                    logger.debug("Closing idle pooled MCP session")
+                    await self._discard(pooled)
+
+            for key, lock in list(self._key_locks.items()):
+                if key not in self._sessions and not lock.locked():
+                    del self._key_locks[key]
+
+    async def _close_all(self) -> None:
+        for pooled in list(self._sessions.values()):
+            await self._discard(pooled)
+
+
+_session_pool = MCPSessionPool()
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    return _session_pool
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections.abc import Mapping
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import cast
+
+from pydantic import BaseModel
+from redis import Redis
+
+from onyx.configs.tool_configs import WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS
+from onyx.configs.tool_configs import WEB_CONTENT_CACHE_ENABLED
+from onyx.configs.tool_configs import WEB_CONTENT_CACHE_MAX_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.tools.tool_implementations.open_url.models import WebContent
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_CACHE_KEY_PREFIX = "web_content_cache:"
+_MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*(s-maxage|max-age)\s*=\s*\"?(\d+)\"?")
+
+
+class CachedWebContent(BaseModel):
+    content: WebContent
+    etag: str | None = None
+    last_modified: str | None = None
+    # epoch seconds, after this the content must be revalidated before being reused
+    fresh_until: float
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _seconds_until(expires: str) -> int:
+    try:
+        expires_at = parsedate_to_datetime(expires)
+    except (TypeError, ValueError):
+        # invalid dates (e.g. "0") mean already expired
+        return 0
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return max(0, int(expires_at.timestamp() - time.time()))
+
+
+def get_freshness_ttl(
+    cache_control: str | None, expires: str | None = None
+) -> int | None:
+    """Seconds a response may be reused without revalidation according to its
+    Cache-Control and Expires headers, or None if it must not be stored at all."""
+    cache_control = (cache_control or "").lower()
+    # responses for a single user must not end up in a cache shared between users
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+
+    # as a cache shared between users, s-maxage takes precedence over max-age, both
+    # take precedence over Expires
+    max_ages = dict(_MAX_AGE_PATTERN.findall(cache_control))
+    max_age = max_ages.get("s-maxage") or max_ages.get("max-age")
+    if max_age is not None:
+        freshness_ttl = int(max_age)
+    elif expires is not None:
+        freshness_ttl = _seconds_until(expires)
+    else:
+        return WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS
+
+    return min(freshness_ttl, WEB_CONTENT_CACHE_MAX_TTL_SECONDS)
+
+
+class WebContentCache:
+    """Cache of URL -> extracted page content, shared by all open_url calls of a tenant.
+
+    Entries with an ETag or Last-Modified validator are kept past their freshness
+    lifetime (up to WEB_CONTENT_CACHE_MAX_TTL_SECONDS) so that they can be revalidated
+    with a conditional request instead of being fetched and parsed again.
+
+    Cache failures are logged and treated as misses, the cache is never required."""
+
+    def __init__(self, redis_client: Redis | None = None) -> None:
+        # resolve the client up front so the tenant is taken from the calling context
+        self._redis_client = redis_client or get_redis_client()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return _CACHE_KEY_PREFIX + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> CachedWebContent | None:
+        try:
+            raw_value = self._redis_client.get(self._key(url))
+            if raw_value is None:
+                return None
+            return CachedWebContent.model_validate_json(cast(bytes, raw_value))
+        except Exception as e:
+            logger.warning(f"Failed to read web content cache for {url}: {e}")
+            return None
+
+    def set(
+        self,
+        url: str,
+        content: WebContent,
+        response_headers: Mapping[str, str] | None = None,
+        previous: CachedWebContent | None = None,
+    ) -> None:
+        """Store successfully scraped content. The response headers decide how long
+        it stays fresh, validators from a previous entry are kept if the new response
+        (e.g. a 304) doesn't repeat them."""
+        if not content.scrape_successful:
+            return
+
+        response_headers = response_headers or {}
+        freshness_ttl = get_freshness_ttl(
+            response_headers.get("Cache-Control"), response_headers.get("Expires")
+        )
+        if freshness_ttl is None:
+            return
+
+        entry = CachedWebContent(
+            content=content,
+            etag=response_headers.get("ETag") or (previous.etag if previous else None),
+            last_modified=response_headers.get("Last-Modified")
+            or (previous.last_modified if previous else None),
+            fresh_until=time.time() + freshness_ttl,
+        )
+
+        storage_ttl = (
+            WEB_CONTENT_CACHE_MAX_TTL_SECONDS
+            if entry.etag or entry.last_modified
+            else freshness_ttl
+        )
+        if storage_ttl <= 0:
+            return
+
+        try:
+            self._redis_client.set(
+                self._key(url), entry.model_dump_json(), ex=storage_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write web content cache for {url}: {e}")
+
+
+def get_web_content_cache() -> WebContentCache | None:
+    """Returns None if the cache is disabled or unavailable. Must be called from the
+    request context (not a bare worker thread) so the right tenant is used."""
+    if not WEB_CONTENT_CACHE_ENABLED:
+        return None
+
+    try:
+        return WebContentCache()
+    except Exception as e:
+        logger.warning(f"Web content cache unavailable: {e}")
+        return None
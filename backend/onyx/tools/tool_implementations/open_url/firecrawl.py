@@ -9,6 +9,9 @@ from typing import Any
 import requests
 
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import time_str_to_utc
+from onyx.tools.tool_implementations.open_url.content_cache import (
+    get_web_content_cache,
+)
 from onyx.tools.tool_implementations.open_url.models import WebContent
 from onyx.tools.tool_implementations.open_url.models import WebContentProvider
 from onyx.utils.logger import setup_logger
@@ -52,9 +55,32 @@ class FirecrawlClient(WebContentProvider):
         if not urls:
             return []
 
-        max_workers = min(_DEFAULT_MAX_WORKERS, len(urls))
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            return list(executor.map(self._get_webpage_content_safe, urls))
+        # Firecrawl doesn't pass through the page's caching headers, so scraped
+        # pages are cached with the default TTL
+        cache = get_web_content_cache()
+        url_to_content: dict[str, WebContent] = {}
+        if cache is not None:
+            for url in dict.fromkeys(urls):
+                cached = cache.get(url)
+                if cached is not None and cached.is_fresh():
+                    url_to_content[url] = cached.content
+
+        urls_to_fetch = [
+            url for url in dict.fromkeys(urls) if url not in url_to_content
+        ]
+        if urls_to_fetch:
+            max_workers = min(_DEFAULT_MAX_WORKERS, len(urls_to_fetch))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = list(
+                    executor.map(self._get_webpage_content_safe, urls_to_fetch)
+                )
+
+            for url, content in zip(urls_to_fetch, fetched):
+                url_to_content[url] = content
+                if cache is not None:
+                    cache.set(url, content)
+
+        return [url_to_content[url] for url in urls]
 
     def _get_webpage_content_safe(self, url: str) -> WebContent:
         try:
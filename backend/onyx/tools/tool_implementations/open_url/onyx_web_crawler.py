@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import http.cookiejar
+import threading
+from collections.abc import Iterator
 from collections.abc import Sequence
+from contextlib import contextmanager
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from onyx.configs.tool_configs import WEB_CRAWLER_MAX_CONNECTIONS_PER_HOST
+from onyx.configs.tool_configs import WEB_CRAWLER_MAX_WORKERS
 from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
+from onyx.tools.tool_implementations.open_url.content_cache import CachedWebContent
+from onyx.tools.tool_implementations.open_url.content_cache import (
+    get_web_content_cache,
+)
+from onyx.tools.tool_implementations.open_url.content_cache import WebContentCache
 from onyx.tools.tool_implementations.open_url.models import (
     WebContent,
 )
@@ -13,12 +26,75 @@ from onyx.tools.tool_implementations.open_url.models import (
     WebContentProvider,
 )
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
 DEFAULT_TIMEOUT_SECONDS = 15
 DEFAULT_USER_AGENT = "OnyxWebCrawler/1.0 (+https://www.onyx.app)"
 
+# Shared across crawler instances so connections are reused between tool calls
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+# Only hosts with requests in flight or waiting are tracked, the entry is dropped
+# with its last user so that the map doesn't grow with every host ever crawled
+_host_semaphores: dict[str, tuple[threading.BoundedSemaphore, int]] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # the session is shared by every user and tenant, cookies set by one
+            # page must not be sent along with anyone else's requests
+            session.cookies.set_policy(
+                http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+            )
+            adapter = HTTPAdapter(
+                pool_connections=WEB_CRAWLER_MAX_WORKERS,
+                pool_maxsize=WEB_CRAWLER_MAX_WORKERS,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+@contextmanager
+def _host_connection(url: str) -> Iterator[None]:
+    """Limits the concurrent requests to the url's host"""
+    host = urlparse(url).netloc.lower()
+    with _host_semaphores_lock:
+        semaphore, users = _host_semaphores.get(
+            host, (threading.BoundedSemaphore(WEB_CRAWLER_MAX_CONNECTIONS_PER_HOST), 0)
+        )
+        _host_semaphores[host] = (semaphore, users + 1)
+
+    try:
+        with semaphore:
+            yield
+    finally:
+        with _host_semaphores_lock:
+            semaphore, users = _host_semaphores[host]
+            if users == 1:
+                del _host_semaphores[host]
+            else:
+                _host_semaphores[host] = (semaphore, users - 1)
+
+
+def _failed_content(url: str) -> WebContent:
+    return WebContent(
+        title="",
+        link=url,
+        full_content="",
+        published_date=None,
+        scrape_successful=False,
+    )
+
 
 class OnyxWebCrawler(WebContentProvider):
     """
@@ -32,47 +108,66 @@ class OnyxWebCrawler(WebContentProvider):
         *,
         timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
         user_agent: str = DEFAULT_USER_AGENT,
+        max_workers: int = WEB_CRAWLER_MAX_WORKERS,
+        use_cache: bool = True,
     ) -> None:
         self._timeout_seconds = timeout_seconds
         self._headers = {
             "User-Agent": user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         }
+        self._max_workers = max_workers
+        self._use_cache = use_cache
 
     def contents(self, urls: Sequence[str]) -> list[WebContent]:
-        results: list[WebContent] = []
-        for url in urls:
-            results.append(self._fetch_url(url))
-        return results
+        if not urls:
+            return []
+
+        cache = get_web_content_cache() if self._use_cache else None
+
+        # Duplicate urls are only fetched once
+        unique_urls = list(dict.fromkeys(urls))
+        fetched = run_functions_tuples_in_parallel(
+            [(self._fetch_url, (url, cache)) for url in unique_urls],
+            allow_failures=True,
+            max_workers=self._max_workers,
+        )
+        url_to_content = {
+            url: content if content is not None else _failed_content(url)
+            for url, content in zip(unique_urls, fetched)
+        }
+        return [url_to_content[url] for url in urls]
+
+    def _fetch_url(self, url: str, cache: WebContentCache | None = None) -> WebContent:
+        cached: CachedWebContent | None = cache.get(url) if cache is not None else None
+        if cached is not None and cached.is_fresh():
+            return cached.content
+
+        headers = dict(self._headers)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
 
-    def _fetch_url(self, url: str) -> WebContent:
         try:
-            response = requests.get(
-                url, headers=self._headers, timeout=self._timeout_seconds
-            )
+            with _host_connection(url):
+                response = _get_session().get(
+                    url, headers=headers, timeout=self._timeout_seconds
+                )
         except Exception as exc:  # pragma: no cover - network failures vary
             logger.warning(
                 "Onyx crawler failed to fetch %s (%s)",
                 url,
                 exc.__class__.__name__,
             )
-            return WebContent(
-                title="",
-                link=url,
-                full_content="",
-                published_date=None,
-                scrape_successful=False,
-            )
+            return _failed_content(url)
+
+        if response.status_code == 304 and cached is not None:
+            if cache is not None:
+                cache.set(url, cached.content, response.headers, previous=cached)
+            return cached.content
 
         if response.status_code >= 400:
             logger.warning("Onyx crawler received %s for %s", response.status_code, url)
-            return WebContent(
-                title="",
-                link=url,
-                full_content="",
-                published_date=None,
-                scrape_successful=False,
-            )
+            return _failed_content(url)
 
         try:
             parsed: ParsedHTML = web_html_cleanup(response.text)
@@ -85,10 +180,13 @@ class OnyxWebCrawler(WebContentProvider):
             text_content = ""
             title = ""
 
-        return WebContent(
+        content = WebContent(
             title=title,
             link=url,
             full_content=text_content,
             published_date=None,
             scrape_successful=bool(text_content.strip()),
         )
+        if cache is not None:
+            cache.set(url, content, response.headers)
+        return content
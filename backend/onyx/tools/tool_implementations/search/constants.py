@@ -18,10 +18,23 @@ KEYWORD_QUERY_HYBRID_ALPHA = 0.2
 
 # Reciprocal Rank Fusion
 RRF_K_VALUE = 50
+# Results of the parallel queries are fused as they arrive. Once the first query returns, the others get this
+# long to finish before the search moves on without them, so a single slow query can't stall the whole search.
+QUERY_STRAGGLER_TIMEOUT_SECONDS = 5
 
 # Context Expansion
 FULL_DOC_NUM_CHUNKS_AROUND = 5
 
+# The relevance of the selected sections is classified in as few LLM calls as possible, these bound the size
+# of each call.
+MAX_SECTIONS_PER_RELEVANCE_PROMPT = 10
+MAX_CHARS_PER_RELEVANCE_PROMPT = 60_000
+SECTION_RELEVANCE_TIMEOUT = 20  # seconds
+# Sections whose LLM classification failed are classified from the score of the local reranking model instead,
+# a cross encoder scoring in [0, 1]. It isn't trusted with full document expansions.
+RERANKER_NOT_RELEVANT_THRESHOLD = 0.1
+RERANKER_ADJACENT_SECTIONS_THRESHOLD = 0.75
+
 # If a document is quite relevant and has many returned sections, likely it's enough to use the chunks around
 # the highest scoring section to detect relevance. This allows more other docs to be evaluated in the step.
 # This avoids documents with good titles or generally strong matches to flood out the rest of the search results.
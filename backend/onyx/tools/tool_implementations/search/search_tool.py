@@ -34,6 +34,7 @@ so that the rest of the code can persist it, render it in the UI, etc. The respo
 refer to by using matching keywords to other parts of the prompt and reminders.
 """
 
+import threading
 import time
 from collections.abc import Callable
 from typing import Any
@@ -44,8 +45,10 @@ from sqlalchemy.orm import sessionmaker
 
 from onyx.chat.emitter import Emitter
 from onyx.configs.chat_configs import MAX_CHUNKS_FED_TO_CHAT
+from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.context.search.models import BaseFilters
 from onyx.context.search.models import ChunkSearchRequest
+from onyx.context.search.models import ContextExpansionType
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SearchDocsResponse
@@ -56,10 +59,13 @@ from onyx.db.connector import check_connectors_exist
 from onyx.db.connector import check_federated_connectors_exist
 from onyx.db.models import Persona
 from onyx.db.models import User
+from onyx.db.search_settings import get_current_search_settings
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.llm.factory import get_llm_token_counter
 from onyx.llm.interfaces import LLM
+from onyx.natural_language_processing.search_nlp_models import RerankingModel
 from onyx.onyxbot.slack.models import SlackContext
+from onyx.secondary_llm_flows.document_filter import classify_sections_relevance
 from onyx.secondary_llm_flows.document_filter import select_chunks_for_relevance
 from onyx.secondary_llm_flows.document_filter import select_sections_for_expansion
 from onyx.secondary_llm_flows.query_expansion import keyword_query_expansion
@@ -72,6 +78,9 @@ from onyx.server.query_and_chat.streaming_models import SearchToolStart
 from onyx.tools.interface import Tool
 from onyx.tools.models import SearchToolOverrideKwargs
 from onyx.tools.models import ToolResponse
+from onyx.tools.tool_implementations.search.constants import (
+    FULL_DOC_NUM_CHUNKS_AROUND,
+)
 from onyx.tools.tool_implementations.search.constants import (
     KEYWORD_QUERY_HYBRID_ALPHA,
 )
@@ -88,6 +97,12 @@ from onyx.tools.tool_implementations.search.constants import (
     MAX_CHUNKS_FOR_RELEVANCE,
 )
 from onyx.tools.tool_implementations.search.constants import ORIGINAL_QUERY_WEIGHT
+from onyx.tools.tool_implementations.search.constants import (
+    QUERY_STRAGGLER_TIMEOUT_SECONDS,
+)
+from onyx.tools.tool_implementations.search.search_utils import (
+    build_section_relevance_input,
+)
 from onyx.tools.tool_implementations.search.search_utils import (
     expand_section_with_context,
 )
@@ -95,13 +110,18 @@ from onyx.tools.tool_implementations.search.search_utils import (
     merge_overlapping_sections,
 )
 from onyx.tools.tool_implementations.search.search_utils import (
-    weighted_reciprocal_rank_fusion,
+    retrieve_adjacent_chunks_for_sections,
 )
+from onyx.tools.tool_implementations.search.search_utils import WeightedRankFusion
 from onyx.tools.tool_implementations.utils import (
     convert_inference_sections_to_llm_string,
 )
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_as_completed
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import TimeoutThread
+from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
 
@@ -249,6 +269,14 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
 
         self._id = tool_id
 
+        # Searches started ahead of time by start_speculative_search, keyed by
+        # (query, hybrid_alpha, num_hits). Tools only live for a single chat turn
+        # so the results never go stale.
+        self._speculative_searches: dict[
+            tuple[str, float | None, int | None], TimeoutThread[list[InferenceChunk]]
+        ] = {}
+        self._speculative_searches_lock = threading.Lock()
+
     def _get_thread_safe_session(self) -> Session:
         """Create a new database session for the current thread.
 
@@ -261,11 +289,63 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         """
         return self._session_factory()
 
+    def _rerank_with_local_model(self, query: str, passages: list[str]) -> list[float]:
+        """Scores the passages with the local reranking model, a cheap fallback for the
+        LLM classifying the relevance of the sections."""
+        with self._get_thread_safe_session() as db_session:
+            search_settings = get_current_search_settings(db_session)
+        if (
+            search_settings.rerank_model_name is None
+            or search_settings.rerank_provider_type is not None
+        ):
+            raise ValueError("No local reranking model is configured")
+
+        return RerankingModel(
+            model_name=search_settings.rerank_model_name,
+            provider_type=None,
+            api_key=None,
+            api_url=None,
+            local_model_backend=search_settings.rerank_local_model_backend,
+        ).predict(query, passages)
+
+    def start_speculative_search(
+        self, query: str, num_hits: int | None = NUM_RETURNED_HITS
+    ) -> None:
+        """Start searching for a query that a later run of this tool is likely to
+        search for (e.g. its original_query) in the background. When it does, the
+        results are taken from here instead of searching again."""
+        key = (query, None, num_hits)
+        with self._speculative_searches_lock:
+            if key in self._speculative_searches:
+                return
+            self._speculative_searches[key] = run_in_background(
+                self._run_search_pipeline, query, None, num_hits
+            )
+
     def _run_search_for_query(
         self,
         query: str,
         hybrid_alpha: float | None,
-        num_hits: int,
+        num_hits: int | None,
+    ) -> list[InferenceChunk]:
+        with self._speculative_searches_lock:
+            speculative_search = self._speculative_searches.get(
+                (query, hybrid_alpha, num_hits)
+            )
+
+        if speculative_search is not None:
+            try:
+                return wait_on_background(speculative_search)
+            except Exception as e:
+                logger.warning(f"Speculative search for '{query}' failed: {e}")
+
+        return self._run_search_pipeline(query, hybrid_alpha, num_hits)
+
+    def _run_search_pipeline(
+        self,
+        query: str,
+        hybrid_alpha: float | None,
+        num_hits: int | None,
     ) -> list[InferenceChunk]:
         """Run search pipeline for a single query.
 
@@ -520,17 +600,53 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 )
                 search_weights.append(weight)
 
-            # Run all searches in parallel
-            all_search_results = run_functions_tuples_in_parallel(search_functions)
-
             # Merge results using weighted Reciprocal Rank Fusion
             # This intelligently combines rankings from different queries
-            top_chunks = weighted_reciprocal_rank_fusion(
-                ranked_results=all_search_results,
+            rank_fusion: WeightedRankFusion[InferenceChunk] = WeightedRankFusion(
                 weights=search_weights,
                 id_extractor=lambda chunk: f"{chunk.document_id}_{chunk.chunk_id}",
             )
 
+            # The user's own query is always waited for
+            original_query_indices = {
+                search_idx
+                for search_idx, (query, _) in enumerate(deduplicated_semantic_queries)
+                if override_kwargs.original_query
+                and query.lower() == override_kwargs.original_query.lower()
+            }
+            num_hits = (
+                override_kwargs.num_hits
+                if override_kwargs.num_hits is not None
+                else NUM_RETURNED_HITS
+            )
+
+            # Run all searches in parallel, fusing the results as each one finishes.
+            # Stop waiting once the queries still running can't change the top hits
+            # or they are taking too long compared to the ones already done.
+            for search_idx, search_results in run_functions_tuples_as_completed(
+                search_functions,
+                straggler_timeout=QUERY_STRAGGLER_TIMEOUT_SECONDS,
+                wait_for=original_query_indices,
+            ):
+                if search_results is None:
+                    logger.warning(
+                        f"Search tool - query {search_functions[search_idx][1][0]!r} "
+                        "failed, continuing without it"
+                    )
+                rank_fusion.add_results(search_idx, search_results or [])
+                if rank_fusion.is_top_k_settled(num_hits) and not (
+                    original_query_indices & rank_fusion.pending_sources
+                ):
+                    break
+
+            if rank_fusion.pending_sources:
+                logger.info(
+                    f"Search tool - continuing without {len(rank_fusion.pending_sources)} "
+                    f"of {len(search_functions)} queries: "
+                    f"{[search_functions[idx][1][0] for idx in sorted(rank_fusion.pending_sources)]}"
+                )
+            top_chunks = rank_fusion.fused_results()
+
             # We can disregard all of the chunks that exceed the num_hits parameter since it's not valid to have
             # documents/contents from things that aren't returned to the user on the frontend
             top_sections = merge_individual_chunks(top_chunks)[
@@ -602,6 +718,61 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 )
             )
 
+            # Start timing for document expansion
+            document_expansion_start_time = time.time()
+
+            # Fetch the surrounding chunks of every selected section in one batched
+            # retrieval, rather than one or two retrievals per section. This covers
+            # both the classification prompt and a possible full document expansion.
+            prefetched_adjacent_chunks: list[
+                tuple[list[InferenceChunk], list[InferenceChunk]] | None
+            ]
+            try:
+                prefetched_adjacent_chunks = list(
+                    retrieve_adjacent_chunks_for_sections(
+                        sections=selected_sections,
+                        document_index=self.document_index,
+                        num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
+                        num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
+                    )
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Batched retrieval of adjacent chunks failed: {e}. "
+                    "Falling back to per section retrieval."
+                )
+                prefetched_adjacent_chunks = [None] * len(selected_sections)
+
+            # Classify the relevance of all sections that need it in a single (or a few
+            # size bounded) LLM calls rather than one call per section. Sections without
+            # prefetched chunks fall back to being classified individually.
+            expand_overrides = [
+                section.center_chunk.document_id in best_doc_ids_set
+                for section in selected_sections
+            ]
+            sections_to_classify = [
+                (ind, build_section_relevance_input(section, adjacent_chunks))
+                for ind, (section, expand_override, adjacent_chunks) in enumerate(
+                    zip(selected_sections, expand_overrides, prefetched_adjacent_chunks)
+                )
+                if not expand_override and adjacent_chunks is not None
+            ]
+            batch_classifications = classify_sections_relevance(
+                sections=[
+                    relevance_input for _, relevance_input in sections_to_classify
+                ],
+                user_query=secondary_flows_user_query,
+                llm=self.llm,
+                reranker=self._rerank_with_local_model,
+            )
+            classifications: list[ContextExpansionType | None] = [None] * len(
+                selected_sections
+            )
+            for (ind, _), classification in zip(
+                sections_to_classify, batch_classifications
+            ):
+                classifications[ind] = classification
+
             # Create wrapper function to handle errors gracefully
             def expand_section_safe(
                 section: InferenceSection,
@@ -609,6 +780,10 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 llm: LLM,
                 document_index: DocumentIndex,
                 expand_override: bool,
+                adjacent_chunks: (
+                    tuple[list[InferenceChunk], list[InferenceChunk]] | None
+                ),
+                classification: ContextExpansionType | None,
             ) -> InferenceSection:
                 """Wrapper that handles exceptions and returns original section on error."""
                 try:
@@ -618,6 +793,8 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                         llm=llm,
                         document_index=document_index,
                         expand_override=expand_override,
+                        prefetched_adjacent_chunks=adjacent_chunks,
+                        classification=classification,
                     )
                     # Return expanded section if not None, otherwise original
                     return expanded_section if expanded_section is not None else section
@@ -636,15 +813,19 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                         secondary_flows_user_query,
                         self.llm,
                         self.document_index,
-                        section.center_chunk.document_id in best_doc_ids_set,
+                        expand_override,
+                        adjacent_chunks,
+                        classification,
                     ),
                 )
-                for section in selected_sections
+                for section, expand_override, adjacent_chunks, classification in zip(
+                    selected_sections,
+                    expand_overrides,
+                    prefetched_adjacent_chunks,
+                    classifications,
+                )
             ]
 
-            # Start timing for document expansion
-            document_expansion_start_time = time.time()
-
             # Run all expansions in parallel
             expanded_sections = run_functions_tuples_in_parallel(expansion_functions)
 
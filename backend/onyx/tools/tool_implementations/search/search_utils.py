@@ -1,5 +1,7 @@
+import heapq
 from collections import defaultdict
 from collections.abc import Callable
+from typing import Generic
 from typing import TypeVar
 
 from onyx.context.search.models import ContextExpansionType
@@ -15,6 +17,7 @@ from onyx.document_index.vespa.shared_utils.utils import (
 from onyx.llm.interfaces import LLM
 from onyx.prompts.prompt_utils import clean_up_source
 from onyx.secondary_llm_flows.document_filter import classify_section_relevance
+from onyx.secondary_llm_flows.document_filter import SectionRelevanceInput
 from onyx.tools.tool_implementations.search.constants import (
     FULL_DOC_NUM_CHUNKS_AROUND,
 )
@@ -27,6 +30,109 @@ logger = setup_logger()
 T = TypeVar("T")
 
 
+class WeightedRankFusion(Generic[T]):
+    """Incremental version of weighted_reciprocal_rank_fusion.
+
+    Ranked result lists can be added one at a time and in any order, e.g. as each
+    query's retrieval finishes. Once all of them are added, fused_results is exactly
+    what weighted_reciprocal_rank_fusion returns for the same inputs. Before that,
+    is_top_k_settled tells whether the lists still missing could change the top k.
+    """
+
+    def __init__(
+        self,
+        weights: list[float],
+        id_extractor: Callable[[T], str],
+        k: int = RRF_K_VALUE,
+    ) -> None:
+        self._weights = weights
+        self._id_extractor = id_extractor
+        self._k = k
+        self._pending_sources = set(range(len(weights)))
+
+        # Track RRF scores for each unique item (identified by ID)
+        self._rrf_scores: dict[str, float] = defaultdict(float)
+        # Track the actual item object for each ID (use first occurrence)
+        self._id_to_item: dict[str, T] = {}
+        # Track which result list each item first appeared in (for tiebreaking)
+        self._id_to_source_index: dict[str, int] = {}
+        # Track the position within the source list (for tiebreaking)
+        self._id_to_source_rank: dict[str, int] = {}
+
+    @property
+    def pending_sources(self) -> set[int]:
+        return set(self._pending_sources)
+
+    def add_results(self, source_idx: int, result_list: list[T]) -> None:
+        if source_idx not in self._pending_sources:
+            raise ValueError(
+                f"Results for source {source_idx} were already added or the source "
+                "does not exist"
+            )
+        self._pending_sources.remove(source_idx)
+
+        weight = self._weights[source_idx]
+        for rank, item in enumerate(result_list, start=1):
+            item_id = self._id_extractor(item)
+
+            # Add weighted RRF score: weight / (k + rank)
+            self._rrf_scores[item_id] += weight / (self._k + rank)
+
+            # Store the item object and source info from the earliest source list, so
+            # the result doesn't depend on the order the lists are added in
+            if (
+                item_id not in self._id_to_item
+                or source_idx < self._id_to_source_index[item_id]
+            ):
+                self._id_to_item[item_id] = item
+                self._id_to_source_index[item_id] = source_idx
+                self._id_to_source_rank[item_id] = rank
+
+    def _sort_key(self, item_id: str) -> tuple[float, int, int]:
+        return (
+            -self._rrf_scores[item_id],  # Primary: higher RRF score first
+            self._id_to_source_rank[item_id],  # Secondary: lower rank within source
+            self._id_to_source_index[item_id],  # Tertiary: round-robin across sources
+        )
+
+    def top_k(self, top_k: int) -> list[T]:
+        return [
+            self._id_to_item[item_id]
+            for item_id in heapq.nsmallest(top_k, self._rrf_scores, key=self._sort_key)
+        ]
+
+    def fused_results(self) -> list[T]:
+        return [
+            self._id_to_item[item_id]
+            for item_id in sorted(self._rrf_scores, key=self._sort_key)
+        ]
+
+    def is_top_k_settled(self, top_k: int) -> bool:
+        """Whether the result lists not added yet can no longer change which items
+        make up the top k (their order within the top k may still change).
+
+        Any item can gain at most weight / (k + 1) from each missing list, so the set
+        is settled once the k-th item leads the best item outside of the top k
+        (or an item not seen yet) by more than all of those gains combined.
+        """
+        if not self._pending_sources:
+            return True
+
+        max_pending_gain = sum(
+            self._weights[source_idx] for source_idx in self._pending_sources
+        ) / (self._k + 1)
+
+        ranked_ids = heapq.nsmallest(top_k + 1, self._rrf_scores, key=self._sort_key)
+        if len(ranked_ids) < top_k:
+            return False
+
+        kth_score = self._rrf_scores[ranked_ids[top_k - 1]]
+        next_score = (
+            self._rrf_scores[ranked_ids[top_k]] if len(ranked_ids) > top_k else 0.0
+        )
+        return kth_score > next_score + max_pending_gain
+
+
 def weighted_reciprocal_rank_fusion(
     ranked_results: list[list[T]],
     weights: list[float],
@@ -74,44 +180,11 @@ def weighted_reciprocal_rank_fusion(
             f"number of weights ({len(weights)})"
         )
 
-    # Track RRF scores for each unique item (identified by ID)
-    rrf_scores: dict[str, float] = defaultdict(float)
-    # Track the actual item object for each ID (use first occurrence)
-    id_to_item: dict[str, T] = {}
-    # Track which result list each item first appeared in (for tiebreaking)
-    id_to_source_index: dict[str, int] = {}
-    # Track the position within the source list (for tiebreaking)
-    id_to_source_rank: dict[str, int] = {}
-
-    # Compute weighted RRF scores
-    for source_idx, (result_list, weight) in enumerate(zip(ranked_results, weights)):
-        for rank, item in enumerate(result_list, start=1):
-            item_id = id_extractor(item)
+    fusion = WeightedRankFusion(weights=weights, id_extractor=id_extractor, k=k)
+    for source_idx, result_list in enumerate(ranked_results):
+        fusion.add_results(source_idx, result_list)
 
-            # Add weighted RRF score: weight / (k + rank)
-            rrf_scores[item_id] += weight / (k + rank)
-
-            # Store the item object and source info (if not already stored)
-            if item_id not in id_to_item:
-                id_to_item[item_id] = item
-                id_to_source_index[item_id] = source_idx
-                id_to_source_rank[item_id] = rank
-
-    # Sort items by:
-    # 1. RRF score (descending - higher is better)
-    # 2. Source index modulo (for round-robin across queries)
-    # 3. Rank within source (ascending - lower rank is better)
-    sorted_ids = sorted(
-        rrf_scores.keys(),
-        key=lambda id: (
-            -rrf_scores[
-                id
-            ],  # Primary: higher RRF score first (negative for descending)
-            id_to_source_rank[id],  # Secondary: lower rank within source first
-            id_to_source_index[id],  # Tertiary: round-robin by cycling through sources
-        ),
-    )
-    return [id_to_item[item_id] for item_id in sorted_ids]
+    return fusion.fused_results()
 
 
 def section_to_dict(section: InferenceSection, section_num: int) -> dict:
@@ -129,83 +202,122 @@ def section_to_dict(section: InferenceSection, section_num: int) -> dict:
     return doc_dict
 
 
-def _retrieve_adjacent_chunks(
-    section: InferenceSection,
+def _merge_chunk_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge overlapping or adjacent inclusive (min, max) chunk ranges."""
+    merged: list[tuple[int, int]] = []
+    for range_min, range_max in sorted(ranges):
+        if merged and range_min <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_max))
+        else:
+            merged.append((range_min, range_max))
+    return merged
+
+
+def retrieve_adjacent_chunks_for_sections(
+    sections: list[InferenceSection],
     document_index: DocumentIndex,
     num_chunks_above: int,
     num_chunks_below: int,
-) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
-    """Retrieve adjacent chunks above and below a section.
+) -> list[tuple[list[InferenceChunk], list[InferenceChunk]]]:
+    """Retrieve adjacent chunks above and below every section with a single batched
+    retrieval. The needed chunk ranges are merged per document before fetching, so
+    overlapping sections from the same document only fetch each chunk once.
 
     Args:
-        section: The InferenceSection to get adjacent chunks for
+        sections: The InferenceSections to get adjacent chunks for
         document_index: The document index to query
-        num_chunks_above: Number of chunks to retrieve above the section
-        num_chunks_below: Number of chunks to retrieve below the section
+        num_chunks_above: Number of chunks to retrieve above each section
+        num_chunks_below: Number of chunks to retrieve below each section
 
     Returns:
-        Tuple of (chunks_above, chunks_below)
+        (chunks_above, chunks_below) for each section, in the same order as `sections`
     """
-    # Get the document_id and chunk range from the section
-    document_id = section.center_chunk.document_id
-
-    # The document fetching already enforced permissions
-    # the expansion does not need to do this unless it's for performance reasons
-    filters = IndexFilters(access_control_list=None)
-
-    # Find the min and max chunk_id in the section
-    chunk_ids = [chunk.chunk_id for chunk in section.chunks]
-    min_chunk_id = min(chunk_ids)
-    max_chunk_id = max(chunk_ids)
-
-    chunks_above: list[InferenceChunk] = []
-    chunks_below: list[InferenceChunk] = []
-
-    # Retrieve chunks above (if any)
-    if num_chunks_above > 0 and min_chunk_id > 0:
-        above_min = max(0, min_chunk_id - num_chunks_above)
-        above_max = min_chunk_id - 1
-
-        above_request = VespaChunkRequest(
-            document_id=replace_invalid_doc_id_characters(document_id),
-            min_chunk_ind=above_min,
-            max_chunk_ind=above_max,
-        )
-
-        try:
-            chunks_above = document_index.id_based_retrieval(
-                chunk_requests=[above_request],
-                filters=filters,
-                batch_retrieval=True,
+    # (min_chunk_id, max_chunk_id) of each section
+    section_bounds: list[tuple[int, int]] = []
+    doc_to_ranges: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    for section in sections:
+        chunk_ids = [chunk.chunk_id for chunk in section.chunks]
+        min_chunk_id = min(chunk_ids)
+        max_chunk_id = max(chunk_ids)
+        section_bounds.append((min_chunk_id, max_chunk_id))
+
+        fetch_above = num_chunks_above > 0 and min_chunk_id > 0
+        fetch_below = num_chunks_below > 0
+        if not fetch_above and not fetch_below:
+            continue
+        # With chunks needed on both sides, the range spans the section's own chunks
+        # too so that it merges with the ranges of overlapping sections
+        doc_to_ranges[section.center_chunk.document_id].append(
+            (
+                (
+                    max(0, min_chunk_id - num_chunks_above)
+                    if fetch_above
+                    else max_chunk_id + 1
+                ),
+                max_chunk_id + num_chunks_below if fetch_below else min_chunk_id - 1,
             )
-            # Sort by chunk_id to ensure correct order
-            chunks_above.sort(key=lambda c: c.chunk_id)
-        except Exception as e:
-            logger.warning(f"Failed to retrieve chunks above section: {e}")
-
-    # Retrieve chunks below (if any)
-    if num_chunks_below > 0:
-        below_min = max_chunk_id + 1
-        below_max = max_chunk_id + num_chunks_below
+        )
 
-        below_request = VespaChunkRequest(
+    chunk_requests = [
+        VespaChunkRequest(
             document_id=replace_invalid_doc_id_characters(document_id),
-            min_chunk_ind=below_min,
-            max_chunk_ind=below_max,
+            min_chunk_ind=range_min,
+            max_chunk_ind=range_max,
         )
+        for document_id, ranges in doc_to_ranges.items()
+        for range_min, range_max in _merge_chunk_ranges(ranges)
+    ]
+
+    retrieved_chunks: dict[tuple[str, int], InferenceChunk] = {}
+    if chunk_requests:
+        # The document fetching already enforced permissions
+        # the expansion does not need to do this unless it's for performance reasons
+        for chunk in document_index.id_based_retrieval(
+            chunk_requests=chunk_requests,
+            filters=IndexFilters(access_control_list=None),
+            batch_retrieval=True,
+        ):
+            retrieved_chunks[(chunk.document_id, chunk.chunk_id)] = chunk
+
+    results: list[tuple[list[InferenceChunk], list[InferenceChunk]]] = []
+    for section, (min_chunk_id, max_chunk_id) in zip(sections, section_bounds):
+        document_id = section.center_chunk.document_id
+        chunks_above = [
+            retrieved_chunks[(document_id, chunk_id)]
+            for chunk_id in range(max(0, min_chunk_id - num_chunks_above), min_chunk_id)
+            if (document_id, chunk_id) in retrieved_chunks
+        ]
+        chunks_below = [
+            retrieved_chunks[(document_id, chunk_id)]
+            for chunk_id in range(max_chunk_id + 1, max_chunk_id + num_chunks_below + 1)
+            if (document_id, chunk_id) in retrieved_chunks
+        ]
+        results.append((chunks_above, chunks_below))
+
+    return results
 
-        try:
-            chunks_below = document_index.id_based_retrieval(
-                chunk_requests=[below_request],
-                filters=filters,
-                batch_retrieval=True,
-            )
-            # Sort by chunk_id to ensure correct order
-            chunks_below.sort(key=lambda c: c.chunk_id)
-        except Exception as e:
-            logger.warning(f"Failed to retrieve chunks below section: {e}")
 
-    return chunks_above, chunks_below
+def _retrieve_adjacent_chunks(
+    section: InferenceSection,
+    document_index: DocumentIndex,
+    num_chunks_above: int,
+    num_chunks_below: int,
+) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
+    """Retrieve adjacent chunks above and below a single section.
+
+    Returns:
+        Tuple of (chunks_above, chunks_below)
+    """
+    try:
+        return retrieve_adjacent_chunks_for_sections(
+            sections=[section],
+            document_index=document_index,
+            num_chunks_above=num_chunks_above,
+            num_chunks_below=num_chunks_below,
+        )[0]
+    except Exception as e:
+        logger.warning(f"Failed to retrieve chunks around section: {e}")
+        return [], []
 
 
 def merge_overlapping_sections(
@@ -351,12 +463,58 @@ def merge_overlapping_sections(
     return result
 
 
+def _chunks_for_relevance_prompt(
+    section: InferenceSection,
+    prefetched_adjacent_chunks: tuple[list[InferenceChunk], list[InferenceChunk]],
+) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
+    """Narrow the prefetched adjacent chunks down to the 2 above and below used in the
+    relevance classification prompt."""
+    min_chunk_id = min(chunk.chunk_id for chunk in section.chunks)
+    max_chunk_id = max(chunk.chunk_id for chunk in section.chunks)
+    chunks_above = [
+        chunk
+        for chunk in prefetched_adjacent_chunks[0]
+        if chunk.chunk_id >= min_chunk_id - 2
+    ]
+    chunks_below = [
+        chunk
+        for chunk in prefetched_adjacent_chunks[1]
+        if chunk.chunk_id <= max_chunk_id + 2
+    ]
+    return chunks_above, chunks_below
+
+
+def build_section_relevance_input(
+    section: InferenceSection,
+    prefetched_adjacent_chunks: tuple[list[InferenceChunk], list[InferenceChunk]],
+) -> SectionRelevanceInput:
+    """Build the input for classify_sections_relevance from the adjacent chunks
+    retrieved by retrieve_adjacent_chunks_for_sections."""
+    chunks_above, chunks_below = _chunks_for_relevance_prompt(
+        section, prefetched_adjacent_chunks
+    )
+    return SectionRelevanceInput(
+        document_title=section.center_chunk.semantic_identifier,
+        section_text=section.combined_content,
+        section_above_text=(
+            " ".join([c.content for c in chunks_above]) if chunks_above else None
+        ),
+        section_below_text=(
+            " ".join([c.content for c in chunks_below]) if chunks_below else None
+        ),
+    )
+
+
 def expand_section_with_context(
     section: InferenceSection,
     user_query: str,
     llm: LLM,
     document_index: DocumentIndex,
     expand_override: bool = False,
+    prefetched_adjacent_chunks: (
+        tuple[list[InferenceChunk], list[InferenceChunk]] | None
+    ) = None,
+    classification: ContextExpansionType | None = None,
 ) -> InferenceSection | None:
     """Use LLM to classify section relevance and return expanded section with appropriate context.
 
@@ -372,6 +530,11 @@ def expand_section_with_context(
         llm: LLM instance to use for classification
         document_index: Document index for retrieving adjacent chunks
         expand_override: If True, skip LLM classification and use FULL_DOCUMENT expansion
+        prefetched_adjacent_chunks: (chunks_above, chunks_below) already retrieved with
+            FULL_DOC_NUM_CHUNKS_AROUND chunks on each side, see
+            retrieve_adjacent_chunks_for_sections. If provided, no retrieval is done here.
+        classification: Classification already made for this section, see
+            classify_sections_relevance. If provided, no LLM call is made here.
 
     Returns:
         Expanded InferenceSection with appropriate context, or None if NOT_RELEVANT
@@ -385,12 +548,19 @@ def expand_section_with_context(
         # These are not used, but need to be defined to avoid type errors
     else:
         # Retrieve 2 chunks above and below for the LLM classification prompt
-        chunks_above_for_prompt, chunks_below_for_prompt = _retrieve_adjacent_chunks(
-            section=section,
-            document_index=document_index,
-            num_chunks_above=2,
-            num_chunks_below=2,
-        )
+        if prefetched_adjacent_chunks is not None:
+            chunks_above_for_prompt, chunks_below_for_prompt = (
+                _chunks_for_relevance_prompt(section, prefetched_adjacent_chunks)
+            )
+        else:
+            chunks_above_for_prompt, chunks_below_for_prompt = (
+                _retrieve_adjacent_chunks(
+                    section=section,
+                    document_index=document_index,
+                    num_chunks_above=2,
+                    num_chunks_below=2,
+                )
+            )
 
         # Format the section content for the prompt
         section_above_text = (
@@ -404,15 +574,16 @@ def expand_section_with_context(
             else None
         )
 
-        # Classify section relevance using LLM
-        classification = classify_section_relevance(
-            document_title=section.center_chunk.semantic_identifier,
-            section_text=section.combined_content,
-            user_query=user_query,
-            llm=llm,
-            section_above_text=section_above_text,
-            section_below_text=section_below_text,
-        )
+        if classification is None:
+            # Classify section relevance using LLM
+            classification = classify_section_relevance(
+                document_title=section.center_chunk.semantic_identifier,
+                section_text=section.combined_content,
+                user_query=user_query,
+                llm=llm,
+                section_above_text=section_above_text,
+                section_below_text=section_below_text,
+            )
 
     # Now build the expanded section based on classification
     if classification == ContextExpansionType.NOT_RELEVANT:
@@ -458,12 +629,15 @@ def expand_section_with_context(
                 f"LLM classified section as FULL_DOCUMENT: {section.center_chunk.semantic_identifier}"
             )
 
-        chunks_above_full, chunks_below_full = _retrieve_adjacent_chunks(
-            section=section,
-            document_index=document_index,
-            num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
-            num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
-        )
+        if prefetched_adjacent_chunks is not None:
+            chunks_above_full, chunks_below_full = prefetched_adjacent_chunks
+        else:
+            chunks_above_full, chunks_below_full = _retrieve_adjacent_chunks(
+                section=section,
+                document_index=document_index,
+                num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
+                num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
+            )
 
         # Combine all chunks: 5 above + section + 5 below
         all_chunks = chunks_above_full + section.chunks + chunks_below_full
@@ -1,9 +1,13 @@
+import os
+import threading
 import traceback
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import onyx.tracing.framework._error_tracing as _error_tracing
 from onyx.chat.models import ChatMessageSimple
+from onyx.configs.chat_configs import DEEP_RESEARCH_MAX_CONCURRENT_TOOL_CALLS
 from onyx.configs.constants import MessageType
 from onyx.context.search.models import SearchDocsResponse
 from onyx.server.query_and_chat.streaming_models import Packet
@@ -21,7 +25,7 @@ from onyx.tools.tool_implementations.web_search.web_search_tool import WebSearch
 from onyx.tracing.framework.create import function_span
 from onyx.tracing.framework.spans import SpanError
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import run_functions_tuples_as_completed
 
 logger = setup_logger()
 
@@ -35,6 +39,28 @@ MERGEABLE_TOOL_FIELDS: dict[str, str] = {
     OpenURLTool.NAME: URLS_FIELD,
 }
 
+_SECTION_END_LOCK = threading.Lock()
+
+_timed_tool_executor: ThreadPoolExecutor | None = None
+_timed_tool_executor_pid: int | None = None
+_timed_tool_executor_lock = threading.Lock()
+
+
+def _get_timed_tool_executor() -> ThreadPoolExecutor:
+    """Runs the tool calls that have a time budget. Tool calls over their budget are
+    not waited for but can't be stopped, sharing one bounded executor caps how many
+    of them can pile up."""
+    global _timed_tool_executor, _timed_tool_executor_pid
+    with _timed_tool_executor_lock:
+        # after a fork the worker threads only exist in the parent
+        if _timed_tool_executor is None or _timed_tool_executor_pid != os.getpid():
+            _timed_tool_executor = ThreadPoolExecutor(
+                max_workers=DEEP_RESEARCH_MAX_CONCURRENT_TOOL_CALLS,
+                thread_name_prefix="timed-tool-call",
+            )
+            _timed_tool_executor_pid = os.getpid()
+        return _timed_tool_executor
+
 
 def _merge_tool_calls(tool_calls: list[ToolCallKickoff]) -> list[ToolCallKickoff]:
     """Merge multiple tool calls for SearchTool, WebSearchTool, or OpenURLTool into a single call.
@@ -91,14 +117,38 @@ def _merge_tool_calls(tool_calls: list[ToolCallKickoff]) -> list[ToolCallKickoff
     return merged_calls
 
 
+def _end_tool_section(
+    tool: Tool,
+    tool_call: ToolCallKickoff,
+    section_ended: threading.Event,
+    close_placement: bool = False,
+) -> None:
+    # A tool that ran past the time budget was already ended by the caller and
+    # must not end its section again when it eventually finishes
+    with _SECTION_END_LOCK:
+        if section_ended.is_set():
+            return
+        section_ended.set()
+
+    section_end = Packet(
+        placement=tool_call.placement,
+        obj=SectionEnd(),
+    )
+    if close_placement:
+        tool.emitter.close_placement(tool_call.placement, last_packet=section_end)
+    else:
+        tool.emitter.emit(section_end)
+
+
 def _run_single_tool(
     tool: Tool,
     tool_call: ToolCallKickoff,
     override_kwargs: Any,
+    section_ended: threading.Event,
 ) -> ToolResponse:
     """Execute a single tool and return its response.
 
-    This function is designed to be run in parallel via run_functions_tuples_in_parallel.
+    This function is designed to be run in parallel via run_functions_tuples_as_completed.
     """
     with function_span(tool.name) as span_fn:
         span_fn.span_data.input = str(tool_call.tool_args)
@@ -127,12 +177,7 @@ def _run_single_tool(
             )
 
     # Emit SectionEnd after tool completes (success or failure)
-    tool.emitter.emit(
-        Packet(
-            placement=tool_call.placement,
-            obj=SectionEnd(),
-        )
-    )
+    _end_tool_section(tool, tool_call, section_ended)
 
     # Set tool_call on the response for downstream processing
     tool_response.tool_call = tool_call
@@ -150,12 +195,19 @@ def run_tool_calls(
     next_citation_num: int,
     # Skip query expansion for repeat search tool calls
     skip_search_query_expansion: bool = False,
+    timeout: float | None = None,
 ) -> tuple[list[ToolResponse], dict[int, str]]:
     """Run multiple tool calls in parallel and update citation mappings.
 
     Merges tool calls for SearchTool, WebSearchTool, and OpenURLTool before execution.
     All tools are executed in parallel, and citation mappings are updated
     from search tool responses.
+    Tools that don't finish within timeout seconds are not waited for, they are
+    reported back to the LLM as failed. Tool calls with a timeout share a bounded
+    executor, see DEEP_RESEARCH_MAX_CONCURRENT_TOOL_CALLS.
+    A run that fails outside of the tool itself (errors raised by the tool are
+    already part of its response) is reported back to the LLM as
+    "Tool execution failed.", so every returned response has its tool_call set.
 
     Args:
         tool_calls: List of tool calls to execute
@@ -166,6 +218,7 @@ def run_tool_calls(
         citation_mapping: Current citation number to URL mapping
         next_citation_num: Next citation number to use
         skip_search_query_expansion: Whether to skip query expansion for search tools
+        timeout: Time budget for all of the tool calls, None to wait for all of them
 
     Returns:
         A tuple containing:
@@ -252,17 +305,58 @@ def run_tool_calls(
 
         tool_run_params.append((tool, tool_call, override_kwargs))
 
-    # Run all tools in parallel
+    # Run all tools in parallel, each tool streams its own results and ends its
+    # section as soon as it finishes
+    section_end_events = [threading.Event() for _ in tool_run_params]
     functions_with_args = [
-        (_run_single_tool, (tool, tool_call, override_kwargs))
-        for tool, tool_call, override_kwargs in tool_run_params
+        (_run_single_tool, (tool, tool_call, override_kwargs, section_ended))
+        for (tool, tool_call, override_kwargs), section_ended in zip(
+            tool_run_params, section_end_events
+        )
     ]
 
-    tool_responses: list[ToolResponse] = run_functions_tuples_in_parallel(
-        functions_with_args,
-        allow_failures=True,  # Continue even if some tools fail
+    # Failed tools have a None response, continue even if some tools fail
+    responses_by_index: dict[int, ToolResponse | None] = dict(
+        run_functions_tuples_as_completed(
+            functions_with_args,
+            timeout=timeout,
+            executor=_get_timed_tool_executor() if timeout is not None else None,
+        )
     )
 
+    tool_responses: list[ToolResponse] = []
+    for index, (tool, tool_call, _) in enumerate(tool_run_params):
+        if index in responses_by_index:
+            tool_response = responses_by_index[index]
+            if tool_response is None:
+                # the tool's own errors are already reported in its response, this
+                # is a failure around it
+                tool_response = ToolResponse(
+                    rich_response=None,
+                    llm_facing_response="Tool execution failed.",
+                )
+                tool_response.tool_call = tool_call
+                _end_tool_section(tool, tool_call, section_end_events[index])
+            tool_responses.append(tool_response)
+            continue
+
+        logger.warning(
+            f"Tool {tool.name} did not finish within the {timeout} second budget"
+        )
+        # the tool keeps running in the background, whatever it emits from now on
+        # is dropped
+        _end_tool_section(
+            tool, tool_call, section_end_events[index], close_placement=True
+        )
+        timed_out_response = ToolResponse(
+            rich_response=None,
+            llm_facing_response=(
+                f"Tool execution did not finish within {timeout} seconds."
+            ),
+        )
+        timed_out_response.tool_call = tool_call
+        tool_responses.append(timed_out_response)
+
     # Process results and update citation_mapping
     for tool_response in tool_responses:
         if tool_response and isinstance(
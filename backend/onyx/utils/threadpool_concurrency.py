@@ -4,9 +4,12 @@ import concurrent
 import contextvars
 import copy
 import threading
+import time
 import uuid
+from collections.abc import AsyncGenerator
 from collections.abc import Awaitable
 from collections.abc import Callable
+from collections.abc import Collection
 from collections.abc import Iterator
 from collections.abc import MutableMapping
 from collections.abc import Sequence
@@ -15,6 +18,7 @@ from concurrent.futures import FIRST_COMPLETED
 from concurrent.futures import Future
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import wait
+from contextlib import contextmanager
 from typing import Any
 from typing import cast
 from typing import Generic
@@ -230,6 +234,93 @@ def run_functions_tuples_in_parallel(
     return [result for index, result in results]
 
 
+def run_functions_tuples_as_completed(
+    functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
+    max_workers: int | None = None,
+    straggler_timeout: float | None = None,
+    timeout: float | None = None,
+    wait_for: Collection[int] = (),
+    executor: ThreadPoolExecutor | None = None,
+) -> Iterator[tuple[int, Any]]:
+    """
+    Executes multiple functions in parallel and yields (index, result) for each function
+    as soon as it finishes. Like run_functions_tuples_in_parallel, contextvars are
+    propagated to the worker threads. Failed functions are logged and yield a result
+    of None.
+
+    All functions are given at most timeout seconds to finish and, once the first
+    function has finished, the remaining ones are given at most straggler_timeout
+    seconds. Functions that are still running when either passes, or when the caller
+    stops iterating, are abandoned: nothing more is yielded for them and the caller
+    doesn't wait for them to finish. The straggler_timeout doesn't apply while any of
+    the functions at the wait_for indices is still running.
+
+    With a shared executor, max_workers is ignored and the abandoned functions that
+    haven't started yet are cancelled, so they never take up one of its workers.
+    """
+    workers = (
+        min(max_workers, len(functions_with_args))
+        if max_workers is not None
+        else len(functions_with_args)
+    )
+
+    if workers <= 0:
+        return
+
+    owns_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    pending: dict[Future[Any], int] = {}
+    try:
+        pending = {
+            executor.submit(contextvars.copy_context().run, func, *args): i
+            for i, (func, args) in enumerate(functions_with_args)
+        }
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        straggler_deadline: float | None = None
+        while pending:
+            current_deadline = deadline
+            if straggler_deadline is not None and not any(
+                index in wait_for for index in pending.values()
+            ):
+                current_deadline = (
+                    straggler_deadline
+                    if current_deadline is None
+                    else min(current_deadline, straggler_deadline)
+                )
+            timeout = (
+                max(0.0, current_deadline - time.monotonic())
+                if current_deadline is not None
+                else None
+            )
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.warning(
+                    f"Abandoning {len(pending)} function(s) that did not finish in time"
+                )
+                return
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.exception(f"Function at index {index} failed due to {e}")
+                    result = None
+
+                yield index, result
+
+            if straggler_timeout is not None and straggler_deadline is None:
+                straggler_deadline = time.monotonic() + straggler_timeout
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in pending:
+                future.cancel()
+
+
 class FunctionCall(Generic[R]):
     """
     Container for run_functions_in_parallel, fetch the results from the output of
@@ -422,3 +513,107 @@ def parallel_yield_from_funcs(
     yield from parallel_yield(
         [func_wrapper(func) for func in funcs], max_workers=max_workers
     )
+
+
+class _IteratorError:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+_ITERATOR_DONE = object()
+# How often a producer blocked on a full queue re-checks whether the consumer went away
+_PRODUCER_POLL_INTERVAL = 0.3
+
+
+async def iterate_in_background_thread(
+    iterator: Iterator[R], max_buffered: int, executor: ThreadPoolExecutor
+) -> AsyncGenerator[R, None]:
+    """
+    Consumes a blocking iterator in a thread of executor and yields its items on the
+    event loop. At most max_buffered items are held in memory, if the consumer is
+    slower than the iterator, the producing thread blocks until there is room.
+
+    Unlike handing the iterator to the anyio threadpool, waiting for the next item does
+    not occupy a threadpool worker, so long lived streams can't starve other requests.
+    The executor bounds how many iterators are consumed at once, an iterator submitted
+    while all of its workers are busy waits for one to free up. If the consumer stops
+    early, the iterator is closed in the producing thread after it produces its next
+    item, or without being started if it was still waiting for a worker.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_buffered)
+    consumer_gone = threading.Event()
+
+    def _put(item: Any) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=_PRODUCER_POLL_INTERVAL)
+                return True
+            except concurrent.futures.TimeoutError:
+                if consumer_gone.is_set():
+                    future.cancel()
+                    return False
+
+    def _produce() -> None:
+        try:
+            if consumer_gone.is_set():
+                return
+            for item in iterator:
+                if consumer_gone.is_set() or not _put(item):
+                    return
+            _put(_ITERATOR_DONE)
+        except BaseException as e:
+            if not consumer_gone.is_set():
+                _put(_IteratorError(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    context = contextvars.copy_context()
+    executor.submit(context.run, _produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _ITERATOR_DONE:
+                return
+            if isinstance(item, _IteratorError):
+                raise item.exception
+            yield item
+    finally:
+        consumer_gone.set()
+
+
+class SizeBudget:
+    """
+    Bounds the total size (e.g. in bytes) of the work that runs at the same time across
+    threads. Work that is larger than the whole budget still runs, but only once nothing
+    else holds part of the budget, so it can't wait forever. A max_size <= 0 disables
+    the bound.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        """Blocks until size fits into the budget and holds it until the context exits"""
+        if self.max_size <= 0:
+            yield
+            return
+
+        size = max(size, 0)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._in_use == 0 or self._in_use + size <= self.max_size
+            )
+            self._in_use += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_use -= size
+                self._condition.notify_all()
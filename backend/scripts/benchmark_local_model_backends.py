@@ -0,0 +1,162 @@
+"""
+Compares the ONNX backends for local embedding / reranking models against torch.
+
+For every backend it reports the average latency and how far the results drift from
+the torch results, and exits with a non-zero code if the drift is outside of the
+tolerances below. Run this before switching a deployment's search settings to an
+ONNX backend for a model that hasn't been benchmarked yet.
+
+Requires the model server dependencies plus `optimum[onnxruntime]`.
+
+Usage (from the backend directory):
+python -m scripts.benchmark_local_model_backends \\
+    --embedding-model nomic-ai/nomic-embed-text-v1 \\
+    --rerank-model mixedbread-ai/mxbai-rerank-xsmall-v1
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from model_server.encoders import get_embedding_model
+from model_server.encoders import get_local_reranking_model
+from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
+from shared_configs.enums import LocalModelBackend
+
+# Accuracy tolerances, relative to the torch backend
+# Minimum cosine similarity between the torch and ONNX embedding of the same text
+MIN_EMBEDDING_COSINE_SIMILARITY = {
+    LocalModelBackend.ONNX: 0.9999,
+    LocalModelBackend.ONNX_INT8: 0.99,
+}
+# Minimum Spearman rank correlation between the torch and ONNX reranking scores
+MIN_RERANK_RANK_CORRELATION = {
+    LocalModelBackend.ONNX: 0.999,
+    LocalModelBackend.ONNX_INT8: 0.95,
+}
+
+_QUERY = "How do I rotate the API keys used by a connector?"
+_PASSAGES = [
+    "API keys for connectors can be rotated from the connector settings page by "
+    "editing the credential and pasting in the new key.",
+    "Credentials are encrypted at rest and are only decrypted by the background "
+    "workers when a connector runs.",
+    "The indexing pipeline chunks each document, embeds the chunks and writes them "
+    "to the document index.",
+    "To change the embedding model, create new search settings, the documents are "
+    "re-indexed in the background before the switch happens.",
+    "Slack channels can be added to a bot configuration so that it answers questions "
+    "posted in those channels.",
+    "If a connector fails repeatedly with authentication errors, the credential most "
+    "likely expired and must be replaced.",
+    "Document sets group documents from several connectors so that assistants can be "
+    "restricted to them.",
+    "Rate limits can be configured per user group to bound the LLM token usage of "
+    "each team.",
+    "Revoked or rotated keys stop working immediately, the next connector run will "
+    "pick up the updated credential.",
+    "Usage reports list the number of messages sent per user over a time range.",
+]
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def _time(fn: Callable[[], Any], iterations: int) -> tuple[float, Any]:
+    result = None
+    start = time.monotonic()
+    for _ in range(iterations):
+        result = fn()
+    return (time.monotonic() - start) / iterations, result
+
+
+def benchmark_embedding(
+    model_name: str, backends: list[LocalModelBackend], iterations: int
+) -> bool:
+    texts = [_QUERY] + _PASSAGES
+    within_tolerance = True
+    baseline: np.ndarray | None = None
+
+    for backend in [LocalModelBackend.TORCH] + backends:
+        model = get_embedding_model(model_name, DOC_EMBEDDING_CONTEXT_SIZE, backend)
+        latency, embeddings = _time(
+            lambda: model.encode(texts, normalize_embeddings=True), iterations
+        )
+        embeddings = np.asarray(embeddings)
+
+        if baseline is None:
+            baseline = embeddings
+            print(f"[embedding] {backend.value}: {latency * 1000:.1f}ms per batch")
+            continue
+
+        min_similarity = float(np.min(np.sum(baseline * embeddings, axis=1)))
+        ok = min_similarity >= MIN_EMBEDDING_COSINE_SIMILARITY[backend]
+        within_tolerance &= ok
+        print(
+            f"[embedding] {backend.value}: {latency * 1000:.1f}ms per batch, "
+            f"min cosine similarity to torch {min_similarity:.5f} "
+            f"(>= {MIN_EMBEDDING_COSINE_SIMILARITY[backend]}) {'OK' if ok else 'FAIL'}"
+        )
+
+    return within_tolerance
+
+
+def benchmark_reranking(
+    model_name: str, backends: list[LocalModelBackend], iterations: int
+) -> bool:
+    pairs = [(_QUERY, passage) for passage in _PASSAGES]
+    within_tolerance = True
+    baseline: np.ndarray | None = None
+
+    for backend in [LocalModelBackend.TORCH] + backends:
+        model = get_local_reranking_model(model_name, backend)
+        latency, scores = _time(lambda: model.predict(pairs), iterations)
+        scores = np.asarray(scores)
+
+        if baseline is None:
+            baseline = scores
+            print(f"[reranking] {backend.value}: {latency * 1000:.1f}ms per batch")
+            continue
+
+        correlation = _spearman(baseline, scores)
+        ok = correlation >= MIN_RERANK_RANK_CORRELATION[backend]
+        within_tolerance &= ok
+        print(
+            f"[reranking] {backend.value}: {latency * 1000:.1f}ms per batch, "
+            f"rank correlation to torch {correlation:.4f} "
+            f"(>= {MIN_RERANK_RANK_CORRELATION[backend]}) {'OK' if ok else 'FAIL'}"
+        )
+
+    return within_tolerance
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--embedding-model", type=str, default=None)
+    parser.add_argument("--rerank-model", type=str, default=None)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        type=LocalModelBackend,
+        default=[LocalModelBackend.ONNX, LocalModelBackend.ONNX_INT8],
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    backends = [
+        backend for backend in args.backends if backend != LocalModelBackend.TORCH
+    ]
+    success = True
+    if args.embedding_model:
+        success &= benchmark_embedding(args.embedding_model, backends, args.iterations)
+    if args.rerank_model:
+        success &= benchmark_reranking(args.rerank_model, backends, args.iterations)
+
+    sys.exit(0 if success else 1)
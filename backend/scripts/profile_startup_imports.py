@@ -0,0 +1,204 @@
+"""
+Profiles what the api server and the Celery workers import at startup.
+
+Every entry point is imported in a fresh interpreter with `python -X importtime`,
+Celery apps including the task modules they autodiscover. For each one this reports
+the wall time, the peak memory, the number of loaded modules and the top level
+packages that take the most time to import.
+
+With --check it exits with a non-zero code if an entry point goes over its startup
+budget or imports a package that it must not need, see STARTUP_BUDGETS. Heavy,
+optional subsystems (LLM clients, MCP, file processing libraries, ...) should be
+imported in the functions that use them so that the lighter workers stay fast to
+start.
+
+Usage (from the backend directory):
+python -m scripts.profile_startup_imports --check
+python -m scripts.profile_startup_imports light monitoring --top 30
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from pydantic import BaseModel
+
+_BACKEND_DIR = Path(__file__).resolve().parents[1]
+_CELERY_APPS_PACKAGE = "onyx.background.celery.apps"
+
+# Packages that only the chat flow, indexing or specific connectors need
+_HEAVY_PACKAGES = [
+    "litellm",
+    "mcp",
+    "nltk",
+    "openai",
+    "openpyxl",
+    "playwright",
+    "torch",
+    "transformers",
+    "onyx.chat.process_message",
+    "onyx.evals",
+]
+
+
+class StartupBudget(BaseModel):
+    max_seconds: float
+    # top level modules (or submodules) that must not be loaded by the entry point
+    forbidden_modules: list[str] = []
+
+
+# Generous enough to not be flaky on a loaded CI machine, tighten as imports are
+# made lazier
+STARTUP_BUDGETS: dict[str, StartupBudget] = {
+    "api_server": StartupBudget(max_seconds=15),
+    "primary": StartupBudget(
+        max_seconds=10, forbidden_modules=["nltk", "playwright", "torch"]
+    ),
+    "light": StartupBudget(max_seconds=6, forbidden_modules=_HEAVY_PACKAGES),
+    "monitoring": StartupBudget(max_seconds=5, forbidden_modules=_HEAVY_PACKAGES),
+    "beat": StartupBudget(max_seconds=5, forbidden_modules=_HEAVY_PACKAGES),
+    "heavy": StartupBudget(max_seconds=6, forbidden_modules=_HEAVY_PACKAGES),
+    "docfetching": StartupBudget(max_seconds=10),
+    "docprocessing": StartupBudget(max_seconds=10),
+    "kg_processing": StartupBudget(max_seconds=10),
+    "user_file_processing": StartupBudget(max_seconds=10),
+    "background": StartupBudget(max_seconds=12),
+}
+
+_IMPORT_SNIPPET = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+app = getattr(module, "celery_app", None)
+if app is not None:
+    app.loader.import_default_modules()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class StartupProfile(BaseModel):
+    entry_point: str
+    seconds: float
+    max_rss_mb: float
+    modules: list[str]
+    # self time in seconds aggregated by top level package
+    seconds_by_package: dict[str, float]
+
+    def loaded(self, module: str) -> bool:
+        return module in self.modules
+
+    def violations(self, budget: StartupBudget) -> list[str]:
+        violations = [
+            f"imports {module}"
+            for module in budget.forbidden_modules
+            if self.loaded(module)
+        ]
+        if self.seconds > budget.max_seconds:
+            violations.append(
+                f"took {self.seconds:.2f}s, budget is {budget.max_seconds:.2f}s"
+            )
+        return violations
+
+
+def _entry_point_module(entry_point: str) -> str:
+    if entry_point == "api_server":
+        return "onyx.main"
+    return f"{_CELERY_APPS_PACKAGE}.{entry_point}"
+
+
+def profile_entry_point(entry_point: str) -> StartupProfile:
+    """Imports the entry point in a fresh interpreter"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _IMPORT_SNIPPET.format(module=_entry_point_module(entry_point)),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=_BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(_BACKEND_DIR)},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {entry_point}:\n{result.stderr[-5000:]}")
+
+    seconds_by_package: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            package = match.group(4).split(".")[0]
+            seconds_by_package[package] += int(match.group(1)) / 1_000_000
+
+    # the snippet's output is the last line, imports may print before it
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        entry_point=entry_point,
+        seconds=stats["seconds"],
+        max_rss_mb=stats["max_rss_mb"],
+        modules=stats["modules"],
+        seconds_by_package=dict(seconds_by_package),
+    )
+
+
+def _print_profile(profile: StartupProfile, top: int) -> None:
+    print(
+        f"{profile.entry_point}: {profile.seconds:.2f}s, "
+        f"{profile.max_rss_mb:.0f}MB peak RSS, {len(profile.modules)} modules"
+    )
+    slowest = sorted(
+        profile.seconds_by_package.items(), key=lambda item: item[1], reverse=True
+    )
+    for package, seconds in slowest[:top]:
+        print(f"  {seconds:6.3f}s  {package}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "entry_points",
+        nargs="*",
+        help=f"Entry points to profile, defaults to all of: {', '.join(STARTUP_BUDGETS)}",
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="Number of packages to show"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with a non-zero code if an entry point violates its budget",
+    )
+    args = parser.parse_args()
+    unknown = set(args.entry_points) - set(STARTUP_BUDGETS)
+    if unknown:
+        parser.error(f"Unknown entry points: {', '.join(sorted(unknown))}")
+
+    failures: list[str] = []
+    for entry_point in args.entry_points or list(STARTUP_BUDGETS):
+        profile = profile_entry_point(entry_point)
+        _print_profile(profile, args.top)
+        for violation in profile.violations(STARTUP_BUDGETS[entry_point]):
+            failures.append(f"{entry_point} {violation}")
+
+    if failures:
+        print("\nStartup budget violations:")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
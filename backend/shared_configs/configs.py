@@ -40,6 +40,13 @@ INTENT_MODEL_VERSION = "onyx-dot-app/hybrid-intent-token-classifier"
 INTENT_MODEL_TAG: str | None = None
 INFORMATION_CONTENT_MODEL_VERSION = "onyx-dot-app/information-content-model"
 INFORMATION_CONTENT_MODEL_TAG: str | None = None
+# Run the intent and connector classifier models with int8 weights when on CPU,
+# much faster at a small accuracy cost
+QUANTIZE_QUERY_CLASSIFIER_MODELS = (
+    os.environ.get("QUANTIZE_QUERY_CLASSIFIER_MODELS", "").lower() == "true"
+)
+# Max number of queries in a single forward pass of the query classifier models
+QUERY_CLASSIFIER_BATCH_SIZE = int(os.environ.get("QUERY_CLASSIFIER_BATCH_SIZE") or 32)
 
 # Bi-Encoder, other details
 DOC_EMBEDDING_CONTEXT_SIZE = 512
@@ -64,6 +71,17 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Number of threads each ONNX Runtime session may use for a single inference call,
+# 0 lets ONNX Runtime decide (one per physical core)
+ONNX_INTRA_OP_NUM_THREADS = int(os.environ.get("ONNX_INTRA_OP_NUM_THREADS") or 0)
+# Where ONNX exports / int8 quantized versions of local models are written so they
+# only have to be created once. Defaults to the Hugging Face model cache (HF_HOME),
+# which the deployments persist in a volume
+ONNX_MODEL_CACHE_DIR = os.environ.get("ONNX_MODEL_CACHE_DIR") or os.path.join(
+    os.environ.get("HF_HOME") or os.path.expanduser("~/.cache/huggingface"),
+    "onnx_models",
+)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
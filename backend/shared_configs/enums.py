@@ -16,6 +16,16 @@ class RerankerProvider(str, Enum):
     BEDROCK = "bedrock"
 
 
+class LocalModelBackend(str, Enum):
+    """Runtime used by the model server to run a locally hosted embedding or
+    reranking model"""
+
+    TORCH = "torch"
+    ONNX = "onnx"
+    # dynamically quantized int8 weights, fastest on CPU at a small accuracy cost
+    ONNX_INT8 = "onnx_int8"
+
+
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
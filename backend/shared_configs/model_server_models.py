@@ -2,6 +2,7 @@ from pydantic import BaseModel
 
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelBackend
 from shared_configs.enums import RerankerProvider
 
 
@@ -17,6 +18,16 @@ class ConnectorClassificationResponse(BaseModel):
     connectors: list[str]
 
 
+class ConnectorClassificationBatchRequest(BaseModel):
+    available_connectors: list[str]
+    queries: list[str]
+
+
+class ConnectorClassificationBatchResponse(BaseModel):
+    # connectors for each query, in the same order as the request queries
+    connectors: list[list[str]]
+
+
 class EmbedRequest(BaseModel):
     texts: list[str]
     # Can be none for cloud embedding model requests, error handling logic exists for other cases
@@ -37,6 +48,9 @@ class EmbedRequest(BaseModel):
     # will be ignored for other providers.
     reduced_dimension: int | None = None
 
+    # only applies to local models
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH
+
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
 
@@ -52,6 +66,8 @@ class RerankRequest(BaseModel):
     provider_type: RerankerProvider | None = None
     api_key: str | None = None
     api_url: str | None = None
+    # only applies to local models
+    local_model_backend: LocalModelBackend = LocalModelBackend.TORCH
 
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
@@ -74,6 +90,19 @@ class IntentResponse(BaseModel):
     keywords: list[str]
 
 
+class IntentBatchRequest(BaseModel):
+    queries: list[str]
+    # Sequence classification threshold
+    semantic_percent_threshold: float
+    # Token classification threshold
+    keyword_percent_threshold: float
+
+
+class IntentBatchResponse(BaseModel):
+    # results for each query, in the same order as the request queries
+    results: list[IntentResponse]
+
+
 class InformationContentClassificationRequests(BaseModel):
     queries: list[str]
 
@@ -56,9 +56,15 @@ def mock_nlp_embeddings_post() -> Iterator[None]:
         resp.raise_for_status = MagicMock()
         return resp
 
-    with patch(
-        "onyx.natural_language_processing.search_nlp_models.requests.post",
-        side_effect=_mock_post,
+    with (
+        patch(
+            "onyx.natural_language_processing.search_nlp_models.requests.post",
+            side_effect=_mock_post,
+        ),
+        patch(
+            "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post",
+            side_effect=_mock_post,
+        ),
     ):
         yield
 
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from model_server.onnx_models import _export_quantized_model
+from model_server.onnx_models import _QUANTIZED_FILE_NAME
+from model_server.onnx_models import load_local_model
+from shared_configs.enums import LocalModelBackend
+
+
+class _FakeModel:
+    def __init__(self, model_name: str, **kwargs: Any) -> None:
+        self.model_name = model_name
+        self.kwargs = kwargs
+
+
+def test_load_local_model_torch_skips_onnx() -> None:
+    with patch("model_server.onnx_models._load_onnx_model") as mock_load_onnx:
+        model = load_local_model(
+            _FakeModel,  # type: ignore
+            "fake-model",
+            LocalModelBackend.TORCH,
+            trust_remote_code=True,
+        )
+
+    mock_load_onnx.assert_not_called()
+    assert model.model_name == "fake-model"
+    assert model.kwargs == {"trust_remote_code": True}
+
+
+def test_load_local_model_falls_back_to_torch() -> None:
+    with patch(
+        "model_server.onnx_models._load_onnx_model",
+        side_effect=ImportError("No module named 'onnxruntime'"),
+    ) as mock_load_onnx:
+        model = load_local_model(
+            _FakeModel,  # type: ignore
+            "fake-model",
+            LocalModelBackend.ONNX_INT8,
+            trust_remote_code=True,
+        )
+
+    mock_load_onnx.assert_called_once()
+    assert model.kwargs == {"trust_remote_code": True}
+
+
+class _FakeOnnxModel(_FakeModel):
+    def save_pretrained(self, path: str) -> None:
+        os.makedirs(os.path.join(path, "onnx"), exist_ok=True)
+
+
+def test_export_replaces_a_directory_without_the_quantized_model(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pytest.importorskip("sentence_transformers")
+
+    def export_dynamic_quantized_onnx_model(
+        model: Any, quantization_config: str, model_name_or_path: str
+    ) -> None:
+        Path(model_name_or_path, _QUANTIZED_FILE_NAME).touch()
+
+    monkeypatch.setattr(
+        "sentence_transformers.export_dynamic_quantized_onnx_model",
+        export_dynamic_quantized_onnx_model,
+    )
+    # e.g. left behind by an export that was interrupted
+    quantized_dir = tmp_path / "fake-model"
+    (quantized_dir / "onnx").mkdir(parents=True)
+
+    _export_quantized_model(
+        _FakeOnnxModel,  # type: ignore
+        "fake-model",
+        str(quantized_dir),
+        {},
+    )
+
+    assert (quantized_dir / _QUANTIZED_FILE_NAME).exists()
+    # the scratch directory is gone
+    assert list(tmp_path.iterdir()) == [quantized_dir]
@@ -0,0 +1,152 @@
+import json
+import time
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy import update
+from sqlalchemy.orm import make_transient_to_detached
+
+from onyx.auth import principal_cache
+from onyx.auth.principal_cache import _collect_bulk_changed_principals
+from onyx.auth.principal_cache import _PrincipalCache
+from onyx.auth.principal_cache import _publish_changed_principals
+from onyx.auth.principal_cache import _snapshot
+from onyx.auth.principal_cache import build_principal_cache_key
+from onyx.auth.principal_cache import CredentialType
+from onyx.db.models import Memory
+from onyx.db.models import PersonalAccessToken
+from onyx.db.models import User
+from onyx.redis import redis_invalidation
+
+
+def _user() -> User:
+    user = User(id=uuid4(), email="test@example.com", hashed_password="hashed")
+    make_transient_to_detached(user)
+    return user
+
+
+def test_cache_expires_and_evicts_entries() -> None:
+    cache = _PrincipalCache(ttl=60, max_entries=2)
+    first, second = _user(), _user()
+
+    cache.put("a", first)
+    cache.put("b", first)
+    cache.put("c", second)
+    # over the limit, the least recently used key is dropped
+    assert cache.get("a") is None
+    assert cache.get("b") is first
+
+    cache.evict_users([first.id])
+    assert cache.get("b") is None
+    assert cache.get("c") is second
+
+    cache.evict_keys(["c"])
+    assert cache.get("c") is None
+
+    cache.ttl = 0
+    cache.put("d", second)
+    time.sleep(0.01)
+    assert cache.get("d") is None
+
+
+def test_cache_keys_are_scoped_by_credential_type() -> None:
+    assert build_principal_cache_key(
+        CredentialType.API_KEY, "hash"
+    ) != build_principal_cache_key(CredentialType.PAT, "hash")
+
+
+def test_snapshot_is_a_separate_instance() -> None:
+    user = _user()
+    snapshot = _snapshot(user)
+
+    assert snapshot is not user
+    assert snapshot.id == user.id
+    assert snapshot.email == user.email
+
+
+def _orm_execute_state(statement: object, entity: type) -> MagicMock:
+    state = MagicMock()
+    state.is_update = True
+    state.is_delete = False
+    state.statement = statement
+    state.bind_mapper.class_ = entity
+    state.session.info = {}
+    return state
+
+
+def test_bulk_changes_are_attributed_to_the_filtered_user(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    published: list[dict] = []
+    monkeypatch.setattr(principal_cache, "_publish", published.append)
+    user_id = uuid4()
+
+    state = _orm_execute_state(
+        update(User).where(User.id == user_id).values(theme_preference=None),  # type: ignore
+        User,
+    )
+    _collect_bulk_changed_principals(state)
+    _publish_changed_principals(state.session)
+
+    other_state = _orm_execute_state(
+        delete(Memory).where(Memory.id.in_([1, 2])), Memory
+    )
+    _collect_bulk_changed_principals(other_state)
+    _publish_changed_principals(other_state.session)
+
+    assert published == [{"user_ids": [str(user_id)]}, {"all": True}]
+
+
+def test_pat_usage_tracking_does_not_invalidate(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    published: list[dict] = []
+    monkeypatch.setattr(principal_cache, "_publish", published.append)
+
+    state = _orm_execute_state(
+        update(PersonalAccessToken)
+        .where(PersonalAccessToken.hashed_token == "hashed")
+        .values(last_used_at=None),
+        PersonalAccessToken,
+    )
+    _collect_bulk_changed_principals(state)
+    _publish_changed_principals(state.session)
+
+    assert published == []
+
+
+def test_publish_does_not_wait_for_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis_client = MagicMock()
+    redis_client.publish.side_effect = lambda *_: time.sleep(0.5)
+    monkeypatch.setattr(
+        redis_invalidation, "get_raw_redis_client", lambda: redis_client
+    )
+
+    start = time.monotonic()
+    principal_cache._publish({"all": True})
+    principal_cache._publish({"user_ids": []})
+    assert time.monotonic() - start < 0.5
+
+    redis_invalidation._get_publish_executor().submit(lambda: None).result()
+    assert [call.args[1] for call in redis_client.publish.call_args_list] == [
+        json.dumps({"all": True}),
+        json.dumps({"user_ids": []}),
+    ]
+
+
+def test_invalidation_messages(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = _PrincipalCache(ttl=60, max_entries=10)
+    monkeypatch.setattr(principal_cache, "_cache", cache)
+    first, second = _user(), _user()
+    cache.put("a", first)
+    cache.put("b", second)
+    cache.put("c", second)
+
+    principal_cache._handle_invalidation(json.dumps({"user_ids": [str(first.id)]}))
+    principal_cache._handle_invalidation(json.dumps({"keys": ["b"]}))
+    assert [cache.get(key) for key in "abc"] == [None, None, second]
+
+    principal_cache._handle_invalidation(json.dumps({"all": True}))
+    assert cache.get("c") is None
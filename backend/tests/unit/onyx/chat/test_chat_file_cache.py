@@ -0,0 +1,89 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.chat import chat_utils
+from onyx.chat.chat_utils import _ChatFileCache
+from onyx.chat.chat_utils import load_chat_files
+from onyx.chat.models import ChatLoadedFile
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import FileDescriptor
+
+
+def _loaded_file(file_id: str, size: int = 10, token_count: int = 0) -> ChatLoadedFile:
+    return ChatLoadedFile(
+        file_id=file_id,
+        content=b"x" * size,
+        file_type=ChatFileType.PLAIN_TEXT,
+        filename=file_id,
+        content_text="x" * size,
+        token_count=token_count,
+    )
+
+
+def test_cache_evicts_least_recently_used_files() -> None:
+    cache = _ChatFileCache(max_bytes=25)
+    cache.put("tenant", _loaded_file("a"))
+    cache.put("tenant", _loaded_file("b"))
+    assert cache.get("tenant", "a") is not None
+
+    cache.put("tenant", _loaded_file("c"))
+    assert cache.get("tenant", "b") is None
+    assert cache.get("tenant", "a") is not None
+    assert cache.get("tenant", "c") is not None
+
+    # files larger than the cache are never cached
+    cache.put("tenant", _loaded_file("d", size=30))
+    assert cache.get("tenant", "d") is None
+    assert cache.get("tenant", "a") is not None
+
+
+def test_cache_is_scoped_by_tenant() -> None:
+    cache = _ChatFileCache(max_bytes=25)
+    cache.put("tenant_a", _loaded_file("a"))
+
+    assert cache.get("tenant_a", "a") is not None
+    assert cache.get("tenant_b", "a") is None
+
+
+def test_cache_is_disabled_without_a_size() -> None:
+    cache = _ChatFileCache(max_bytes=0)
+    cache.put("tenant", _loaded_file("empty", size=0))
+
+    assert cache.get("tenant", "empty") is None
+
+
+def test_loaded_files_are_reused_across_turns(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    loaded_ids: list[str] = []
+
+    def fake_load_chat_file(file: FileDescriptor, db_session: Any) -> ChatLoadedFile:
+        loaded_ids.append(file["id"])
+        # the user file is still being processed for the first load
+        token_count = 0 if file.get("user_file_id") and len(loaded_ids) < 3 else 5
+        return _loaded_file(file["id"], token_count=token_count)
+
+    monkeypatch.setattr(chat_utils, "load_chat_file", fake_load_chat_file)
+    monkeypatch.setattr(chat_utils, "_chat_file_cache", _ChatFileCache(1000))
+
+    first_turn: list[FileDescriptor] = [
+        {"id": "plain", "type": ChatFileType.PLAIN_TEXT},
+        {"id": "user", "type": ChatFileType.PLAIN_TEXT, "user_file_id": "1"},
+    ]
+    second_turn = first_turn + [{"id": "new", "type": ChatFileType.PLAIN_TEXT}]
+
+    assert [f.file_id for f in load_chat_files(first_turn, MagicMock())] == [
+        "plain",
+        "user",
+    ]
+    assert [f.file_id for f in load_chat_files(second_turn, MagicMock())] == [
+        "plain",
+        "user",
+        "new",
+    ]
+    load_chat_files(second_turn, MagicMock())
+
+    # the user file without a token count yet is loaded again on the next turn
+    assert sorted(loaded_ids) == ["new", "plain", "user", "user"]
@@ -0,0 +1,181 @@
+from uuid import UUID
+from uuid import uuid4
+
+import pytest
+
+from onyx.chat import chat_utils
+from onyx.chat.chat_utils import _ChatHistoryCache
+from onyx.chat.chat_utils import convert_chat_history
+from onyx.chat.chat_utils import get_cached_chat_history
+from onyx.chat.models import ChatLoadedFile
+from onyx.chat.models import ChatMessageSimple
+from onyx.configs.constants import MessageType
+from onyx.db.models import ChatMessage
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import FileDescriptor
+
+
+def _chat_message(
+    message_id: int,
+    message_type: MessageType,
+    message: str,
+    files: list[FileDescriptor] | None = None,
+) -> ChatMessage:
+    return ChatMessage(
+        id=message_id,
+        message_type=message_type,
+        message=message,
+        token_count=len(message),
+        files=files,
+        tool_calls=[],
+    )
+
+
+def _convert(
+    chat_session_id: UUID,
+    chat_history: list[ChatMessage],
+    files: list[ChatLoadedFile] | None = None,
+    tool_id_to_name_map: dict[int, str] | None = None,
+) -> tuple[int, list[str]]:
+    """Returns the number of reused chat messages and the converted messages."""
+    tool_id_to_name_map = tool_id_to_name_map or {}
+    cached_chat_history = get_cached_chat_history(
+        chat_session_id, chat_history, tool_id_to_name_map
+    )
+    simple_messages = convert_chat_history(
+        chat_history=chat_history,
+        files=files or [],
+        project_image_files=[],
+        additional_context="context",
+        token_counter=len,
+        tool_id_to_name_map=tool_id_to_name_map,
+        chat_session_id=chat_session_id,
+        cached_chat_history=cached_chat_history,
+    )
+    return len(cached_chat_history), [m.message for m in simple_messages]
+
+
+def _convert_uncached(chat_history: list[ChatMessage]) -> list[str]:
+    return [
+        m.message
+        for m in convert_chat_history(
+            chat_history=chat_history,
+            files=[],
+            project_image_files=[],
+            additional_context="context",
+            token_counter=len,
+            tool_id_to_name_map={},
+        )
+    ]
+
+
+@pytest.fixture(autouse=True)
+def history_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(chat_utils, "_chat_history_cache", _ChatHistoryCache(1000))
+
+
+def test_previous_turns_are_reused() -> None:
+    chat_session_id = uuid4()
+    first_turn = [_chat_message(1, MessageType.USER, "hi")]
+    assert _convert(chat_session_id, first_turn) == (0, _convert_uncached(first_turn))
+
+    second_turn = first_turn + [
+        _chat_message(2, MessageType.ASSISTANT, "hello"),
+        _chat_message(3, MessageType.USER, "how are you"),
+    ]
+    reused, messages = _convert(chat_session_id, second_turn)
+    # the last user message of the first turn wasn't cached
+    assert reused == 0
+    assert messages == _convert_uncached(second_turn)
+
+    third_turn = second_turn + [
+        _chat_message(4, MessageType.ASSISTANT, "good"),
+        _chat_message(5, MessageType.USER, "nice"),
+    ]
+    reused, messages = _convert(chat_session_id, third_turn)
+    assert reused == 2
+    assert messages == _convert_uncached(third_turn)
+
+    # other chat sessions don't share the cached history
+    assert _convert(uuid4(), third_turn)[0] == 0
+
+
+def test_changed_messages_are_converted_again() -> None:
+    chat_session_id = uuid4()
+    chat_history = [
+        _chat_message(1, MessageType.USER, "hi"),
+        _chat_message(2, MessageType.ASSISTANT, "hello"),
+        _chat_message(3, MessageType.USER, "how are you"),
+        _chat_message(4, MessageType.ASSISTANT, "good"),
+        _chat_message(5, MessageType.USER, "nice"),
+    ]
+    _convert(chat_session_id, chat_history)
+    assert _convert(chat_session_id, chat_history)[0] == 4
+
+    # an assistant message that was updated in place
+    chat_history[3] = _chat_message(4, MessageType.ASSISTANT, "good, thanks")
+    reused, messages = _convert(chat_session_id, chat_history)
+    assert reused == 3
+    assert "good, thanks" in messages
+
+    # regenerating the answer to an earlier message converts it as the last message
+    reused, messages = _convert(chat_session_id, chat_history[:3])
+    assert reused == 2
+    assert messages == _convert_uncached(chat_history[:3])
+
+    # renamed tools invalidate the whole history
+    assert _convert(chat_session_id, chat_history, tool_id_to_name_map={1: "a"})[0] == 0
+
+
+def test_messages_with_processing_user_files_are_not_cached() -> None:
+    chat_session_id = uuid4()
+    user_file: FileDescriptor = {
+        "id": "file",
+        "type": ChatFileType.PLAIN_TEXT,
+        "user_file_id": "1",
+    }
+    chat_history = [
+        _chat_message(1, MessageType.USER, "hi", files=[user_file]),
+        _chat_message(2, MessageType.ASSISTANT, "hello"),
+        _chat_message(3, MessageType.USER, "nice"),
+    ]
+
+    def loaded_file(token_count: int) -> ChatLoadedFile:
+        return ChatLoadedFile(
+            file_id="file",
+            content=b"text",
+            file_type=ChatFileType.PLAIN_TEXT,
+            filename="file",
+            content_text="text",
+            token_count=token_count,
+        )
+
+    _convert(chat_session_id, chat_history, files=[loaded_file(0)])
+    assert _convert(chat_session_id, chat_history, files=[loaded_file(5)])[0] == 0
+    assert _convert(chat_session_id, chat_history, files=[loaded_file(5)])[0] == 2
+
+
+def test_cache_evicts_least_recently_used_histories() -> None:
+    cache = _ChatHistoryCache(max_bytes=25)
+    chat_history = [
+        _chat_message(1, MessageType.USER, "x" * 10),
+        _chat_message(2, MessageType.USER, "last"),
+    ]
+    converted = [
+        [
+            ChatMessageSimple(
+                message="x" * 10,
+                token_count=10,
+                message_type=MessageType.USER,
+            )
+        ]
+    ]
+    first, second, third = uuid4(), uuid4(), uuid4()
+    cache.put("tenant", first, chat_history[:1], converted, {})
+    cache.put("tenant", second, chat_history[:1], converted, {})
+    assert cache.get("tenant", first, chat_history, {}) == converted
+
+    cache.put("tenant", third, chat_history[:1], converted, {})
+    assert cache.get("tenant", second, chat_history, {}) == []
+    assert cache.get("tenant", first, chat_history, {}) == converted
+    assert cache.get("other_tenant", first, chat_history, {}) == []
@@ -849,6 +849,45 @@ def test_multiple_code_blocks(mock_search_docs: CitationMapping) -> None:
     assert len(citations) == 1
 
 
+def test_citation_and_code_block_in_same_token(
+    mock_search_docs: CitationMapping,
+) -> None:
+    """Test that the code block state is tracked per character, not per token."""
+    processor = DynamicCitationProcessor()
+    processor.update_citation_mapping({1: mock_search_docs[1], 2: mock_search_docs[2]})
+
+    tokens: list[str | None] = ["Text [1] then\n```\nprint('[2]')\n```\nEnd [2]."]
+    output, citations = process_tokens(processor, tokens)
+
+    assert output == (
+        "Text [[1]](https://example.com/doc1) then\n```plaintext\nprint('[2]')\n```\n"
+        "End [[2]](https://example.com/doc2)."
+    )
+    assert [citation.citation_number for citation in citations] == [1, 2]
+
+
+def test_output_independent_of_token_boundaries(
+    mock_search_docs: CitationMapping,
+) -> None:
+    """Test that the output doesn't depend on how the text is split into tokens."""
+    text = "See [1], [[2]] and [1, 3].\n```\ncode [2]\n```\nDone [[[2]]"
+
+    outputs = []
+    for token_size in [1, 2, 3, 5, 8, len(text)]:
+        processor = DynamicCitationProcessor()
+        processor.update_citation_mapping(
+            {1: mock_search_docs[1], 2: mock_search_docs[2], 3: mock_search_docs[3]}
+        )
+        tokens: list[str | None] = [
+            text[i : i + token_size] for i in range(0, len(text), token_size)
+        ]
+        output, citations = process_tokens(processor, tokens)
+        outputs.append((output, [c.citation_number for c in citations]))
+
+    assert all(output == outputs[0] for output in outputs)
+    assert outputs[0][1] == [1, 2, 3]
+
+
 # ============================================================================
 # Stop Token Tests
 # ============================================================================
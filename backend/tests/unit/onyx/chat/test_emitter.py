@@ -0,0 +1,66 @@
+import threading
+from queue import Queue
+
+from onyx.chat.emitter import coalesce_packets
+from onyx.chat.emitter import Emitter
+from onyx.server.query_and_chat.placement import Placement
+from onyx.server.query_and_chat.streaming_models import AgentResponseDelta
+from onyx.server.query_and_chat.streaming_models import OverallStop
+from onyx.server.query_and_chat.streaming_models import Packet
+from onyx.server.query_and_chat.streaming_models import ReasoningDelta
+
+
+def _placement(turn_index: int) -> Placement:
+    return Placement(turn_index=turn_index)
+
+
+def test_coalesce_packets_merges_consecutive_deltas() -> None:
+    packets = [
+        Packet(placement=_placement(0), obj=ReasoningDelta(reasoning="Let me ")),
+        Packet(placement=_placement(0), obj=ReasoningDelta(reasoning="think")),
+        Packet(placement=_placement(1), obj=AgentResponseDelta(content="Hello")),
+        Packet(placement=_placement(1), obj=AgentResponseDelta(content=", ")),
+        Packet(placement=_placement(1), obj=AgentResponseDelta(content="world")),
+        Packet(placement=_placement(2), obj=AgentResponseDelta(content="!")),
+        Packet(placement=_placement(2), obj=OverallStop()),
+    ]
+
+    coalesced = coalesce_packets(packets)
+
+    assert [packet.obj for packet in coalesced] == [
+        ReasoningDelta(reasoning="Let me think"),
+        AgentResponseDelta(content="Hello, world"),
+        AgentResponseDelta(content="!"),
+        OverallStop(),
+    ]
+    assert [packet.placement.turn_index for packet in coalesced] == [0, 1, 2, 2]
+
+
+def test_emit_on_full_bus_returns_once_closed() -> None:
+    emitter = Emitter(Queue(maxsize=1))
+    emitter.emit(Packet(placement=_placement(0), obj=OverallStop()))
+
+    blocked_emit = threading.Thread(
+        target=emitter.emit,
+        args=(Packet(placement=_placement(0), obj=OverallStop()),),
+    )
+    blocked_emit.start()
+    blocked_emit.join(0.5)
+    assert blocked_emit.is_alive()
+
+    emitter.close()
+    blocked_emit.join(2)
+    assert not blocked_emit.is_alive()
+    assert emitter.bus.qsize() == 1
+
+
+def test_close_placement_drops_later_packets() -> None:
+    emitter = Emitter(Queue())
+    emitter.close_placement(
+        _placement(0), last_packet=Packet(placement=_placement(0), obj=OverallStop())
+    )
+    emitter.emit(Packet(placement=_placement(0), obj=ReasoningDelta(reasoning="late")))
+    emitter.emit(Packet(placement=_placement(1), obj=OverallStop()))
+
+    assert [emitter.bus.get().placement.turn_index for _ in range(2)] == [0, 1]
+    assert emitter.bus.empty()
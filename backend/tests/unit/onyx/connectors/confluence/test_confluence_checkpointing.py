@@ -270,7 +270,10 @@ def test_load_from_checkpoint_with_page_processing_error(
             confluence_connector, 0, end_time
         )
 
-        assert len(outputs) == 1
+        # the failed page doesn't keep the full page of results from being
+        # checkpointed, the second call only finds the empty page
+        assert len(outputs) == 2
+        assert outputs[1].items == []
         checkpoint_output = outputs[0]
         assert len(checkpoint_output.items) == 2
 
@@ -0,0 +1,102 @@
+from io import BytesIO
+from unittest.mock import patch
+
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream
+from pypdf.generic import DictionaryObject
+from pypdf.generic import NameObject
+
+from onyx.connectors.file.connector import _process_file
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+
+
+def _make_pdf(page_texts: list[str]) -> BytesIO:
+    writer = PdfWriter()
+    for text in page_texts:
+        page = writer.add_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject(
+                    {
+                        NameObject("/F1"): DictionaryObject(
+                            {
+                                NameObject("/Type"): NameObject("/Font"),
+                                NameObject("/Subtype"): NameObject("/Type1"),
+                                NameObject("/BaseFont"): NameObject("/Helvetica"),
+                            }
+                        )
+                    }
+                )
+            }
+        )
+        content = ContentStream(None, writer)
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page.replace_contents(content)
+    writer.add_metadata({"/Title": "Report title"})
+
+    file = BytesIO()
+    writer.write(file)
+    file.seek(0)
+    return file
+
+
+def _process_pdf(
+    stream_pdf_pages: bool,
+) -> tuple[list[Document], list[tuple[int, int]]]:
+    progress: list[tuple[int, int]] = []
+    with (
+        patch(
+            "onyx.connectors.file.connector.get_image_extraction_and_analysis_enabled",
+            return_value=False,
+        ),
+        patch(
+            "onyx.file_processing.extract_file_text.get_image_extraction_and_analysis_enabled",
+            return_value=False,
+        ),
+        patch(
+            "onyx.connectors.file.connector.get_unstructured_api_key",
+            return_value=None,
+        ),
+        patch(
+            "onyx.file_processing.extract_file_text.get_unstructured_api_key",
+            return_value=None,
+        ),
+    ):
+        documents = _process_file(
+            file_id="file-id",
+            file_name="report.pdf",
+            file=_make_pdf(["First page", "", "Third page"]),
+            metadata=None,
+            pdf_pass=None,
+            file_type="application/pdf",
+            stream_pdf_pages=stream_pdf_pages,
+            progress_callback=lambda processed, total: progress.append(
+                (processed, total)
+            ),
+        )
+    return documents, progress
+
+
+def test_process_file_streams_pdf_pages_into_sections() -> None:
+    documents, progress = _process_pdf(stream_pdf_pages=True)
+
+    assert len(documents) == 1
+    document = documents[0]
+    assert [
+        section.text
+        for section in document.sections
+        if isinstance(section, TextSection)
+    ] == ["First page", "Third page"]
+    # the PDF metadata is applied just like without streaming
+    assert document.metadata["Title"] == "Report title"
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_process_file_keeps_a_single_section_without_streaming() -> None:
+    documents, progress = _process_pdf(stream_pdf_pages=False)
+
+    assert len(documents) == 1
+    assert len(documents[0].sections) == 1
+    assert documents[0].metadata["Title"] == "Report title"
+    assert progress == []
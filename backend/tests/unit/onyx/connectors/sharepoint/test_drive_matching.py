@@ -8,6 +8,7 @@ from typing import Any
 
 import pytest
 
+from onyx.connectors.interfaces import ChangeDetectionIndexInterface
 from onyx.connectors.sharepoint.connector import SHARED_DOCUMENTS_MAP
 from onyx.connectors.sharepoint.connector import SharepointConnector
 from onyx.connectors.sharepoint.connector import SharepointConnectorCheckpoint
@@ -146,8 +147,10 @@ def test_load_from_checkpoint_maps_drive_name(monkeypatch: pytest.MonkeyPatch) -
         assert drive_name == "Documents"
         return [
             SimpleNamespace(
+                id="item",
                 name="sample.pdf",
                 web_url="https://example.sharepoint.com/sites/sample/sample.pdf",
+                properties={"eTag": "etag"},
             )
         ]
 
@@ -198,3 +201,97 @@ def test_load_from_checkpoint_maps_drive_name(monkeypatch: pytest.MonkeyPatch) -
 
     assert len(documents) == 1
     assert captured_drive_names == [SHARED_DOCUMENTS_MAP["Documents"]]
+
+
+class _FakeChangeDetectionIndex(ChangeDetectionIndexInterface):
+    def __init__(self, source_versions: dict[str, str]) -> None:
+        self.source_versions = source_versions
+        self.lookups: list[list[str]] = []
+
+    def get_source_versions(self, document_ids: list[str]) -> dict[str, str]:
+        self.lookups.append(document_ids)
+        return {
+            document_id: self.source_versions[document_id]
+            for document_id in document_ids
+            if document_id in self.source_versions
+        }
+
+
+def test_load_from_checkpoint_skips_items_with_an_unchanged_etag(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connector = SharepointConnector()
+    connector._graph_client = object()
+    connector.include_site_pages = False
+    # "renamed" kept its cTag, only the eTag changes on renames
+    change_detection_index = _FakeChangeDetectionIndex(
+        {"unchanged": "etag-1", "renamed": "etag-2"}
+    )
+    connector.set_change_detection_index(change_detection_index)
+
+    def fake_get_drive_items(
+        self: SharepointConnector,
+        site_descriptor: SiteDescriptor,
+        drive_name: str,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list[SimpleNamespace]:
+        return [
+            SimpleNamespace(
+                id=item_id,
+                name=f"{item_id}.pdf",
+                web_url=f"https://example.sharepoint.com/sites/sample/{item_id}.pdf",
+                properties={"eTag": etag, "cTag": "ctag"},
+            )
+            for item_id, etag in [
+                ("unchanged", "etag-1"),
+                ("renamed", "etag-3"),
+                ("new", "etag-4"),
+            ]
+        ]
+
+    def fake_convert(
+        driveitem: SimpleNamespace,
+        drive_name: str,
+        ctx: Any,
+        graph_client: Any,
+        include_permissions: bool,
+    ) -> SimpleNamespace:
+        return SimpleNamespace(id=driveitem.id, sections=["content"])
+
+    monkeypatch.setattr(
+        SharepointConnector,
+        "_get_drive_items_for_drive_name",
+        fake_get_drive_items,
+    )
+    monkeypatch.setattr(
+        "onyx.connectors.sharepoint.connector._convert_driveitem_to_document_with_permissions",
+        fake_convert,
+    )
+
+    checkpoint = SharepointConnectorCheckpoint(has_more=True)
+    checkpoint.cached_site_descriptors = deque()
+    checkpoint.current_site_descriptor = SiteDescriptor(
+        url="https://example.sharepoint.com/sites/sample",
+        drive_name="Documents",
+        folder_path=None,
+    )
+    checkpoint.cached_drive_names = deque(["Documents"])
+    checkpoint.current_drive_name = None
+    checkpoint.process_site_pages = False
+
+    documents: list[Any] = list(
+        connector._load_from_checkpoint(
+            start=0,
+            end=0,
+            checkpoint=checkpoint,
+            include_permissions=False,
+        )
+    )
+
+    assert [(document.id, document.source_version) for document in documents] == [
+        ("renamed", "etag-3"),
+        ("new", "etag-4"),
+    ]
+    # the versions of the whole drive are looked up at once
+    assert change_detection_index.lookups == [["unchanged", "renamed", "new"]]
@@ -0,0 +1,168 @@
+from typing import Any
+from typing import cast
+
+import redis
+
+from onyx.access.models import ExternalAccess
+from onyx.connectors.models import Document
+from onyx.connectors.models import DocumentSource
+from onyx.connectors.models import TextSection
+from onyx.redis.redis_connector_change_index import compute_document_content_hash
+from onyx.redis.redis_connector_change_index import RedisConnectorChangeIndex
+from onyx.redis.redis_pool import TenantRedis
+
+
+class _FakeRedis:
+    """Just enough of a redis client to back a single hash."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, bytes]] = {}
+
+    def pipeline(self) -> "_FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def expire(self, key: str, ttl: int) -> None:
+        pass
+
+    def hset(self, key: str, mapping: dict[str, str]) -> None:
+        self.hashes.setdefault(key, {}).update(
+            {field: value.encode("utf-8") for field, value in mapping.items()}
+        )
+
+    def hmget(self, key: str, fields: list[str]) -> list[bytes | None]:
+        stored = self.hashes.get(key, {})
+        return [stored.get(field) for field in fields]
+
+    def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def delete(self, key: str) -> None:
+        self.hashes.pop(key, None)
+
+
+class _FakeTenantRedis(TenantRedis):
+    """Keeps the tenant prefixing of the real client on top of a _FakeRedis."""
+
+    def __init__(self, tenant_id: str, fake: _FakeRedis | None = None) -> None:
+        super().__init__(tenant_id)
+        self.fake = fake or _FakeRedis()
+
+    def pipeline(self, *args: Any, **kwargs: Any) -> Any:
+        # like real pipelines, doesn't add the tenant prefix
+        return self.fake
+
+    def expire(self, *args: Any, **kwargs: Any) -> Any:
+        return self.fake.expire(*args, **kwargs)
+
+    def hset(self, *args: Any, **kwargs: Any) -> Any:
+        return self.fake.hset(*args, **kwargs)
+
+    def hmget(self, *args: Any, **kwargs: Any) -> Any:
+        return self.fake.hmget(*args, **kwargs)
+
+    def hdel(self, *args: Any, **kwargs: Any) -> Any:
+        return self.fake.hdel(*args, **kwargs)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        return self.fake.delete(*args, **kwargs)
+
+
+def _make_doc(
+    doc_id: str, text: str = "hello", source_version: str | None = None, **kwargs: Any
+) -> Document:
+    return Document(
+        id=doc_id,
+        sections=[TextSection(text=text, link="https://example.com")],
+        source=DocumentSource.GOOGLE_DRIVE,
+        semantic_identifier=doc_id,
+        metadata={},
+        source_version=source_version,
+        **kwargs,
+    )
+
+
+def _make_index() -> RedisConnectorChangeIndex:
+    return RedisConnectorChangeIndex("tenant", 1, cast(redis.Redis, _FakeRedis()))
+
+
+def test_content_hash_ignores_permission_ordering() -> None:
+    access_a = ExternalAccess(
+        external_user_emails={"a@x.com", "b@x.com", "c@x.com"},
+        external_user_group_ids={"g1", "g2"},
+        is_public=False,
+    )
+    access_b = ExternalAccess(
+        external_user_emails={"c@x.com", "a@x.com", "b@x.com"},
+        external_user_group_ids={"g2", "g1"},
+        is_public=False,
+    )
+    assert compute_document_content_hash(
+        _make_doc("1", external_access=access_a)
+    ) == compute_document_content_hash(_make_doc("1", external_access=access_b))
+
+
+def test_source_version_lookup() -> None:
+    index = _make_index()
+    index.record([_make_doc("1", source_version="v1"), _make_doc("2")])
+
+    assert index.is_unchanged("1", "v1")
+    assert not index.is_unchanged("1", "v2")
+    # recorded without a version, so can never be considered unchanged by version
+    assert not index.is_unchanged("2", None)
+    assert not index.is_unchanged("3", "v1")
+
+    index.remove(["1"])
+    assert not index.is_unchanged("1", "v1")
+
+
+def test_filter_unchanged_documents() -> None:
+    index = _make_index()
+    index.record([_make_doc("1", text="old"), _make_doc("2", text="same")])
+
+    changed = index.filter_unchanged_documents(
+        [
+            _make_doc("1", text="new"),
+            _make_doc("2", text="same"),
+            _make_doc("3", text="brand new"),
+        ]
+    )
+    assert [doc.id for doc in changed] == ["1", "3"]
+
+    index.reset()
+    assert len(index.filter_unchanged_documents([_make_doc("2", text="same")])) == 1
+
+
+def test_tenant_redis_operations_use_the_same_key() -> None:
+    tenant_redis = _FakeTenantRedis("tenant_a")
+    index = RedisConnectorChangeIndex("tenant_a", 1, tenant_redis)
+    # same cc pair id in another tenant
+    other_index = RedisConnectorChangeIndex(
+        "tenant_b", 1, _FakeTenantRedis("tenant_b", tenant_redis.fake)
+    )
+
+    index.record(
+        [_make_doc("1", source_version="v1"), _make_doc("2", source_version="v1")]
+    )
+    assert list(tenant_redis.fake.hashes) == ["tenant_a:connectorchangeindex_1"]
+    assert index.get_source_versions(["1", "2"]) == {"1": "v1", "2": "v1"}
+    assert other_index.get_source_versions(["1", "2"]) == {}
+
+    index.remove(["1"])
+    assert index.get_source_versions(["1", "2"]) == {"2": "v1"}
+
+    index.reset()
+    assert index.get_entries(["1", "2"]) == {}
+    assert tenant_redis.fake.hashes == {}
+
+
+def test_get_unchanged() -> None:
+    index = _make_index()
+    index.record(
+        [_make_doc("1", source_version="v1"), _make_doc("2", source_version="v1")]
+    )
+
+    assert index.get_unchanged({"1": "v1", "2": "v2", "3": "v1", "4": None}) == {"1"}
@@ -20,9 +20,11 @@ from onyx.connectors.factory import ConnectorMissingException
 from onyx.connectors.factory import identify_connector_class
 from onyx.connectors.factory import instantiate_connector
 from onyx.connectors.interfaces import BaseConnector
+from onyx.connectors.interfaces import OAuthConnector
 from onyx.connectors.models import InputType
 from onyx.connectors.registry import CONNECTOR_CLASS_MAP
 from onyx.connectors.registry import ConnectorMapping
+from onyx.connectors.registry import OAUTH_CONNECTOR_SOURCES
 
 
 class TestConnectorMappingValidation:
@@ -67,6 +69,16 @@ class TestConnectorMappingValidation:
             unique_sources
         ), "Duplicate DocumentSource entries found"
 
+    def test_oauth_connector_sources_are_complete(self) -> None:
+        """Test that the OAuth flow knows about every connector implementing OAuth."""
+        oauth_sources = {
+            source
+            for source in CONNECTOR_CLASS_MAP
+            if issubclass(_load_connector_class(source), OAuthConnector)
+        }
+
+        assert oauth_sources == OAUTH_CONNECTOR_SOURCES
+
     def test_blob_storage_connectors_correct(self) -> None:
         """Test that all blob storage sources map to the same connector."""
         blob_sources = [
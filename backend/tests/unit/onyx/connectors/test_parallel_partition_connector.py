@@ -0,0 +1,120 @@
+from typing import Any
+from unittest.mock import patch
+
+from onyx.connectors.connector_runner import ConnectorRunner
+from onyx.connectors.connector_runner import ParallelPartitionConnector
+from onyx.connectors.interfaces import CheckpointOutput
+from onyx.connectors.interfaces import PartitionedCheckpointedConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
+from onyx.connectors.models import ConnectorCheckpoint
+from onyx.connectors.models import Document
+from onyx.connectors.models import DocumentSource
+from onyx.connectors.models import PartitionedConnectorCheckpoint
+from onyx.connectors.models import TextSection
+
+
+class _PageCheckpoint(ConnectorCheckpoint):
+    page: int = 0
+
+
+class _FakePartitionedConnector(PartitionedCheckpointedConnector[_PageCheckpoint]):
+    """Each partition has `num_pages` pages with one document per page."""
+
+    def __init__(self, partitions: list[str], num_pages: int) -> None:
+        self.partitions = partitions
+        self.num_pages = num_pages
+        self.partition_id: str | None = None
+
+    def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
+        return None
+
+    def get_partitions(self) -> list[str]:
+        return self.partitions
+
+    def build_partition_connector(
+        self, partition_id: str
+    ) -> "_FakePartitionedConnector":
+        partition_connector = _FakePartitionedConnector([partition_id], self.num_pages)
+        partition_connector.partition_id = partition_id
+        return partition_connector
+
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: _PageCheckpoint,
+    ) -> CheckpointOutput[_PageCheckpoint]:
+        yield Document(
+            id=f"{self.partition_id}-{checkpoint.page}",
+            sections=[TextSection(text="text", link=None)],
+            source=DocumentSource.MOCK_CONNECTOR,
+            semantic_identifier="doc",
+            metadata={},
+        )
+        next_page = checkpoint.page + 1
+        return _PageCheckpoint(page=next_page, has_more=next_page < self.num_pages)
+
+    def build_dummy_checkpoint(self) -> _PageCheckpoint:
+        return _PageCheckpoint(has_more=True)
+
+    def validate_checkpoint_json(self, checkpoint_json: str) -> _PageCheckpoint:
+        return _PageCheckpoint.model_validate_json(checkpoint_json)
+
+
+def _drain(
+    gen: CheckpointOutput[PartitionedConnectorCheckpoint], doc_ids: set[str]
+) -> PartitionedConnectorCheckpoint:
+    try:
+        while True:
+            document_or_failure = next(gen)
+            assert isinstance(document_or_failure, Document)
+            doc_ids.add(document_or_failure.id)
+    except StopIteration as e:
+        return e.value
+
+
+def test_all_partitions_are_fetched_and_checkpointed() -> None:
+    connector = ParallelPartitionConnector(
+        connector=_FakePartitionedConnector(["a", "b", "c"], num_pages=2),
+        partitions=["a", "b", "c"],
+        max_workers=3,
+    )
+
+    doc_ids: set[str] = set()
+    checkpoint = connector.build_dummy_checkpoint()
+    num_steps = 0
+    while checkpoint.has_more:
+        checkpoint = _drain(connector.load_from_checkpoint(0, 1, checkpoint), doc_ids)
+        num_steps += 1
+
+    # every partition advances by one of its own checkpoints per step
+    assert num_steps == 2
+    assert doc_ids == {"a-0", "a-1", "b-0", "b-1", "c-0", "c-1"}
+    assert sorted(checkpoint.completed_partitions) == ["a", "b", "c"]
+
+    resumed = connector.validate_checkpoint_json(checkpoint.model_dump_json())
+    assert not resumed.has_more
+
+
+def test_runner_only_wraps_when_enabled() -> None:
+    with patch("onyx.connectors.connector_runner.DOCFETCHING_PARTITION_PARALLELISM", 1):
+        runner: ConnectorRunner = ConnectorRunner(
+            connector=_FakePartitionedConnector(["a", "b"], num_pages=1),
+            batch_size=10,
+            include_permissions=False,
+        )
+    assert isinstance(runner.connector, _FakePartitionedConnector)
+
+    with patch("onyx.connectors.connector_runner.DOCFETCHING_PARTITION_PARALLELISM", 4):
+        runner = ConnectorRunner(
+            connector=_FakePartitionedConnector(["a", "b"], num_pages=1),
+            batch_size=10,
+            include_permissions=False,
+        )
+        single_partition_runner: ConnectorRunner = ConnectorRunner(
+            connector=_FakePartitionedConnector(["a"], num_pages=1),
+            batch_size=10,
+            include_permissions=False,
+        )
+    assert isinstance(runner.connector, ParallelPartitionConnector)
+    assert isinstance(single_partition_runner.connector, _FakePartitionedConnector)
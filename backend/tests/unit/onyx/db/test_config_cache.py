@@ -0,0 +1,130 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from onyx.db import config_cache
+from onyx.db.config_cache import _collect_bulk_config_changes
+from onyx.db.config_cache import _collect_config_changes
+from onyx.db.config_cache import _ConfigCache
+from onyx.db.config_cache import _publish_config_changes
+from onyx.db.config_cache import get_or_load_config
+from onyx.db.engine.tenant_routing import route_session_to_tenant
+from onyx.db.models import ChatMessage
+from onyx.db.models import LLMProvider
+from onyx.db.models import Persona__Tool
+from onyx.db.models import Tool
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> _ConfigCache:
+    cache = _ConfigCache(ttl=60)
+    monkeypatch.setattr(config_cache, "_cache", cache)
+    monkeypatch.setattr(config_cache, "CONFIG_CACHE_ENABLED", True)
+    monkeypatch.setattr(config_cache._subscriber, "ensure_started", lambda: None)
+    monkeypatch.setattr(config_cache._subscriber.subscribed, "is_set", lambda: True)
+    return cache
+
+
+def test_values_are_cached_per_tenant_until_invalidated(cache: _ConfigCache) -> None:
+    loads: list[str] = []
+
+    def load() -> str:
+        loads.append("load")
+        return f"value {len(loads)}"
+
+    assert get_or_load_config("kind", 1, load) == "value 1"
+    assert get_or_load_config("kind", 1, load) == "value 1"
+    assert get_or_load_config("kind", 2, load) == "value 2"
+
+    cache.invalidate("public")
+    assert get_or_load_config("kind", 1, load) == "value 3"
+    assert len(loads) == 3
+
+
+def test_values_loaded_during_an_invalidation_are_not_cached(
+    cache: _ConfigCache,
+) -> None:
+    def load_while_admin_edits() -> str:
+        cache.invalidate("public")
+        return "stale"
+
+    assert get_or_load_config("kind", None, load_while_admin_edits) == "stale"
+    assert get_or_load_config("kind", None, lambda: "fresh") == "fresh"
+
+    cache.clear()
+    version = cache.version("public")
+    cache.clear()
+    cache.put("public", ("kind", None), "stale", version)
+    assert cache.get("public", ("kind", None)) == (False, None)
+
+
+def _orm_execute_state(statement: object) -> MagicMock:
+    state = MagicMock()
+    state.is_select = False
+    state.statement = statement
+    state.session.info = {}
+    return state
+
+
+def test_changes_to_cached_tables_are_published(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    published: list[str] = []
+    monkeypatch.setattr(config_cache, "_publish", published.append)
+
+    # core statements on association tables
+    state = _orm_execute_state(
+        delete(Persona__Tool.__table__).where(Persona__Tool.persona_id == 1)  # type: ignore
+    )
+    _collect_bulk_config_changes(state)
+    _publish_config_changes(state.session)
+
+    # ORM bulk updates
+    state = _orm_execute_state(update(LLMProvider).values(api_key="key"))
+    _collect_bulk_config_changes(state)
+    _publish_config_changes(state.session)
+
+    # unrelated tables and reads
+    state = _orm_execute_state(delete(ChatMessage))
+    _collect_bulk_config_changes(state)
+    _publish_config_changes(state.session)
+    read_state = _orm_execute_state(select(Tool))
+    read_state.is_select = True
+    _collect_bulk_config_changes(read_state)
+    _publish_config_changes(read_state.session)
+
+    assert published == ["public", "public"]
+
+    session = Session()
+    session.add(Tool(name="tool", description="", in_code_tool_id=None))
+    _collect_config_changes(session, None)
+    _publish_config_changes(session)
+    assert published == ["public", "public", "public"]
+
+
+def test_changes_are_published_for_the_tenant_of_the_session(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    published: list[str] = []
+    monkeypatch.setattr(config_cache, "_publish", published.append)
+
+    routed_session = Session()
+    route_session_to_tenant(routed_session, "tenant_a")
+    routed_session.info[config_cache._CONFIG_CHANGED_KEY] = True
+    _publish_config_changes(routed_session)
+
+    with (
+        create_engine("sqlite://")
+        .connect()
+        .execution_options(schema_translate_map={None: "tenant_b"}) as connection
+    ):
+        translated_session = Session(bind=connection)
+        translated_session.info[config_cache._CONFIG_CHANGED_KEY] = True
+        _publish_config_changes(translated_session)
+
+    assert published == ["tenant_a", "tenant_b"]
@@ -0,0 +1,58 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+import onyx.db.document  # noqa: F401  # resolves the import cycle with onyx.db.entities
+from onyx.db.entities import upsert_staging_entities
+from onyx.db.relationships import upsert_staging_relationships
+from onyx.kg.models import KGStagingEntity
+
+
+def _executed_params(db_session: MagicMock, call_index: int) -> dict[str, Any]:
+    stmt = db_session.execute.call_args_list[call_index].args[0]
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def test_upsert_staging_entities_merges_duplicates() -> None:
+    db_session = MagicMock()
+
+    upsert_staging_entities(
+        db_session,
+        [
+            KGStagingEntity(
+                name="acme",
+                entity_type="account",
+                document_id="doc_1",
+                attributes={"key": "acme-key", "industry": "retail"},
+            ),
+            KGStagingEntity(name="Acme", entity_type="ACCOUNT"),
+            KGStagingEntity(name="bob", entity_type="employee"),
+        ],
+    )
+
+    # one insert for all entities, one update for the documents
+    assert db_session.execute.call_count == 2
+    params = _executed_params(db_session, 0)
+    assert params["id_name_m0"] == "ACCOUNT::acme"
+    assert params["occurrences_m0"] == 2
+    assert params["document_id_m0"] == "doc_1"
+    assert params["entity_key_m0"] == "acme-key"
+    assert params["attributes_m0"] == {"industry": "retail"}
+    assert params["id_name_m1"] == "EMPLOYEE::bob"
+    assert params["occurrences_m1"] == 1
+    assert "id_name_m2" not in params
+
+
+def test_upsert_staging_relationships_counts_per_document() -> None:
+    db_session = MagicMock()
+    relationship = "ACCOUNT::acme__works_with__EMPLOYEE::bob"
+
+    upsert_staging_relationships(
+        db_session,
+        [(relationship, "doc_1"), (relationship, "doc_1"), (relationship, "doc_2")],
+    )
+
+    params = _executed_params(db_session, 0)
+    assert [params["source_document_m0"], params["occurrences_m0"]] == ["doc_1", 2]
+    assert [params["source_document_m1"], params["occurrences_m1"]] == ["doc_2", 1]
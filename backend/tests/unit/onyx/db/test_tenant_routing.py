@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from onyx.db.engine import tenant_routing
+from onyx.db.engine.tenant_routing import route_session_to_tenant
+from onyx.db.engine.tenant_routing import set_connection_search_path
+
+
+def _mock_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.info = {}
+    return connection
+
+
+def test_search_path_is_only_set_when_the_tenant_changes() -> None:
+    connection = _mock_connection()
+    dbapi_connection = connection.connection.dbapi_connection
+    cursor = dbapi_connection.cursor.return_value
+
+    set_connection_search_path(connection, "tenant_a")
+    set_connection_search_path(connection, "tenant_a")
+    set_connection_search_path(connection, "tenant_b")
+
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        'SET search_path TO "tenant_a"',
+        'SET search_path TO "tenant_b"',
+    ]
+    # committed so that a rolled back transaction doesn't revert it
+    assert dbapi_connection.commit.call_count == 2
+
+
+def test_every_transaction_of_a_routed_session_is_routed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    routed: list[str] = []
+
+    def fake_set_search_path(connection: Connection, schema: str) -> None:
+        routed.append(schema)
+
+    monkeypatch.setattr(
+        tenant_routing, "set_connection_search_path", fake_set_search_path
+    )
+    engine = create_engine("sqlite://")
+
+    with Session(bind=engine) as session:
+        route_session_to_tenant(session, "tenant_a")
+        session.execute(text("SELECT 1"))
+        session.commit()
+        session.execute(text("SELECT 1"))
+        session.rollback()
+
+    with Session(bind=engine) as session:
+        session.execute(text("SELECT 1"))
+
+    assert routed == ["tenant_a", "tenant_a"]
+
+
+def test_compiled_cache_lookups_are_counted() -> None:
+    engine = create_engine("sqlite://")
+    counter = tenant_routing._compiled_cache_lookups
+
+    def lookups(result: str) -> float:
+        return counter.labels(result=result)._value.get()
+
+    hits_before = lookups("hit")
+    with engine.connect() as connection:
+        connection.execute(select(1).where(text("1 = 1")))
+        misses = lookups("miss")
+        connection.execute(select(1).where(text("1 = 1")))
+
+    assert lookups("hit") == hits_before + 1
+    assert lookups("miss") == misses
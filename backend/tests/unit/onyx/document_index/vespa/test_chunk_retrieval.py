@@ -0,0 +1,117 @@
+import httpx
+import pytest
+
+from onyx.context.search.models import IndexFilters
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa import chunk_retrieval
+from onyx.document_index.vespa.chunk_retrieval import _can_fetch_by_id
+from onyx.document_index.vespa.chunk_retrieval import get_chunks_via_document_api
+from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
+from onyx.document_index.vespa_constants import MAX_CHUNKS_PER_ID_FETCH
+
+
+def _chunk_id(document_id: str, chunk_ind: int) -> str:
+    return str(
+        get_uuid_from_chunk_info(
+            document_id=document_id, chunk_id=chunk_ind, tenant_id="public"
+        )
+    )
+
+
+def _mock_vespa_client(
+    chunks: dict[str, dict[str, int]],
+    requested_paths: list[str],
+    failing_chunk_ids: set[str] | None = None,
+) -> httpx.Client:
+    """Serves the ACL of the chunks by chunk id like the Document API"""
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requested_paths.append(request.url.path)
+        chunk_id = request.url.path.rsplit("/", 1)[-1]
+        if failing_chunk_ids and chunk_id in failing_chunk_ids:
+            return httpx.Response(503)
+        if chunk_id not in chunks:
+            return httpx.Response(404, json={"id": chunk_id})
+        return httpx.Response(
+            200,
+            json={"id": chunk_id, "fields": {ACCESS_CONTROL_LIST: chunks[chunk_id]}},
+        )
+
+    return httpx.Client(transport=httpx.MockTransport(handle))
+
+
+def test_chunks_are_fetched_by_id_with_acl_filtering() -> None:
+    chunks = {
+        _chunk_id("doc1", 0): {"PUBLIC": 1},
+        _chunk_id("doc1", 1): {"user_email:a@b.com": 1},
+        _chunk_id("doc2", 0): {"user_email:c@d.com": 1},
+    }
+    requested_paths: list[str] = []
+    chunk_requests = [
+        VespaChunkRequest("doc1", min_chunk_ind=0, max_chunk_ind=2),
+        VespaChunkRequest("doc2", min_chunk_ind=0, max_chunk_ind=0),
+        # e.g. indexed with the old chunk id scheme
+        VespaChunkRequest("doc3", min_chunk_ind=0, max_chunk_ind=1),
+    ]
+
+    with _mock_vespa_client(chunks, requested_paths) as http_client:
+        documents, not_found_requests = get_chunks_via_document_api(
+            chunk_requests=chunk_requests,
+            index_name="danswer_chunk",
+            filters=IndexFilters(
+                access_control_list=["PUBLIC", "user_email:a@b.com"],
+                tenant_id="public",
+            ),
+            http_client=http_client,
+        )
+
+    assert len(requested_paths) == 6
+    assert sorted(document["id"] for document in documents) == sorted(
+        [_chunk_id("doc1", 0), _chunk_id("doc1", 1)]
+    )
+    # doc2 exists but isn't accessible, only doc3 has to be retrieved otherwise
+    assert not_found_requests == [chunk_requests[2]]
+
+
+def test_requests_with_failed_fetches_are_retrieved_by_document_id(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # skip the retry delays
+    monkeypatch.setattr(
+        chunk_retrieval,
+        "_get_chunk_by_id",
+        chunk_retrieval._get_chunk_by_id.__wrapped__,  # type: ignore[attr-defined]
+    )
+    chunks = {
+        _chunk_id("doc1", 0): {"PUBLIC": 1},
+        _chunk_id("doc2", 0): {"PUBLIC": 1},
+        _chunk_id("doc2", 1): {"PUBLIC": 1},
+    }
+    chunk_requests = [
+        VespaChunkRequest("doc1", min_chunk_ind=0, max_chunk_ind=0),
+        VespaChunkRequest("doc2", min_chunk_ind=0, max_chunk_ind=1),
+    ]
+
+    with _mock_vespa_client(
+        chunks, [], failing_chunk_ids={_chunk_id("doc2", 1)}
+    ) as http_client:
+        documents, not_found_requests = get_chunks_via_document_api(
+            chunk_requests=chunk_requests,
+            index_name="danswer_chunk",
+            filters=IndexFilters(access_control_list=None, tenant_id="public"),
+            http_client=http_client,
+        )
+
+    # the chunk of doc2 that was fetched isn't returned twice
+    assert [document["id"] for document in documents] == [_chunk_id("doc1", 0)]
+    assert not_found_requests == [chunk_requests[1]]
+
+
+def test_only_capped_regular_chunk_requests_are_fetched_by_id() -> None:
+    assert _can_fetch_by_id(VespaChunkRequest("doc", 2, 5), get_large_chunks=False)
+    assert not _can_fetch_by_id(VespaChunkRequest("doc", 2, 5), get_large_chunks=True)
+    assert not _can_fetch_by_id(VespaChunkRequest("doc"), get_large_chunks=False)
+    assert not _can_fetch_by_id(
+        VespaChunkRequest("doc", 0, MAX_CHUNKS_PER_ID_FETCH), get_large_chunks=False
+    )
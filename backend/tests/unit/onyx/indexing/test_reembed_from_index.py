@@ -0,0 +1,438 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.background.indexing import reembed_from_index
+from onyx.background.indexing import run_docfetching
+from onyx.background.indexing.reembed_from_index import _build_document
+from onyx.background.indexing.reembed_from_index import (
+    get_current_index_poll_range_end,
+)
+from onyx.background.indexing.reembed_from_index import (
+    iter_current_index_document_batches,
+)
+from onyx.background.indexing.run_docfetching import (
+    current_index_document_extraction,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.connectors.models import ConnectorStopSignal
+from onyx.connectors.models import Document
+from onyx.connectors.models import ImageSection
+from onyx.connectors.models import TextSection
+from onyx.context.search.models import InferenceChunk
+from onyx.db.enums import AccessType
+from onyx.db.enums import IndexModelStatus
+from onyx.db.models import Document as DbDocument
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.indexing import indexing_pipeline
+from onyx.indexing.indexing_pipeline import process_image_sections
+
+
+def _chunk(
+    chunk_id: int,
+    content: str,
+    section_continuation: bool = False,
+    image_file_id: str | None = None,
+    source_links: dict[int, str] | None = None,
+    document_id: str = "doc",
+) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        chunk_id=chunk_id,
+        blurb=content,
+        content=content,
+        source_links=(
+            source_links
+            if source_links is not None
+            else {0: f"https://example.com/{chunk_id}"}
+        ),
+        image_file_id=image_file_id,
+        section_continuation=section_continuation,
+        source_type=DocumentSource.CONFLUENCE,
+        semantic_identifier="Page",
+        title=None,
+        boost=1,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={"space": "eng"},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+        primary_owners=["Jane Doe"],
+    )
+
+
+def test_documents_are_rebuilt_from_their_chunks() -> None:
+    db_document = DbDocument(
+        id="doc",
+        semantic_id="Page",
+        from_ingestion_api=False,
+        primary_owners=["Jane Doe"],
+        external_user_emails=["a@b.com"],
+        external_user_group_ids=None,
+        is_public=False,
+    )
+    chunks = [
+        # the link offsets are in the cleaned up text, "intro" is 5 characters long
+        _chunk(0, "Intro.\n\nFirst section", source_links={0: "", 5: "https://a"}),
+        _chunk(
+            1,
+            "still the first section",
+            source_links={0: "https://a"},
+            section_continuation=True,
+        ),
+        _chunk(2, "a diagram", image_file_id="image"),
+        _chunk(
+            3,
+            "Second section\n\nThird section",
+            source_links={0: "https://b", 13: "https://c"},
+        ),
+    ]
+
+    document = _build_document(db_document, chunks, include_external_access=True)
+
+    assert document.sections == [
+        TextSection(text="Intro.", link=None),
+        TextSection(text="First section still the first section", link="https://a"),
+        ImageSection(
+            image_file_id="image", link="https://example.com/2", text="a diagram"
+        ),
+        TextSection(text="Second section", link="https://b"),
+        TextSection(text="Third section", link="https://c"),
+    ]
+    # no title was indexed, it has to stay empty rather than become the semantic id
+    assert document.get_title_for_document_index() is None
+    assert document.metadata == {"space": "eng"}
+    assert document.primary_owners
+    assert document.primary_owners[0].get_semantic_name() == "Jane Doe"
+    assert document.external_access
+    assert document.external_access.external_user_emails == {"a@b.com"}
+
+    document = _build_document(db_document, chunks, include_external_access=False)
+    assert document.external_access is None
+
+
+def test_summarized_images_are_not_summarized_again(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        indexing_pipeline, "get_image_extraction_and_analysis_enabled", lambda: True
+    )
+    monkeypatch.setattr(
+        indexing_pipeline, "get_default_llm_with_vision", lambda: MagicMock()
+    )
+    summarize = MagicMock(return_value="new summary")
+    monkeypatch.setattr(
+        indexing_pipeline, "summarize_image_with_error_handling", summarize
+    )
+    monkeypatch.setattr(indexing_pipeline, "get_default_file_store", MagicMock())
+
+    document = Document(
+        id="doc",
+        source=DocumentSource.CONFLUENCE,
+        semantic_identifier="Page",
+        metadata={},
+        sections=[
+            ImageSection(image_file_id="summarized", text="a diagram"),
+            ImageSection(image_file_id="new"),
+        ],
+    )
+
+    (indexing_document,) = process_image_sections([document])
+
+    assert [section.text for section in indexing_document.processed_sections] == [
+        "a diagram",
+        "new summary",
+    ]
+    assert summarize.call_count == 1
+
+
+def _mock_sessions(monkeypatch: pytest.MonkeyPatch, module: Any) -> MagicMock:
+    db_session = MagicMock()
+
+    @contextmanager
+    def get_session() -> Iterator[MagicMock]:
+        yield db_session
+
+    monkeypatch.setattr(module, "get_session_with_current_tenant", get_session)
+    return db_session
+
+
+def test_documents_are_paged_through_by_document_id(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _mock_sessions(monkeypatch, reembed_from_index)
+    monkeypatch.setattr(
+        reembed_from_index,
+        "get_connector_credential_pair_from_id",
+        lambda db_session, cc_pair_id: MagicMock(
+            connector_id=1, credential_id=2, access_type=AccessType.PUBLIC
+        ),
+    )
+    monkeypatch.setattr(
+        reembed_from_index, "get_current_search_settings", lambda db_session: None
+    )
+    db_documents = [
+        DbDocument(id=document_id, semantic_id=document_id, from_ingestion_api=False)
+        for document_id in ["a", "b", "c"]
+    ]
+    pages: list[str | None] = []
+
+    def get_document_batch(
+        db_session: Any,
+        connector_id: int,
+        credential_id: int,
+        limit: int,
+        after_document_id: str | None,
+    ) -> list[DbDocument]:
+        pages.append(after_document_id)
+        remaining = [
+            db_document
+            for db_document in db_documents
+            if after_document_id is None or db_document.id > after_document_id
+        ]
+        return remaining[:limit]
+
+    monkeypatch.setattr(
+        reembed_from_index,
+        "get_document_batch_for_connector_credential_pair",
+        get_document_batch,
+    )
+    # "b" has no chunks in the current index
+    chunks = {
+        "a": [_chunk(1, "two", document_id="a"), _chunk(0, "one", document_id="a")],
+        "c": [_chunk(0, "three", document_id="c")],
+    }
+
+    def id_based_retrieval(
+        chunk_requests: list[VespaChunkRequest], **kwargs: Any
+    ) -> list[InferenceChunk]:
+        return [
+            chunk
+            for chunk_request in chunk_requests
+            for chunk in chunks.get(chunk_request.document_id, [])
+        ]
+
+    document_index = MagicMock()
+    document_index.id_based_retrieval.side_effect = id_based_retrieval
+    monkeypatch.setattr(
+        reembed_from_index,
+        "get_default_document_index",
+        lambda search_settings, secondary_search_settings: document_index,
+    )
+
+    batches = list(
+        iter_current_index_document_batches(
+            cc_pair_id=1, tenant_id="public", batch_size=2
+        )
+    )
+
+    assert pages == [None, "b", "c"]
+    assert [[document.id for document in batch] for batch in batches] == [
+        ["a"],
+        ["c"],
+    ]
+    # the chunks are ordered by chunk id before the document is rebuilt
+    assert batches[0][0].sections == [
+        TextSection(text="one", link="https://example.com/0"),
+        TextSection(text="two", link="https://example.com/1"),
+    ]
+    # permissions are only taken over for sync cc pairs
+    assert batches[0][0].external_access is None
+
+
+def _index_attempt(
+    status: IndexModelStatus | None = IndexModelStatus.FUTURE,
+    from_beginning: bool = False,
+) -> MagicMock:
+    return MagicMock(
+        search_settings=MagicMock(status=status) if status else None,
+        from_beginning=from_beginning,
+        connector_credential_pair_id=1,
+    )
+
+
+@pytest.mark.parametrize(
+    "index_attempt,last_poll_range_end",
+    [
+        # the attempt isn't building the index of new search settings
+        (_index_attempt(status=None), 1000),
+        (_index_attempt(status=IndexModelStatus.PRESENT), 1000),
+        # an explicit reindex from the source
+        (_index_attempt(from_beginning=True), 1000),
+        # the current index never completed an attempt for the cc pair
+        (_index_attempt(), None),
+    ],
+)
+def test_the_connector_runs_when_the_current_index_cannot_be_used(
+    monkeypatch: pytest.MonkeyPatch,
+    index_attempt: MagicMock,
+    last_poll_range_end: int | None,
+) -> None:
+    monkeypatch.setattr(
+        reembed_from_index, "get_current_search_settings", lambda db_session: None
+    )
+    monkeypatch.setattr(
+        reembed_from_index,
+        "get_last_successful_attempt_poll_range_end",
+        lambda **kwargs: last_poll_range_end,
+    )
+
+    assert get_current_index_poll_range_end(index_attempt, MagicMock()) is None
+
+
+def test_the_current_index_covers_its_last_successful_attempt(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        reembed_from_index, "get_current_search_settings", lambda db_session: None
+    )
+    monkeypatch.setattr(
+        reembed_from_index,
+        "get_last_successful_attempt_poll_range_end",
+        lambda **kwargs: 1000,
+    )
+
+    assert get_current_index_poll_range_end(
+        _index_attempt(), MagicMock()
+    ) == datetime.fromtimestamp(1000, tz=timezone.utc)
+
+
+class _Extraction:
+    """Mocks the dependencies of current_index_document_extraction"""
+
+    def __init__(
+        self, monkeypatch: pytest.MonkeyPatch, batches: list[list[Document]]
+    ) -> None:
+        self.db_session = _mock_sessions(monkeypatch, run_docfetching)
+        self.index_attempt = _index_attempt()
+        self.index_attempt.status.is_terminal.return_value = False
+        self.batch_storage = MagicMock()
+        self.check_status = MagicMock()
+        self.coordination = MagicMock()
+        self.mark_attempt_canceled = MagicMock()
+        self.mark_attempt_failed = MagicMock()
+        self.app = MagicMock()
+
+        def iter_batches(
+            cc_pair_id: int, tenant_id: str, batch_size: int
+        ) -> Iterator[list[Document]]:
+            for batch in batches:
+                yield batch
+
+        monkeypatch.setattr(
+            run_docfetching,
+            "get_document_batch_storage",
+            lambda cc_pair_id, index_attempt_id: self.batch_storage,
+        )
+        monkeypatch.setattr(
+            run_docfetching,
+            "get_index_attempt",
+            lambda *args, **kwargs: self.index_attempt,
+        )
+        monkeypatch.setattr(
+            run_docfetching, "iter_current_index_document_batches", iter_batches
+        )
+        monkeypatch.setattr(
+            run_docfetching, "_check_connector_and_attempt_status", self.check_status
+        )
+        monkeypatch.setattr(run_docfetching, "IndexingCoordination", self.coordination)
+        monkeypatch.setattr(
+            run_docfetching, "mark_attempt_canceled", self.mark_attempt_canceled
+        )
+        monkeypatch.setattr(
+            run_docfetching, "mark_attempt_failed", self.mark_attempt_failed
+        )
+
+    def run(self, callback: MagicMock | None = None) -> None:
+        current_index_document_extraction(
+            app=self.app,
+            index_attempt_id=1,
+            cc_pair_id=2,
+            tenant_id="public",
+            poll_range_end=datetime.fromtimestamp(1000, tz=timezone.utc),
+            callback=callback,
+        )
+
+
+def _document(document_id: str) -> Document:
+    return Document(
+        id=document_id,
+        source=DocumentSource.CONFLUENCE,
+        semantic_identifier=document_id,
+        metadata={},
+        sections=[TextSection(text=document_id)],
+    )
+
+
+def test_documents_from_the_current_index_are_queued_for_processing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    batches = [[_document("a")], [_document("b")]]
+    extraction = _Extraction(monkeypatch, batches)
+
+    extraction.run()
+
+    # the attempt covers everything up to the end of the current index's attempt
+    assert extraction.index_attempt.poll_range_start == datetime.fromtimestamp(
+        0, tz=timezone.utc
+    )
+    assert extraction.index_attempt.poll_range_end == datetime.fromtimestamp(
+        1000, tz=timezone.utc
+    )
+    extraction.db_session.commit.assert_called()
+    extraction.batch_storage.cleanup_all_batches.assert_called_once()
+    assert [
+        call.args for call in extraction.batch_storage.store_batch.call_args_list
+    ] == [(0, batches[0]), (1, batches[1])]
+    assert [call.args for call in extraction.app.send_task.call_args_list] == [
+        (OnyxCeleryTask.DOCPROCESSING_TASK,),
+        (OnyxCeleryTask.DOCPROCESSING_TASK,),
+    ]
+    assert [
+        call.kwargs["kwargs"]["batch_num"]
+        for call in extraction.app.send_task.call_args_list
+    ] == [0, 1]
+    assert extraction.check_status.call_count == 2
+    assert (
+        extraction.coordination.set_total_batches.call_args.kwargs["total_batches"] == 2
+    )
+
+
+def test_stopped_extraction_cancels_the_attempt(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    extraction = _Extraction(monkeypatch, [[_document("a")]])
+    callback = MagicMock()
+    callback.should_stop.return_value = True
+
+    with pytest.raises(ConnectorStopSignal):
+        extraction.run(callback)
+
+    extraction.mark_attempt_canceled.assert_called_once()
+    extraction.mark_attempt_failed.assert_not_called()
+    extraction.app.send_task.assert_not_called()
+
+
+@pytest.mark.parametrize("is_terminal", [False, True])
+def test_failed_extraction_fails_the_attempt_unless_it_already_ended(
+    monkeypatch: pytest.MonkeyPatch, is_terminal: bool
+) -> None:
+    extraction = _Extraction(monkeypatch, [[_document("a")]])
+    extraction.index_attempt.status.is_terminal.return_value = is_terminal
+    extraction.check_status.side_effect = RuntimeError("cc pair was deleted")
+
+    with pytest.raises(RuntimeError):
+        extraction.run()
+
+    assert extraction.mark_attempt_failed.called is not is_terminal
+    extraction.mark_attempt_canceled.assert_not_called()
+    extraction.coordination.set_total_batches.assert_not_called()
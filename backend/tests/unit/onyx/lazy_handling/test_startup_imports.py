@@ -0,0 +1,13 @@
+import pytest
+
+from scripts.profile_startup_imports import profile_entry_point
+from scripts.profile_startup_imports import STARTUP_BUDGETS
+
+
+@pytest.mark.parametrize("entry_point", ["light", "monitoring", "beat"])
+def test_light_workers_do_not_import_heavy_packages(entry_point: str) -> None:
+    profile = profile_entry_point(entry_point)
+
+    forbidden_modules = STARTUP_BUDGETS[entry_point].forbidden_modules
+    assert forbidden_modules
+    assert [module for module in forbidden_modules if profile.loaded(module)] == []
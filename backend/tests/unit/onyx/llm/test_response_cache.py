@@ -0,0 +1,128 @@
+from typing import Any
+from unittest.mock import patch
+
+import litellm
+import pytest
+
+from onyx.llm.models import LanguageModelInput
+from onyx.llm.models import UserMessage
+from onyx.llm.multi_llm import LitellmLLM
+
+
+class _FakeRedis:
+    """Just enough of the redis client for the response cache"""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.index: dict[str, float] = {}
+
+    def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self.values[key] = value
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    def zadd(self, name: str, mapping: dict[str, float]) -> None:
+        self.index.update(mapping)
+
+    def zremrangebyscore(self, name: str, min: float, max: float) -> None:
+        self.index = {k: v for k, v in self.index.items() if not min <= v <= max}
+
+    def zcard(self, name: str) -> int:
+        return len(self.index)
+
+    def zpopmin(self, name: str, count: int) -> list[tuple[str, float]]:
+        popped = sorted(self.index.items(), key=lambda item: item[1])[:count]
+        for key, _ in popped:
+            del self.index[key]
+        return popped
+
+
+def _mock_response(content: str) -> litellm.ModelResponse:
+    return litellm.ModelResponse(
+        id="chatcmpl-123",
+        choices=[
+            litellm.Choices(
+                finish_reason="stop",
+                index=0,
+                message=litellm.Message(content=content, role="assistant"),
+            )
+        ],
+        model="gpt-3.5-turbo",
+    )
+
+
+@pytest.fixture
+def llm() -> LitellmLLM:
+    return LitellmLLM(
+        api_key="test_key",
+        timeout=30,
+        model_provider="openai",
+        model_name="gpt-3.5-turbo",
+        max_input_tokens=4096,
+    )
+
+
+@pytest.fixture
+def fake_redis() -> Any:
+    redis_client = _FakeRedis()
+    with (
+        patch("onyx.llm.multi_llm.LLM_RESPONSE_CACHE_ENABLED", True),
+        patch("onyx.llm.response_cache.get_redis_client", return_value=redis_client),
+    ):
+        yield redis_client
+
+
+def test_cached_response_skips_provider(llm: LitellmLLM, fake_redis: Any) -> None:
+    with patch("litellm.completion") as mock_completion:
+        mock_completion.return_value = _mock_response("Rephrased query")
+
+        first: LanguageModelInput = [UserMessage(content="What is  onyx?\n")]
+        second: LanguageModelInput = [UserMessage(content="What is onyx?")]
+        responses = [
+            llm.invoke(prompt, use_response_cache=True) for prompt in [first, second]
+        ]
+
+        # Prompts only differing in whitespace share the cache entry
+        mock_completion.assert_called_once()
+        assert [r.choice.message.content for r in responses] == ["Rephrased query"] * 2
+
+        # Calls that don't opt in always go to the provider
+        llm.invoke(second)
+        assert mock_completion.call_count == 2
+
+
+def test_oldest_cached_responses_evicted(llm: LitellmLLM, fake_redis: Any) -> None:
+    with (
+        patch("litellm.completion") as mock_completion,
+        patch("onyx.llm.response_cache.LLM_RESPONSE_CACHE_MAX_ENTRIES", 2),
+    ):
+        mock_completion.return_value = _mock_response("Answer")
+
+        for query in ["first", "second", "third"]:
+            llm.invoke([UserMessage(content=query)], use_response_cache=True)
+
+        assert len(fake_redis.values) == 2
+        assert len(fake_redis.index) == 2
+
+        # the first query was evicted, the last one is still cached
+        llm.invoke([UserMessage(content="first")], use_response_cache=True)
+        llm.invoke([UserMessage(content="third")], use_response_cache=True)
+        assert mock_completion.call_count == 4
+
+
+def test_invalid_cached_response_is_a_miss(llm: LitellmLLM, fake_redis: Any) -> None:
+    with patch("litellm.completion") as mock_completion:
+        mock_completion.return_value = _mock_response("Answer")
+
+        prompt: LanguageModelInput = [UserMessage(content="What is onyx?")]
+        llm.invoke(prompt, use_response_cache=True)
+        for key in fake_redis.values:
+            fake_redis.values[key] = '{"not": "a response"}'
+
+        response = llm.invoke(prompt, use_response_cache=True)
+        assert response.choice.message.content == "Answer"
+        assert mock_completion.call_count == 2
@@ -16,6 +16,7 @@ from onyx.natural_language_processing.search_nlp_models import (
 from onyx.natural_language_processing.search_nlp_models import (
     InformationContentClassificationModel,
 )
+from onyx.natural_language_processing.search_nlp_models import QueryAnalysisModel
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 
@@ -145,7 +146,9 @@ class TestConnectorClassificationModel:
         assert results == available_connectors
 
     @patch.dict(os.environ, {"DISABLE_MODEL_SERVER": "false"})
-    @patch("requests.post")
+    @patch(
+        "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post"
+    )
     def test_predict_with_model_server_enabled(self, mock_post: MagicMock) -> None:
         """Test that predict makes request when DISABLE_MODEL_SERVER is false"""
         mock_response = MagicMock()
@@ -162,7 +165,9 @@ class TestConnectorClassificationModel:
         mock_post.assert_called_once()
 
     @patch.dict(os.environ, {"DISABLE_MODEL_SERVER": "1"})
-    @patch("requests.post")
+    @patch(
+        "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post"
+    )
     def test_predict_with_disable_model_server_numeric(
         self, mock_post: MagicMock
     ) -> None:
@@ -180,3 +185,68 @@ class TestConnectorClassificationModel:
 
         assert results == ["github"]
         mock_post.assert_called_once()
+
+    @patch.dict(os.environ, {"DISABLE_MODEL_SERVER": "true"})
+    def test_predict_batch_with_disable_model_server(self) -> None:
+        """Test that predict_batch returns all connectors for every query"""
+        model = ConnectorClassificationModel()
+        available_connectors = ["confluence", "slack"]
+
+        results = model.predict_batch(["query 1", "query 2"], available_connectors)
+
+        assert results == [available_connectors, available_connectors]
+
+    @patch.dict(os.environ, {"DISABLE_MODEL_SERVER": "false"})
+    @patch(
+        "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post"
+    )
+    def test_predict_batch_makes_a_single_request(self, mock_post: MagicMock) -> None:
+        """Test that predict_batch classifies all queries with one request"""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"connectors": [["confluence"], []]}
+        mock_post.return_value = mock_response
+
+        model = ConnectorClassificationModel()
+
+        results = model.predict_batch(["query 1", "query 2"], ["confluence", "slack"])
+
+        assert results == [["confluence"], []]
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args[0].endswith(
+            "/custom/connector-classification-batch"
+        )
+        assert mock_post.call_args.kwargs["json"]["queries"] == ["query 1", "query 2"]
+
+
+class TestQueryAnalysisModel:
+    """Test cases for QueryAnalysisModel batching"""
+
+    @patch(
+        "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post"
+    )
+    def test_predict_batch_makes_a_single_request(self, mock_post: MagicMock) -> None:
+        """Test that predict_batch analyzes all queries with one request"""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "results": [
+                {"is_keyword": True, "keywords": ["error", "code"]},
+                {"is_keyword": False, "keywords": []},
+            ]
+        }
+        mock_post.return_value = mock_response
+
+        model = QueryAnalysisModel()
+
+        results = model.predict_batch(["error code", "how do I reset my password"])
+
+        assert results == [(True, ["error", "code"]), (False, [])]
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args[0].endswith("/custom/query-analysis-batch")
+
+    @patch(
+        "onyx.natural_language_processing.search_nlp_models._CUSTOM_MODELS_SESSION.post"
+    )
+    def test_predict_batch_without_queries(self, mock_post: MagicMock) -> None:
+        """Test that predict_batch doesn't call the model server for no queries"""
+        assert QueryAnalysisModel().predict_batch([]) == []
+        mock_post.assert_not_called()
@@ -0,0 +1,119 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from onyx.onyxbot.slack.event_scheduler import is_duplicate_slack_event
+from onyx.onyxbot.slack.event_scheduler import SlackEventScheduler
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+from shared_configs.contextvars import get_current_tenant_id
+
+
+def test_busy_tenant_does_not_starve_other_tenants() -> None:
+    scheduler = SlackEventScheduler(
+        num_workers=2, max_concurrent_per_tenant=1, max_queued_per_tenant=10
+    )
+    release_busy_tenant = threading.Event()
+    quiet_tenant_done = threading.Event()
+
+    def block() -> None:
+        release_busy_tenant.wait(5)
+
+    for _ in range(5):
+        assert scheduler.submit("busy", 1, block)
+    assert scheduler.submit("quiet", 1, quiet_tenant_done.set)
+
+    # the busy tenant may only use one of the two workers
+    assert quiet_tenant_done.wait(2)
+
+    release_busy_tenant.set()
+    scheduler.shutdown(timeout=5)
+
+
+def test_events_of_a_tenant_are_dropped_when_its_queue_is_full() -> None:
+    scheduler = SlackEventScheduler(
+        num_workers=1, max_concurrent_per_tenant=1, max_queued_per_tenant=2
+    )
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(5)
+
+    assert scheduler.submit("tenant", 1, block)
+    assert started.wait(2)
+    assert scheduler.submit("tenant", 1, lambda: None)
+    assert scheduler.submit("tenant", 2, lambda: None)
+    assert not scheduler.submit("tenant", 1, lambda: None)
+    # other tenants have their own queues
+    assert scheduler.submit("other_tenant", 1, lambda: None)
+
+    release.set()
+    scheduler.shutdown(timeout=5)
+
+
+def test_events_run_in_the_submitters_context_and_are_drained_on_shutdown() -> None:
+    scheduler = SlackEventScheduler(
+        num_workers=1, max_concurrent_per_tenant=1, max_queued_per_tenant=10
+    )
+    seen_tenants: list[str] = []
+
+    def record_tenant() -> None:
+        time.sleep(0.01)
+        seen_tenants.append(get_current_tenant_id())
+
+    for tenant_id in ["tenant_a", "tenant_b", "tenant_a"]:
+        token = CURRENT_TENANT_ID_CONTEXTVAR.set(tenant_id)
+        try:
+            assert scheduler.submit(tenant_id, 1, record_tenant)
+        finally:
+            CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+    scheduler.shutdown(timeout=5)
+
+    assert sorted(seen_tenants) == ["tenant_a", "tenant_a", "tenant_b"]
+    assert not scheduler.submit("tenant_a", 1, record_tenant)
+
+
+def test_shutdown_timeout_is_shared_by_all_workers() -> None:
+    scheduler = SlackEventScheduler(
+        num_workers=3, max_concurrent_per_tenant=3, max_queued_per_tenant=10
+    )
+    release = threading.Event()
+
+    def block() -> None:
+        release.wait(5)
+
+    for _ in range(3):
+        assert scheduler.submit("tenant", 1, block)
+
+    start = time.monotonic()
+    scheduler.shutdown(timeout=0.3)
+    assert time.monotonic() - start < 0.6
+
+    release.set()
+
+
+def test_redelivered_events_are_ignored() -> None:
+    redis_client = MagicMock()
+    redis_client.set.side_effect = [True, None]
+    req = SocketModeRequest(
+        type="events_api", envelope_id="envelope", payload={"event_id": "Ev123"}
+    )
+
+    with patch(
+        "onyx.onyxbot.slack.event_scheduler.get_redis_client",
+        return_value=redis_client,
+    ):
+        assert not is_duplicate_slack_event(req, slack_bot_id=1)
+        assert is_duplicate_slack_event(req, slack_bot_id=1)
+
+        slash_command = SocketModeRequest(
+            type="slash_commands", envelope_id="envelope", payload={}
+        )
+        assert not is_duplicate_slack_event(slash_command, slack_bot_id=1)
+
+    assert redis_client.set.call_count == 2
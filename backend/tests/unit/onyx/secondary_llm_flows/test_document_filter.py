@@ -0,0 +1,115 @@
+from unittest.mock import Mock
+
+from onyx.context.search.models import ContextExpansionType
+from onyx.secondary_llm_flows.document_filter import classify_sections_relevance
+from onyx.secondary_llm_flows.document_filter import SectionRelevanceInput
+
+
+def _mock_llm(responses: list[str]) -> Mock:
+    llm = Mock()
+    llm.invoke.side_effect = [
+        Mock(choice=Mock(message=Mock(content=response))) for response in responses
+    ]
+    return llm
+
+
+def _section(ind: int) -> SectionRelevanceInput:
+    return SectionRelevanceInput(
+        document_title=f"Doc {ind}",
+        section_text=f"Main section {ind}",
+        section_above_text=f"Above {ind}",
+        section_below_text=f"Below {ind}",
+    )
+
+
+def test_classify_sections_relevance_single_call() -> None:
+    llm = _mock_llm(["0: 1\n1: 3\n2: 4"])
+
+    result = classify_sections_relevance(
+        sections=[_section(0), _section(1), _section(2)],
+        user_query="query",
+        llm=llm,
+    )
+
+    assert llm.invoke.call_count == 1
+    assert result == [
+        ContextExpansionType.NOT_RELEVANT,
+        ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+        ContextExpansionType.FULL_DOCUMENT,
+    ]
+
+
+def test_classify_sections_relevance_fallbacks() -> None:
+    """Unparseable or missing classifications default to MAIN_SECTION_ONLY, and
+    sections without any surrounding context can't be expanded."""
+    llm = _mock_llm(["0: 4"])
+    no_context_section = SectionRelevanceInput(
+        document_title="Doc", section_text="Main section"
+    )
+
+    result = classify_sections_relevance(
+        sections=[no_context_section, _section(1)],
+        user_query="query",
+        llm=llm,
+    )
+
+    assert result == [
+        ContextExpansionType.MAIN_SECTION_ONLY,
+        ContextExpansionType.MAIN_SECTION_ONLY,
+    ]
+
+
+def test_classify_sections_relevance_size_bounded_batches() -> None:
+    llm = Mock()
+    llm.invoke.side_effect = Exception("LLM unavailable")
+
+    result = classify_sections_relevance(
+        sections=[_section(ind) for ind in range(5)],
+        user_query="query",
+        llm=llm,
+        max_sections_per_prompt=2,
+    )
+
+    assert llm.invoke.call_count == 3
+    assert result == [ContextExpansionType.MAIN_SECTION_ONLY] * 5
+
+
+def test_classify_sections_relevance_reranker_fallback() -> None:
+    """Sections the LLM didn't classify are classified from their reranker score."""
+    llm = _mock_llm(["0: 4"])
+    reranked_passages: list[str] = []
+
+    def reranker(query: str, passages: list[str]) -> list[float]:
+        reranked_passages.extend(passages)
+        return [0.01, 0.5, 0.9]
+
+    result = classify_sections_relevance(
+        sections=[_section(ind) for ind in range(4)],
+        user_query="query",
+        llm=llm,
+        reranker=reranker,
+    )
+
+    assert reranked_passages == ["Main section 1", "Main section 2", "Main section 3"]
+    assert result == [
+        ContextExpansionType.FULL_DOCUMENT,
+        ContextExpansionType.NOT_RELEVANT,
+        ContextExpansionType.MAIN_SECTION_ONLY,
+        ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+    ]
+
+
+def test_classify_sections_relevance_failing_reranker() -> None:
+    llm = Mock()
+    llm.invoke.side_effect = Exception("LLM unavailable")
+    reranker = Mock(side_effect=Exception("Model server unavailable"))
+
+    result = classify_sections_relevance(
+        sections=[_section(0), _section(1)],
+        user_query="query",
+        llm=llm,
+        reranker=reranker,
+    )
+
+    assert reranker.call_count == 1
+    assert result == [ContextExpansionType.MAIN_SECTION_ONLY] * 2
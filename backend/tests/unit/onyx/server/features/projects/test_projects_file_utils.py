@@ -0,0 +1,129 @@
+import threading
+import time
+from io import BytesIO
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from fastapi import UploadFile
+
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import count_tokens
+from onyx.server.features.projects.projects_file_utils import (
+    categorize_uploaded_files,
+)
+from onyx.server.features.projects.projects_file_utils import (
+    FILE_TOKEN_COUNT_THRESHOLD,
+)
+from onyx.utils.threadpool_concurrency import SizeBudget
+
+
+class _WordTokenizer(BaseTokenizer):
+    def __init__(self) -> None:
+        self.encoded_lengths: list[int] = []
+
+    def encode(self, string: str) -> list[int]:
+        self.encoded_lengths.append(len(string))
+        return [0] * len(string.split())
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return ""
+
+
+def test_count_tokens_counts_long_texts_in_segments() -> None:
+    tokenizer = _WordTokenizer()
+    content = "word " * 100_000
+
+    assert count_tokens(content, tokenizer) == 100_000
+    assert len(tokenizer.encoded_lengths) > 1
+    assert sum(tokenizer.encoded_lengths) == len(content)
+
+    tokenizer.encoded_lengths.clear()
+    assert count_tokens(content, tokenizer, stop_after=10) > 10
+    assert len(tokenizer.encoded_lengths) == 1
+
+
+def test_categorize_uploaded_files_keeps_the_upload_order() -> None:
+    texts = {
+        "small.txt": "a few words",
+        "empty.txt": "",
+        "huge.txt": "word " * (FILE_TOKEN_COUNT_THRESHOLD + 1),
+        "other.txt": "some more words here",
+    }
+    uploads = [
+        UploadFile(file=BytesIO(b"content"), filename=filename) for filename in texts
+    ]
+
+    def extract_file_text(file: BytesIO, file_name: str, **kwargs: object) -> str:
+        return texts[file_name]
+
+    with (
+        patch(
+            "onyx.server.features.projects.projects_file_utils.get_default_llm",
+            return_value=MagicMock(),
+        ),
+        patch(
+            "onyx.server.features.projects.projects_file_utils.get_tokenizer",
+            return_value=_WordTokenizer(),
+        ),
+        patch(
+            "onyx.server.features.projects.projects_file_utils.extract_file_text",
+            side_effect=extract_file_text,
+        ),
+    ):
+        result = categorize_uploaded_files(
+            uploads + [UploadFile(file=BytesIO(b""), filename="x.exe")]
+        )
+
+    assert [upload.filename for upload in result.acceptable] == [
+        "small.txt",
+        "other.txt",
+    ]
+    assert result.acceptable_file_to_token_count == {"small.txt": 3, "other.txt": 4}
+    assert result.non_accepted == ["huge.txt"]
+    assert result.unsupported == ["empty.txt", "x.exe"]
+
+
+def test_categorize_uploaded_files_bounds_the_size_extracted_at_once() -> None:
+    uploads = [
+        UploadFile(file=BytesIO(b"content"), filename=f"file_{i}.txt") for i in range(4)
+    ]
+    extracting = 0
+    max_extracting = 0
+    lock = threading.Lock()
+
+    def extract_file_text(file: BytesIO, file_name: str, **kwargs: object) -> str:
+        nonlocal extracting, max_extracting
+        with lock:
+            extracting += 1
+            max_extracting = max(max_extracting, extracting)
+        time.sleep(0.05)
+        with lock:
+            extracting -= 1
+        return "a few words"
+
+    with (
+        patch(
+            "onyx.server.features.projects.projects_file_utils.get_default_llm",
+            return_value=MagicMock(),
+        ),
+        patch(
+            "onyx.server.features.projects.projects_file_utils.get_tokenizer",
+            return_value=_WordTokenizer(),
+        ),
+        patch(
+            "onyx.server.features.projects.projects_file_utils.extract_file_text",
+            side_effect=extract_file_text,
+        ),
+        # room for two of the 7 byte uploads
+        patch(
+            "onyx.server.features.projects.projects_file_utils._UPLOAD_EXTRACTION_BUDGET",
+            SizeBudget(max_size=14),
+        ),
+    ):
+        result = categorize_uploaded_files(uploads)
+
+    assert len(result.acceptable) == 4
+    assert max_extracting == 2
@@ -0,0 +1,133 @@
+from collections.abc import Sequence
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+
+import pytest
+
+from onyx.server.query_and_chat import token_limit
+from onyx.server.query_and_chat.token_limit import _increment_usage
+from onyx.server.query_and_chat.token_limit import fetch_usage
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+
+class _FakeRedis:
+    """Just the hash commands used by the usage counters, pipelines run immediately"""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+
+    def pipeline(self, transaction: bool = True) -> "_FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return dict(self.hashes.get(key, {}))
+
+    def hincrby(self, key: str, field: str, amount: int) -> None:
+        values = self.hashes.setdefault(key, {})
+        values[field.encode()] = str(
+            int(values.get(field.encode(), 0)) + amount
+        ).encode()
+
+    def hset(
+        self,
+        key: str,
+        field: str = "",
+        value: Any = None,
+        mapping: dict[str, Any] | None = None,
+    ) -> None:
+        values = self.hashes.setdefault(key, {})
+        for name, item in (mapping or {field: value}).items():
+            values[str(name).encode()] = str(item).encode()
+
+    def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.hashes.get(key, {}).pop(field.encode(), None)
+
+    def delete(self, key: str) -> None:
+        self.hashes.pop(key, None)
+
+    def expire(self, key: str, seconds: int) -> None:
+        pass
+
+
+@pytest.fixture
+def redis_client(monkeypatch: pytest.MonkeyPatch) -> _FakeRedis:
+    redis_client = _FakeRedis()
+    monkeypatch.setattr(token_limit, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(token_limit, "TOKEN_USAGE_COUNTERS_ENABLED", True)
+    return redis_client
+
+
+def test_usage_is_read_from_counters_after_reconciliation(
+    redis_client: _FakeRedis,
+) -> None:
+    now = datetime.now(tz=timezone.utc)
+    db_fetches: list[datetime] = []
+
+    def fetch_usage_from_db() -> Sequence[tuple[datetime, int]]:
+        db_fetches.append(now)
+        return [(now - timedelta(minutes=30), 100), (now - timedelta(hours=5), 200)]
+
+    cutoff_time = now - timedelta(hours=1)
+    usage = fetch_usage("global", cutoff_time, fetch_usage_from_db)
+    assert sum(token_count for _, token_count in usage) == 300
+
+    _increment_usage(["global", "user:1"], 50)
+    usage = fetch_usage("global", cutoff_time, fetch_usage_from_db)
+
+    # the bucket outside of the window is dropped, new usage is counted
+    assert sorted(token_count for _, token_count in usage) == [50, 100]
+    assert len(db_fetches) == 1
+
+    # a longer window isn't covered by the counters anymore
+    fetch_usage("global", now - timedelta(hours=6), fetch_usage_from_db)
+    assert len(db_fetches) == 2
+
+
+def test_counters_are_reconciled_periodically(
+    redis_client: _FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    fetch_usage("user:1", cutoff_time, lambda: [])
+    _increment_usage(["user:1"], 50)
+
+    monkeypatch.setattr(token_limit, "TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS", 0)
+    # Postgres is the source of truth, e.g. if the turn was never committed
+    assert fetch_usage("user:1", cutoff_time, lambda: []) == []
+    monkeypatch.setattr(token_limit, "TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS", 3600)
+    assert fetch_usage("user:1", cutoff_time, lambda: [(cutoff_time, 1)]) == []
+
+
+def test_usage_falls_back_to_postgres_without_redis(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def unavailable() -> None:
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(token_limit, "get_redis_client", unavailable)
+    monkeypatch.setattr(token_limit, "TOKEN_USAGE_COUNTERS_ENABLED", True)
+    usage = [(datetime.now(tz=timezone.utc), 10)]
+
+    assert fetch_usage("global", usage[0][0], lambda: usage) == usage
+    _increment_usage(["global"], 10)
+
+
+def test_counters_are_kept_per_tenant(redis_client: _FakeRedis) -> None:
+    cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    for tenant_id in ["tenant_a", "tenant_b"]:
+        token = CURRENT_TENANT_ID_CONTEXTVAR.set(tenant_id)
+        try:
+            fetch_usage("global", cutoff_time, lambda: [])
+            _increment_usage(["global"], 50)
+        finally:
+            CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+    assert sorted(redis_client.hashes) == [
+        "tenant_a:token_usage:global",
+        "tenant_b:token_usage:global",
+    ]
@@ -0,0 +1,158 @@
+from collections.abc import AsyncIterator
+from collections.abc import Generator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+from mcp.types import ErrorData
+
+from onyx.db.enums import MCPTransport
+from onyx.tools.tool_implementations.mcp import mcp_client
+from onyx.tools.tool_implementations.mcp.mcp_session_pool import MCPSessionPool
+from onyx.tools.tool_implementations.mcp.mcp_session_pool import SessionOpener
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.initialized = 0
+        self.ping_fails = False
+
+    async def initialize(self) -> None:
+        self.initialized += 1
+
+    async def send_ping(self) -> None:
+        if self.ping_fails:
+            raise McpError(ErrorData(code=CONNECTION_CLOSED, message="gone"))
+
+
+class _FakeServer:
+    def __init__(self) -> None:
+        self.sessions: list[_FakeSession] = []
+        self.closed = 0
+
+    def opener(self) -> SessionOpener:
+        @asynccontextmanager
+        async def open_session() -> AsyncIterator[ClientSession]:
+            session = _FakeSession()
+            self.sessions.append(session)
+            try:
+                yield session  # type: ignore[misc]
+            finally:
+                self.closed += 1
+
+        return open_session
+
+
+async def _session_id(session: Any) -> int:
+    return id(session)
+
+
+@pytest.fixture
+def pool() -> Generator[MCPSessionPool, None, None]:
+    pool = MCPSessionPool(idle_timeout=300, health_check_interval=300, max_size=2)
+    yield pool
+    pool.close_all()
+
+
+def test_session_is_opened_and_initialized_once(pool: MCPSessionPool) -> None:
+    server = _FakeServer()
+
+    first = pool.run("key", server.opener(), _session_id)
+    second = pool.run("key", server.opener(), _session_id)
+
+    assert first == second
+    assert len(server.sessions) == 1
+    assert server.sessions[0].initialized == 1
+    assert server.closed == 0
+
+
+def test_disconnected_session_is_reopened(pool: MCPSessionPool) -> None:
+    server = _FakeServer()
+    calls: list[int] = []
+
+    async def drop_first_call(session: Any) -> str:
+        calls.append(id(session))
+        if len(calls) == 1:
+            raise McpError(ErrorData(code=CONNECTION_CLOSED, message="gone"))
+        return "ok"
+
+    assert pool.run("key", server.opener(), drop_first_call, True) == "ok"
+    assert len(server.sessions) == 2
+    assert calls[0] != calls[1]
+    assert server.closed == 1
+
+    # calls that are not safe to repeat only drop the session
+    calls.clear()
+    with pytest.raises(McpError):
+        pool.run("other", server.opener(), drop_first_call)
+    assert pool.run("other", server.opener(), drop_first_call) == "ok"
+    assert len(server.sessions) == 4
+
+
+def test_tool_errors_keep_the_session(pool: MCPSessionPool) -> None:
+    server = _FakeServer()
+
+    async def fail(session: Any) -> None:
+        raise ValueError("bad arguments")
+
+    with pytest.raises(ValueError):
+        pool.run("key", server.opener(), fail, True)
+    pool.run("key", server.opener(), _session_id)
+
+    assert len(server.sessions) == 1
+
+
+def test_stale_session_failing_health_check_is_reopened() -> None:
+    pool = MCPSessionPool(idle_timeout=300, health_check_interval=0, max_size=2)
+    server = _FakeServer()
+    try:
+        first = pool.run("key", server.opener(), _session_id)
+        # a healthy session is reused
+        assert pool.run("key", server.opener(), _session_id) == first
+
+        server.sessions[0].ping_fails = True
+        assert pool.run("key", server.opener(), _session_id) != first
+        assert len(server.sessions) == 2
+        assert server.closed == 1
+    finally:
+        pool.close_all()
+
+
+def test_least_recently_used_session_is_closed_when_full(
+    pool: MCPSessionPool,
+) -> None:
+    server = _FakeServer()
+
+    pool.run("a", server.opener(), _session_id)
+    pool.run("b", server.opener(), _session_id)
+    pool.run("a", server.opener(), _session_id)
+    pool.run("c", server.opener(), _session_id)
+
+    assert server.closed == 1
+    # "b" was closed, "a" is still pooled
+    pool.run("a", server.opener(), _session_id)
+    assert len(server.sessions) == 3
+
+
+def test_discovered_tools_are_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def fake_call(function: Any, server_url: str, *args: Any, **kwargs: Any) -> list:
+        calls.append(server_url)
+        return []
+
+    monkeypatch.setattr(mcp_client, "_call_mcp_client_function_sync", fake_call)
+    monkeypatch.setattr(mcp_client, "_tool_list_cache", {})
+
+    headers = {"Authorization": "Bearer a"}
+    mcp_client.discover_mcp_tools("http://server", headers)
+    mcp_client.discover_mcp_tools("http://server", headers)
+    assert calls == ["http://server"]
+
+    # other credentials or transports are not served from the cache
+    mcp_client.discover_mcp_tools("http://server", {"Authorization": "Bearer b"})
+    mcp_client.discover_mcp_tools("http://server", headers, MCPTransport.SSE)
+    assert len(calls) == 3
@@ -0,0 +1,97 @@
+import time
+from email.utils import formatdate
+from typing import Any
+from typing import cast
+
+import pytest
+
+from onyx.configs.tool_configs import WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS
+from onyx.configs.tool_configs import WEB_CONTENT_CACHE_MAX_TTL_SECONDS
+from onyx.tools.tool_implementations.open_url.content_cache import get_freshness_ttl
+from onyx.tools.tool_implementations.open_url.content_cache import WebContentCache
+from onyx.tools.tool_implementations.open_url.models import WebContent
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+        self.expirations: dict[str, int] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self.values[key] = value.encode("utf-8")
+        self.expirations[key] = ex
+
+
+def _content(url: str = "https://example.com/page") -> WebContent:
+    return WebContent(title="Page", link=url, full_content="Some page text")
+
+
+@pytest.mark.parametrize(
+    "cache_control,expected",
+    [
+        (None, WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS),
+        ("public", WEB_CONTENT_CACHE_DEFAULT_TTL_SECONDS),
+        ("max-age=120", 120),
+        ("public, max-age=120, s-maxage=60", 60),
+        ("max-age=999999999", WEB_CONTENT_CACHE_MAX_TTL_SECONDS),
+        ("no-cache", 0),
+        ("private, no-store", None),
+        ("private, max-age=120", None),
+    ],
+)
+def test_get_freshness_ttl(cache_control: str | None, expected: int | None) -> None:
+    assert get_freshness_ttl(cache_control) == expected
+
+
+def test_get_freshness_ttl_from_expires() -> None:
+    expires = formatdate(time.time() + 120, usegmt=True)
+    assert 110 <= cast(int, get_freshness_ttl(None, expires)) <= 120
+    # max-age takes precedence
+    assert get_freshness_ttl("max-age=60", expires) == 60
+    assert get_freshness_ttl(None, formatdate(time.time() - 120, usegmt=True)) == 0
+    assert get_freshness_ttl(None, "0") == 0
+
+
+def test_cache_round_trip() -> None:
+    cache = WebContentCache(redis_client=_FakeRedis())  # type: ignore
+    url = "https://example.com/page"
+
+    cache.set(url, _content(url), {"Cache-Control": "max-age=60"})
+
+    cached = cache.get(url)
+    assert cached is not None
+    assert cached.is_fresh()
+    assert cached.content.full_content == "Some page text"
+    assert cached.conditional_headers() == {}
+
+
+def test_cache_keeps_revalidatable_entries() -> None:
+    redis_client = _FakeRedis()
+    cache = WebContentCache(redis_client=redis_client)  # type: ignore
+    url = "https://example.com/page"
+
+    cache.set(url, _content(url), {"Cache-Control": "no-cache", "ETag": '"abc"'})
+
+    cached = cache.get(url)
+    assert cached is not None
+    assert not cached.is_fresh()
+    assert cached.conditional_headers() == {"If-None-Match": '"abc"'}
+    assert list(redis_client.expirations.values()) == [
+        WEB_CONTENT_CACHE_MAX_TTL_SECONDS
+    ]
+
+
+def test_cache_skips_failed_and_uncacheable_content() -> None:
+    redis_client = _FakeRedis()
+    cache = WebContentCache(redis_client=redis_client)  # type: ignore
+
+    failed = WebContent(
+        title="", link="https://a.com", full_content="", scrape_successful=False
+    )
+    cache.set("https://a.com", failed)
+    cache.set("https://b.com", _content("https://b.com"), {"Cache-Control": "no-store"})
+
+    assert redis_client.values == {}
@@ -0,0 +1,45 @@
+import threading
+from http.client import HTTPMessage
+
+import requests
+from requests.cookies import MockRequest
+from requests.cookies import MockResponse
+
+from onyx.tools.tool_implementations.open_url import onyx_web_crawler
+from onyx.tools.tool_implementations.open_url.onyx_web_crawler import _get_session
+from onyx.tools.tool_implementations.open_url.onyx_web_crawler import _host_connection
+
+
+def test_host_semaphores_are_dropped_once_idle() -> None:
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_connection() -> None:
+        with _host_connection("https://Example.com/a"):
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold_connection)
+    thread.start()
+    entered.wait()
+
+    assert list(onyx_web_crawler._host_semaphores) == ["example.com"]
+
+    release.set()
+    thread.join()
+    assert onyx_web_crawler._host_semaphores == {}
+
+
+def test_shared_session_does_not_keep_cookies() -> None:
+    session = _get_session()
+    request = requests.Request("GET", "https://example.com/page").prepare()
+    headers = HTTPMessage()
+    headers["Set-Cookie"] = "session_id=secret; Path=/"
+
+    # what requests does with the headers of every response
+    session.cookies.extract_cookies(
+        MockResponse(headers),  # type: ignore[arg-type]
+        MockRequest(request),  # type: ignore[arg-type]
+    )
+
+    assert len(session.cookies) == 0
@@ -0,0 +1,53 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.tools.tool_implementations.search.search_tool import SearchTool
+
+
+def _search_tool() -> SearchTool:
+    return SearchTool(
+        tool_id=1,
+        db_session=Mock(),
+        emitter=Mock(),
+        user=None,
+        persona=Mock(),
+        llm=Mock(),
+        document_index=Mock(),
+        user_selected_filters=None,
+        project_id=None,
+    )
+
+
+def test_speculative_search_is_reused() -> None:
+    search_tool = _search_tool()
+    chunks = [Mock(), Mock()]
+
+    with patch(
+        "onyx.tools.tool_implementations.search.search_tool.search_pipeline",
+        return_value=chunks,
+    ) as mock_search_pipeline:
+        search_tool.start_speculative_search("research task", num_hits=10)
+        # starting the same speculative search twice is a no-op
+        search_tool.start_speculative_search("research task", num_hits=10)
+
+        assert search_tool._run_search_for_query("research task", None, 10) == chunks
+        assert search_tool._run_search_for_query("research task", None, 10) == chunks
+        assert mock_search_pipeline.call_count == 1
+
+        # other queries / settings still run their own search
+        search_tool._run_search_for_query("research task", 0.2, 10)
+        assert mock_search_pipeline.call_count == 2
+
+
+def test_failed_speculative_search_falls_back() -> None:
+    search_tool = _search_tool()
+    chunks = [Mock()]
+
+    with patch(
+        "onyx.tools.tool_implementations.search.search_tool.search_pipeline",
+        side_effect=[RuntimeError("vespa unavailable"), chunks],
+    ) as mock_search_pipeline:
+        search_tool.start_speculative_search("research task", num_hits=10)
+
+        assert search_tool._run_search_for_query("research task", None, 10) == chunks
+        assert mock_search_pipeline.call_count == 2
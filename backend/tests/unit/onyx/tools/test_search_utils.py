@@ -1,13 +1,20 @@
 """Unit tests for search utility functions."""
 
+from typing import cast
 from typing import NamedTuple
+from unittest.mock import Mock
 
 import pytest
 
+from onyx.context.search.models import InferenceSection
 from onyx.tools.tool_implementations.search.search_tool import deduplicate_queries
+from onyx.tools.tool_implementations.search.search_utils import (
+    retrieve_adjacent_chunks_for_sections,
+)
 from onyx.tools.tool_implementations.search.search_utils import (
     weighted_reciprocal_rank_fusion,
 )
+from onyx.tools.tool_implementations.search.search_utils import WeightedRankFusion
 
 
 # =============================================================================
@@ -571,3 +578,140 @@ class TestDeduplicateQueries:
         assert len(result) == 1
         assert result[0][0] == "Café"
         assert result[0][1] == 4.5
+
+
+# =============================================================================
+# Tests for WeightedRankFusion
+# =============================================================================
+
+
+class TestWeightedRankFusion:
+    """Test suite for incremental WeightedRankFusion."""
+
+    def test_order_of_arrival_does_not_matter(self) -> None:
+        """Adding result lists in any order matches the batch fusion."""
+        doc_a = MockDocument("doc_a", "Content A")
+        doc_b = MockDocument("doc_b", "Content B")
+        doc_c = MockDocument("doc_c", "Content C")
+        doc_d = MockDocument("doc_d", "Content D")
+
+        ranked_results = [[doc_a, doc_b], [doc_c, doc_d], [doc_d, doc_b]]
+        weights = [1.0, 1.0, 0.5]
+
+        fusion: WeightedRankFusion[MockDocument] = WeightedRankFusion(
+            weights=weights, id_extractor=lambda doc: doc.document_id
+        )
+        for source_idx in [2, 0, 1]:
+            fusion.add_results(source_idx, ranked_results[source_idx])
+
+        expected = weighted_reciprocal_rank_fusion(
+            ranked_results=ranked_results,
+            weights=weights,
+            id_extractor=lambda doc: doc.document_id,
+        )
+        assert fusion.fused_results() == expected
+        assert fusion.top_k(2) == expected[:2]
+
+    def test_top_k_settled(self) -> None:
+        """The top k is settled only once missing lists can't change it."""
+        docs = [MockDocument(f"doc_{i}", f"Content {i}") for i in range(4)]
+
+        fusion: WeightedRankFusion[MockDocument] = WeightedRankFusion(
+            weights=[1.0, 1.0, 0.01], id_extractor=lambda doc: doc.document_id, k=1
+        )
+        fusion.add_results(0, [docs[0], docs[1]])
+        # A full weight list is still missing
+        assert not fusion.is_top_k_settled(1)
+
+        fusion.add_results(1, [docs[0], docs[2]])
+        # Only the low weight list is missing, it can't overtake doc_0
+        assert fusion.is_top_k_settled(1)
+        # But it could still shuffle the items below doc_0
+        assert not fusion.is_top_k_settled(2)
+
+    def test_duplicate_source_rejected(self) -> None:
+        fusion: WeightedRankFusion[MockDocument] = WeightedRankFusion(
+            weights=[1.0], id_extractor=lambda doc: doc.document_id
+        )
+        fusion.add_results(0, [])
+
+        with pytest.raises(ValueError):
+            fusion.add_results(0, [])
+
+
+# =============================================================================
+# Tests for retrieve_adjacent_chunks_for_sections
+# =============================================================================
+
+
+def _mock_chunk(document_id: str, chunk_id: int) -> Mock:
+    return Mock(document_id=document_id, chunk_id=chunk_id)
+
+
+def _mock_section(document_id: str, chunk_ids: list[int]) -> InferenceSection:
+    chunks = [_mock_chunk(document_id, chunk_id) for chunk_id in chunk_ids]
+    return cast(InferenceSection, Mock(chunks=chunks, center_chunk=chunks[0]))
+
+
+class TestRetrieveAdjacentChunksForSections:
+    """Test suite for retrieve_adjacent_chunks_for_sections function."""
+
+    def test_single_batched_retrieval_with_merged_ranges(self) -> None:
+        """Overlapping ranges within a document are merged and everything is
+        fetched in one retrieval call."""
+        # doc_a chunks 4-5 are needed by both of its sections, so a single range
+        # covering both sections is requested
+        sections = [
+            _mock_section("doc_a", [3]),
+            _mock_section("doc_a", [6]),
+            _mock_section("doc_b", [0, 1]),
+        ]
+        stored_chunks = [_mock_chunk("doc_a", chunk_id) for chunk_id in range(10)] + [
+            _mock_chunk("doc_b", chunk_id) for chunk_id in range(3)
+        ]
+
+        document_index = Mock()
+        document_index.id_based_retrieval.side_effect = (
+            lambda chunk_requests, filters, batch_retrieval: [
+                chunk
+                for chunk in stored_chunks
+                for request in chunk_requests
+                if chunk.document_id == request.document_id
+                and request.min_chunk_ind <= chunk.chunk_id <= request.max_chunk_ind
+            ]
+        )
+
+        result = retrieve_adjacent_chunks_for_sections(
+            sections=sections,
+            document_index=document_index,
+            num_chunks_above=2,
+            num_chunks_below=2,
+        )
+
+        document_index.id_based_retrieval.assert_called_once()
+        chunk_requests = document_index.id_based_retrieval.call_args.kwargs[
+            "chunk_requests"
+        ]
+        assert sorted(
+            (request.document_id, request.min_chunk_ind, request.max_chunk_ind)
+            for request in chunk_requests
+        ) == [("doc_a", 1, 8), ("doc_b", 2, 3)]
+
+        assert [
+            ([c.chunk_id for c in above], [c.chunk_id for c in below])
+            for above, below in result
+        ] == [([1, 2], [4, 5]), ([4, 5], [7, 8]), ([], [2])]
+
+    def test_no_sections(self) -> None:
+        """No retrieval is issued when there is nothing to expand."""
+        document_index = Mock()
+
+        result = retrieve_adjacent_chunks_for_sections(
+            sections=[],
+            document_index=document_index,
+            num_chunks_above=2,
+            num_chunks_below=2,
+        )
+
+        assert result == []
+        document_index.id_based_retrieval.assert_not_called()
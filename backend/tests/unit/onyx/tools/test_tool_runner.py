@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.chat.emitter import Emitter
+from onyx.chat.emitter import get_default_emitter
+from onyx.server.query_and_chat.placement import Placement
+from onyx.server.query_and_chat.streaming_models import CustomToolStart
+from onyx.server.query_and_chat.streaming_models import Packet
+from onyx.server.query_and_chat.streaming_models import SectionEnd
+from onyx.tools.models import ToolCallKickoff
+from onyx.tools.models import ToolResponse
+from onyx.tools.tool_runner import run_tool_calls
+
+
+def _mock_tool(name: str, delay: float, emitter: Emitter) -> Mock:
+    def run(placement: Placement, **kwargs: Any) -> ToolResponse:
+        time.sleep(delay)
+        emitter.emit(Packet(placement=placement, obj=CustomToolStart(tool_name=name)))
+        return ToolResponse(rich_response=None, llm_facing_response=f"{name} done")
+
+    tool = Mock()
+    tool.name = name
+    tool.emitter = emitter
+    tool.run.side_effect = run
+    return tool
+
+
+def _emitted(emitter: Emitter) -> list[tuple[int, str]]:
+    packets: list[tuple[int, str]] = []
+    while not emitter.bus.empty():
+        packet = emitter.bus.get()
+        packets.append((packet.placement.tab_index, packet.obj.type))
+    return packets
+
+
+def _tool_calls(tools: list[Mock]) -> list[ToolCallKickoff]:
+    return [
+        ToolCallKickoff(
+            tool_call_id=f"call_{ind}",
+            tool_name=tool.name,
+            tool_args={},
+            placement=Placement(turn_index=0, tab_index=ind),
+        )
+        for ind, tool in enumerate(tools)
+    ]
+
+
+def test_run_tool_calls_reports_tools_over_budget_as_failed() -> None:
+    emitter = get_default_emitter()
+    fast_tool = _mock_tool("fast_tool", delay=0.0, emitter=emitter)
+    slow_tool = _mock_tool("slow_tool", delay=0.5, emitter=emitter)
+    tool_calls = _tool_calls([fast_tool, slow_tool])
+
+    start = time.monotonic()
+    tool_responses, _ = run_tool_calls(
+        tool_calls=tool_calls,
+        tools=[fast_tool, slow_tool],
+        message_history=[],
+        memories=None,
+        user_info=None,
+        citation_mapping={},
+        next_citation_num=1,
+        timeout=0.1,
+    )
+    assert time.monotonic() - start < 0.4
+
+    assert [response.llm_facing_response for response in tool_responses] == [
+        "fast_tool done",
+        "Tool execution did not finish within 0.1 seconds.",
+    ]
+    assert [response.tool_call for response in tool_responses] == tool_calls
+
+    # the slow tool finishing later doesn't emit into its ended section
+    time.sleep(0.6)
+    assert sorted(_emitted(emitter)) == [
+        (0, CustomToolStart(tool_name="").type),
+        (0, SectionEnd().type),
+        (1, SectionEnd().type),
+    ]
+
+
+def test_run_tool_calls_reports_failures_around_the_tool_without_timeout() -> None:
+    emitter = Mock()
+    emitter.emit.side_effect = RuntimeError("emitter is gone")
+    tool = _mock_tool("tool", delay=0.0, emitter=emitter)
+    tool_calls = _tool_calls([tool])
+
+    tool_responses, _ = run_tool_calls(
+        tool_calls=tool_calls,
+        tools=[tool],
+        message_history=[],
+        memories=None,
+        user_info=None,
+        citation_mapping={},
+        next_citation_num=1,
+    )
+
+    assert [response.llm_facing_response for response in tool_responses] == [
+        "Tool execution failed."
+    ]
+    assert tool_responses[0].tool_call == tool_calls[0]
+
+
+def test_run_tool_calls_caps_the_tools_left_running_past_their_budget() -> None:
+    emitter = get_default_emitter()
+    slow_tool = _mock_tool("slow_tool", delay=0.5, emitter=emitter)
+    fast_tool = _mock_tool("fast_tool", delay=0.0, emitter=emitter)
+
+    with (
+        ThreadPoolExecutor(max_workers=1) as executor,
+        patch("onyx.tools.tool_runner._get_timed_tool_executor", return_value=executor),
+    ):
+        for tool in [slow_tool, fast_tool]:
+            tool_responses, _ = run_tool_calls(
+                tool_calls=_tool_calls([tool]),
+                tools=[tool],
+                message_history=[],
+                memories=None,
+                user_info=None,
+                citation_mapping={},
+                next_citation_num=1,
+                timeout=0.1,
+            )
+            assert [response.llm_facing_response for response in tool_responses] == [
+                "Tool execution did not finish within 0.1 seconds."
+            ]
+
+    # the slow tool still held the only worker, the fast tool was never started
+    assert slow_tool.run.call_count == 1
+    assert fast_tool.run.call_count == 0
@@ -1,3 +1,4 @@
+import asyncio
 import contextvars
 import threading
 import time
@@ -7,9 +8,12 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from onyx.utils.threadpool_concurrency import iterate_in_background_thread
 from onyx.utils.threadpool_concurrency import parallel_yield
+from onyx.utils.threadpool_concurrency import run_functions_tuples_as_completed
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import run_with_timeout
+from onyx.utils.threadpool_concurrency import SizeBudget
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
 from onyx.utils.threadpool_concurrency import wait_on_background
 
@@ -389,3 +393,231 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_run_functions_tuples_as_completed_yields_in_completion_order() -> None:
+    """Results are yielded as soon as each function finishes, failures yield None"""
+
+    def delayed(value: int, delay: float) -> int:
+        time.sleep(delay)
+        return value
+
+    def failing() -> int:
+        raise ValueError("boom")
+
+    results = list(
+        run_functions_tuples_as_completed(
+            [(delayed, (0, 0.3)), (delayed, (1, 0.0)), (failing, ())]
+        )
+    )
+
+    assert sorted(results, key=lambda x: x[0]) == [(0, 0), (1, 1), (2, None)]
+    assert results[-1] == (0, 0)
+
+
+def test_run_functions_tuples_as_completed_abandons_stragglers() -> None:
+    """Functions still running straggler_timeout after the first finished are skipped"""
+
+    def delayed(value: int, delay: float) -> int:
+        time.sleep(delay)
+        return value
+
+    start = time.time()
+    results = list(
+        run_functions_tuples_as_completed(
+            [(delayed, (0, 0.0)), (delayed, (1, 2.0))],
+            straggler_timeout=0.1,
+        )
+    )
+
+    assert results == [(0, 0)]
+    assert time.time() - start < 1.0
+
+
+def test_run_functions_tuples_as_completed_waits_for_required_functions() -> None:
+    """The straggler_timeout doesn't apply while a wait_for function is running"""
+
+    def delayed(value: int, delay: float) -> int:
+        time.sleep(delay)
+        return value
+
+    results = list(
+        run_functions_tuples_as_completed(
+            [(delayed, (0, 0.0)), (delayed, (1, 0.3)), (delayed, (2, 2.0))],
+            straggler_timeout=0.1,
+            wait_for={1},
+        )
+    )
+
+    assert results == [(0, 0), (1, 1)]
+
+
+def test_run_functions_tuples_as_completed_overall_timeout() -> None:
+    """Functions still running when the overall timeout passes are skipped, even if
+    none of the functions has finished yet"""
+
+    def delayed(value: int, delay: float) -> int:
+        time.sleep(delay)
+        return value
+
+    start = time.time()
+    results = list(
+        run_functions_tuples_as_completed(
+            [(delayed, (0, 0.05)), (delayed, (1, 2.0)), (delayed, (2, 2.0))],
+            timeout=0.3,
+        )
+    )
+
+    assert results == [(0, 0)]
+    assert time.time() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_backpressure() -> None:
+    """The producer never runs more than max_buffered items ahead of the consumer
+    and is closed once the consumer stops"""
+    produced: list[int] = []
+    closed = threading.Event()
+
+    def producer() -> Generator[int, None, None]:
+        try:
+            for i in range(100):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    results: list[int] = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async for item in iterate_in_background_thread(
+            producer(), max_buffered=2, executor=executor
+        ):
+            results.append(item)
+            await asyncio.sleep(0.05)
+            # buffered items + the one the producer is blocked on
+            assert len(produced) <= len(results) + 3
+            if len(results) == 5:
+                break
+
+        assert results == [0, 1, 2, 3, 4]
+        assert await asyncio.to_thread(closed.wait, 2)
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_forwards_errors() -> None:
+    def producer() -> Generator[int, None, None]:
+        yield 1
+        raise ValueError("boom")
+
+    results: list[int] = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError, match="boom"):
+            async for item in iterate_in_background_thread(
+                producer(), max_buffered=10, executor=executor
+            ):
+                results.append(item)
+
+    assert results == [1]
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_waits_for_a_free_worker() -> None:
+    """Iterators beyond the executor's workers wait for a worker to free up, and
+    are never started if their consumer went away in the meantime"""
+    release_first = threading.Event()
+    started: list[str] = []
+
+    def producer(name: str) -> Generator[str, None, None]:
+        started.append(name)
+        if name == "first":
+            release_first.wait(2)
+        yield name
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = iterate_in_background_thread(
+            producer("first"), max_buffered=1, executor=executor
+        )
+        first_item = asyncio.ensure_future(first.__anext__())
+        await asyncio.sleep(0.1)
+
+        abandoned = iterate_in_background_thread(
+            producer("abandoned"), max_buffered=1, executor=executor
+        )
+        abandoned_item = asyncio.ensure_future(abandoned.__anext__())
+        second = iterate_in_background_thread(
+            producer("second"), max_buffered=1, executor=executor
+        )
+        second_item = asyncio.ensure_future(second.__anext__())
+        await asyncio.sleep(0.1)
+        assert started == ["first"]
+
+        abandoned_item.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned_item
+        await abandoned.aclose()
+
+        release_first.set()
+        assert await first_item == "first"
+        assert await asyncio.wait_for(second_item, 2) == "second"
+        await first.aclose()
+        await second.aclose()
+
+    assert started == ["first", "second"]
+
+
+def test_size_budget_bounds_the_size_in_use() -> None:
+    budget = SizeBudget(max_size=10)
+    in_use = 0
+    max_in_use = 0
+    lock = threading.Lock()
+
+    def work(size: int) -> None:
+        nonlocal in_use, max_in_use
+        with budget.reserve(size):
+            with lock:
+                in_use += size
+                max_in_use = max(max_in_use, in_use)
+            time.sleep(0.05)
+            with lock:
+                in_use -= size
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(work, [4, 4, 4, 4, 4, 4]))
+
+    assert max_in_use == 8
+
+
+def test_size_budget_runs_work_larger_than_the_budget_alone() -> None:
+    budget = SizeBudget(max_size=10)
+    small_reserved = threading.Event()
+    release_small = threading.Event()
+    large_done = threading.Event()
+
+    def small() -> None:
+        with budget.reserve(1):
+            small_reserved.set()
+            release_small.wait(2)
+
+    def large() -> None:
+        with budget.reserve(100):
+            large_done.set()
+
+    small_thread = threading.Thread(target=small)
+    small_thread.start()
+    assert small_reserved.wait(2)
+
+    large_thread = threading.Thread(target=large)
+    large_thread.start()
+    # waits for the small reservation instead of exceeding the budget
+    assert not large_done.wait(0.1)
+
+    release_small.set()
+    assert large_done.wait(2)
+    small_thread.join()
+    large_thread.join()
+
+
+def test_size_budget_is_unbounded_when_disabled() -> None:
+    budget = SizeBudget(max_size=0)
+    with budget.reserve(100), budget.reserve(100):
+        pass
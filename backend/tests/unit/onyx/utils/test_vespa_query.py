@@ -3,6 +3,7 @@ from datetime import timedelta
 from datetime import timezone
 from uuid import UUID
 
+from onyx.configs.app_configs import VESPA_WEIGHTED_SET_FILTER_THRESHOLD
 from onyx.configs.constants import DocumentSource
 from onyx.configs.constants import INDEX_SEPARATOR
 from onyx.context.search.models import IndexFilters
@@ -63,6 +64,26 @@ class TestBuildVespaFilters:
             == f'!({HIDDEN}=true) and (access_control_list contains "user2" or access_control_list contains "group2") and '
         )
 
+    def test_large_acl_uses_weighted_set(self) -> None:
+        """Large ACLs are compacted into a single deduped weightedSet term."""
+        acl = [f"group:{i}" for i in range(VESPA_WEIGHTED_SET_FILTER_THRESHOLD + 1)]
+        filters = IndexFilters(access_control_list=acl + acl[:3] + [""])
+        result = build_vespa_filters(filters)
+
+        weighted_elems = ", ".join(f'"{entry}": 1' for entry in acl)
+        assert (
+            result
+            == f"!({HIDDEN}=true) and (weightedSet(access_control_list, {{{weighted_elems}}})) and "
+        )
+
+        # values are escaped
+        filters = IndexFilters(
+            access_control_list=['group:"quoted"']
+            * (VESPA_WEIGHTED_SET_FILTER_THRESHOLD + 1)
+            + [f"user:{i}" for i in range(VESPA_WEIGHTED_SET_FILTER_THRESHOLD)]
+        )
+        assert '"group:\\"quoted\\"": 1' in build_vespa_filters(filters)
+
     def test_tenant_filter(self) -> None:
         """Test tenant ID filtering."""
         # With tenant ID
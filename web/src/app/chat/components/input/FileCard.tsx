@@ -8,6 +8,18 @@ import Truncated from "@/refresh-components/texts/Truncated";
 import { cn, isImageFile } from "@/lib/utils";
 import SimpleLoader from "@/refresh-components/loaders/SimpleLoader";
 import { SvgFileText, SvgX } from "@opal/icons";
+
+function processingLabel(file: ProjectFile): string {
+  const progress = file.progress;
+  if (progress?.stage === "indexing") {
+    return "Indexing...";
+  }
+  if (progress?.total_units) {
+    return `Processing ${progress.processed_units}/${progress.total_units}...`;
+  }
+  return "Processing...";
+}
+
 function ImageFileCard({
   file,
   imageUrl,
@@ -209,7 +221,7 @@ export function FileCard({
           {isProcessing
             ? file.status === UserFileStatus.UPLOADING
               ? "Uploading..."
-              : "Processing..."
+              : processingLabel(file)
             : typeLabel}
         </Text>
       </div>
@@ -579,7 +579,10 @@ export const ProjectsProvider: React.FC<ProjectsProviderProps> = ({
               if (
                 latest.status !== f.status ||
                 latest.name !== f.name ||
-                latest.file_type !== f.file_type
+                latest.file_type !== f.file_type ||
+                latest.progress?.stage !== f.progress?.stage ||
+                latest.progress?.processed_units !==
+                  f.progress?.processed_units
               ) {
                 next.push({ ...f, ...latest } as ProjectFile);
                 changed = true;
@@ -604,7 +607,10 @@ export const ProjectsProvider: React.FC<ProjectsProviderProps> = ({
               if (
                 latest.status !== f.status ||
                 latest.name !== f.name ||
-                latest.file_type !== f.file_type
+                latest.file_type !== f.file_type ||
+                latest.progress?.stage !== f.progress?.stage ||
+                latest.progress?.processed_units !==
+                  f.progress?.processed_units
               ) {
                 changed = true;
                 return { ...f, ...latest } as ProjectFile;
@@ -629,7 +635,10 @@ export const ProjectsProvider: React.FC<ProjectsProviderProps> = ({
               if (
                 latest.status !== prevVal.status ||
                 latest.name !== prevVal.name ||
-                latest.file_type !== prevVal.file_type
+                latest.file_type !== prevVal.file_type ||
+                latest.progress?.stage !== prevVal.progress?.stage ||
+                latest.progress?.processed_units !==
+                  prevVal.progress?.processed_units
               ) {
                 map.set(id, latest);
                 changed = true;
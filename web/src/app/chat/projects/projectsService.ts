@@ -35,6 +35,14 @@ export interface ProjectFile {
   token_count: number | null;
   chunk_count: number | null;
   temp_id?: string | null;
+  // only set while the file is being processed
+  progress?: UserFileProgress | null;
+}
+
+export interface UserFileProgress {
+  stage: "extracting" | "indexing";
+  processed_units: number;
+  total_units: number | null;
 }
 
 export interface UserFileDeleteResult {